@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Batch de scraping multi-ligues dans un seul processus.
+
+- Un pool de threads borné pour toutes les pages (formtable.asp de chaque ligue, puis teamstats.asp
+  de chaque équipe dès que sa ligue est connue)
+- Une session HTTP partagée, avec un débit global maximal (requêtes / seconde, tous threads confondus)
+- Un seul thread d'écriture SQLite : chaque ligue complète est écrite d'un bloc
+- Un journal de progression : une exécution interrompue reprend aux ligues non terminées.
+  Une exécution menée à son terme efface le journal, même si des ligues ont échoué :
+  l'exécution suivante reprend toutes les ligues
+
+Utilisé par scrape_all_leagues_batch.py et pipeline_update_all.py
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import scrape_state
+from scrape_all_leagues_auto import BulgariaAutoScraper
+
+JOURNAL_PATH = os.path.join(os.path.dirname(__file__), "data", "batch_journal.json")
+
+
+class RateLimitedSession(requests.Session):
+    """Session partagée par tous les workers : les requêtes sont espacées d'au moins 1/rate seconde"""
+
+    def __init__(self, rate_per_second: float, pool_size: int):
+        super().__init__()
+        self.min_interval = 1.0 / rate_per_second
+        self.next_slot = 0.0
+        self.slot_lock = threading.Lock()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, *args, **kwargs):
+        with self.slot_lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+        return super().request(*args, **kwargs)
+
+
+class ProgressJournal:
+    """Ligues terminées de l'exécution en cours (fichier JSON ré-écrit après chaque ligue)"""
+
+    def __init__(self, path: str = JOURNAL_PATH):
+        self.path = path
+        self.state = {"started_at": datetime.now().isoformat(timespec="seconds"), "done": {}}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.state = json.load(f)
+
+    @property
+    def done(self) -> Dict[str, dict]:
+        return self.state["done"]
+
+    def mark_done(self, league: str, **info):
+        self.done[league] = {"at": datetime.now().isoformat(timespec="seconds"), **info}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Supprime le fichier (toutes les ligues de l'exécution ont été traitées)"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def reset(self):
+        """Repart de zéro (--restart)"""
+        self.clear()
+        self.state = {"started_at": datetime.now().isoformat(timespec="seconds"), "done": {}}
+
+
+@dataclass
+class LeagueProgress:
+    """Équipes d'une ligue en cours de scraping"""
+    teams: List[Tuple[str, str]]
+    remaining: int
+    matches: List[dict] = field(default_factory=list)
+    marks: Dict[str, Tuple[str, str]] = field(default_factory=dict)
+    failed_teams: List[str] = field(default_factory=list)
+
+
+class BatchRunner:
+    """Scraping de plusieurs ligues sur un pool unique, écriture SQLite sérialisée"""
+
+    DEFAULT_WORKERS = 8
+    DEFAULT_RATE = 2.0  # requêtes / seconde, tous workers confondus
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, rate_per_second: float = DEFAULT_RATE,
+                 incremental: bool = True, use_cache: bool = True, db_path: Optional[str] = None,
+                 journal_path: str = JOURNAL_PATH):
+        """
+        Args:
+            workers: Nombre de pages téléchargées simultanément
+            rate_per_second: Débit global maximal
+            incremental: Repères par équipe (sinon remplacement des équipes re-scrapées)
+            use_cache: Cache HTTP disque (pages inchangées ignorées)
+            db_path: Base SQLite (défaut : celle du scraper)
+            journal_path: Journal de progression
+        """
+        self.workers = workers
+        self.incremental = incremental
+        self.scraper = BulgariaAutoScraper(use_cache=use_cache, db_path=db_path)
+        # Le débit est régulé par la session partagée, plus par une pause par worker
+        self.scraper.REQUEST_DELAY = 0
+        session = RateLimitedSession(rate_per_second, workers)
+        session.headers.update(self.scraper.session.headers)
+        self.scraper.session = session
+        self.journal = ProgressJournal(journal_path)
+        self.writes = queue.Queue()
+        self.failed: Dict[str, str] = {}
+
+    def _load_watermarks(self, league: str) -> Dict[str, Tuple[str, str]]:
+        if not self.incremental:
+            return {}
+        conn = sqlite3.connect(self.scraper.DB_PATH)
+        marks = scrape_state.load_watermarks(conn, league)
+        conn.close()
+        return marks
+
+    def _writer_loop(self):
+        """Seul thread qui écrit dans SQLite : une ligue complète par transaction de sauvegarde"""
+        while True:
+            job = self.writes.get()
+            if job is None:
+                return
+            league, progress = job
+            try:
+                if not self.incremental:
+                    self.scraper.purge_league(league, [name for _, name in progress.teams],
+                                              {match['team'] for match in progress.matches})
+                inserted = self.scraper.save_to_db(progress.matches)
+                if league in self.scraper.failed_leagues:
+                    # Transaction annulée : ni repères ni journal, la ligue est reprise
+                    self.failed[league] = f"écriture en échec : {self.scraper.failed_leagues[league]}"
+                    print(f"❌ {league} : erreur d'écriture - {self.scraper.failed_leagues[league]}")
+                    continue
+                conn = sqlite3.connect(self.scraper.DB_PATH)
+                scrape_state.save_watermarks(conn, league, progress.marks)
+                conn.close()
+                if progress.failed_teams:
+                    # Ligue incomplète : ré-essayée à la reprise
+                    self.failed[league] = f"équipes en échec : {', '.join(progress.failed_teams)}"
+                else:
+                    self.journal.mark_done(league, matches=len(progress.matches), inserted=inserted)
+                print(f"💾 {league} : {len(progress.matches)} matchs écrits ({inserted} nouveaux)")
+            except Exception as e:
+                self.failed[league] = str(e)
+                print(f"❌ {league} : erreur d'écriture - {e}")
+
+    def run(self, leagues: List[str]) -> Dict[str, str]:
+        """
+        Scrape toutes les ligues (sauf saisons terminées et ligues journalisées par une exécution interrompue)
+
+        Returns:
+            {league: erreur} des ligues en échec (vide si tout est terminé)
+        """
+        start = time.time()
+        self.scraper.unchanged_teams = set()
+        finished = scrape_state.finished_leagues() if self.incremental else set()
+        pending = [league for league in leagues if league not in finished and league not in self.journal.done]
+        if self.journal.done:
+            print(f"♻️  Reprise : {len(self.journal.done)} ligues déjà traitées")
+        if finished:
+            print(f"⏭️  Saisons terminées ignorées : {', '.join(sorted(finished & set(leagues)))}")
+        print(f"🚀 {len(pending)} ligues, {self.workers} workers")
+
+        writer = threading.Thread(target=self._writer_loop, daemon=True)
+        writer.start()
+
+        progress: Dict[str, LeagueProgress] = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            league_futures = {pool.submit(self.scraper.extract_team_codes, league): league for league in pending}
+            team_futures = {}
+            waiting = set(league_futures)
+            while waiting:
+                done, waiting = wait(waiting, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in league_futures:
+                        league = league_futures[future]
+                        teams = future.result()
+                        if not teams:
+                            self.failed[league] = "aucune équipe trouvée"
+                            continue
+                        marks = self._load_watermarks(league)
+                        progress[league] = LeagueProgress(teams=teams, remaining=len(teams))
+                        for code, name in teams:
+                            team_future = pool.submit(self.scraper.scrape_team, league, code, name,
+                                                      since=marks.get(name))
+                            team_futures[team_future] = (league, name)
+                            waiting.add(team_future)
+                        continue
+
+                    league, name = team_futures.pop(future)
+                    league_progress = progress[league]
+                    league_progress.remaining -= 1
+                    try:
+                        matches = future.result()
+                    except Exception as e:
+                        print(f"    ❌ {name}: Exception - {e}")
+                        matches = None
+                    if matches:
+                        league_progress.matches.extend(matches)
+                        league_progress.marks[name] = (matches[-1]['date'], matches[-1]['opponent'])
+                    elif matches is None:
+                        league_progress.failed_teams.append(name)
+                    if league_progress.remaining == 0:
+                        self.writes.put((league, progress.pop(league)))
+
+        self.writes.put(None)
+        writer.join()
+
+        # Toutes les ligues ont été traitées : la reprise ne concerne que les exécutions interrompues
+        self.journal.clear()
+        print(f"\n✅ Batch terminé en {time.time() - start:.0f}s : "
+              f"{len(pending) - len(self.failed)}/{len(pending)} ligues")
+        for league, error in self.failed.items():
+            print(f"   ⚠️  {league} : {error}")
+        if self.scraper.http_cache:
+            print(f"   • {self.scraper.http_cache.summary()}")
+        return self.failed
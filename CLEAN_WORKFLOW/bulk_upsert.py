@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Écriture en masse dans soccerstats_scraped_matches.
+
+- Clé d'unicité : (team, opponent, date, is_home), une ligne par match et par équipe.
+  match_id ("date_A_vs_B") est partagé par les deux lignes d'un même match (domicile / extérieur)
+  et ne peut donc pas servir de cible ON CONFLICT.
+- INSERT ... ON CONFLICT DO UPDATE via executemany, une transaction par ligue
+- PRAGMAs de chargement : WAL + synchronous=NORMAL (un seul fsync par checkpoint au lieu d'un par commit)
+
+Utilisé par BulgariaAutoScraper.save_to_db et import_all_leagues_csv_to_sql.py
+"""
+import sqlite3
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+ROW_KEY = ("team", "opponent", "date", "is_home")
+ROW_KEY_INDEX = "idx_scraped_matches_row_key"
+
+BULK_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",  # 64 Mo
+)
+
+RowKey = Tuple[str, str, str, int]
+
+
+def apply_bulk_pragmas(conn: sqlite3.Connection):
+    for pragma in BULK_PRAGMAS:
+        conn.execute(pragma)
+
+
+def ensure_row_key(conn: sqlite3.Connection) -> int:
+    """
+    Crée l'index UNIQUE sur la clé de ligne (cible de ON CONFLICT).
+    Les doublons éventuels sont supprimés d'abord en gardant la ligne la plus récente.
+
+    Returns:
+        Nombre de doublons supprimés
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (ROW_KEY_INDEX,)
+    ).fetchone()
+    if exists:
+        return 0
+    key = ", ".join(ROW_KEY)
+    stale = f'''
+        SELECT id FROM soccerstats_scraped_matches
+        WHERE id NOT IN (SELECT MAX(id) FROM soccerstats_scraped_matches GROUP BY {key})
+    '''
+    has_events = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'goal_events'"
+    ).fetchone()
+    if has_events:
+        conn.execute(f"DELETE FROM goal_events WHERE match_row_id IN ({stale})")
+    deleted = conn.execute(f"DELETE FROM soccerstats_scraped_matches WHERE id IN ({stale})").rowcount
+    conn.execute(f"CREATE UNIQUE INDEX {ROW_KEY_INDEX} ON soccerstats_scraped_matches ({key})")
+    conn.commit()
+    if deleted:
+        print(f"🧹 {deleted} doublons (team, opponent, date, is_home) supprimés")
+    return deleted
+
+
+def row_ids(cursor: sqlite3.Cursor, teams: Iterable[str]) -> Dict[RowKey, int]:
+    """{(team, opponent, date, is_home): id} des lignes existantes pour ces équipes"""
+    teams = sorted(set(teams))
+    if not teams:
+        return {}
+    cursor.execute(f'''
+        SELECT team, opponent, date, is_home, id FROM soccerstats_scraped_matches
+        WHERE team IN ({','.join('?' * len(teams))})
+    ''', teams)
+    return {(team, opponent, date, int(is_home)): row_id
+            for team, opponent, date, is_home, row_id in cursor.fetchall()}
+
+
+def upsert_rows(cursor: sqlite3.Cursor, columns: Sequence[str], rows: List[tuple],
+                update_columns: Sequence[str]):
+    """
+    INSERT ... ON CONFLICT (team, opponent, date, is_home) DO UPDATE, en un seul executemany.
+    Le commit (une transaction par ligue) est laissé à l'appelant.
+
+    Args:
+        columns: Colonnes insérées (doivent inclure la clé de ligne)
+        rows: Valeurs, dans l'ordre de columns
+        update_columns: Colonnes réécrites si la ligne existe déjà (scraped_at est toujours rafraîchi)
+    """
+    assignments = [f"{column} = excluded.{column}" for column in update_columns]
+    assignments.append("scraped_at = CURRENT_TIMESTAMP")
+    cursor.executemany(f'''
+        INSERT INTO soccerstats_scraped_matches ({', '.join(columns)})
+        VALUES ({', '.join('?' * len(columns))})
+        ON CONFLICT ({', '.join(ROW_KEY)}) DO UPDATE SET {', '.join(assignments)}
+    ''', rows)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Accès lecture partagé à predictions.db pour le live (prédicteurs, scoring, sélecteur).
+
+- Chemin unique : variable d'environnement PARIS_LIVE_DB, sinon CLEAN_WORKFLOW/data/predictions.db
+  (modifiable à chaud via set_db_path)
+- Pool de connexions lecture seule (mode=ro + PRAGMA query_only), partagées entre threads
+- Base passée en WAL à la première ouverture : les lectures live ne bloquent pas les écritures du scraper
+- Connexions longues : le cache de requêtes préparées de sqlite3 (cached_statements) est réutilisé
+  d'une recherche à l'autre au lieu d'être reconstruit à chaque connect()
+
+`conn.close()` sur une connexion du pool la rend au pool : le code existant
+(connect / cursor / close) fonctionne sans modification.
+
+Usage :
+    import db_access
+    conn = db_access.connect()
+    rows = conn.execute("SELECT ...", params).fetchall()
+    conn.close()
+
+    with db_access.connection() as conn:
+        ...
+"""
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+from urllib.parse import quote
+
+DB_PATH = os.environ.get(
+    "PARIS_LIVE_DB", os.path.join(os.path.dirname(__file__), "data", "predictions.db")
+)
+
+POOL_SIZE = 8  # connexions inactives conservées par base
+CACHED_STATEMENTS = 256  # requêtes préparées gardées par connexion
+
+_db_path = DB_PATH
+_pools: Dict[str, "ReadOnlyPool"] = {}
+_pools_lock = threading.Lock()
+
+
+class PooledConnection(sqlite3.Connection):
+    """Connexion lecture seule : close() la rend au pool au lieu de la fermer"""
+
+    pool: Optional["ReadOnlyPool"] = None
+    in_pool = False
+
+    def close(self):
+        if self.pool is None:
+            super().close()
+        else:
+            self.pool.release(self)
+
+
+class ReadOnlyPool:
+    """Connexions lecture seule vers une base (sans limite d'emprunt, POOL_SIZE conservées)"""
+
+    def __init__(self, path: str, size: int = POOL_SIZE):
+        self.path = os.path.abspath(path)
+        self.size = size
+        self.idle = queue.LifoQueue()
+        self.wal_checked = False
+        self.lock = threading.Lock()
+        self.stats = {"opened": 0, "reused": 0}
+
+    def _enable_wal(self):
+        """journal_mode=WAL est persistant : une connexion écriture suffit, une seule fois"""
+        with self.lock:
+            if self.wal_checked:
+                return
+            self.wal_checked = True
+        if not os.path.exists(self.path):
+            return
+        try:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.close()
+        except sqlite3.Error as e:
+            print(f"⚠️  WAL non activé sur {self.path} : {e}")
+
+    def _open(self) -> PooledConnection:
+        self._enable_wal()
+        conn = sqlite3.connect(
+            f"file:{quote(self.path)}?mode=ro",
+            uri=True,
+            timeout=5,
+            check_same_thread=False,
+            cached_statements=CACHED_STATEMENTS,
+            factory=PooledConnection,
+        )
+        conn.execute("PRAGMA query_only = ON")
+        conn.pool = self
+        with self.lock:
+            self.stats["opened"] += 1
+        return conn
+
+    def acquire(self) -> PooledConnection:
+        try:
+            conn = self.idle.get_nowait()
+        except queue.Empty:
+            return self._open()
+        conn.in_pool = False
+        with self.lock:
+            self.stats["reused"] += 1
+        return conn
+
+    def release(self, conn: PooledConnection):
+        if conn.in_pool:
+            return  # double close()
+        if conn.in_transaction:
+            conn.rollback()
+        if self.idle.qsize() < self.size:
+            conn.in_pool = True
+            self.idle.put(conn)
+        else:
+            sqlite3.Connection.close(conn)
+
+    def close(self):
+        while True:
+            try:
+                conn = self.idle.get_nowait()
+            except queue.Empty:
+                return
+            sqlite3.Connection.close(conn)
+
+
+def get_db_path() -> str:
+    """Chemin de predictions.db utilisé par le live"""
+    return _db_path
+
+
+def set_db_path(path: str):
+    """Change la base par défaut (tests, autre environnement)"""
+    global _db_path
+    _db_path = path
+
+
+def get_pool(path: Optional[str] = None) -> ReadOnlyPool:
+    key = os.path.abspath(path or _db_path)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ReadOnlyPool(key)
+        return _pools[key]
+
+
+def connect(path: Optional[str] = None) -> PooledConnection:
+    """
+    Emprunte une connexion lecture seule
+
+    Raises:
+        sqlite3.OperationalError: Base absente (mode=ro ne crée pas le fichier)
+    """
+    return get_pool(path).acquire()
+
+
+@contextmanager
+def connection(path: Optional[str] = None):
+    """with db_access.connection() as conn: ... (connexion rendue au pool en sortie)"""
+    conn = connect(path)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def close_all():
+    """Ferme toutes les connexions inactives (fin de processus, changement de base)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+Stockage colonnaire des minutes de but.
+
+En plus des colonnes JSON historiques (goal_times / goal_times_conceded, complétées par des 0),
+chaque ligne de soccerstats_scraped_matches porte :
+- goal_minutes / conceded_minutes : BLOB uint8, une minute par octet, sans padding
+et la table normalisée goal_events(match_row_id, minute, stoppage, scored_by_team).
+
+Les lecteurs utilisent decode_minutes(), qui accepte indifféremment un BLOB ou l'ancien JSON,
+et select_goal_columns() pour choisir les colonnes présentes dans la base.
+
+Le BLOB est prioritaire sur le JSON : un écrivain qui ne met à jour que les colonnes JSON
+(scrape_team_goal_times.py, upsert des imports CSV) laisserait un BLOB périmé. Les triggers de
+ensure_schema() remettent alors le BLOB à NULL (lecture du JSON, re-packé par migrate()) et
+suppriment les goal_events de la ligne ; la suppression d'une ligne supprime aussi ses goal_events.
+
+Usage (migration one-shot) :
+    python3 CLEAN_WORKFLOW/goal_storage.py
+    python3 CLEAN_WORKFLOW/goal_storage.py --db football-live-prediction/data/predictions.db
+"""
+import json
+import os
+import sqlite3
+import time
+from typing import Iterable, List, Sequence, Tuple
+
+DB_PATH = os.path.join(os.path.dirname(__file__), "data", "predictions.db")
+
+# (minute, temps additionnel, 1 si marqué par l'équipe de la ligne / 0 si encaissé)
+GoalEvent = Tuple[int, int, int]
+
+EVENTS_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS goal_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    match_row_id INTEGER NOT NULL,
+    minute INTEGER NOT NULL,
+    stoppage INTEGER NOT NULL DEFAULT 0,
+    scored_by_team INTEGER NOT NULL,
+    FOREIGN KEY (match_row_id) REFERENCES soccerstats_scraped_matches(id)
+);
+CREATE INDEX IF NOT EXISTS idx_goal_events_match ON goal_events(match_row_id);
+CREATE INDEX IF NOT EXISTS idx_goal_events_minute ON goal_events(minute, scored_by_team);
+'''
+
+# Écriture JSON seule (BLOB inchangé dans la même requête) : BLOB et goal_events deviennent périmés
+STALE_TRIGGERS = '''
+CREATE TRIGGER IF NOT EXISTS trg_goal_json_updated
+AFTER UPDATE OF goal_times, goal_times_conceded ON soccerstats_scraped_matches
+WHEN NEW.goal_minutes IS OLD.goal_minutes AND NEW.conceded_minutes IS OLD.conceded_minutes
+BEGIN
+    UPDATE soccerstats_scraped_matches SET goal_minutes = NULL, conceded_minutes = NULL WHERE id = NEW.id;
+    DELETE FROM goal_events WHERE match_row_id = NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_goal_row_deleted
+AFTER DELETE ON soccerstats_scraped_matches
+BEGIN
+    DELETE FROM goal_events WHERE match_row_id = OLD.id;
+END;
+'''
+
+
+def pack_minutes(minutes: Iterable[int]) -> bytes:
+    """Encode une liste de minutes en BLOB uint8 (les 0 de padding sont retirés)"""
+    return bytes(min(int(m), 255) for m in minutes if m and m > 0)
+
+
+def decode_minutes(value) -> List[int]:
+    """
+    Décode une colonne de minutes quel que soit son format :
+    BLOB uint8, JSON '[12, 0, 0]', CSV '12,45' ou entier isolé.
+    """
+    if value is None:
+        return []
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return [m for m in bytes(value) if m > 0]
+    if isinstance(value, (int, float)):
+        return [int(value)] if value > 0 else []
+    text = str(value).strip()
+    if not text:
+        return []
+    try:
+        if text.startswith('['):
+            values = json.loads(text)
+        else:
+            values = [int(x) for x in text.split(',') if x.strip().isdigit()]
+    except (ValueError, TypeError):
+        return []
+    if isinstance(values, (int, float)):
+        values = [values]
+    return [int(m) for m in values if isinstance(m, (int, float)) and m > 0]
+
+
+def has_packed_columns(conn: sqlite3.Connection) -> bool:
+    """True si les colonnes goal_minutes / conceded_minutes existent"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(soccerstats_scraped_matches)")}
+    return 'goal_minutes' in columns and 'conceded_minutes' in columns
+
+
+def select_goal_columns(conn: sqlite3.Connection) -> str:
+    """
+    Expression SELECT des deux colonnes de minutes (marqués, encaissés).
+    Préfère le BLOB et retombe sur le JSON pour les lignes non migrées (ou dont le BLOB a été
+    invalidé par les triggers de ensure_schema après une écriture JSON seule).
+    """
+    if has_packed_columns(conn):
+        return ("COALESCE(goal_minutes, goal_times) AS goal_times, "
+                "COALESCE(conceded_minutes, goal_times_conceded) AS goal_times_conceded")
+    return "goal_times, goal_times_conceded"
+
+
+def ensure_schema(conn: sqlite3.Connection):
+    """Ajoute les colonnes BLOB, la table goal_events et les triggers d'invalidation si nécessaire"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(soccerstats_scraped_matches)")}
+    if 'goal_minutes' not in columns:
+        conn.execute("ALTER TABLE soccerstats_scraped_matches ADD COLUMN goal_minutes BLOB")
+    if 'conceded_minutes' not in columns:
+        conn.execute("ALTER TABLE soccerstats_scraped_matches ADD COLUMN conceded_minutes BLOB")
+    conn.executescript(EVENTS_SCHEMA)
+    conn.executescript(STALE_TRIGGERS)
+
+
+def events_from_minutes(scored: Sequence[int], conceded: Sequence[int]) -> List[GoalEvent]:
+    """Construit les événements sans temps additionnel (cas des lignes JSON historiques)"""
+    return [(m, 0, 1) for m in scored if m > 0] + [(m, 0, 0) for m in conceded if m > 0]
+
+
+def write_goals(cursor: sqlite3.Cursor, row_id: int, events: Sequence[GoalEvent]):
+    """
+    Dual-write des buts d'une ligne : BLOBs + goal_events (remplace l'existant).
+    Les colonnes JSON restent écrites par l'appelant pour compatibilité.
+    """
+    scored = [minute for minute, _, by_team in events if by_team]
+    conceded = [minute for minute, _, by_team in events if not by_team]
+    cursor.execute('''
+        UPDATE soccerstats_scraped_matches SET goal_minutes = ?, conceded_minutes = ?
+        WHERE id = ?
+    ''', (pack_minutes(scored), pack_minutes(conceded), row_id))
+    cursor.execute("DELETE FROM goal_events WHERE match_row_id = ?", (row_id,))
+    cursor.executemany('''
+        INSERT INTO goal_events (match_row_id, minute, stoppage, scored_by_team)
+        VALUES (?, ?, ?, ?)
+    ''', [(row_id, minute, stoppage or 0, 1 if by_team else 0)
+          for minute, stoppage, by_team in events if minute > 0])
+
+
+def write_goals_many(cursor: sqlite3.Cursor, items: Sequence[Tuple[int, Sequence[GoalEvent]]]):
+    """write_goals pour un lot de lignes [(row_id, events)], en trois executemany"""
+    updates = []
+    events = []
+    for row_id, row_events in items:
+        scored = [minute for minute, _, by_team in row_events if by_team]
+        conceded = [minute for minute, _, by_team in row_events if not by_team]
+        updates.append((pack_minutes(scored), pack_minutes(conceded), row_id))
+        events.extend((row_id, minute, stoppage or 0, 1 if by_team else 0)
+                      for minute, stoppage, by_team in row_events if minute > 0)
+    cursor.executemany('''
+        UPDATE soccerstats_scraped_matches SET goal_minutes = ?, conceded_minutes = ?
+        WHERE id = ?
+    ''', updates)
+    cursor.executemany("DELETE FROM goal_events WHERE match_row_id = ?", [(u[2],) for u in updates])
+    cursor.executemany('''
+        INSERT INTO goal_events (match_row_id, minute, stoppage, scored_by_team)
+        VALUES (?, ?, ?, ?)
+    ''', events)
+
+
+def migrate(conn: sqlite3.Connection, batch_size: int = 2000) -> int:
+    """
+    Migration one-shot : remplit BLOBs et goal_events depuis les colonnes JSON
+    pour toutes les lignes non encore migrées (goal_minutes IS NULL).
+
+    Returns:
+        Nombre de lignes migrées
+    """
+    ensure_schema(conn)
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT id, goal_times, goal_times_conceded FROM soccerstats_scraped_matches
+        WHERE goal_minutes IS NULL
+    ''')
+    rows = cursor.fetchall()
+    write = conn.cursor()
+    for i in range(0, len(rows), batch_size):
+        batch = rows[i:i + batch_size]
+        updates = []
+        events = []
+        for row_id, goal_times, goal_times_conceded in batch:
+            scored = decode_minutes(goal_times)
+            conceded = decode_minutes(goal_times_conceded)
+            updates.append((pack_minutes(scored), pack_minutes(conceded), row_id))
+            events.extend((row_id, m, s, b) for m, s, b in events_from_minutes(scored, conceded))
+        write.executemany('''
+            UPDATE soccerstats_scraped_matches SET goal_minutes = ?, conceded_minutes = ?
+            WHERE id = ?
+        ''', updates)
+        write.executemany("DELETE FROM goal_events WHERE match_row_id = ?", [(u[2],) for u in updates])
+        write.executemany('''
+            INSERT INTO goal_events (match_row_id, minute, stoppage, scored_by_team)
+            VALUES (?, ?, ?, ?)
+        ''', events)
+        conn.commit()
+    return len(rows)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Migration des minutes de but vers le stockage colonnaire")
+    parser.add_argument('--db', default=DB_PATH, help='Chemin vers predictions.db')
+    args = parser.parse_args()
+
+    start = time.time()
+    conn = sqlite3.connect(args.db)
+    migrated = migrate(conn)
+    n_events = conn.execute("SELECT COUNT(*) FROM goal_events").fetchone()[0]
+    conn.close()
+    print(f"✅ {migrated} lignes migrées ({n_events} événements de but) en {time.time() - start:.2f}s")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Couche de parsing HTML commune aux scrapers live et historiques.
+
+- Backend : lxml s'il est installé (sinon html.parser), forçable via PARIS_LIVE_HTML_PARSER
+- SoupStrainer : seuls les sous-arbres utiles d'une page sont construits
+    MATCH_PAGE   pmatch.asp      tables sans attribut style (en-tête équipes/score, minute, bloc des stats) ;
+                                 exclut le bloc d'analyse (~400 Ko) et la colonne de navigation
+    BTABLE       page d'accueil  table#btable (liste des matchs du jour)
+    TEAM_LINKS   formtable.asp   liens teamstats.asp uniquement
+    TEAM_MATCHES teamstats.asp   tables bgcolor=#cccccc (la première est la liste des matchs)
+  Un parse restreint qui ne trouve pas ce qu'il cherche est refait sur la page complète (parse(check=...))
+- Tooltip des scores : chemin rapide par regex pour la structure <font><br/><b>X-Y</b> ... (min)</font>,
+  repli sur BeautifulSoup si la structure n'est pas reconnue
+
+Benchmark sur les pages enregistrées du dépôt :
+    python3 CLEAN_WORKFLOW/html_parsing.py
+"""
+import os
+import re
+import time
+from typing import Callable, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = 'lxml'
+except ImportError:
+    DEFAULT_PARSER = 'html.parser'
+
+PARSER = os.environ.get('PARIS_LIVE_HTML_PARSER', DEFAULT_PARSER)
+
+MATCH_PAGE = SoupStrainer('table', attrs={'style': lambda value: value is None})
+BTABLE = SoupStrainer('table', id='btable')
+TEAM_LINKS = SoupStrainer('a', href=re.compile(r'teamstats\.asp'))
+TEAM_MATCHES = SoupStrainer('table', attrs={'bgcolor': '#cccccc', 'width': '100%'})
+
+# Un but du tooltip : <font><br/><b>1-0</b> <font color='#000000'>Nom (12)</font> pen.</font>
+TOOLTIP_GOAL_RE = re.compile(
+    r"<font[^>]*>\s*(?:<br\s*/?>\s*)?<b>\s*(\d+)-(\d+)[^<]*</b>(.*?)(?=<font[^>]*>\s*(?:<br\s*/?>\s*)?<b>|$)",
+    re.S | re.I,
+)
+TAG_RE = re.compile(r'<[^>]+>')
+B_TAG_RE = re.compile(r'<b[\s>]', re.I)
+
+
+def make_soup(markup, strainer: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """BeautifulSoup avec le backend configuré, restreint au strainer éventuel"""
+    return BeautifulSoup(markup, PARSER, parse_only=strainer)
+
+
+def parse(markup, strainer: SoupStrainer, check: Callable[[BeautifulSoup], bool]) -> BeautifulSoup:
+    """Parse restreint ; page complète si check(soup) échoue (mise en page inattendue)"""
+    soup = make_soup(markup, strainer)
+    if check(soup):
+        return soup
+    return make_soup(markup)
+
+
+def tooltip_score_blocks(tooltip_html: str) -> Optional[List[Tuple[int, int, str]]]:
+    """
+    Chemin rapide : [(score domicile, score extérieur, texte du bloc)] dans l'ordre du tooltip
+
+    Returns:
+        None si la structure n'est pas celle attendue (chaque <b> doit ouvrir un bloc de but)
+    """
+    blocks = [(int(home), int(away), TAG_RE.sub('', f"{home}-{away}{tail}"))
+              for home, away, tail in TOOLTIP_GOAL_RE.findall(tooltip_html)]
+    if len(blocks) != len(B_TAG_RE.findall(tooltip_html)):
+        return None
+    return blocks
+
+
+def _benchmark(repeat: int = 3):
+    """Compare html.parser complet et la couche lxml + SoupStrainer sur les pages enregistrées"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    pages = [
+        ('football-live-prediction/live_match_sample.html', MATCH_PAGE),
+        ('soccerstats_home.html', BTABLE),
+        ('football-live-prediction/debug_bulgaria_latest.html', None),
+        ('football-live-prediction/bulgaria_teams.html', TEAM_LINKS),
+    ]
+
+    def best(fn):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        return min(timings) * 1000
+
+    print(f"Backend : {PARSER}")
+    for relative_path, strainer in pages:
+        path = os.path.join(root, relative_path)
+        if not os.path.exists(path):
+            continue
+        with open(path, 'rb') as f:
+            html = f.read()
+        baseline = best(lambda: BeautifulSoup(html, 'html.parser'))
+        fast = best(lambda: make_soup(html, strainer))
+        print(f"   • {relative_path:52s} {len(html) / 1024:5.0f} Ko  "
+              f"html.parser {baseline:6.0f} ms  ->  {fast:5.0f} ms  (x{baseline / fast:.1f})")
+
+    tooltip = ("<span><div>"
+               "<font><br/><b>1-0</b> <font color='#000000'>A (12)</font></font>"
+               "<font><br/><b>1-1</b> <font color='#000000'>B (45+2)</font></font>"
+               "<font><br/><b>2-1</b> <font color='#000000'>C (90+4)</font> pen.</font>"
+               "</div></span>")
+    n = 1000
+    baseline = best(lambda: [BeautifulSoup(tooltip, 'html.parser').find_all('b') for _ in range(n)])
+    fast = best(lambda: [tooltip_score_blocks(tooltip) for _ in range(n)])
+    print(f"   • tooltip x{n:<47d}        html.parser {baseline:6.0f} ms  ->  {fast:5.0f} ms  (x{baseline / fast:.0f})")
+
+
+if __name__ == '__main__':
+    _benchmark()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Cache HTTP sur disque pour les pages SoccerStats.
+
+- Clé : URL complète (paramètres GET inclus)
+- Fraîcheur : TTL par type de page (formtable.asp, teamstats.asp...) -> aucune requête réseau
+- Revalidation conditionnelle : If-None-Match / If-Modified-Since (réponse 304)
+- Empreinte SHA-1 du corps : une page re-téléchargée mais identique est signalée inchangée
+
+Chaque réponse porte deux attributs :
+    response.from_cache  -> corps servi depuis le disque (TTL ou 304)
+    response.changed     -> corps différent de la dernière version confirmée
+Si `changed` est faux, le parsing et les écritures DB peuvent être sautés.
+
+"Inchangée" n'a de sens que pour une base donnée : un scraper qui écrit en base utilise un cache
+propre à cette base (cache_path_for) avec auto_confirm=False, et n'appelle confirm() qu'une fois
+les lignes de la page committées (invalidate() en cas d'échec).
+
+Usage :
+    cache = HttpCache(cache_path_for(db_path), auto_confirm=False)
+    response = cache.get(session, url, timeout=15)
+    if response.changed:
+        ...  # parsing + écriture DB
+        cache.confirm([url])
+    print(cache.summary())
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Callable, Dict, Iterable, Optional
+from urllib.parse import urlencode, urlparse
+
+import requests
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(__file__), "data", "http_cache.db")
+
+# Durée de fraîcheur (secondes) par page : pendant ce délai aucune requête n'est envoyée
+# Les pages live (accueil, latest, pmatch) sont toujours revalidées
+DEFAULT_TTL = {
+    "formtable.asp": 6 * 3600,
+    "teamstats.asp": 6 * 3600,
+    "results.asp": 6 * 3600,
+    "widetable.asp": 6 * 3600,
+    "latest.asp": 0,
+    "pmatch.asp": 0,
+}
+DEFAULT_TTL_OTHER = 0
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS http_cache (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT NOT NULL,
+    encoding TEXT,
+    fetched_at REAL NOT NULL,
+    body BLOB NOT NULL,
+    committed_hash TEXT
+)
+'''
+
+
+def cache_path_for(db_path: str) -> str:
+    """Cache associé à une base SQLite (predictions.db -> predictions.http_cache.db, même dossier)"""
+    root, _ = os.path.splitext(os.path.abspath(db_path))
+    return f"{root}.http_cache.db"
+
+
+class HttpCache:
+    """Cache HTTP thread-safe (une connexion SQLite partagée, protégée par un verrou)"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: Optional[Dict[str, float]] = None,
+                 default_ttl: float = DEFAULT_TTL_OTHER, auto_confirm: bool = True):
+        """
+        Args:
+            path: Fichier SQLite du cache
+            ttl: TTL par page ({"teamstats.asp": 3600}), complète DEFAULT_TTL
+            default_ttl: TTL des pages non listées
+            auto_confirm: Confirmer chaque version dès le téléchargement ; False pour ne la
+                confirmer qu'après écriture en base (confirm)
+        """
+        self.path = path
+        self.ttl = dict(DEFAULT_TTL)
+        if ttl:
+            self.ttl.update(ttl)
+        self.default_ttl = default_ttl
+        self.auto_confirm = auto_confirm
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(http_cache)")}
+        if "committed_hash" not in columns:
+            # Cache antérieur : aucune version confirmée, chaque page sera retraitée une fois
+            self.conn.execute("ALTER TABLE http_cache ADD COLUMN committed_hash TEXT")
+        self.conn.commit()
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "revalidated": 0, "unchanged": 0, "misses": 0}
+
+    def ttl_for(self, url: str) -> float:
+        """TTL applicable à une URL (selon le nom de la page .asp)"""
+        page = urlparse(url).path.rsplit("/", 1)[-1]
+        return self.ttl.get(page, self.default_ttl)
+
+    def _count(self, key: str):
+        with self.lock:
+            self.stats[key] += 1
+
+    def _lookup(self, url: str):
+        with self.lock:
+            return self.conn.execute('''
+                SELECT etag, last_modified, content_hash, encoding, fetched_at, body, committed_hash
+                FROM http_cache WHERE url = ?
+            ''', (url,)).fetchone()
+
+    @staticmethod
+    def _cached_response(url: str, entry, changed: bool) -> requests.Response:
+        response = requests.Response()
+        response._content = zlib.decompress(entry[5])
+        response.status_code = 200
+        response.url = url
+        response.encoding = entry[3]
+        response.from_cache = True
+        response.changed = changed
+        return response
+
+    def get(self, session: requests.Session, url: str, params: Optional[Dict] = None,
+            timeout: float = 15, on_request: Optional[Callable[[], None]] = None) -> requests.Response:
+        """
+        GET avec cache
+
+        Args:
+            session: Session requests utilisée pour le réseau
+            url: URL de la page
+            params: Paramètres GET (intégrés à la clé)
+            timeout: Timeout HTTP (secondes)
+            on_request: Appelé juste avant un accès réseau (rate limiting)
+
+        Returns:
+            requests.Response avec les attributs from_cache et changed
+
+        Raises:
+            requests.HTTPError: Statut HTTP en erreur (rien n'est mis en cache)
+        """
+        if params:
+            url = f"{url}{'&' if '?' in url else '?'}{urlencode(params)}"
+
+        entry = self._lookup(url)
+        # Corps en cache mais jamais confirmé (écriture DB en échec ou interrompue) : toujours à traiter
+        cached_changed = bool(entry) and entry[6] != entry[2]
+        if entry and time.time() - entry[4] < self.ttl_for(url):
+            self._count("hits")
+            return self._cached_response(url, entry, changed=cached_changed)
+
+        headers = {}
+        if entry and entry[0]:
+            headers["If-None-Match"] = entry[0]
+        if entry and entry[1]:
+            headers["If-Modified-Since"] = entry[1]
+
+        if on_request:
+            on_request()
+        response = session.get(url, headers=headers, timeout=timeout)
+
+        if response.status_code == 304 and entry:
+            with self.lock:
+                self.conn.execute("UPDATE http_cache SET fetched_at = ? WHERE url = ?", (time.time(), url))
+                self.conn.commit()
+            self._count("revalidated")
+            return self._cached_response(url, entry, changed=cached_changed)
+
+        response.raise_for_status()
+        content_hash = hashlib.sha1(response.content).hexdigest()
+        committed_hash = entry[6] if entry else None
+        changed = committed_hash != content_hash
+        if self.auto_confirm:
+            committed_hash = content_hash
+        with self.lock:
+            self.conn.execute('''
+                INSERT OR REPLACE INTO http_cache
+                (url, etag, last_modified, content_hash, encoding, fetched_at, body, committed_hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                url,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                content_hash,
+                response.encoding,
+                time.time(),
+                zlib.compress(response.content),
+                committed_hash,
+            ))
+            self.conn.commit()
+        self._count("misses" if changed else "unchanged")
+        response.from_cache = False
+        response.changed = changed
+        return response
+
+    def confirm(self, urls: Iterable[str]):
+        """Marque la version en cache de ces URLs comme écrite en base (plus signalée changed)"""
+        with self.lock:
+            self.conn.executemany("UPDATE http_cache SET committed_hash = content_hash WHERE url = ?",
+                                  [(url,) for url in urls])
+            self.conn.commit()
+
+    def invalidate(self, url: str):
+        """Oublie une URL (ex : parsing ou écriture DB en échec, pour forcer un retraitement)"""
+        with self.lock:
+            self.conn.execute("DELETE FROM http_cache WHERE url = ?", (url,))
+            self.conn.commit()
+
+    @property
+    def hit_rate(self) -> float:
+        """Part des pages servies sans re-télécharger le corps (TTL + 304)"""
+        total = sum(self.stats.values())
+        return (self.stats["hits"] + self.stats["revalidated"]) / total if total else 0.0
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"cache HTTP : {s['hits']} hits TTL, {s['revalidated']} revalidées (304), "
+                f"{s['unchanged']} inchangées, {s['misses']} téléchargées "
+                f"(hit rate {self.hit_rate * 100:.0f}%)")
+
+    def close(self):
+        self.conn.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Inspection du cache HTTP")
+    parser.add_argument("--db", default=DEFAULT_CACHE_PATH)
+    parser.add_argument("--clear", action="store_true", help="Vider le cache")
+    args = parser.parse_args()
+
+    cache = HttpCache(args.db)
+    if args.clear:
+        cache.conn.execute("DELETE FROM http_cache")
+        cache.conn.commit()
+        print("🗑️  Cache vidé")
+    for page, count, size in cache.conn.execute('''
+        SELECT substr(url, 1, instr(url || '?', '?') - 1) AS page, COUNT(*), SUM(length(body))
+        FROM http_cache GROUP BY page ORDER BY COUNT(*) DESC
+    '''):
+        print(f"   • {page:55s} {count:5d} pages  {size / 1024:8.0f} KB")
+    cache.close()
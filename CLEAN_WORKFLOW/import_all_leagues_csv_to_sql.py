@@ -5,6 +5,9 @@ from datetime import datetime
 import glob
 import os
 
+import bulk_upsert
+import recurrence_index
+
 # Dossier contenant tous les CSV par ligue
 csv_dir = "CLEAN_WORKFLOW/data/"
 # Pattern pour trouver tous les CSV de type predictions_xxx_only.csv
@@ -12,8 +15,16 @@ csv_pattern = os.path.join(csv_dir, "predictions_*_only.csv")
 
 # Connexion à la base
 conn = sqlite3.connect("CLEAN_WORKFLOW/data/predictions.db")
+bulk_upsert.apply_bulk_pragmas(conn)
+bulk_upsert.ensure_row_key(conn)
 c = conn.cursor()
 
+COLUMNS = (
+    'country', 'league_code', 'league', 'league_display_name', 'team', 'opponent', 'date', 'is_home',
+    'score', 'goals_for', 'goals_against', 'goal_times', 'goal_times_conceded', 'match_id',
+    'ht_score', 'url', 'scraped_at',
+)
+
 def safe_int(x):
     try:
         return int(x)
@@ -42,13 +53,15 @@ for csv_path in glob.glob(csv_pattern):
         continue
     league_code = safe_str(df.iloc[0]['league_code'])
     country = safe_str(df.iloc[0]['country'])
-    # Vider la table pour cette ligue/pays
+    # Ligues dont l'index des récurrences doit suivre (lignes supprimées ou ré-insérées)
+    leagues = {league for (league,) in c.execute(
+        "SELECT DISTINCT league FROM soccerstats_scraped_matches WHERE league_code = ? AND country = ?",
+        (league_code, country))}
+    # Vider la table pour cette ligue/pays puis ré-insérer : une seule transaction par ligue
     c.execute("DELETE FROM soccerstats_scraped_matches WHERE league_code = ? AND country = ?", (league_code, country))
-    conn.commit()
-    # Insérer chaque ligne du CSV
-    for _, row in df.iterrows():
-        values = (
-            None,  # id (auto)
+    scraped_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    rows = [
+        (
             safe_str(row['country']),
             safe_str(row['league_code']),
             safe_str(row['league']),
@@ -65,11 +78,17 @@ for csv_path in glob.glob(csv_pattern):
             safe_str(row['match_id']),
             safe_str(row['ht_score']) if 'ht_score' in row else '',
             safe_str(row['url']) if 'url' in row else '',
-            datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            scraped_at,
         )
-        c.execute("INSERT INTO soccerstats_scraped_matches VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)", values)
-    print(f"Synchronisé : {os.path.basename(csv_path)} -> DB ({len(df)} lignes)")
+        for row in df.to_dict('records')
+    ]
+    # Lignes en double dans le CSV : la dernière l'emporte (upsert sur team, opponent, date, is_home)
+    bulk_upsert.upsert_rows(c, COLUMNS, rows, COLUMNS[8:16])
     conn.commit()
+    leagues.update(row[2] for row in rows)
+    for league in leagues:
+        recurrence_index.rebuild(conn, league)
+    print(f"Synchronisé : {os.path.basename(csv_path)} -> DB ({len(df)} lignes)")
 
 conn.close()
 print("Synchronisation automatique de tous les CSV terminée.")
@@ -3,10 +3,20 @@ import sqlite3
 import ast
 from datetime import datetime
 
+import bulk_upsert
+import recurrence_index
+
 # Charger le CSV Bundesliga
 csv_path = "CLEAN_WORKFLOW/data/predictions_bundesliga_only.csv"
 df = pd.read_csv(csv_path)
 
+# Colonnes nommées : la table peut en compter d'autres (goal_minutes, conceded_minutes...)
+COLUMNS = (
+    'country', 'league_code', 'league', 'league_display_name', 'team', 'opponent', 'date', 'is_home',
+    'score', 'goals_for', 'goals_against', 'goal_times', 'goal_times_conceded', 'match_id',
+    'ht_score', 'url', 'scraped_at',
+)
+
 # Adapter les colonnes pour la table SQL (mêmes noms et types)
 def safe_int(x):
     try:
@@ -31,16 +41,18 @@ def safe_goal_times(x):
 
 # Connexion à la base
 conn = sqlite3.connect("CLEAN_WORKFLOW/data/predictions.db")
+bulk_upsert.apply_bulk_pragmas(conn)
+bulk_upsert.ensure_row_key(conn)
 c = conn.cursor()
 
-# Vider la table pour éviter les doublons
+# Ligues dont l'index des récurrences doit suivre (lignes supprimées ou ré-insérées)
+leagues = {league for (league,) in c.execute(
+    "SELECT DISTINCT league FROM soccerstats_scraped_matches WHERE league_code = 'germany' AND country = 'Bulgaria'")}
+# Vider la table pour éviter les doublons, puis ré-insérer dans la même transaction
 c.execute("DELETE FROM soccerstats_scraped_matches WHERE league_code = 'germany' AND country = 'Bulgaria'")
-conn.commit()
-
-# Insérer chaque ligne du CSV
-for _, row in df.iterrows():
-    values = (
-        None,  # id (auto)
+scraped_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+rows = [
+    (
         safe_str(row['country']),
         safe_str(row['league_code']),
         safe_str(row['league']),
@@ -57,10 +69,16 @@ for _, row in df.iterrows():
         safe_str(row['match_id']),
         safe_str(row['ht_score']) if 'ht_score' in row else '',
         safe_str(row['url']) if 'url' in row else '',
-        datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        scraped_at,
     )
-    c.execute("INSERT INTO soccerstats_scraped_matches VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)", values)
+    for row in df.to_dict('records')
+]
+# Lignes en double dans le CSV : la dernière l'emporte (upsert sur team, opponent, date, is_home)
+bulk_upsert.upsert_rows(c, COLUMNS, rows, COLUMNS[8:16])
 
 conn.commit()
+leagues.update(row[2] for row in rows)
+for league in leagues:
+    recurrence_index.rebuild(conn, league)
 conn.close()
 print("Import Bundesliga CSV -> SQL terminé et synchronisé.")
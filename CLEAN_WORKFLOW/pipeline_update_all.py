@@ -1,19 +1,27 @@
-import subprocess
+import os
+import runpy
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+import scrape_all_leagues_batch
+
+# Toutes les étapes tournent dans ce processus (imports bs4/pandas/sqlite partagés)
+STEPS_DIR = os.path.dirname(__file__)
 
 # 1. Scraping de toutes les ligues
 print("=== [1/4] Scraping de toutes les ligues ===")
-subprocess.run(["python3", "CLEAN_WORKFLOW/scrape_all_leagues_batch.py"])
+scrape_all_leagues_batch.main([])
 
 # 2. Synchronisation SQL
 print("\n=== [2/4] Synchronisation SQL avec tous les CSV ===")
-subprocess.run(["python3", "CLEAN_WORKFLOW/import_all_leagues_csv_to_sql.py"])
+runpy.run_path(os.path.join(STEPS_DIR, "import_all_leagues_csv_to_sql.py"), run_name="__main__")
 
 # 3. Export agrégé
 print("\n=== [3/4] Génération de l’export agrégé ===")
-subprocess.run(["python3", "CLEAN_WORKFLOW/export_recurrence_stats.py"])
+runpy.run_path(os.path.join(STEPS_DIR, "export_recurrence_stats.py"), run_name="__main__")
 
 # 4. Analyse top patterns (optionnel)
 print("\n=== [4/4] Analyse top patterns toutes ligues confondues ===")
-subprocess.run(["python3", "CLEAN_WORKFLOW/top_recurrence_all_leagues.py"])
+runpy.run_path(os.path.join(STEPS_DIR, "top_recurrence_all_leagues.py"), run_name="__main__")
 
 print("\nPipeline complet terminé ! Toutes les données sont à jour.")
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+Moteur de récurrence vectorisé (NumPy).
+
+Charge soccerstats_scraped_matches une seule fois dans deux matrices matchs × 120 minutes
+(buts marqués / buts encaissés, comptage par minute), puis calcule toutes les statistiques
+par (league, team, is_home) avec des réductions vectorisées :
+- interval_stats : récurrence, buts marqués/encaissés, matchs avec but, pour n'importe quels intervalles
+  (éventuellement limité aux N derniers matchs de chaque équipe)
+- minute_stats : moyenne / écart-type / SEM / IQR des minutes de but dans une fenêtre
+- count_stats : moyenne / écart-type / SEM du nombre de buts par match dans une fenêtre (MT1, MT2...)
+
+Usage:
+    from recurrence_engine import RecurrenceEngine
+    engine = RecurrenceEngine.load(conn)
+    df = engine.interval_stats({"31-45": (31, 45), "75-90": (75, 90)}, last_n=4)
+"""
+import datetime
+import os
+import sqlite3
+import sys
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(__file__))
+import goal_storage
+
+DB_PATH = os.path.join(os.path.dirname(__file__), "data", "predictions.db")
+
+# Minutes 1..MAX_MINUTE (colonne = minute - 1) ; au-delà, le but est compté en MAX_MINUTE
+MAX_MINUTE = 120
+
+GROUP_KEYS = ['league', 'team', 'is_home']
+
+
+def parse_match_dates(dates: pd.Series) -> pd.Series:
+    """
+    Convertit les dates 'jour mois' (sans année) en datetime, en ajoutant l'année courante
+    (même règle que top_recurrence_recent_all_leagues_active)
+    """
+    current_year = datetime.datetime.now().year
+    dates = dates.astype(str).str.strip()
+    missing_year = dates.str.match(r"^\d{1,2} [A-Za-zéû]+$")
+    dates = dates.where(~missing_year, dates + f" {current_year}")
+    # format='mixed' : chaque date est analysée seule (sinon pandas déduit le format du premier élément)
+    return pd.to_datetime(dates, errors='coerce', dayfirst=True, format='mixed')
+
+
+def _minutes_matrix(columns: Iterable, n_rows: int) -> np.ndarray:
+    """Construit la matrice (n_rows, MAX_MINUTE) des comptages de buts par minute"""
+    lists = [goal_storage.decode_minutes(value) for value in columns]
+    lengths = np.fromiter((len(l) for l in lists), dtype=np.int64, count=n_rows)
+    matrix = np.zeros((n_rows, MAX_MINUTE), dtype=np.int16)
+    if lengths.sum():
+        minutes = np.fromiter((m for l in lists for m in l), dtype=np.int64, count=int(lengths.sum()))
+        rows = np.repeat(np.arange(n_rows), lengths)
+        np.add.at(matrix, (rows, np.clip(minutes, 1, MAX_MINUTE) - 1), 1)
+    return matrix
+
+
+def _hist_percentile(hist: np.ndarray, minutes: np.ndarray, q: float) -> np.ndarray:
+    """
+    Percentile (interpolation linéaire, comme np.percentile) pour chaque ligne d'un histogramme
+    de minutes, sans reconstruire les listes de minutes
+    """
+    n = hist.sum(axis=1)
+    cum = np.cumsum(hist, axis=1)
+    pos = q / 100.0 * np.maximum(n - 1, 0)
+    lo = np.floor(pos)
+    hi = np.ceil(pos)
+    idx_lo = np.minimum((cum <= lo[:, None]).sum(axis=1), len(minutes) - 1)
+    idx_hi = np.minimum((cum <= hi[:, None]).sum(axis=1), len(minutes) - 1)
+    v_lo = minutes[idx_lo].astype(float)
+    v_hi = minutes[idx_hi].astype(float)
+    result = v_lo + (v_hi - v_lo) * (pos - lo)
+    return np.where(n > 0, result, 0.0)
+
+
+def _group_mean_std(values: np.ndarray, group_ids: np.ndarray, n_groups: int):
+    """Moyenne, écart-type (ddof=1) et SEM par groupe ; 0 si moins de 2 observations"""
+    n = np.bincount(group_ids, minlength=n_groups).astype(float)
+    s = np.bincount(group_ids, weights=values, minlength=n_groups)
+    sq = np.bincount(group_ids, weights=values.astype(float) ** 2, minlength=n_groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(n > 0, s / n, 0.0)
+        var = np.where(n > 1, (sq - n * mean ** 2) / (n - 1), 0.0)
+        std = np.sqrt(np.maximum(var, 0.0))
+        sem = np.where(n > 1, std / np.sqrt(n), 0.0)
+    return mean, std, sem
+
+
+class RecurrenceEngine:
+    """Statistiques de récurrence vectorisées pour toutes les ligues / équipes / côtés"""
+
+    def __init__(self, matches: pd.DataFrame, scored: np.ndarray, conceded: np.ndarray):
+        """
+        Args:
+            matches: DataFrame (league, team, is_home, date), une ligne par match
+            scored / conceded: matrices (len(matches), MAX_MINUTE) de buts par minute
+        """
+        self.matches = matches.reset_index(drop=True)
+        self.scored = scored
+        self.conceded = conceded
+        # Sommes cumulées : buts dans [start, end] = cum[:, end] - cum[:, start - 1]
+        zeros = np.zeros((len(self.matches), 1), dtype=np.int32)
+        self._cum_scored = np.hstack([zeros, np.cumsum(scored, axis=1, dtype=np.int32)])
+        self._cum_conceded = np.hstack([zeros, np.cumsum(conceded, axis=1, dtype=np.int32)])
+
+        grouped = self.matches.groupby(GROUP_KEYS, sort=True, dropna=False)
+        self.group_ids = grouped.ngroup().to_numpy()
+        self.keys = grouped.size().reset_index()[GROUP_KEYS]
+        self._recency_rank = None
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection, leagues: Optional[Iterable[str]] = None) -> "RecurrenceEngine":
+        """Charge la table entière (ou quelques ligues) en une seule requête"""
+        query = f"SELECT league, team, is_home, date, {goal_storage.select_goal_columns(conn)} FROM soccerstats_scraped_matches"
+        params = []
+        if leagues is not None:
+            leagues = list(leagues)
+            query += f" WHERE league IN ({','.join('?' * len(leagues))})"
+            params = leagues
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        matches = pd.DataFrame([row[:4] for row in rows], columns=['league', 'team', 'is_home', 'date'])
+        matches['is_home'] = matches['is_home'].fillna(0).astype(int)
+        scored = _minutes_matrix((row[4] for row in rows), len(rows))
+        conceded = _minutes_matrix((row[5] for row in rows), len(rows))
+        return cls(matches, scored, conceded)
+
+    @property
+    def n_groups(self) -> int:
+        return len(self.keys)
+
+    def _window(self, cum: np.ndarray, start: int, end: int) -> np.ndarray:
+        start = max(int(start), 1)
+        end = min(int(end), MAX_MINUTE)
+        if end < start:
+            return np.zeros(len(cum), dtype=np.int32)
+        return cum[:, end] - cum[:, start - 1]
+
+    def _mask(self, last_n: Optional[int]) -> np.ndarray:
+        """Masque des matchs retenus : tous, ou les last_n plus récents de chaque groupe"""
+        if not last_n:
+            return np.ones(len(self.matches), dtype=bool)
+        if self._recency_rank is None:
+            dates = parse_match_dates(self.matches['date'])
+            order = pd.DataFrame({'gid': self.group_ids, 'date': dates})
+            order = order.sort_values('date', ascending=False, kind='mergesort', na_position='last')
+            rank = np.empty(len(order), dtype=np.int64)
+            rank[order.index.to_numpy()] = order.groupby('gid', sort=False).cumcount().to_numpy()
+            self._recency_rank = rank
+        return self._recency_rank < last_n
+
+    def interval_stats(self, intervals: Dict[str, Tuple[int, int]],
+                       last_n: Optional[int] = None) -> pd.DataFrame:
+        """
+        Compteurs par (league, team, is_home, interval)
+
+        Args:
+            intervals: label -> (début, fin) inclusifs
+            last_n: limiter aux N derniers matchs de chaque groupe (None = tous)
+
+        Returns:
+            DataFrame : league, team, is_home, interval, matches, matches_with_goal,
+            matches_with_goal_for, matches_with_goal_against, goals_for, goals_against,
+            recurrence (en %)
+        """
+        mask = self._mask(last_n)
+        gid = self.group_ids[mask]
+        n = self.n_groups
+        matches = np.bincount(gid, minlength=n)
+        frames = []
+        for label, (start, end) in intervals.items():
+            s = self._window(self._cum_scored, start, end)[mask]
+            c = self._window(self._cum_conceded, start, end)[mask]
+            frame = self.keys.copy()
+            frame['interval'] = [label] * len(frame)
+            frame['matches'] = matches
+            frame['matches_with_goal'] = np.bincount(gid, weights=(s + c) > 0, minlength=n).astype(int)
+            frame['matches_with_goal_for'] = np.bincount(gid, weights=s > 0, minlength=n).astype(int)
+            frame['matches_with_goal_against'] = np.bincount(gid, weights=c > 0, minlength=n).astype(int)
+            frame['goals_for'] = np.bincount(gid, weights=s, minlength=n).astype(int)
+            frame['goals_against'] = np.bincount(gid, weights=c, minlength=n).astype(int)
+            frames.append(frame)
+        result = pd.concat(frames, ignore_index=True)
+        result = result[result['matches'] > 0].reset_index(drop=True)
+        result['recurrence'] = 100.0 * result['matches_with_goal'] / result['matches']
+        return result
+
+    def minute_stats(self, start: int, end: int, conceded: bool = False) -> pd.DataFrame:
+        """
+        Distribution des minutes de but dans [start, end] par groupe
+
+        Returns:
+            DataFrame : league, team, is_home, n_goals, avg_minute, std_minute, sem, q1, q3
+        """
+        start, end = max(int(start), 1), min(int(end), MAX_MINUTE)
+        matrix = self.conceded if conceded else self.scored
+        hist = np.zeros((self.n_groups, MAX_MINUTE), dtype=np.int64)
+        np.add.at(hist, self.group_ids, matrix)
+        hist = hist[:, start - 1:end]
+        minutes = np.arange(start, end + 1)
+        n = hist.sum(axis=1).astype(float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(n > 0, (hist * minutes).sum(axis=1) / n, 0.0)
+            var = np.where(n > 1, ((hist * minutes ** 2).sum(axis=1) - n * mean ** 2) / (n - 1), 0.0)
+            std = np.sqrt(np.maximum(var, 0.0))
+            sem = np.where(n > 1, std / np.sqrt(n), 0.0)
+        result = self.keys.copy()
+        result['n_goals'] = n.astype(int)
+        result['avg_minute'] = mean
+        result['std_minute'] = std
+        result['sem'] = sem
+        result['q1'] = _hist_percentile(hist, minutes, 25)
+        result['q3'] = _hist_percentile(hist, minutes, 75)
+        return result
+
+    def count_stats(self, start: int, end: int, last_n: Optional[int] = None) -> pd.DataFrame:
+        """
+        Nombre de buts par match dans [start, end] (ex: MT1 = 1-45, MT2 = 46-90)
+
+        Returns:
+            DataFrame : league, team, is_home, matches, goals_for_mean/std, goals_against_mean/std,
+            total_mean, total_std, total_sem
+        """
+        mask = self._mask(last_n)
+        gid = self.group_ids[mask]
+        s = self._window(self._cum_scored, start, end)[mask]
+        c = self._window(self._cum_conceded, start, end)[mask]
+        result = self.keys.copy()
+        result['matches'] = np.bincount(gid, minlength=self.n_groups)
+        result['goals_for_mean'], result['goals_for_std'], _ = _group_mean_std(s, gid, self.n_groups)
+        result['goals_against_mean'], result['goals_against_std'], _ = _group_mean_std(c, gid, self.n_groups)
+        result['total_mean'], result['total_std'], result['total_sem'] = _group_mean_std(s + c, gid, self.n_groups)
+        return result[result['matches'] > 0].reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark du moteur de récurrence vectorisé")
+    parser.add_argument('--db', default=DB_PATH, help='Chemin vers predictions.db')
+    args = parser.parse_args()
+
+    start = time.time()
+    conn = sqlite3.connect(args.db)
+    engine = RecurrenceEngine.load(conn)
+    conn.close()
+    loaded = time.time()
+    stats = engine.interval_stats({"31-45": (31, 45), "75-90": (75, 90), "75-90+": (75, 120)})
+    engine.interval_stats({"31-45": (31, 45), "75-90": (75, 90)}, last_n=4)
+    engine.minute_stats(1, 45)
+    engine.count_stats(1, 45)
+    print(f"✅ {len(engine.matches)} matchs, {engine.n_groups} groupes chargés en {loaded - start:.2f}s")
+    print(f"⚡ {len(stats)} lignes de stats calculées en {time.time() - loaded:.2f}s")
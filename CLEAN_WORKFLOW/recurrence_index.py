@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Index matérialisé des récurrences par intervalle.
+
+La table `recurrence_index` contient une ligne par (league, team, is_home, interval_name)
+avec les compteurs pré-agrégés depuis soccerstats_scraped_matches :
+- matches : nombre de matchs joués dans ce contexte
+- matches_with_goal : matchs avec au moins un but (marqué OU encaissé) dans l'intervalle
+- matches_with_goal_for / matches_with_goal_against
+- goals_for / goals_against : buts marqués / encaissés dans l'intervalle
+- minute_sum / minute_sq_sum : moments des minutes de but (moyenne, écart-type)
+
+L'index est reconstruit par équipe à chaque écriture de BulgariaAutoScraper.save_to_db,
+les lookups live deviennent donc une simple lecture par clé primaire.
+
+Usage:
+    python3 CLEAN_WORKFLOW/recurrence_index.py                 # reconstruction complète
+    python3 CLEAN_WORKFLOW/recurrence_index.py --league france
+"""
+import os
+import sqlite3
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(__file__))
+import goal_storage
+
+DB_PATH = os.path.join(os.path.dirname(__file__), "data", "predictions.db")
+
+# Intervalles indexés : label -> (début, fin) inclusifs
+# "31-45+" et "75-90+" sont les intervalles clés utilisés par scoring_utils / top_patterns_global
+INTERVALS = {
+    "1-15": (1, 15),
+    "16-30": (16, 30),
+    "31-45": (31, 45),
+    "46-60": (46, 60),
+    "61-75": (61, 75),
+    "76-90": (76, 90),
+    "31-45+": (31, 45),
+    "75-90+": (75, 120),
+}
+
+# Correspondance bornes (tuple) -> label, pour les appelants qui manipulent des tuples
+INTERVAL_BY_BOUNDS = {(31, 45): "31-45+", (75, 120): "75-90+", (75, 90): "75-90+"}
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS recurrence_index (
+    league TEXT NOT NULL,
+    team TEXT NOT NULL,
+    is_home INTEGER NOT NULL,
+    interval_name TEXT NOT NULL,
+    matches INTEGER NOT NULL DEFAULT 0,
+    matches_with_goal INTEGER NOT NULL DEFAULT 0,
+    matches_with_goal_for INTEGER NOT NULL DEFAULT 0,
+    matches_with_goal_against INTEGER NOT NULL DEFAULT 0,
+    goals_for INTEGER NOT NULL DEFAULT 0,
+    goals_against INTEGER NOT NULL DEFAULT 0,
+    minute_sum REAL NOT NULL DEFAULT 0,
+    minute_sq_sum REAL NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (league, team, is_home, interval_name)
+);
+CREATE INDEX IF NOT EXISTS idx_recurrence_index_interval
+    ON recurrence_index(interval_name, league);
+'''
+
+
+def ensure_schema(conn: sqlite3.Connection):
+    """Crée la table recurrence_index si elle n'existe pas"""
+    conn.executescript(SCHEMA)
+
+
+def has_index(conn: sqlite3.Connection) -> bool:
+    """True si la table recurrence_index existe et contient des lignes"""
+    row = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name='recurrence_index'"
+    ).fetchone()
+    if not row:
+        return False
+    return conn.execute("SELECT 1 FROM recurrence_index LIMIT 1").fetchone() is not None
+
+
+def parse_minutes(raw) -> List[int]:
+    """Décode une colonne goal_times (BLOB packé ou JSON complété par des 0)"""
+    return goal_storage.decode_minutes(raw)
+
+
+def _interval_end(label: str, start: int, end: int, all_minutes: List[int]) -> int:
+    """
+    Borne de fin effective d'un intervalle pour un match.
+    Reprend la règle historique de scoring_utils.get_pattern_score pour "31-45+" :
+    si le dernier but du match est <= 60, l'intervalle s'étend jusqu'à ce but.
+    """
+    if label == "31-45+":
+        minute_max = max(all_minutes) if all_minutes else end
+        return min(minute_max, 60) if minute_max <= 60 else 45
+    return end
+
+
+def aggregate_matches(rows: Iterable[Tuple[str, str]]) -> Dict[str, dict]:
+    """
+    Agrège une liste de (goal_times, goal_times_conceded) en compteurs par intervalle
+
+    Returns:
+        Dict label -> compteurs (mêmes colonnes que la table)
+    """
+    stats = {
+        label: {
+            'matches': 0, 'matches_with_goal': 0,
+            'matches_with_goal_for': 0, 'matches_with_goal_against': 0,
+            'goals_for': 0, 'goals_against': 0,
+            'minute_sum': 0.0, 'minute_sq_sum': 0.0,
+        }
+        for label in INTERVALS
+    }
+    for goal_times, goal_times_conceded in rows:
+        goals = parse_minutes(goal_times)
+        conceded = parse_minutes(goal_times_conceded)
+        all_minutes = goals + conceded
+        for label, (start, end) in INTERVALS.items():
+            interval_end = _interval_end(label, start, end, all_minutes)
+            scored = [m for m in goals if start <= m <= interval_end]
+            against = [m for m in conceded if start <= m <= interval_end]
+            s = stats[label]
+            s['matches'] += 1
+            s['goals_for'] += len(scored)
+            s['goals_against'] += len(against)
+            if scored:
+                s['matches_with_goal_for'] += 1
+            if against:
+                s['matches_with_goal_against'] += 1
+            if scored or against:
+                s['matches_with_goal'] += 1
+            for m in scored + against:
+                s['minute_sum'] += m
+                s['minute_sq_sum'] += m * m
+    return stats
+
+
+def refresh_teams(conn: sqlite3.Connection, keys: Iterable[Tuple[str, str]]) -> int:
+    """
+    Reconstruit l'index pour un ensemble de (league, team).
+    Appelé après chaque save_to_db : seules les équipes écrites sont recalculées.
+
+    Returns:
+        Nombre de lignes d'index écrites
+    """
+    ensure_schema(conn)
+    cursor = conn.cursor()
+    goal_columns = goal_storage.select_goal_columns(conn)
+    written = 0
+    for league, team in set(keys):
+        cursor.execute(
+            "DELETE FROM recurrence_index WHERE league = ? AND team = ?", (league, team)
+        )
+        for is_home in (1, 0):
+            cursor.execute(f'''
+                SELECT {goal_columns} FROM soccerstats_scraped_matches
+                WHERE league = ? AND team = ? AND is_home = ?
+            ''', (league, team, is_home))
+            rows = cursor.fetchall()
+            if not rows:
+                continue
+            for label, s in aggregate_matches(rows).items():
+                cursor.execute('''
+                    INSERT INTO recurrence_index
+                    (league, team, is_home, interval_name, matches, matches_with_goal,
+                     matches_with_goal_for, matches_with_goal_against, goals_for, goals_against,
+                     minute_sum, minute_sq_sum)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    league, team, is_home, label, s['matches'], s['matches_with_goal'],
+                    s['matches_with_goal_for'], s['matches_with_goal_against'],
+                    s['goals_for'], s['goals_against'], s['minute_sum'], s['minute_sq_sum'],
+                ))
+                written += 1
+    conn.commit()
+    return written
+
+
+def rebuild(conn: sqlite3.Connection, league: Optional[str] = None) -> int:
+    """Reconstruction complète (ou limitée à une ligue) de l'index"""
+    ensure_schema(conn)
+    if league:
+        conn.execute("DELETE FROM recurrence_index WHERE league = ?", (league,))
+        keys = conn.execute(
+            "SELECT DISTINCT league, team FROM soccerstats_scraped_matches WHERE league = ?",
+            (league,),
+        ).fetchall()
+    else:
+        conn.execute("DELETE FROM recurrence_index")
+        keys = conn.execute(
+            "SELECT DISTINCT league, team FROM soccerstats_scraped_matches"
+        ).fetchall()
+    return refresh_teams(conn, keys)
+
+
+def lookup(conn: sqlite3.Connection, league: str, team: str, is_home: bool,
+           interval_name: str) -> Optional[dict]:
+    """
+    Lecture ponctuelle d'une ligne d'index
+
+    Returns:
+        Dict des compteurs (+ 'recurrence' en 0-1) ou None si absent
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    row = cursor.execute('''
+        SELECT * FROM recurrence_index
+        WHERE league = ? AND team = ? AND is_home = ? AND interval_name = ?
+    ''', (league, team, 1 if is_home else 0, interval_name)).fetchone()
+    if row is None:
+        return None
+    data = dict(row)
+    data['recurrence'] = data['matches_with_goal'] / data['matches'] if data['matches'] else 0.0
+    n_goals = data['goals_for'] + data['goals_against']
+    data['avg_minute'] = data['minute_sum'] / n_goals if n_goals else 0.0
+    return data
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Reconstruit l'index des récurrences par intervalle")
+    parser.add_argument('--db', default=DB_PATH, help='Chemin vers predictions.db')
+    parser.add_argument('--league', help='Limiter la reconstruction à une ligue')
+    args = parser.parse_args()
+
+    start = time.time()
+    conn = sqlite3.connect(args.db)
+    written = rebuild(conn, league=args.league)
+    conn.close()
+    print(f"✅ recurrence_index reconstruit : {written} lignes en {time.time() - start:.2f}s")
@@ -14,6 +14,8 @@ import requests
 from bs4 import BeautifulSoup
 import json
 
+import recurrence_index
+
 DB_PATH = os.path.join(os.path.dirname(__file__), "data", "predictions.db")
 LEAGUES = []  # Placeholder for leagues, will be populated from the database
 
@@ -99,6 +101,12 @@ def main():
             """, (m["league"], m["team"], m["goal_times"], m["goal_times_conceded"], m["is_home"]))
         total += len(matches)
     conn.commit()
+    # Table entièrement réécrite : index des récurrences reconstruit en entier
+    try:
+        written = recurrence_index.rebuild(conn)
+        print(f"[INFO] Index récurrences reconstruit : {written} lignes")
+    except Exception as e:
+        print(f"[ERREUR] Reconstruction de l'index des récurrences : {e}")
     conn.close()
     print(f"[OK] Base de données régénérée avec {total} entrées.")
 
@@ -4,13 +4,12 @@ def normalize_team_name(name):
 """
 Utilitaires pour extraction patterns historiques, saturation, momentum pour scoring live.
 """
-import sqlite3
 import json
 from collections import defaultdict
 from typing import Tuple
 
-import os
-DB_PATH = os.path.join(os.path.dirname(__file__), "data", "predictions.db")
+import db_access
+import recurrence_index
 INTERVALS = [(31, 45), (75, 120)]
 INTERVAL_LABELS = { (31, 45): "31-45+", (75, 120): "75-90+" }
 
@@ -18,9 +17,30 @@ INTERVAL_LABELS = { (31, 45): "31-45+", (75, 120): "75-90+" }
 def get_pattern_score(league: str, team: str, side: str, interval: Tuple[int, int]) -> float:
     """
     Retourne la récurrence stricte (0-1) pour une équipe, un intervalle, une ligue, un côté (HOME/AWAY)
+    Lecture directe dans recurrence_index si disponible (et l'équipe indexée), sinon scan de
+    soccerstats_scraped_matches
     """
+    conn = db_access.connect()
+    label = recurrence_index.INTERVAL_BY_BOUNDS.get(tuple(interval))
+    if label and recurrence_index.has_index(conn):
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT team FROM recurrence_index WHERE league = ?", (league,))
+        norm_map = {normalize_team_name(row[0]): row[0] for row in cursor.fetchall()}
+        norm_team = norm_map.get(normalize_team_name(team), team)
+        data = recurrence_index.lookup(conn, league, norm_team, side == "HOME", label)
+        conn.close()
+        if data:
+            return data['recurrence']
+        # Équipe absente de l'index (écrite depuis le dernier rebuild) : scan complet
+        return _get_pattern_score_scan(league, team, side, interval)
+    conn.close()
+    return _get_pattern_score_scan(league, team, side, interval)
+
+
+def _get_pattern_score_scan(league: str, team: str, side: str, interval: Tuple[int, int]) -> float:
+    """Calcul historique par scan complet des matchs de l'équipe (fallback sans index)"""
     # Normalisation du nom d'équipe pour correspondre à la base
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_access.connect()
     cursor = conn.cursor()
     cursor.execute("SELECT DISTINCT team FROM soccerstats_scraped_matches WHERE league = ?", (league,))
     teams_in_db = [row[0] for row in cursor.fetchall()]
@@ -70,7 +90,7 @@ def get_saturation_score(league: str, team: str, goals_scored: int, interval: Tu
     Retourne un score de saturation (1.0 = pas saturé, <1.0 = saturation atteinte)
     """
     # Normalisation du nom d'équipe pour correspondre à la base
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_access.connect()
     cursor = conn.cursor()
     cursor.execute("SELECT DISTINCT team FROM soccerstats_scraped_matches WHERE league = ?", (league,))
     teams_in_db = [row[0] for row in cursor.fetchall()]
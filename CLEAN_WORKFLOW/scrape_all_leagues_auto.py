@@ -15,18 +15,45 @@ import re
 import time
 from typing import List, Tuple, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
-
+import sys
 import os
 
+import recurrence_index
+import goal_storage
+import html_parsing
+import bulk_upsert
+import http_cache
+import scrape_state
+
 class BulgariaAutoScraper:
 	BASE_URL = "https://www.soccerstats.com"
+	REQUEST_DELAY = 2  # pause (s) après chaque page équipe téléchargée, par worker
 	DB_PATH = os.path.join(os.path.dirname(__file__), "data", "predictions.db")
     
-	def __init__(self):
+	def __init__(self, use_cache: bool = True, db_path: Optional[str] = None):
+		if db_path:
+			self.DB_PATH = db_path
 		self.session = requests.Session()
 		self.session.headers.update({
 			'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
 		})
+		# Cache HTTP disque propre à la base : pages formtable/teamstats inchangées => ni parsing ni écriture DB
+		# Une page n'est confirmée qu'après le commit de sa ligue (save_to_db)
+		self.http_cache = http_cache.HttpCache(http_cache.cache_path_for(self.DB_PATH),
+											   auto_confirm=False) if use_cache else None
+		self.unchanged_teams = set()  # {(league_code, team)} pages inchangées depuis le dernier run()
+		self.pending_pages = {}  # {(league_code, team): url} pages parsées, en attente d'écriture
+		self.failed_leagues = {}  # {league_code: erreur} du dernier save_to_db
+
+	def _get(self, url: str) -> requests.Response:
+		"""GET via le cache HTTP s'il est actif (attributs from_cache / changed)"""
+		if self.http_cache is None:
+			response = self.session.get(url, timeout=15)
+			response.raise_for_status()
+			response.from_cache = False
+			response.changed = True
+			return response
+		return self.http_cache.get(self.session, url, timeout=15)
     
 	def extract_team_codes(self, league_code: str = "bulgaria") -> List[Tuple[str, str]]:
 		"""
@@ -46,10 +73,9 @@ class BulgariaAutoScraper:
 		print("="*80)
         
 		try:
-			response = self.session.get(url, timeout=15)
-			response.raise_for_status()
-			soup = BeautifulSoup(response.content, 'html.parser')
-            
+			response = self._get(url)
+			soup = html_parsing.make_soup(response.content, html_parsing.TEAM_LINKS)
+
 			# Trouver tous les liens vers teamstats
 			links = soup.find_all('a', href=re.compile(r'teamstats\.asp\?league=' + league_code + r'&stats=u\d+-'))
             
@@ -75,6 +101,49 @@ class BulgariaAutoScraper:
 			print(f"❌ Erreur extraction codes : {e}")
 			return []
     
+	def _extract_goal_events_from_tooltip(self, tooltip_html: str, team_is_home: bool) -> List[Tuple[int, int, int]]:
+		"""
+		Extraire les buts depuis le tooltip HTML sous forme d'événements
+
+		Args:
+			tooltip_html: HTML du tooltip avec détails des buts
+			team_is_home: True si l'équipe joue à domicile
+
+		Returns:
+			Liste de (minute, temps additionnel, 1 si marqué / 0 si encaissé)
+		"""
+		events = []
+
+		if not tooltip_html or 'span' not in tooltip_html.lower():
+			return events
+
+		# Scores progressifs <b>X-Y</b> avec le texte de leur bloc : regex, sinon BeautifulSoup
+		blocks = html_parsing.tooltip_score_blocks(tooltip_html)
+		if blocks is None:
+			blocks = []
+			for score_tag in BeautifulSoup(tooltip_html, 'html.parser').find_all('b'):
+				match = re.match(r'(\d+)-(\d+)', score_tag.get_text().strip())
+				if match and score_tag.parent:
+					blocks.append((int(match.group(1)), int(match.group(2)), score_tag.parent.get_text()))
+
+		prev_home = 0
+		prev_away = 0
+
+		for home_score, away_score, block_text in blocks:
+			# Minute au début de la parenthèse, temps additionnel éventuel : (45+2), (45 pen.), (90+3 o.g.)
+			minute_match = re.search(r'\((\d{1,3})(?:\+(\d{1,2}))?[^)]*\)', block_text)
+			if minute_match:
+				minute = int(minute_match.group(1))
+				stoppage = int(minute_match.group(2)) if minute_match.group(2) else 0
+				if minute > 0:  # Filtrer les zéros
+					if home_score > prev_home:
+						events.append((minute, stoppage, 1 if team_is_home else 0))
+					elif away_score > prev_away:
+						events.append((minute, stoppage, 0 if team_is_home else 1))
+				prev_home = home_score
+				prev_away = away_score
+		return events
+
 	def _extract_goals_from_tooltip(self, tooltip_html: str, team_is_home: bool) -> Tuple[List[int], List[int]]:
 		"""
 		Extraire les buts marqués et encaissés depuis le tooltip HTML
@@ -86,47 +155,9 @@ class BulgariaAutoScraper:
 		Returns:
 			(goals_scored, goals_conceded) : Listes des minutes de buts
 		"""
-		goals_scored = []
-		goals_conceded = []
-        
-		if not tooltip_html or 'span' not in tooltip_html.lower():
-			return goals_scored, goals_conceded
-        
-		soup = BeautifulSoup(tooltip_html, 'html.parser')
-        
-		# Trouver tous les scores progressifs <b>X-Y</b>
-		score_tags = soup.find_all('b')
-        
-		prev_home = 0
-		prev_away = 0
-        
-		for score_tag in score_tags:
-			score_text = score_tag.get_text().strip()
-			match = re.match(r'(\d+)-(\d+)', score_text)
-			if not match:
-				continue
-			home_score = int(match.group(1))
-			away_score = int(match.group(2))
-			parent = score_tag.parent
-			if parent:
-				parent_text = parent.get_text()
-				# Nouvelle regex : extraire le nombre au début de la parenthèse, même si suivi de texte (ex: (45 pen.), (45 o.g.))
-				minute_match = re.search(r'\((\d{1,3})[^)]*\)', parent_text)
-				if minute_match:
-					minute = int(minute_match.group(1))
-					if minute > 0:  # Filtrer les zéros
-						if home_score > prev_home:
-							if team_is_home:
-								goals_scored.append(minute)
-							else:
-								goals_conceded.append(minute)
-						elif away_score > prev_away:
-							if not team_is_home:
-								goals_scored.append(minute)
-							else:
-								goals_conceded.append(minute)
-					prev_home = home_score
-					prev_away = away_score
+		events = self._extract_goal_events_from_tooltip(tooltip_html, team_is_home)
+		goals_scored = [minute for minute, _, scored in events if scored]
+		goals_conceded = [minute for minute, _, scored in events if not scored]
 		# Debug : afficher les minutes extraites
 		print(f"[DEBUG] Minutes extraites : marqués={goals_scored}, encaissés={goals_conceded}")
 		# Cas suspect : minutes attendues manquantes (exemple E. Frankfurt AWAY)
@@ -135,8 +166,20 @@ class BulgariaAutoScraper:
 			print("[DEBUG] HTML tooltip suspect (aucune minute clé trouvée) :\n", tooltip_html)
 		return goals_scored, goals_conceded
     
+	@staticmethod
+	def _row_key(row) -> Optional[Tuple[str, str]]:
+		"""(date, adversaire) d'une ligne de teamstats.asp, sans parser le score ni le tooltip"""
+		cells = row.find_all('td')
+		if len(cells) < 9:
+			return None
+		date = cells[0].get_text(strip=True)
+		if cells[1].find('b'):
+			return date, cells[3].get_text(strip=True)
+		return date, cells[1].get_text(strip=True)
+
 	def scrape_team(self, league_code: str, team_code: str, team_name: str, 
-					country: str = "Bulgaria", league_display: str = "A PFG") -> Optional[List[dict]]:
+					country: str = "Bulgaria", league_display: str = "A PFG",
+					since: Optional[Tuple[str, str]] = None) -> Optional[List[dict]]:
 		"""
 		ÉTAPE 2 : Scraper tous les matches d'une équipe
         
@@ -146,19 +189,29 @@ class BulgariaAutoScraper:
 			team_name: Nom équipe (CSKA Sofia)
 			country: Pays
 			league_display: Nom affiché du championnat
-        
+			since: Dernier match enregistré (date, adversaire) : seules les lignes suivantes sont parsées
+
 		Returns:
-			Liste de dictionnaires avec données des matches
+			Liste de dictionnaires avec données des matches ([] si rien de nouveau ou page inchangée,
+			None en cas d'échec)
 		"""
 		url = f"{self.BASE_URL}/teamstats.asp?league={league_code}&stats={team_code}"
         
 		try:
-			response = self.session.get(url, timeout=15)
-			response.raise_for_status()
-			time.sleep(2)  # Respecter le serveur
-            
-			soup = BeautifulSoup(response.content, 'html.parser')
+			response = self._get(url)
+			if not response.from_cache:
+				time.sleep(self.REQUEST_DELAY)  # Respecter le serveur
+
+			if not response.changed:
+				# Page identique à la version déjà enregistrée en base
+				self.unchanged_teams.add((league_code, team_name))
+				print(f"    ♻️  {team_name}: page inchangée")
+				return []
             
+			# Tables de matchs seulement ; page complète si absentes (ex: Iran, repli sur 'Latest matches')
+			soup = html_parsing.parse(response.content, html_parsing.TEAM_MATCHES,
+									  check=lambda s: s.find('table') is not None)
+
 			# Trouver le tableau des matches (double-sélecteur)
 			table = soup.find('table', {'bgcolor': '#cccccc', 'width': '100%'})
 			# Si non trouvé (ex: Iran), chercher le tableau juste après 'Latest matches'
@@ -172,6 +225,8 @@ class BulgariaAutoScraper:
 						table = next_table.find_next('table', {'cellpadding': '2', 'width': '100%'})
 			if not table:
 				print(f"    ❌ Tableau non trouvé pour {team_name}")
+				if self.http_cache:
+					self.http_cache.invalidate(url)
 				return None
             
 			matches_data = []
@@ -179,6 +234,10 @@ class BulgariaAutoScraper:
 			# Parser chaque ligne (skip header)
 			all_rows = table.find_all('tr')
 			rows = all_rows[1:] if len(all_rows) > 1 else all_rows
+
+			# Mode incrémental : la page est chronologique, on reprend après le dernier match connu
+			if since is not None:
+				rows = rows[scrape_state.rows_after((self._row_key(row) for row in rows), since):]
             
 			for row in rows:
 				try:
@@ -216,10 +275,12 @@ class BulgariaAutoScraper:
 					tooltip_span = score_link.find('span')
 					tooltip_html = str(tooltip_span) if tooltip_span else ""
                     
-					# Extraire buts marqués et encaissés
-					goals_scored, goals_conceded = self._extract_goals_from_tooltip(
+					# Extraire buts marqués et encaissés (avec temps additionnel)
+					goal_events = self._extract_goal_events_from_tooltip(
 						tooltip_html, team_is_home
 					)
+					goals_scored = [minute for minute, _, scored in goal_events if scored]
+					goals_conceded = [minute for minute, _, scored in goal_events if not scored]
                     
 					# Déterminer opponent
 					opponent = away_team if team_is_home else home_team
@@ -238,106 +299,172 @@ class BulgariaAutoScraper:
 						'score': score,
 						'ht_score': ht_score,
 						'goals_scored': goals_scored,
-						'goals_conceded': goals_conceded
+						'goals_conceded': goals_conceded,
+						'goal_events': goal_events
 					})
                     
 				except Exception as e:
 					continue
             
 			print(f"    ✅ {team_name}: {len(matches_data)} matches")
+			if self.http_cache:
+				if matches_data:
+					self.pending_pages[(league_code, team_name)] = url
+				else:
+					self.http_cache.confirm([url])  # rien à écrire
 			return matches_data
             
 		except Exception as e:
 			print(f"    ❌ {team_name}: Erreur - {e}")
+			if self.http_cache:
+				self.http_cache.invalidate(url)
 			return None
     
+	UPSERT_COLUMNS = (
+		'country', 'league_code', 'league', 'league_display_name', 'team', 'opponent', 'date', 'is_home',
+		'score', 'goals_for', 'goals_against', 'goal_times', 'goal_times_conceded', 'match_id',
+	)
+	UPSERT_UPDATE_COLUMNS = ('score', 'goals_for', 'goals_against', 'goal_times', 'goal_times_conceded')
+
 	def save_to_db(self, matches_data: List[dict]):
 		"""
 		Sauvegarder les matches dans la DB avec gestion des doublons
+		Upsert en masse sur (team, opponent, date, is_home) : une transaction par ligue
+		Les ligues dont la transaction a échoué sont listées dans self.failed_leagues
 		"""
+		self.failed_leagues = {}
 		conn = sqlite3.connect(self.DB_PATH)
+		bulk_upsert.apply_bulk_pragmas(conn)
+		goal_storage.ensure_schema(conn)
+		bulk_upsert.ensure_row_key(conn)
 		cursor = conn.cursor()
-        
+
+		by_league = {}
+		for match in matches_data:
+			by_league.setdefault(match['league_code'], []).append(match)
+
 		inserted = 0
 		updated = 0
-        
-		for match in matches_data:
+
+		for league_code, league_matches in by_league.items():
 			try:
-				# Générer match_id
-				team1, team2 = sorted([match['team'], match['opponent']])
-				match_id = f"{match['date']}_{team1}_vs_{team2}"
-                
-				# Convertir goal_times en JSON (buts marqués ET encaissés)
-				goal_times_scored = match['goals_scored'] + [0] * (10 - len(match['goals_scored']))
-				goal_times_scored_json = json.dumps(goal_times_scored[:10])
-                
-				goal_times_conceded = match['goals_conceded'] + [0] * (10 - len(match['goals_conceded']))
-				goal_times_conceded_json = json.dumps(goal_times_conceded[:10])
-                
-				# Vérifier si le match existe déjà
-				cursor.execute('''
-					SELECT COUNT(*) FROM soccerstats_scraped_matches 
-					WHERE team = ? AND opponent = ? AND date = ? AND is_home = ?
-				''', (match['team'], match['opponent'], match['date'], 1 if match['is_home'] else 0))
-                
-				if cursor.fetchone()[0] > 0:
-					# Match déjà existant - le mettre à jour
-					updated += 1
-					cursor.execute('''
-						UPDATE soccerstats_scraped_matches 
-						SET score = ?, goals_for = ?, goals_against = ?, 
-							goal_times = ?, goal_times_conceded = ?, scraped_at = CURRENT_TIMESTAMP
-						WHERE team = ? AND opponent = ? AND date = ? AND is_home = ?
-					''', (
-						match['score'],
-						len(match['goals_scored']),
-						len(match['goals_conceded']),
-						goal_times_scored_json,
-						goal_times_conceded_json,
-						match['team'],
-						match['opponent'],
-						match['date'],
-						1 if match['is_home'] else 0
-					))
-				else:
-					# Nouveau match - l'insérer
-					cursor.execute('''
-						INSERT INTO soccerstats_scraped_matches 
-						(country, league_code, league, league_display_name, team, opponent, date, is_home, 
-						 score, goals_for, goals_against, goal_times, goal_times_conceded, match_id)
-						VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-					''', (
-						match['country'],
-						match['league_code'],
-						match['league_code'],  # league = league_code pour compatibilité
-						match['league'],
-						match['team'],
-						match['opponent'],
-						match['date'],
-						1 if match['is_home'] else 0,
-						match['score'],
-						len(match['goals_scored']),
-						len(match['goals_conceded']),
-						goal_times_scored_json,
-						goal_times_conceded_json,
-						match_id
+				rows = []
+				keys = []
+				for match in league_matches:
+					# Générer match_id
+					team1, team2 = sorted([match['team'], match['opponent']])
+					match_id = f"{match['date']}_{team1}_vs_{team2}"
+
+					# Convertir goal_times en JSON (buts marqués ET encaissés)
+					goal_times_scored = match['goals_scored'] + [0] * (10 - len(match['goals_scored']))
+					goal_times_conceded = match['goals_conceded'] + [0] * (10 - len(match['goals_conceded']))
+
+					is_home = 1 if match['is_home'] else 0
+					values = {
+						'country': match['country'],
+						'league_code': match['league_code'],
+						'league': match['league_code'],  # league = league_code pour compatibilité
+						'league_display_name': match['league'],
+						'team': match['team'],
+						'opponent': match['opponent'],
+						'date': match['date'],
+						'is_home': is_home,
+						'score': match['score'],
+						'goals_for': len(match['goals_scored']),
+						'goals_against': len(match['goals_conceded']),
+						'goal_times': json.dumps(goal_times_scored[:10]),
+						'goal_times_conceded': json.dumps(goal_times_conceded[:10]),
+						'match_id': match_id,
+					}
+					rows.append(tuple(values[column] for column in self.UPSERT_COLUMNS))
+					keys.append((match['team'], match['opponent'], match['date'], is_home))
+
+				teams = {match['team'] for match in league_matches}
+				existing = bulk_upsert.row_ids(cursor, teams)
+				bulk_upsert.upsert_rows(cursor, self.UPSERT_COLUMNS, rows, self.UPSERT_UPDATE_COLUMNS)
+				row_ids = bulk_upsert.row_ids(cursor, teams)
+
+				# Dual-write : minutes packées + goal_events
+				goal_storage.write_goals_many(cursor, [
+					(row_ids[key], match.get('goal_events') or goal_storage.events_from_minutes(
+						match['goals_scored'], match['goals_conceded']
 					))
-					inserted += 1
-                
+					for key, match in zip(keys, league_matches)
+				])
+				conn.commit()
 			except Exception as e:
-				print(f"Erreur insertion : {e}")
+				conn.rollback()
+				print(f"Erreur insertion ({league_code}) : {e}")
+				self.failed_leagues[league_code] = str(e)
+				self._settle_pages(league_code, {match['team'] for match in league_matches}, committed=False)
 				continue
-        
-		conn.commit()
+
+			self._settle_pages(league_code, teams, committed=True)
+
+			written_keys = set(keys)
+			inserted += len(written_keys - existing.keys())
+			updated += len(written_keys & existing.keys())
+
+		# Mise à jour incrémentale de l'index des récurrences (équipes écrites uniquement)
+		try:
+			written = recurrence_index.refresh_teams(
+				conn, {(match['league_code'], match['team']) for match in matches_data}
+			)
+			print(f"📇 Index récurrences : {written} lignes mises à jour")
+		except Exception as e:
+			print(f"⚠️  Erreur mise à jour index récurrences : {e}")
+
 		conn.close()
-        
+		
 		print(f"\n💾 Sauvegarde : {inserted} nouveaux, {updated} mis à jour")
 		return inserted
-    
-	def run(self, league_code: str = "bulgaria", league_name: str = "Bulgaria", parallel_workers: int = 4):
+	
+	def _settle_pages(self, league_code: str, teams: set, committed: bool):
+		"""Cache HTTP : pages des équipes confirmées après commit, oubliées si l'écriture a échoué"""
+		if self.http_cache is None:
+			return
+		urls = [url for url in (self.pending_pages.pop((league_code, team), None) for team in teams) if url]
+		if committed:
+			self.http_cache.confirm(urls)
+		else:
+			for url in urls:
+				self.http_cache.invalidate(url)
+
+	def purge_league(self, league_code: str, current_teams: List[str], replaced_teams: set) -> int:
+		"""
+		Supprime les lignes d'une ligue avant ré-écriture : équipes re-scrapées et équipes absentes
+		du classement actuel. Les équipes dont la page est inchangée (cache) sont conservées.
+		"""
+		conn = sqlite3.connect(self.DB_PATH)
+		goal_storage.ensure_schema(conn)
+		current = ','.join('?' * len(current_teams))
+		replaced = ','.join('?' * len(replaced_teams))
+		where = f"league = ? AND (team NOT IN ({current}) OR team IN ({replaced}))"
+		params = [league_code, *current_teams, *replaced_teams]
+		conn.execute(f'''
+			DELETE FROM goal_events WHERE match_row_id IN
+			(SELECT id FROM soccerstats_scraped_matches WHERE {where})
+		''', params)
+		deleted = conn.execute(f"DELETE FROM soccerstats_scraped_matches WHERE {where}", params).rowcount
+		conn.commit()
+		conn.close()
+		return deleted
+
+	def run(self, league_code: str = "bulgaria", league_name: str = "Bulgaria", parallel_workers: int = 4,
+			replace: bool = False, incremental: bool = False):
 		"""
 		Exécution complète du scraping automatique
+
+		Args:
+			replace: Remplacer les lignes des équipes re-scrapées (et retirer celles absentes du classement)
+			incremental: Ne parser que les matchs postérieurs au repère de chaque équipe (upsert, sans DELETE)
 		"""
+		self.unchanged_teams = set()
+		watermarks = {}
+		if incremental:
+			conn = sqlite3.connect(self.DB_PATH)
+			watermarks = scrape_state.load_watermarks(conn, league_code)
+			conn.close()
 		print("\n" + "="*80)
 		print(f"🏆 SCRAPING AUTOMATIQUE - {league_name.upper()}")
 		print("="*80)
@@ -354,12 +481,16 @@ class BulgariaAutoScraper:
 		print(f"📥 ÉTAPE 2 : Scraping des matches ({parallel_workers} workers parallèles)")
 		print("="*80 + "\n")
         
+		if incremental:
+			print(f"📌 Mode incrémental : {len(watermarks)} repères équipe chargés")
+
 		all_matches = []
 		success_count = 0
-        
+		new_marks = {}
+
 		with ThreadPoolExecutor(max_workers=parallel_workers) as executor:
 			futures = {
-				executor.submit(self.scrape_team, league_code, code, name): (code, name)
+				executor.submit(self.scrape_team, league_code, code, name, since=watermarks.get(name)): (code, name)
 				for code, name in teams
 			}
             
@@ -370,6 +501,7 @@ class BulgariaAutoScraper:
 					if matches:
 						all_matches.extend(matches)
 						success_count += 1
+						new_marks[name] = (matches[-1]['date'], matches[-1]['opponent'])
 				except Exception as e:
 					print(f"    ❌ {name}: Exception - {e}")
         
@@ -377,13 +509,29 @@ class BulgariaAutoScraper:
 		print("\n" + "="*80)
 		print("💾 Sauvegarde en base de données...")
 		print("="*80)
-        
+
+		if replace:
+			deleted = self.purge_league(league_code, [name for _, name in teams],
+										{match['team'] for match in all_matches})
+			print(f"🧹 {deleted} lignes remplacées pour {league_code}")
+
 		inserted = self.save_to_db(all_matches)
+
+		# Repères mis à jour après la sauvegarde (un échec de scraping ou d'écriture conserve l'ancien repère)
+		if league_code in self.failed_leagues:
+			print(f"⚠️  Écriture en échec : repères de {league_code} conservés")
+		else:
+			conn = sqlite3.connect(self.DB_PATH)
+			scrape_state.save_watermarks(conn, league_code, new_marks)
+			conn.close()
         
 		print(f"\n✅ Scraping terminé !")
 		print(f"   • Équipes scrapées : {success_count}/{len(teams)}")
 		print(f"   • Matches collectés : {len(all_matches)}")
 		print(f"   • Insérés en DB : {inserted}")
+		if self.http_cache:
+			print(f"   • Équipes inchangées : {len(self.unchanged_teams)}")
+			print(f"   • {self.http_cache.summary()}")
 		print("="*80 + "\n")
 
 
@@ -393,24 +541,36 @@ if __name__ == "__main__":
 	parser = argparse.ArgumentParser()
 	parser.add_argument('--league', default='all', help='League code or "all"')
 	parser.add_argument('--workers', type=int, default=4)
+	parser.add_argument('--no-cache', action='store_true', help='Ignorer le cache HTTP (tout re-télécharger)')
+	parser.add_argument('--incremental', action='store_true',
+						help='Ne scraper que les nouveaux matchs (repère par équipe, sans DELETE, saisons terminées ignorées)')
 	args = parser.parse_args()
 
 	# Nettoyer UNIQUEMENT la ligue à scraper (pas tout)
 	conn = sqlite3.connect(BulgariaAutoScraper.DB_PATH)
 	cursor = conn.cursor()
 
-	if args.league != 'all':
+	finished = scrape_state.finished_leagues() if args.incremental else set()
+	if args.league in finished:
+		print(f"⏭️  {args.league} : saison terminée, rien à scraper")
+		sys.exit(0)
+
+	if args.league != 'all' and args.incremental:
+		print(f"📌 Mode incrémental : aucune suppression pour {args.league}\n")
+	elif args.league != 'all' and args.no_cache:
 		cursor.execute("DELETE FROM soccerstats_scraped_matches WHERE league=?", (args.league,))
 		deleted = cursor.rowcount
 		conn.commit()
 		print(f"✅ DB nettoyée pour {args.league} ({deleted} matchs supprimés)\n")
+	elif args.league != 'all':
+		print(f"♻️  Cache HTTP actif : seules les équipes modifiées de {args.league} seront remplacées\n")
 	else:
 		print("⚠️  Mode 'all': conservation de toutes les données existantes\n")
 
 	conn.close()
 
 	# Lancer le scraping automatique
-	scraper = BulgariaAutoScraper()
+	scraper = BulgariaAutoScraper(use_cache=not args.no_cache)
 
 	if args.league == 'all':
 		# Scraper toutes les ligues activées du fichier config.yaml (version CLEAN_WORKFLOW)
@@ -419,11 +579,16 @@ if __name__ == "__main__":
 			config = yaml.safe_load(f)
 		leagues = [(l['url'].split('=')[-1], l['name']) for l in config['leagues'] if l.get('enabled', True)]
 		for code, name in leagues:
+			if code in finished:
+				print(f"\n⏭️  {name} : saison terminée, ignorée")
+				continue
 			print(f"\n\n{'='*80}")
 			print(f"🌍 LIGUE: {name}")
 			print(f"{'='*80}")
-			scraper.run(league_code=code, league_name=name, parallel_workers=args.workers)
+			scraper.run(league_code=code, league_name=name, parallel_workers=args.workers,
+						incremental=args.incremental)
 			print(f"\n✅ {name} terminé!")
 	else:
 		league_names = {l['url'].split('=')[-1]: l['name'] for l in yaml.safe_load(open('/workspaces/paris-live/CLEAN_WORKFLOW/config.yaml'))['leagues']}
-		scraper.run(league_code=args.league, league_name=league_names.get(args.league, args.league.title()), parallel_workers=args.workers)
+		scraper.run(league_code=args.league, league_name=league_names.get(args.league, args.league.title()), parallel_workers=args.workers,
+				    replace=not (args.no_cache or args.incremental), incremental=args.incremental)
@@ -1,4 +1,9 @@
-import subprocess
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+from batch_runner import BatchRunner
 
 # Liste complète des ligues à scrapper
 leagues = [
@@ -11,7 +16,25 @@ leagues = [
     "sweden", "usa", "southkorea4", "georgia", "norway6", "iceland2", "cyprus", "bolivia"
 ]
 
-for league in leagues:
-    print(f"\n=== SCRAPING {league} ===")
-    subprocess.run(["python3", "scrape_all_leagues_auto.py", "--league", league])
-print("\nScraping batch terminé pour toutes les ligues.")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scraping de toutes les ligues dans un seul processus")
+    parser.add_argument('--workers', type=int, default=BatchRunner.DEFAULT_WORKERS)
+    parser.add_argument('--rate', type=float, default=BatchRunner.DEFAULT_RATE, help='Requêtes / seconde (global)')
+    parser.add_argument('--full', action='store_true', help='Re-scraper toutes les lignes (sans repères par équipe)')
+    parser.add_argument('--no-cache', action='store_true', help='Ignorer le cache HTTP')
+    parser.add_argument('--restart', action='store_true', help='Ignorer le journal et repartir de zéro')
+    args = parser.parse_args(argv)
+
+    # Mise à jour incrémentale : seuls les nouveaux matchs de chaque équipe sont parsés (pas de DELETE)
+    runner = BatchRunner(workers=args.workers, rate_per_second=args.rate,
+                         incremental=not args.full, use_cache=not args.no_cache)
+    if args.restart:
+        runner.journal.reset()
+    failed = runner.run(leagues)
+    print("\nScraping batch terminé pour toutes les ligues.")
+    return failed
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main() else 0)
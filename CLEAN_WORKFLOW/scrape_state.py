@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+État du scraping incrémental.
+
+- scrape_watermarks : dernier match enregistré par (ligue, équipe) = (date, adversaire)
+  Les pages teamstats.asp listent les matchs dans l'ordre chronologique : seules les lignes
+  situées après ce repère sont parsées. Le repère est comparé tel qu'affiché ("17 Aug", sans année),
+  ce qui reste valable pour les saisons à cheval sur deux années.
+- leagues_dates.season_finished : ligues à ignorer (saison terminée)
+"""
+import os
+import sqlite3
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+LEAGUES_DATES_DB = os.path.join(os.path.dirname(__file__), "data", "leagues_dates.db")
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS scrape_watermarks (
+    league TEXT NOT NULL,
+    team TEXT NOT NULL,
+    last_date TEXT NOT NULL,
+    last_opponent TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (league, team)
+)
+'''
+
+Watermark = Tuple[str, str]  # (date, adversaire)
+
+
+def ensure_schema(conn: sqlite3.Connection):
+    conn.execute(SCHEMA)
+
+
+def load_watermarks(conn: sqlite3.Connection, league: str) -> Dict[str, Watermark]:
+    """Repères de toutes les équipes d'une ligue : {team: (date, adversaire)}"""
+    ensure_schema(conn)
+    rows = conn.execute(
+        "SELECT team, last_date, last_opponent FROM scrape_watermarks WHERE league = ?", (league,)
+    ).fetchall()
+    return {team: (date, opponent) for team, date, opponent in rows}
+
+
+def save_watermarks(conn: sqlite3.Connection, league: str, marks: Dict[str, Watermark]):
+    """Enregistre les repères après une sauvegarde réussie"""
+    ensure_schema(conn)
+    conn.executemany('''
+        INSERT OR REPLACE INTO scrape_watermarks (league, team, last_date, last_opponent, updated_at)
+        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ''', [(league, team, date, opponent) for team, (date, opponent) in marks.items()])
+    conn.commit()
+
+
+def rows_after(keys: Iterable[Watermark], watermark: Optional[Watermark]) -> int:
+    """
+    Index de la première ligne postérieure au repère
+
+    Args:
+        keys: (date, adversaire) de chaque ligne de la page, dans l'ordre
+        watermark: Dernier match enregistré (None = tout parser)
+
+    Returns:
+        0 si le repère est absent de la page (nouvelle saison, page modifiée) => re-scrape complet
+    """
+    if watermark is None:
+        return 0
+    keys = list(keys)
+    for i in range(len(keys) - 1, -1, -1):
+        if keys[i] == watermark:
+            return i + 1
+    return 0
+
+
+def finished_leagues(db_path: str = LEAGUES_DATES_DB) -> Set[str]:
+    """Ligues dont la saison est terminée (vide si leagues_dates.db est absent)"""
+    if not os.path.exists(db_path):
+        return set()
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT league FROM leagues_dates WHERE season_finished = 1").fetchall()
+    except sqlite3.Error as e:
+        print(f"⚠️  Lecture leagues_dates impossible : {e}")
+        rows = []
+    conn.close()
+    return {row[0] for row in rows}
@@ -82,6 +82,8 @@ from typing import Dict, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
+import html_parsing
+
 @dataclass
 class LiveMatchData:
     """Données extraites d'un match en direct"""
@@ -141,6 +143,125 @@ class LiveMatchData:
         }
 
 
+# Stats lues par scrape_match (titres <h3> de la page pmatch.asp)
+STAT_NAMES = (
+    'Possession', 'Corners', 'Total shots', 'Shots on target',
+    'Shots inside box', 'Shots outside box', 'Attacks', 'Dangerous attacks',
+)
+
+NUMERIC_B_RE = re.compile(r'^\d{1,3}(?:%)?$')
+
+
+class StatBlock:
+    """
+    Blocs de stats d'une page : un seul find_all('h3'), valeurs calculées à la demande
+    et mises en cache par titre. Trois méthodes d'extraction, dans l'ordre :
+        1 - TR suivant le <h3> : TDs [0]=home, [4]=away
+        2 - <b> numériques dans les tables qui suivent le <h3>
+        3 - <b> numériques dans la première table contenant le mot-clé
+    """
+
+    METHODS = (1, 2, 3)
+
+    def __init__(self, soup: BeautifulSoup):
+        self.soup = soup
+        self.headings = [(h3, h3.get_text(strip=True).lower()) for h3 in soup.find_all('h3')]
+        self._next_tr = {}
+        self._next_b = {}
+        self._tables = None
+
+    @staticmethod
+    def stat_key(stat_name: str) -> str:
+        return stat_name.lower().rstrip('s')
+
+    def layout(self, stat_names: Tuple[str, ...]) -> Tuple[str, ...]:
+        """Signature de disposition : titres <h3> des stats présentes (sans les noms d'équipes)"""
+        keys = [self.stat_key(stat_name) for stat_name in stat_names]
+        return tuple(text for _, text in self.headings
+                     if any(key in text or key in text.replace(' ', '') for key in keys))
+
+    def _matching(self, key: str):
+        for i, (h3, text) in enumerate(self.headings):
+            if key in text or key in text.replace(' ', ''):
+                yield i, h3
+
+    @staticmethod
+    def _numeric_b(tr) -> list:
+        return [t for t in (b.get_text(strip=True) for b in tr.find_all('b')) if NUMERIC_B_RE.match(t)]
+
+    def _tr_values(self, i: int, h3) -> Tuple[Optional[str], Optional[str]]:
+        if i not in self._next_tr:
+            values = (None, None)
+            # Trouver la TR parente du h3, puis la TR suivante
+            parent_tr = h3.find_parent('tr')
+            next_tr = parent_tr.find_next('tr') if parent_tr else None
+            if next_tr:
+                tds = next_tr.find_all('td')
+                # Structure: [0]=home, [1-3]=spacer/graph, [4]=away
+                if len(tds) >= 5:
+                    home_val = tds[0].get_text(strip=True)
+                    away_val = tds[4].get_text(strip=True)
+                    if home_val or away_val:
+                        values = (home_val or None, away_val or None)
+                # Fallback si structure différente: chercher les deux premiers TDs non-vides
+                elif len(tds) >= 2:
+                    non_empty = [td.get_text(strip=True) for td in tds if td.get_text(strip=True)]
+                    if len(non_empty) >= 2:
+                        values = (non_empty[0], non_empty[1])
+            self._next_tr[i] = values
+        return self._next_tr[i]
+
+    def _b_values(self, i: int, h3) -> Tuple[Optional[str], Optional[str]]:
+        if i not in self._next_b:
+            values = (None, None)
+            for table in h3.find_all_next('table', limit=8):
+                for tr in table.find_all('tr'):
+                    nums = self._numeric_b(tr)
+                    if len(nums) >= 2:
+                        values = (nums[0], nums[1])
+                        break
+                if values != (None, None):
+                    break
+            self._next_b[i] = values
+        return self._next_b[i]
+
+    def _table_values(self, key: str) -> Tuple[Optional[str], Optional[str]]:
+        if self._tables is None:
+            self._tables = [[table, None] for table in self.soup.find_all('table')]
+        for entry in self._tables:
+            if entry[1] is None:
+                entry[1] = entry[0].get_text().lower()
+            if key in entry[1]:
+                for tr in entry[0].find_all('tr'):
+                    nums = self._numeric_b(tr)
+                    if len(nums) >= 2:
+                        return nums[0], nums[1]
+        return None, None
+
+    def extract(self, method: int, stat_name: str) -> Tuple[Optional[str], Optional[str]]:
+        """Valeurs (home, away) d'une stat par une méthode donnée, (None, None) si échec"""
+        key = self.stat_key(stat_name)
+        try:
+            if method == 3:
+                return self._table_values(key)
+            values_for = self._tr_values if method == 1 else self._b_values
+            for i, h3 in self._matching(key):
+                values = values_for(i, h3)
+                if values != (None, None):
+                    return values
+        except Exception:
+            pass
+        return None, None
+
+    def extract_any(self, stat_name: str) -> Tuple[Optional[int], Tuple[Optional[str], Optional[str]]]:
+        """Essaie les méthodes dans l'ordre : (méthode retenue ou None, (home, away))"""
+        for method in self.METHODS:
+            values = self.extract(method, stat_name)
+            if values != (None, None):
+                return method, values
+        return None, (None, None)
+
+
 class SoccerStatsLiveScraper:
     """
     Scraper pour SoccerStats.com
@@ -163,6 +284,9 @@ class SoccerStatsLiveScraper:
         self.session.headers.update({
             "User-Agent": "paris-live-bot/1.0 (Match Analysis)"
         })
+        # Méthode d'extraction retenue par stat, par disposition de page (voir extract_stats)
+        self.layout_methods: Dict[Tuple[str, ...], Dict[str, Optional[int]]] = {}
+        self.layout_memo_hits = 0
     
     def _respect_throttle(self):
         """Attend si nécessaire pour respecter le throttling"""
@@ -185,7 +309,9 @@ class SoccerStatsLiveScraper:
             self._respect_throttle()
             response = self.session.get(url, timeout=self.DEFAULT_TIMEOUT)
             response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
+            # Tables utiles seulement (sans le bloc d'analyse) ; page complète si les équipes manquent
+            return html_parsing.parse(response.content, html_parsing.MATCH_PAGE,
+                                      check=lambda s: self.extract_teams(s) != (None, None))
         except requests.RequestException as e:
             print(f"❌ Erreur téléchargement {url}: {e}")
             return None
@@ -329,6 +455,8 @@ class SoccerStatsLiveScraper:
         """
         Extrait une statistique (Possession, Corners, Shots, etc.)
         Structure In-play: h3 dans TR, puis TR suivant avec TDs [0]=home, [4]=away
+
+        Pour plusieurs stats d'une même page, préférer extract_stats (un seul parcours)
         
         Args:
             soup: BeautifulSoup object
@@ -337,61 +465,33 @@ class SoccerStatsLiveScraper:
         Returns:
             (home_value, away_value)
         """
-        try:
-            stat_key = stat_name.lower().rstrip('s')
-
-            # MÉTHODE 1: Chercher <h3> qui correspond et utiliser la structure TR+TDs
-            for h3 in soup.find_all('h3'):
-                h3_txt = h3.get_text(strip=True).lower()
-                if stat_key in h3_txt or stat_key in h3_txt.replace(' ', ''):
-                    # Trouver la TR parente du h3
-                    parent_tr = h3.find_parent('tr')
-                    if parent_tr:
-                        # Chercher la TR suivante
-                        next_tr = parent_tr.find_next('tr')
-                        if next_tr:
-                            tds = next_tr.find_all('td')
-                            # Structure: [0]=home, [1-3]=spacer/graph, [4]=away
-                            if len(tds) >= 5:
-                                home_val = tds[0].get_text(strip=True)
-                                away_val = tds[4].get_text(strip=True)
-                                if home_val or away_val:
-                                    return home_val if home_val else None, away_val if away_val else None
-                            # Fallback si structure différente: chercher les deux premiers TDs non-vides
-                            elif len(tds) >= 2:
-                                non_empty = [td.get_text(strip=True) for td in tds if td.get_text(strip=True)]
-                                if len(non_empty) >= 2:
-                                    return non_empty[0], non_empty[1]
-
-            # MÉTHODE 2: Parcourir les <h3> et chercher les <b> numériques dans les tables suivantes
-            for h3 in soup.find_all('h3'):
-                txt = h3.get_text(strip=True).lower()
-                if stat_key in txt or stat_key in txt.replace(' ', ''):
-                    for table in h3.find_all_next('table', limit=8):
-                        for tr in table.find_all('tr'):
-                            b_tags = tr.find_all('b')
-                            nums = []
-                            for b in b_tags:
-                                t = b.get_text(strip=True)
-                                if re.match(r'^\d{1,3}(?:%)?$', t):
-                                    nums.append(t)
-                            if len(nums) >= 2:
-                                return nums[0], nums[1]
-
-            # MÉTHODE 3: Fallback sur les tables contenant le mot-clé
-            for table in soup.find_all('table'):
-                if stat_key in table.get_text().lower():
-                    for tr in table.find_all('tr'):
-                        b_tags = tr.find_all('b')
-                        nums = [b.get_text(strip=True) for b in b_tags 
-                               if re.match(r'^\d{1,3}(?:%)?$', b.get_text(strip=True))]
-                        if len(nums) >= 2:
-                            return nums[0], nums[1]
+        return StatBlock(soup).extract_any(stat_name)[1]
 
-        except Exception as e:
-            pass
+    def extract_stats(self, soup: BeautifulSoup,
+                      stat_names: Tuple[str, ...] = STAT_NAMES) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """
+        Extrait toutes les stats d'une page en un seul parcours des <h3>
 
-        return None, None
+        La méthode qui a fonctionné pour chaque stat est mémorisée par disposition de page
+        (titres <h3> des stats présentes) : les pages suivantes de même disposition l'essaient directement,
+        et une stat absente n'est plus recherchée dans toutes les tables.
+
+        Returns:
+            {stat_name: (home_value, away_value)}
+        """
+        block = StatBlock(soup)
+        memo = self.layout_methods.setdefault(block.layout(stat_names), {})
+        stats = {}
+        for stat_name in stat_names:
+            if stat_name in memo:
+                method = memo[stat_name]
+                value = block.extract(method, stat_name) if method else (None, None)
+                if method is None or value != (None, None):
+                    self.layout_memo_hits += 1
+                    stats[stat_name] = value
+                    continue
+            memo[stat_name], stats[stat_name] = block.extract_any(stat_name)
+        return stats
     
     def parse_stat_value(self, value: Optional[str]) -> Optional[float]:
         """Parse une valeur statistique (ex: '48%' → 48.0, '3' → 3.0)"""
@@ -406,6 +506,10 @@ class SoccerStatsLiveScraper:
             pass
         return None
     
+    def _parse_int_pair(self, values: Tuple[Optional[str], Optional[str]]) -> Tuple[Optional[int], Optional[int]]:
+        """('7', '13') → (7, 13) ; valeur absente → None"""
+        return tuple(int(self.parse_stat_value(value)) if value else None for value in values)
+    
     def scrape_match(self, url: str) -> Optional[LiveMatchData]:
         """
         Scrape un match complet
@@ -425,37 +529,19 @@ class SoccerStatsLiveScraper:
         score_home, score_away = self.extract_score(soup)
         minute, minute_display = self.extract_minute(soup)
         
-        poss_home_str, poss_away_str = self.extract_stat(soup, 'Possession')
+        stats = self.extract_stats(soup)
+
+        poss_home_str, poss_away_str = stats['Possession']
         possession_home = self.parse_stat_value(poss_home_str)
         possession_away = self.parse_stat_value(poss_away_str)
         
-        corners_home_str, corners_away_str = self.extract_stat(soup, 'Corners')
-        corners_home = int(self.parse_stat_value(corners_home_str)) if corners_home_str else None
-        corners_away = int(self.parse_stat_value(corners_away_str)) if corners_away_str else None
-        
-        shots_home_str, shots_away_str = self.extract_stat(soup, 'Total shots')
-        shots_home = int(self.parse_stat_value(shots_home_str)) if shots_home_str else None
-        shots_away = int(self.parse_stat_value(shots_away_str)) if shots_away_str else None
-        
-        sot_home_str, sot_away_str = self.extract_stat(soup, 'Shots on target')
-        shots_on_target_home = int(self.parse_stat_value(sot_home_str)) if sot_home_str else None
-        shots_on_target_away = int(self.parse_stat_value(sot_away_str)) if sot_away_str else None
-        
-        sib_home_str, sib_away_str = self.extract_stat(soup, 'Shots inside box')
-        shots_inside_box_home = int(self.parse_stat_value(sib_home_str)) if sib_home_str else None
-        shots_inside_box_away = int(self.parse_stat_value(sib_away_str)) if sib_away_str else None
-        
-        sob_home_str, sob_away_str = self.extract_stat(soup, 'Shots outside box')
-        shots_outside_box_home = int(self.parse_stat_value(sob_home_str)) if sob_home_str else None
-        shots_outside_box_away = int(self.parse_stat_value(sob_away_str)) if sob_away_str else None
-        
-        attacks_home_str, attacks_away_str = self.extract_stat(soup, 'Attacks')
-        attacks_home = int(self.parse_stat_value(attacks_home_str)) if attacks_home_str else None
-        attacks_away = int(self.parse_stat_value(attacks_away_str)) if attacks_away_str else None
-        
-        dangerous_home_str, dangerous_away_str = self.extract_stat(soup, 'Dangerous attacks')
-        dangerous_attacks_home = int(self.parse_stat_value(dangerous_home_str)) if dangerous_home_str else None
-        dangerous_attacks_away = int(self.parse_stat_value(dangerous_away_str)) if dangerous_away_str else None
+        corners_home, corners_away = self._parse_int_pair(stats['Corners'])
+        shots_home, shots_away = self._parse_int_pair(stats['Total shots'])
+        shots_on_target_home, shots_on_target_away = self._parse_int_pair(stats['Shots on target'])
+        shots_inside_box_home, shots_inside_box_away = self._parse_int_pair(stats['Shots inside box'])
+        shots_outside_box_home, shots_outside_box_away = self._parse_int_pair(stats['Shots outside box'])
+        attacks_home, attacks_away = self._parse_int_pair(stats['Attacks'])
+        dangerous_attacks_home, dangerous_attacks_away = self._parse_int_pair(stats['Dangerous attacks'])
         
         # Vérifications minimales
         if not home_team or not away_team or score_home is None or score_away is None:
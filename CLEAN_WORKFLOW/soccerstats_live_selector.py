@@ -63,10 +63,11 @@ def is_in_interval(minute_raw, minute_num):
     return False
 # Imports globaux
 import sqlite3, json
+import db_access
 
 # Fonction pour calculer la récurrence récente (n derniers matchs)
 def get_recent_pattern_score(league, team, side, interval, n_last=5):
-    conn = sqlite3.connect('/workspaces/paris-live/football-live-prediction/data/predictions.db')
+    conn = db_access.connect()
     cursor = conn.cursor()
     cursor.execute("SELECT goal_times, goal_times_conceded, is_home FROM soccerstats_scraped_matches WHERE league = ? AND team = ?", (league, team))
     matchs = cursor.fetchall()
@@ -143,7 +144,7 @@ def print_full_patterns(league, home_team, away_team, get_pattern_score):
     INTERVALS = [(31, 45), (75, 120)]
     INTERVAL_LABELS = { (31, 45): "31-45+", (75, 120): "75-90+" }
     # Charger la liste des équipes normalisées de la base pour la ligue
-    conn = __import__('sqlite3').connect('/workspaces/paris-live/football-live-prediction/data/predictions.db')
+    conn = db_access.connect()
     cursor = conn.cursor()
     cursor.execute("SELECT DISTINCT team FROM soccerstats_scraped_matches WHERE league = ?", (league,))
     teams_in_db = [row[0] for row in cursor.fetchall()]
@@ -174,7 +175,7 @@ def print_full_patterns(league, home_team, away_team, get_pattern_score):
         for side in ["HOME", "AWAY"]:
             for interval in INTERVALS:
                 # Extraction détaillée
-                conn = __import__('sqlite3').connect('/workspaces/paris-live/football-live-prediction/data/predictions.db')
+                conn = db_access.connect()
                 cursor = conn.cursor()
                 if norm_team is not None:
                     cursor.execute("""
@@ -277,6 +278,8 @@ from urllib.parse import urljoin
 import requests
 from bs4 import BeautifulSoup
 
+import html_parsing
+
 try:
     from soccerstats_live_scraper import SoccerStatsLiveScraper
 except Exception:
@@ -305,7 +308,8 @@ def parse_minute(text: str) -> Optional[int]:
 def get_live_matches(index_url: str = DEFAULT_URL, timeout: int = 10, debug: bool = False) -> List[Dict]:
     r = requests.get(index_url, headers=UA, timeout=timeout)
     r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
+    # table#btable seulement ; la page complète n'est parsée que pour le repli (2)
+    soup = html_parsing.make_soup(r.content, html_parsing.BTABLE)
 
     results: List[Dict] = []
 
@@ -313,7 +317,7 @@ def get_live_matches(index_url: str = DEFAULT_URL, timeout: int = 10, debug: boo
     # Synchronisation dynamique avec la base de données
     import sqlite3
     try:
-        conn = sqlite3.connect("/workspaces/paris-live/football-live-prediction/data/predictions.db")
+        conn = db_access.connect()
         cursor = conn.cursor()
         cursor.execute("SELECT DISTINCT league FROM soccerstats_scraped_matches ORDER BY league;")
         LEAGUES_TO_FOLLOW = [row[0] for row in cursor.fetchall()]
@@ -424,6 +428,7 @@ def get_live_matches(index_url: str = DEFAULT_URL, timeout: int = 10, debug: boo
     if not results:
         if debug:
             print("No results from btable — using fallback scanning of fonts and links...")
+        soup = html_parsing.make_soup(r.content)
         candidates: Dict[str, Dict] = {}
         for a in soup.find_all("a", href=True):
             href_raw = a["href"]
@@ -571,7 +576,7 @@ if __name__ == "__main__":
                                 interval = (75, 90)
                             league = m['url'].split('league=')[1].split('&')[0] if 'league=' in m['url'] else 'france'
                             import sqlite3
-                            conn = sqlite3.connect('/workspaces/paris-live/football-live-prediction/data/predictions.db')
+                            conn = db_access.connect()
                             cursor = conn.cursor()
                             cursor.execute("SELECT goal_times, goal_times_conceded, is_home FROM soccerstats_scraped_matches WHERE league = ? AND team = ?", (league, d['home_team']))
                             matchs_home = [mm for mm in cursor.fetchall() if mm[2]]
@@ -627,7 +632,7 @@ if __name__ == "__main__":
                             # On récupère les matchs home/away pour chaque équipe
                             league = m['url'].split('league=')[1].split('&')[0] if 'league=' in m['url'] else 'france'
                             import sqlite3
-                            conn = sqlite3.connect('/workspaces/paris-live/football-live-prediction/data/predictions.db')
+                            conn = db_access.connect()
                             cursor = conn.cursor()
                             cursor.execute("SELECT goal_times, goal_times_conceded, is_home FROM soccerstats_scraped_matches WHERE league = ? AND team = ?", (league, d['home_team']))
                             matchs_home = [mm for mm in cursor.fetchall() if mm[2]]
@@ -655,7 +660,7 @@ if __name__ == "__main__":
                             interval = (31, 45) if d['minute'] <= 45 else (75, 120)
                             def get_but_stats(league, team, side, interval):
                                 import sqlite3, json
-                                conn = sqlite3.connect('/workspaces/paris-live/football-live-prediction/data/predictions.db')
+                                conn = db_access.connect()
                                 cursor = conn.cursor()
                                 cursor.execute("SELECT goal_times, goal_times_conceded, is_home FROM soccerstats_scraped_matches WHERE league = ? AND team = ?", (league, team))
                                 matchs = cursor.fetchall()
@@ -690,7 +695,7 @@ if __name__ == "__main__":
                             matchs_home = []
                             matchs_away = []
                             import sqlite3
-                            conn = sqlite3.connect('/workspaces/paris-live/football-live-prediction/data/predictions.db')
+                            conn = db_access.connect()
                             cursor = conn.cursor()
                             cursor.execute("SELECT goal_times, goal_times_conceded, is_home FROM soccerstats_scraped_matches WHERE league = ? AND team = ?", (league, d['home_team']))
                             matchs_home = [m for m in cursor.fetchall() if m[2]]
@@ -953,7 +958,7 @@ if __name__ == "__main__":
                             # Fonction pour calculer la récurrence récente (n derniers matchs)
                             def get_recent_pattern_score(league, team, side, interval, n_last=5):
                                 import sqlite3, json
-                                conn = sqlite3.connect('/workspaces/paris-live/football-live-prediction/data/predictions.db')
+                                conn = db_access.connect()
                                 cursor = conn.cursor()
                                 cursor.execute("SELECT goal_times, goal_times_conceded, is_home FROM soccerstats_scraped_matches WHERE league = ? AND team = ?", (league, team))
                                 matchs = cursor.fetchall()
@@ -1039,7 +1044,7 @@ if __name__ == "__main__":
                     # Extraction du nombre de buts marqués/encaissés pour chaque équipe
                     import sqlite3, json
                     def get_but_stats(league, team, side, interval):
-                        conn = sqlite3.connect('/workspaces/paris-live/football-live-prediction/data/predictions.db')
+                        conn = db_access.connect()
                         cursor = conn.cursor()
                         cursor.execute("SELECT goal_times, goal_times_conceded, is_home FROM soccerstats_scraped_matches WHERE league = ? AND team = ?", (league, team))
                         matchs = cursor.fetchall()
@@ -1058,7 +1063,7 @@ if __name__ == "__main__":
                             buts_encaisses += sum(1 for m in conceded if start <= m <= end)
                         return buts_marques, buts_encaisses, buts_marques + buts_encaisses
                     def get_but_stats_and_total(league, team, side, interval):
-                        conn = sqlite3.connect('/workspaces/paris-live/football-live-prediction/data/predictions.db')
+                        conn = db_access.connect()
                         cursor = conn.cursor()
                         cursor.execute("SELECT goal_times, goal_times_conceded, is_home FROM soccerstats_scraped_matches WHERE league = ? AND team = ?", (league, team))
                         matchs = cursor.fetchall()
@@ -1089,7 +1094,7 @@ if __name__ == "__main__":
                     # Extraction minute moyenne/SEM/IQR
                     # On réutilise la logique de print_full_patterns mais en résumé
                     import sqlite3, json
-                    conn = sqlite3.connect('/workspaces/paris-live/football-live-prediction/data/predictions.db')
+                    conn = db_access.connect()
                     cursor = conn.cursor()
                     for team, side in [(home_team, 'HOME'), (away_team, 'AWAY')]:
                         cursor.execute("SELECT goal_times, goal_times_conceded, is_home FROM soccerstats_scraped_matches WHERE league = ? AND team = ?", (league, team))
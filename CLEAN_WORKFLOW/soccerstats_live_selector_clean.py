@@ -10,6 +10,8 @@ import requests
 UA = {"User-Agent": "paris-live-bot/1.0 (Match Detection)"}
 from bs4 import BeautifulSoup
 import re
+import goal_storage
+import db_access
 
 def parse_minute(text: str) -> int:
     if not text:
@@ -30,11 +32,9 @@ def compute_mt_goals(matchs):
     mt1_buts_list = []
     mt2_buts_list = []
     for goal_times, goal_times_conceded, is_home in matchs:
-        try:
-            goals = json.loads(goal_times) if goal_times else []
-            conceded = json.loads(goal_times_conceded) if goal_times_conceded else []
-        except Exception:
-            goals, conceded = [], []
+        # BLOB packé (goal_minutes) ou JSON historique
+        goals = goal_storage.decode_minutes(goal_times)
+        conceded = goal_storage.decode_minutes(goal_times_conceded)
         mt1_buts = sum(1 for m in goals if 1 <= m <= 45) + sum(1 for m in conceded if 1 <= m <= 45)
         mt2_buts = sum(1 for m in goals if 46 <= m <= 90) + sum(1 for m in conceded if 46 <= m <= 90)
         mt1_buts_list.append(mt1_buts)
@@ -156,7 +156,7 @@ if __name__ == "__main__":
 					league = m['url'].split('league=')[1].split('&')[0] if 'league=' in m['url'] else 'france'
 					import sqlite3
                     import os
-                    conn = sqlite3.connect(os.path.join(os.path.dirname(__file__), 'data', 'predictions.db'))
+                    conn = db_access.connect()
 					cursor = conn.cursor()
 					cursor.execute("SELECT goal_times, goal_times_conceded, is_home FROM soccerstats_scraped_matches WHERE league = ? AND team = ?", (league, d['home_team']))
 					matchs_home = [mm for mm in cursor.fetchall() if mm[2]]
@@ -201,7 +201,7 @@ import sqlite3, json
 
 # Fonction pour calculer la récurrence récente (n derniers matchs)
 def get_recent_pattern_score(league, team, side, interval, n_last=5):
-    conn = sqlite3.connect('/workspaces/paris-live/football-live-prediction/data/predictions.db')
+    conn = db_access.connect()
     cursor = conn.cursor()
     cursor.execute("SELECT goal_times, goal_times_conceded, is_home FROM soccerstats_scraped_matches WHERE league = ? AND team = ?", (league, team))
     matchs = cursor.fetchall()
@@ -234,11 +234,9 @@ def compute_mt_goals(matchs):
     mt1_buts_list = []
     mt2_buts_list = []
     for goal_times, goal_times_conceded, is_home in matchs:
-        try:
-            goals = __import__('json').loads(goal_times) if goal_times else []
-            conceded = __import__('json').loads(goal_times_conceded) if goal_times_conceded else []
-        except Exception:
-            goals, conceded = [], []
+        # BLOB packé (goal_minutes) ou JSON historique
+        goals = goal_storage.decode_minutes(goal_times)
+        conceded = goal_storage.decode_minutes(goal_times_conceded)
         # MT1 = 1 à 45+ (on prend tout <= 45.99)
         mt1_buts = sum(1 for m in goals + conceded if 1 <= m <= 45.99)
         # MT2 = 46 à 90+ (on prend tout >= 46)
@@ -278,7 +276,7 @@ def print_full_patterns(league, home_team, away_team, get_pattern_score):
     INTERVALS = [(31, 45), (75, 120)]
     INTERVAL_LABELS = { (31, 45): "31-45+", (75, 120): "75-90+" }
     # Charger la liste des équipes normalisées de la base pour la ligue
-    conn = __import__('sqlite3').connect('/workspaces/paris-live/football-live-prediction/data/predictions.db')
+    conn = db_access.connect()
     cursor = conn.cursor()
     cursor.execute("SELECT DISTINCT team FROM soccerstats_scraped_matches WHERE league = ?", (league,))
     teams_in_db = [row[0] for row in cursor.fetchall()]
@@ -309,7 +307,7 @@ def print_full_patterns(league, home_team, away_team, get_pattern_score):
         for side in ["HOME", "AWAY"]:
             for interval in INTERVALS:
                 # Extraction détaillée
-                conn = __import__('sqlite3').connect('/workspaces/paris-live/football-live-prediction/data/predictions.db')
+                conn = db_access.connect()
                 cursor = conn.cursor()
                 if norm_team is not None:
                     cursor.execute("""
@@ -448,7 +446,7 @@ def get_live_matches(index_url: str = DEFAULT_URL, timeout: int = 10, debug: boo
     # Synchronisation dynamique avec la base de données
     import sqlite3
     try:
-        conn = sqlite3.connect("/workspaces/paris-live/football-live-prediction/data/predictions.db")
+        conn = db_access.connect()
         cursor = conn.cursor()
         cursor.execute("SELECT DISTINCT league FROM soccerstats_scraped_matches ORDER BY league;")
         LEAGUES_TO_FOLLOW = [row[0] for row in cursor.fetchall()]
@@ -706,7 +704,7 @@ if __name__ == "__main__":
                                 interval = (75, 90)
                             league = m['url'].split('league=')[1].split('&')[0] if 'league=' in m['url'] else 'france'
                             import sqlite3
-                            conn = sqlite3.connect('/workspaces/paris-live/football-live-prediction/data/predictions.db')
+                            conn = db_access.connect()
                             cursor = conn.cursor()
                             cursor.execute("SELECT goal_times, goal_times_conceded, is_home FROM soccerstats_scraped_matches WHERE league = ? AND team = ?", (league, d['home_team']))
                             matchs_home = [mm for mm in cursor.fetchall() if mm[2]]
@@ -762,7 +760,7 @@ if __name__ == "__main__":
                             # On récupère les matchs home/away pour chaque équipe
                             league = m['url'].split('league=')[1].split('&')[0] if 'league=' in m['url'] else 'france'
                             import sqlite3
-                            conn = sqlite3.connect('/workspaces/paris-live/football-live-prediction/data/predictions.db')
+                            conn = db_access.connect()
                             cursor = conn.cursor()
                             cursor.execute("SELECT goal_times, goal_times_conceded, is_home FROM soccerstats_scraped_matches WHERE league = ? AND team = ?", (league, d['home_team']))
                             matchs_home = [mm for mm in cursor.fetchall() if mm[2]]
@@ -790,7 +788,7 @@ if __name__ == "__main__":
                             interval = (31, 45) if d['minute'] <= 45 else (75, 120)
                             def get_but_stats(league, team, side, interval):
                                 import sqlite3, json
-                                conn = sqlite3.connect('/workspaces/paris-live/football-live-prediction/data/predictions.db')
+                                conn = db_access.connect()
                                 cursor = conn.cursor()
                                 cursor.execute("SELECT goal_times, goal_times_conceded, is_home FROM soccerstats_scraped_matches WHERE league = ? AND team = ?", (league, team))
                                 matchs = cursor.fetchall()
@@ -825,7 +823,7 @@ if __name__ == "__main__":
                             matchs_home = []
                             matchs_away = []
                             import sqlite3
-                            conn = sqlite3.connect('/workspaces/paris-live/football-live-prediction/data/predictions.db')
+                            conn = db_access.connect()
                             cursor = conn.cursor()
                             cursor.execute("SELECT goal_times, goal_times_conceded, is_home FROM soccerstats_scraped_matches WHERE league = ? AND team = ?", (league, d['home_team']))
                             matchs_home = [m for m in cursor.fetchall() if m[2]]
@@ -1088,7 +1086,7 @@ if __name__ == "__main__":
                             # Fonction pour calculer la récurrence récente (n derniers matchs)
                             def get_recent_pattern_score(league, team, side, interval, n_last=5):
                                 import sqlite3, json
-                                conn = sqlite3.connect('/workspaces/paris-live/football-live-prediction/data/predictions.db')
+                                conn = db_access.connect()
                                 cursor = conn.cursor()
                                 cursor.execute("SELECT goal_times, goal_times_conceded, is_home FROM soccerstats_scraped_matches WHERE league = ? AND team = ?", (league, team))
                                 matchs = cursor.fetchall()
@@ -1174,7 +1172,7 @@ if __name__ == "__main__":
                     # Extraction du nombre de buts marqués/encaissés pour chaque équipe
                     import sqlite3, json
                     def get_but_stats(league, team, side, interval):
-                        conn = sqlite3.connect('/workspaces/paris-live/football-live-prediction/data/predictions.db')
+                        conn = db_access.connect()
                         cursor = conn.cursor()
                         cursor.execute("SELECT goal_times, goal_times_conceded, is_home FROM soccerstats_scraped_matches WHERE league = ? AND team = ?", (league, team))
                         matchs = cursor.fetchall()
@@ -1193,7 +1191,7 @@ if __name__ == "__main__":
                             buts_encaisses += sum(1 for m in conceded if start <= m <= end)
                         return buts_marques, buts_encaisses, buts_marques + buts_encaisses
                     def get_but_stats_and_total(league, team, side, interval):
-                        conn = sqlite3.connect('/workspaces/paris-live/football-live-prediction/data/predictions.db')
+                        conn = db_access.connect()
                         cursor = conn.cursor()
                         cursor.execute("SELECT goal_times, goal_times_conceded, is_home FROM soccerstats_scraped_matches WHERE league = ? AND team = ?", (league, team))
                         matchs = cursor.fetchall()
@@ -1224,7 +1222,7 @@ if __name__ == "__main__":
                     # Extraction minute moyenne/SEM/IQR
                     # On réutilise la logique de print_full_patterns mais en résumé
                     import sqlite3, json
-                    conn = sqlite3.connect('/workspaces/paris-live/football-live-prediction/data/predictions.db')
+                    conn = db_access.connect()
                     cursor = conn.cursor()
                     for team, side in [(home_team, 'HOME'), (away_team, 'AWAY')]:
                         cursor.execute("SELECT goal_times, goal_times_conceded, is_home FROM soccerstats_scraped_matches WHERE league = ? AND team = ?", (league, team))
@@ -0,0 +1,163 @@
+"""
+Tests du batch multi-ligues en processus unique (pool partagé, écrivain unique, reprise).
+
+Usage :
+    python3 -m pytest CLEAN_WORKFLOW/test_batch_runner.py -q
+"""
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.dirname(__file__))
+import bulk_upsert
+import init_soccerstats_db
+import scrape_state
+from batch_runner import BatchRunner, RateLimitedSession
+
+BASE = "https://www.soccerstats.com"
+
+
+def _formtable(league, teams):
+    return "".join(
+        f"<a href='teamstats.asp?league={league}&stats=u{i}-x'>{team}</a>" for i, team in enumerate(teams)
+    ).encode()
+
+
+def _team_page(team, opponent):
+    return (f"<table bgcolor='#cccccc' width='100%'><tr><td>header</td></tr>"
+            f"<tr><td>1 Aug</td><td><b>{team}</b></td>"
+            f"<td><a class='tooltip4'><font>1 - 0</font><span><div>"
+            f"<font><br/><b>1-0</b> <font color='#000000'>X (33)</font></font>"
+            f"</div></span></a></td><td>{opponent}</td>"
+            f"<td></td><td></td><td></td><td>1-0</td><td></td></tr></table>").encode()
+
+
+class FakeSession:
+    def __init__(self, pages):
+        self.pages = pages
+        self.urls = []
+        self.lock = threading.Lock()
+
+    def get(self, url, headers=None, timeout=None):
+        with self.lock:
+            self.urls.append(url)
+        page = self.pages[url]
+        if isinstance(page, Exception):
+            raise page
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = page
+        return response
+
+
+@pytest.fixture
+def runner_factory(tmp_path):
+    db_path = str(tmp_path / "predictions.db")
+    conn = sqlite3.connect(db_path)
+    conn.executescript(init_soccerstats_db.schema)
+    conn.close()
+
+    def make(pages):
+        runner = BatchRunner(workers=4, use_cache=False, db_path=db_path,
+                             journal_path=str(tmp_path / "journal.json"))
+        runner.scraper.session = FakeSession(pages)
+        return runner
+    return make, db_path
+
+
+class TestBatchRunner:
+    """Tests pour BatchRunner"""
+
+    def test_rate_limited_session(self, monkeypatch):
+        """Les requêtes de tous les threads sont espacées de 1/rate"""
+        monkeypatch.setattr(requests.Session, "request", lambda self, *a, **k: None)
+        session = RateLimitedSession(rate_per_second=50, pool_size=4)
+        start = time.monotonic()
+        threads = [threading.Thread(target=session.get, args=("https://x",)) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert time.monotonic() - start >= 5 / 50 - 0.01
+
+    def test_resume_after_interruption(self, runner_factory):
+        """Exécution interrompue : la reprise ne refait que les ligues non journalisées"""
+        make, db_path = runner_factory
+        pages = {
+            f"{BASE}/formtable.asp?league=a": _formtable("a", ["A1", "A2"]),
+            f"{BASE}/teamstats.asp?league=a&stats=u0-x": _team_page("A1", "A2"),
+            f"{BASE}/teamstats.asp?league=a&stats=u1-x": _team_page("A2", "A1"),
+            f"{BASE}/formtable.asp?league=b": _formtable("b", ["B1"]),
+            f"{BASE}/teamstats.asp?league=b&stats=u0-x": _team_page("B1", "Z"),
+        }
+        make(pages).run(["a"])
+        # Exécution interrompue après la ligue a : le journal reste sur disque
+        make(pages).journal.mark_done("a", matches=2, inserted=2)
+
+        runner = make(pages)
+        assert list(runner.journal.done) == ["a"]
+        assert runner.run(["a", "b"]) == {}
+        assert not any("league=a" in url for url in runner.scraper.session.urls)
+        assert not os.path.exists(runner.journal.path)
+
+        conn = sqlite3.connect(db_path)
+        teams = conn.execute("SELECT team FROM soccerstats_scraped_matches ORDER BY team").fetchall()
+        conn.close()
+        assert teams == [("A1",), ("A2",), ("B1",)]
+
+    def test_failed_league_does_not_pin_journal(self, runner_factory):
+        """Une ligue en échec n'empêche pas l'exécution suivante de rafraîchir toutes les autres"""
+        make, db_path = runner_factory
+        pages = {
+            f"{BASE}/formtable.asp?league=a": _formtable("a", ["A1"]),
+            f"{BASE}/teamstats.asp?league=a&stats=u0-x": _team_page("A1", "Z"),
+            f"{BASE}/formtable.asp?league=b": _formtable("b", ["B1"]),
+            f"{BASE}/teamstats.asp?league=b&stats=u0-x": requests.ConnectionError("reset"),
+        }
+        runner = make(pages)
+        assert list(runner.run(["a", "b"])) == ["b"]
+        assert not os.path.exists(runner.journal.path)
+
+        runner = make(pages)
+        assert list(runner.run(["a", "b"])) == ["b"]
+        assert f"{BASE}/teamstats.asp?league=a&stats=u0-x" in runner.scraper.session.urls
+
+    def test_write_failure_not_journaled(self, runner_factory, monkeypatch):
+        """Écriture en échec : ligue reprise, sans repères ni entrée au journal"""
+        make, db_path = runner_factory
+        pages = {
+            f"{BASE}/formtable.asp?league=a": _formtable("a", ["A1"]),
+            f"{BASE}/teamstats.asp?league=a&stats=u0-x": _team_page("A1", "Z"),
+        }
+
+        def fail(*args, **kwargs):
+            raise sqlite3.OperationalError("database is locked")
+        monkeypatch.setattr(bulk_upsert, "upsert_rows", fail)
+        runner = make(pages)
+        failed = runner.run(["a"])
+        assert list(failed) == ["a"]
+        assert "database is locked" in failed["a"]
+        assert runner.journal.done == {}
+
+        conn = sqlite3.connect(db_path)
+        assert scrape_state.load_watermarks(conn, "a") == {}
+        conn.close()
+
+    def test_failed_team_not_hidden_by_unchanged_namesake(self, runner_factory):
+        """Une équipe en échec n'est pas confondue avec une homonyme inchangée (autre ligue, run précédent)"""
+        make, db_path = runner_factory
+        pages = {
+            f"{BASE}/formtable.asp?league=a": _formtable("a", ["United"]),
+            f"{BASE}/teamstats.asp?league=a&stats=u0-x": requests.ConnectionError("reset"),
+        }
+        runner = make(pages)
+        runner.scraper.unchanged_teams = {("a", "United"), ("b", "United")}
+        assert list(runner.run(["a"])) == ["a"]
+        assert "United" in runner.failed["a"]
+        assert runner.journal.done == {}
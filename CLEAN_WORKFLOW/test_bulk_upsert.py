@@ -0,0 +1,80 @@
+"""
+Tests de l'écriture en masse (upsert sur la clé de ligne, une transaction par ligue).
+
+Usage :
+    python3 -m pytest CLEAN_WORKFLOW/test_bulk_upsert.py -q
+"""
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+import bulk_upsert
+import init_soccerstats_db
+from scrape_all_leagues_auto import BulgariaAutoScraper
+
+
+def _match(team, opponent, is_home, scored, conceded, league_code="france", date="1 Aug"):
+    return {
+        'country': 'France', 'league': 'Ligue 1', 'league_code': league_code,
+        'team': team, 'opponent': opponent, 'date': date, 'is_home': is_home,
+        'score': f"{len(scored)}:{len(conceded)}", 'goals_scored': scored, 'goals_conceded': conceded,
+    }
+
+
+@pytest.fixture
+def scraper(tmp_path, monkeypatch):
+    path = str(tmp_path / "predictions.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(init_soccerstats_db.schema)
+    conn.close()
+    monkeypatch.setattr(BulgariaAutoScraper, "DB_PATH", path)
+    return BulgariaAutoScraper(use_cache=False)
+
+
+class TestBulkUpsert:
+    """Tests pour bulk_upsert et BulgariaAutoScraper.save_to_db"""
+
+    def test_upsert_keeps_both_sides_of_a_match(self, scraper):
+        """Les deux lignes d'un match (même match_id) coexistent ; un re-scrape met à jour"""
+        assert scraper.save_to_db([
+            _match("Lyon", "Nice", True, [12], []),
+            _match("Nice", "Lyon", False, [], [12]),
+            _match("Brest", "Metz", True, [], [], league_code="france2"),
+        ]) == 3
+        assert scraper.save_to_db([
+            _match("Lyon", "Nice", True, [12, 80], []),
+            _match("Lyon", "Lens", False, [5], [], date="8 Aug"),
+        ]) == 1
+
+        conn = sqlite3.connect(scraper.DB_PATH)
+        rows = conn.execute('''
+            SELECT team, opponent, goals_for, match_id FROM soccerstats_scraped_matches ORDER BY id
+        ''').fetchall()
+        assert rows == [
+            ("Lyon", "Nice", 2, "1 Aug_Lyon_vs_Nice"),
+            ("Nice", "Lyon", 0, "1 Aug_Lyon_vs_Nice"),
+            ("Brest", "Metz", 0, "1 Aug_Brest_vs_Metz"),
+            ("Lyon", "Lens", 1, "8 Aug_Lens_vs_Lyon"),
+        ]
+        events = conn.execute('''
+            SELECT minute FROM goal_events WHERE match_row_id = 1 ORDER BY minute
+        ''').fetchall()
+        assert events == [(12,), (80,)]
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.close()
+
+    def test_ensure_row_key_removes_duplicates(self, tmp_path):
+        """Les doublons existants sont supprimés (la ligne la plus récente est gardée)"""
+        conn = sqlite3.connect(str(tmp_path / "predictions.db"))
+        conn.executescript(init_soccerstats_db.schema)
+        conn.executemany('''
+            INSERT INTO soccerstats_scraped_matches (team, opponent, date, is_home, score)
+            VALUES ('Lyon', 'Nice', '1 Aug', 1, ?)
+        ''', [("0:0",), ("1:0",)])
+        assert bulk_upsert.ensure_row_key(conn) == 1
+        assert bulk_upsert.ensure_row_key(conn) == 0
+        assert conn.execute("SELECT score FROM soccerstats_scraped_matches").fetchall() == [("1:0",)]
+        conn.close()
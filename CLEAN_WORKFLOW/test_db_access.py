@@ -0,0 +1,84 @@
+"""
+Tests de l'accès lecture partagé (pool, lecture seule, WAL, chemin configurable).
+
+Usage :
+    python3 -m pytest CLEAN_WORKFLOW/test_db_access.py -q
+"""
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "football-live-prediction", "predictors"))
+import db_access
+import init_soccerstats_db
+import scoring_utils
+from live_goal_probability_predictor import LiveGoalProbabilityPredictor
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "predictions.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(init_soccerstats_db.schema)
+    conn.executemany('''
+        INSERT INTO soccerstats_scraped_matches
+        (country, league, team, opponent, date, is_home, score, goals_for, goals_against,
+         goal_times, goal_times_conceded)
+        VALUES ('France', 'france', ?, ?, ?, ?, '1-0', 1, 0, ?, ?)
+    ''', [
+        ("Lyon", "Nice", "1 Aug", 1, json.dumps([40]), json.dumps([])),
+        ("Lyon", "Lens", "8 Aug", 1, json.dumps([10]), json.dumps([])),
+    ])
+    conn.commit()
+    conn.close()
+    previous = db_access.get_db_path()
+    db_access.set_db_path(path)
+    yield path
+    db_access.set_db_path(previous)
+    db_access.close_all()
+
+
+class TestDbAccess:
+    """Tests pour db_access"""
+
+    def test_lookups_reuse_one_connection(self, db_path):
+        """Des recherches successives réutilisent la même connexion, la base passe en WAL"""
+        for _ in range(5):
+            assert scoring_utils.get_pattern_score("france", "Lyon", "HOME", (31, 45)) == 0.5
+        pool = db_access.get_pool()
+        assert pool.stats["opened"] == 1
+        assert pool.stats["reused"] >= 4
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.close()
+
+    def test_read_only(self, db_path):
+        """Aucune écriture possible via le pool ; double close() sans effet"""
+        conn = db_access.connect()
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM soccerstats_scraped_matches")
+        conn.close()
+        conn.close()
+        assert db_access.get_pool().idle.qsize() == 1
+
+    def test_predictor_shares_pool_across_threads(self, db_path):
+        """Le prédicteur lit la base configurée, depuis plusieurs threads"""
+        predictor = LiveGoalProbabilityPredictor()
+        assert predictor.db_path == db_path
+        results = []
+
+        def lookup():
+            results.append(predictor._get_team_recurrence("Lyon", "france", "31-45", True))
+
+        threads = [threading.Thread(target=lookup) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == [50.0] * 4
+        assert db_access.get_pool().stats["opened"] <= 4
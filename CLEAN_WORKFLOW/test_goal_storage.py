@@ -0,0 +1,111 @@
+"""
+Tests du stockage colonnaire des minutes de but (BLOB packé + goal_events).
+
+Usage :
+    python3 -m pytest CLEAN_WORKFLOW/test_goal_storage.py -q
+"""
+import json
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+import goal_storage
+import init_soccerstats_db
+from scrape_all_leagues_auto import BulgariaAutoScraper
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "predictions.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(init_soccerstats_db.schema)
+    conn.execute('''
+        INSERT INTO soccerstats_scraped_matches
+        (league, team, opponent, date, is_home, goal_times, goal_times_conceded)
+        VALUES ('france', 'Lyon', 'Nice', '1 Aug', 1, ?, ?)
+    ''', (json.dumps([12, 90, 0, 0, 0, 0, 0, 0, 0, 0]), json.dumps([45] + [0] * 9)))
+    conn.commit()
+    conn.close()
+    return path
+
+
+class TestGoalStorage:
+    """Tests pour goal_storage"""
+
+    def test_pack_decode_roundtrip(self):
+        """BLOB et JSON historique donnent les mêmes minutes"""
+        packed = goal_storage.pack_minutes([12, 0, 90, 0])
+        assert packed == bytes([12, 90])
+        assert goal_storage.decode_minutes(packed) == [12, 90]
+        assert goal_storage.decode_minutes("[12, 90, 0, 0]") == [12, 90]
+        assert goal_storage.decode_minutes("12,90") == [12, 90]
+        assert goal_storage.decode_minutes(b"") == []
+        assert goal_storage.decode_minutes(None) == []
+
+    def test_migrate_is_idempotent(self, db_path):
+        """La migration remplit BLOBs et goal_events une seule fois"""
+        conn = sqlite3.connect(db_path)
+        assert goal_storage.migrate(conn) == 1
+        assert goal_storage.migrate(conn) == 0
+        row = conn.execute(f"SELECT {goal_storage.select_goal_columns(conn)} FROM soccerstats_scraped_matches").fetchone()
+        assert isinstance(row[0], bytes)
+        assert goal_storage.decode_minutes(row[0]) == [12, 90]
+        assert goal_storage.decode_minutes(row[1]) == [45]
+        events = conn.execute("SELECT minute, scored_by_team FROM goal_events ORDER BY minute").fetchall()
+        assert events == [(12, 1), (45, 0), (90, 1)]
+        conn.close()
+
+    def test_scraper_dual_write(self, db_path, monkeypatch):
+        """save_to_db écrit JSON, BLOBs et goal_events (avec temps additionnel)"""
+        monkeypatch.setattr(BulgariaAutoScraper, "DB_PATH", db_path)
+        scraper = BulgariaAutoScraper(use_cache=False)
+        tooltip = ("<span><div>"
+                   "<font><br/><b>1-0</b> <font color='#000000'>A (12)</font></font>"
+                   "<font><br/><b>1-1</b> <font color='#000000'>B (45+2)</font></font>"
+                   "<font><br/><b>2-1</b> <font color='#000000'>C (90+4)</font> pen.</font>"
+                   "</div></span>")
+        events = scraper._extract_goal_events_from_tooltip(tooltip, team_is_home=False)
+        assert events == [(12, 0, 0), (45, 2, 1), (90, 4, 0)]
+        assert scraper._extract_goals_from_tooltip(tooltip, team_is_home=False) == ([45], [12, 90])
+
+        scraper.save_to_db([{
+            'country': 'France', 'league': 'Ligue 1', 'league_code': 'france',
+            'team': 'Nice', 'opponent': 'Lyon', 'date': '1 Aug', 'is_home': False,
+            'score': '2:1', 'ht_score': '1:1',
+            'goals_scored': [45], 'goals_conceded': [12, 90], 'goal_events': events,
+        }])
+        conn = sqlite3.connect(db_path)
+        row_id, goal_times, goal_minutes, conceded_minutes = conn.execute('''
+            SELECT id, goal_times, goal_minutes, conceded_minutes FROM soccerstats_scraped_matches
+            WHERE team = 'Nice'
+        ''').fetchone()
+        assert json.loads(goal_times)[:1] == [45]
+        assert bytes(goal_minutes) == bytes([45]) and bytes(conceded_minutes) == bytes([12, 90])
+        stored = conn.execute('''
+            SELECT minute, stoppage, scored_by_team FROM goal_events
+            WHERE match_row_id = ? ORDER BY minute
+        ''', (row_id,)).fetchall()
+        assert stored == [(12, 0, 0), (45, 2, 1), (90, 4, 0)]
+        conn.close()
+
+    def test_json_only_writers_invalidate_packed_minutes(self, db_path):
+        """Écriture JSON seule : BLOB remis à NULL (lecture du JSON) ; suppression : goal_events nettoyés"""
+        conn = sqlite3.connect(db_path)
+        goal_storage.migrate(conn)
+        conn.execute("UPDATE soccerstats_scraped_matches SET goal_times = ? WHERE team = 'Lyon'",
+                     (json.dumps([30] + [0] * 9),))
+        conn.commit()
+        row = conn.execute(f"SELECT {goal_storage.select_goal_columns(conn)} FROM soccerstats_scraped_matches").fetchone()
+        assert goal_storage.decode_minutes(row[0]) == [30]
+        assert goal_storage.decode_minutes(row[1]) == [45]
+        assert conn.execute("SELECT COUNT(*) FROM goal_events").fetchone()[0] == 0
+        assert goal_storage.migrate(conn) == 1
+        assert conn.execute("SELECT minute FROM goal_events ORDER BY minute").fetchall() == [(30,), (45,)]
+
+        conn.execute("DELETE FROM soccerstats_scraped_matches WHERE team = 'Lyon'")
+        conn.commit()
+        assert conn.execute("SELECT COUNT(*) FROM goal_events").fetchone()[0] == 0
+        conn.close()
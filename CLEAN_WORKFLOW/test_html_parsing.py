@@ -0,0 +1,80 @@
+"""
+Tests de la couche de parsing HTML (backend lxml, SoupStrainer, chemin rapide du tooltip).
+
+Usage :
+    python3 -m pytest CLEAN_WORKFLOW/test_html_parsing.py -q
+"""
+import os
+import sys
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(__file__))
+import html_parsing
+from soccerstats_live_scraper import SoccerStatsLiveScraper
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_MATCH = os.path.join(ROOT, 'football-live-prediction', 'live_match_sample.html')
+SAMPLE_TEAMS = os.path.join(ROOT, 'football-live-prediction', 'bulgaria_teams.html')
+
+TOOLTIP = ("<span><div>"
+           "<font><br/><b>1-0</b> <font color='#000000'>Petrov (12)</font></font>"
+           "<font><br/><b>1-1</b> <font color='#000000'>Ivanov (45+2)</font></font>"
+           "<font><br/><b>2-1</b> <font color='#000000'>Georgiev (90+4)</font> pen.</font>"
+           "</div></span>")
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+class TestTooltipFastPath:
+    """Tests pour html_parsing.tooltip_score_blocks"""
+
+    def test_same_blocks_as_soup(self):
+        """Scores et texte de bloc identiques au parcours BeautifulSoup"""
+        expected = []
+        for score_tag in BeautifulSoup(TOOLTIP, 'html.parser').find_all('b'):
+            home, away = score_tag.get_text(strip=True).split('-')
+            expected.append((int(home), int(away), score_tag.parent.get_text()))
+        blocks = html_parsing.tooltip_score_blocks(TOOLTIP)
+        assert [(h, a) for h, a, _ in blocks] == [(h, a) for h, a, _ in expected]
+        for (_, _, fast), (_, _, slow) in zip(blocks, expected):
+            assert fast.split() == slow.split()
+        assert '(90+4)' in blocks[2][2]
+
+    def test_unknown_structure_falls_back(self):
+        """Un <b> hors structure connue : None (repli BeautifulSoup chez l'appelant)"""
+        assert html_parsing.tooltip_score_blocks(TOOLTIP.replace('<div>', '<div><b>Buts</b>')) is None
+        assert html_parsing.tooltip_score_blocks("<span>Aucun but</span>") == []
+
+
+class TestStrainers:
+    """Tests pour les SoupStrainer des pages enregistrées"""
+
+    def test_match_page_same_data_as_full_parse(self):
+        """pmatch.asp restreint : mêmes équipes, score, minute et stats qu'un parse complet"""
+        html = _read(SAMPLE_MATCH)
+        scraper = SoccerStatsLiveScraper()
+        full = BeautifulSoup(html, 'html.parser')
+        strained = html_parsing.parse(html, html_parsing.MATCH_PAGE,
+                                      check=lambda s: scraper.extract_teams(s) != (None, None))
+        assert len(str(strained)) < len(str(full))
+        for extract in (scraper.extract_teams, scraper.extract_score, scraper.extract_minute,
+                        scraper.extract_stats):
+            assert extract(strained) == extract(full)
+
+    def test_failed_check_reparses_full_page(self):
+        """check en échec : la page complète est renvoyée"""
+        html = _read(SAMPLE_MATCH)
+        soup = html_parsing.parse(html, html_parsing.TEAM_LINKS, check=lambda s: s.find('h3') is not None)
+        assert soup.find('h3') is not None
+
+    def test_team_links(self):
+        """formtable.asp : seuls les liens teamstats.asp sont construits"""
+        html = _read(SAMPLE_TEAMS)
+        expected = [a['href'] for a in BeautifulSoup(html, 'html.parser').find_all('a', href=True)
+                    if 'teamstats.asp' in a['href']]
+        links = html_parsing.make_soup(html, html_parsing.TEAM_LINKS).find_all('a')
+        assert expected and [a['href'] for a in links] == expected
@@ -0,0 +1,144 @@
+"""
+Tests du cache HTTP disque (TTL, revalidation 304, empreinte du contenu).
+
+Usage :
+    python3 -m pytest CLEAN_WORKFLOW/test_http_cache.py -q
+"""
+import os
+import sqlite3
+import sys
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.dirname(__file__))
+import bulk_upsert
+import init_soccerstats_db
+from http_cache import HttpCache, cache_path_for
+from scrape_all_leagues_auto import BulgariaAutoScraper
+
+TEAM_PAGE = b"""
+<table bgcolor='#cccccc' width='100%'>
+<tr><td>header</td></tr>
+<tr><td>1 Aug</td><td><b>Lyon</b></td>
+<td><a class='tooltip4'><font>2 - 0</font><span><div>
+<font><br/><b>1-0</b> <font color='#000000'>A (12)</font></font>
+<font><br/><b>2-0</b> <font color='#000000'>B (80)</font></font>
+</div></span></a></td>
+<td>Nice</td><td></td><td></td><td></td><td>1-0</td><td></td></tr>
+</table>
+"""
+
+
+class FakeSession:
+    """Session minimale : sert des corps fixes, répond 304 si l'ETag correspond"""
+
+    def __init__(self, pages, etag=None):
+        self.pages = pages
+        self.etag = etag
+        self.calls = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.calls.append((url, dict(headers or {})))
+        response = requests.Response()
+        response.url = url
+        if self.etag and (headers or {}).get("If-None-Match") == self.etag:
+            response.status_code = 304
+            response._content = b""
+            return response
+        response.status_code = 200
+        response._content = self.pages[url]
+        response.encoding = "utf-8"
+        if self.etag:
+            response.headers["ETag"] = self.etag
+        return response
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = HttpCache(str(tmp_path / "http_cache.db"), ttl={"teamstats.asp": 0, "formtable.asp": 3600})
+    yield cache
+    cache.close()
+
+
+class TestHttpCache:
+    """Tests pour HttpCache"""
+
+    def test_ttl_hit_without_network(self, cache):
+        """Dans le TTL la page est servie depuis le disque, sans requête"""
+        url = "https://x/formtable.asp?league=france"
+        session = FakeSession({url: b"<html>table</html>"})
+        first = cache.get(session, url)
+        second = cache.get(session, url)
+        assert first.changed and not first.from_cache
+        assert second.from_cache and not second.changed
+        assert second.text == "<html>table</html>"
+        assert len(session.calls) == 1
+        assert cache.stats == {"hits": 1, "revalidated": 0, "unchanged": 0, "misses": 1}
+
+    def test_revalidation_and_content_hash(self, cache):
+        """304 via If-None-Match ; un corps identique re-téléchargé est signalé inchangé"""
+        url = "https://x/teamstats.asp?league=france&stats=u1-lyon"
+        session = FakeSession({url: b"v1"}, etag='"abc"')
+        cache.get(session, url)
+        revalidated = cache.get(session, url)
+        assert session.calls[-1][1]["If-None-Match"] == '"abc"'
+        assert revalidated.from_cache and not revalidated.changed
+
+        session.etag = None  # serveur sans ETag : seule l'empreinte décide
+        assert not cache.get(session, url).changed
+        session.pages[url] = b"v2"
+        assert cache.get(session, url).changed
+        assert cache.stats == {"hits": 0, "revalidated": 1, "unchanged": 1, "misses": 2}
+
+    def test_scraper_skips_unchanged_team(self, tmp_path, monkeypatch):
+        """Une page équipe inchangée n'est ni re-parsée ni ré-écrite"""
+        url = "https://www.soccerstats.com/teamstats.asp?league=france&stats=u1-lyon"
+        scraper = BulgariaAutoScraper(use_cache=False)
+        scraper.http_cache = HttpCache(str(tmp_path / "http_cache.db"), ttl={"teamstats.asp": 0})
+        scraper.session = FakeSession({url: TEAM_PAGE})
+        monkeypatch.setattr("time.sleep", lambda s: None)
+
+        matches = scraper.scrape_team("france", "u1-lyon", "Lyon")
+        assert [m['goals_scored'] for m in matches] == [[12, 80]]
+        assert scraper.scrape_team("france", "u1-lyon", "Lyon") == []
+        assert scraper.unchanged_teams == {("france", "Lyon")}
+        scraper.http_cache.close()
+
+    def test_unchanged_only_after_commit_in_same_db(self, tmp_path, monkeypatch):
+        """Une page n'est inchangée qu'une fois committée dans la base que le cache alimente"""
+        url = "https://www.soccerstats.com/teamstats.asp?league=france&stats=u1-lyon"
+        db_paths = [str(tmp_path / "a" / "predictions.db"), str(tmp_path / "b" / "predictions.db")]
+        for db_path in db_paths:
+            os.makedirs(os.path.dirname(db_path))
+            conn = sqlite3.connect(db_path)
+            conn.executescript(init_soccerstats_db.schema)
+            conn.close()
+        assert cache_path_for(db_paths[0]) != cache_path_for(db_paths[1])
+        monkeypatch.setattr("time.sleep", lambda s: None)
+
+        scraper = BulgariaAutoScraper(db_path=db_paths[0])
+        scraper.session = FakeSession({url: TEAM_PAGE})
+        assert scraper.scrape_team("france", "u1-lyon", "Lyon")
+        # Téléchargée mais pas encore écrite : toujours à traiter
+        matches = scraper.scrape_team("france", "u1-lyon", "Lyon")
+        assert matches
+
+        def fail(*args, **kwargs):
+            raise sqlite3.OperationalError("database is locked")
+        with monkeypatch.context() as m:
+            m.setattr(bulk_upsert, "upsert_rows", fail)
+            scraper.save_to_db(matches)
+        matches = scraper.scrape_team("france", "u1-lyon", "Lyon")
+        assert matches and scraper.unchanged_teams == set()
+
+        scraper.save_to_db(matches)
+        assert scraper.scrape_team("france", "u1-lyon", "Lyon") == []
+        assert scraper.unchanged_teams == {("france", "Lyon")}
+        scraper.http_cache.close()
+
+        # Autre base : son cache n'a rien confirmé
+        other = BulgariaAutoScraper(db_path=db_paths[1])
+        other.session = FakeSession({url: TEAM_PAGE})
+        assert other.scrape_team("france", "u1-lyon", "Lyon")
+        other.http_cache.close()
@@ -0,0 +1,110 @@
+"""
+Tests de LiveGoalProbabilityPredictor.predict_batch (mêmes résultats que predict_goal_probability, un aller-retour base).
+
+Usage :
+    python3 -m pytest CLEAN_WORKFLOW/test_predict_batch.py -q
+"""
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'football-live-prediction', 'predictors'))
+import db_access
+import init_soccerstats_db
+import recurrence_index
+from live_goal_probability_predictor import LiveGoalProbabilityPredictor
+from test_recurrence_index import _insert
+
+STATES = [
+    dict(home_team="Lyon", away_team="Nice", current_minute=80, home_possession=65, away_possession=35,
+         home_attacks=50, away_attacks=30, home_dangerous_attacks=20, away_dangerous_attacks=10,
+         home_shots_on_target=3, away_shots_on_target=2, score_home=1, score_away=0,
+         last_5_min_events={'buts': 1, 'tirs': 3}, league="france"),
+    dict(home_team="Lyon", away_team="Nice", current_minute=38, home_possession=None, away_possession=None,
+         home_attacks=None, away_attacks=0, home_dangerous_attacks=None, away_dangerous_attacks=4,
+         home_shots_on_target=None, away_shots_on_target=1, home_red_cards=1, score_home=2, score_away=2,
+         league="france"),
+    dict(home_team="Nice", away_team="Lyon", current_minute=88, home_possession=50, away_possession=50,
+         home_attacks=40, away_attacks=40, home_dangerous_attacks=30, away_dangerous_attacks=5,
+         home_shots_on_target=0, away_shots_on_target=1, home_red_cards=1, away_red_cards=1,
+         score_home=0, score_away=3, last_5_min_events={}, league="france"),
+    dict(home_team="Metz", away_team="Brest", current_minute=77, home_possession=38, away_possession=62,
+         home_attacks=10, away_attacks=12, home_dangerous_attacks=2, away_dangerous_attacks=9,
+         home_shots_on_target=1, away_shots_on_target=1, league="france"),
+    dict(home_team="Lyon", away_team="Nice", current_minute=12, home_possession=55, away_possession=45,
+         home_attacks=5, away_attacks=5, home_dangerous_attacks=1, away_dangerous_attacks=1,
+         home_shots_on_target=0, away_shots_on_target=0, league="france"),
+    dict(home_team="Lyon", away_team="Nice", current_minute=45, home_possession=55, away_possession=45,
+         home_attacks=5, away_attacks=5, home_dangerous_attacks=1, away_dangerous_attacks=1,
+         home_shots_on_target=4, away_shots_on_target=0),
+]
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "predictions.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(init_soccerstats_db.schema)
+    _insert(conn, "france", "Lyon", True, [33, 80], [], opponent="A")
+    _insert(conn, "france", "Lyon", True, [12], [90], opponent="B")
+    _insert(conn, "france", "Lyon", True, [], [], opponent="C")
+    _insert(conn, "france", "Lyon", False, [44], [45], opponent="E")
+    _insert(conn, "france", "Nice", False, [76], [], opponent="F")
+    _insert(conn, "france", "Nice", True, [40], [], opponent="G")
+    _insert(conn, "france", "Brest", False, [], [], opponent="H")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(db_access, "_db_path", path)
+    yield path
+    db_access.close_all()
+
+
+def _without_timestamp(result):
+    details = {k: v for k, v in result['details'].items() if k != 'timestamp'}
+    return {**result, 'details': details}
+
+
+def _count_connections(monkeypatch):
+    calls = []
+    connect = db_access.connect
+
+    def counting_connect(*args, **kwargs):
+        calls.append(args)
+        return connect(*args, **kwargs)
+
+    monkeypatch.setattr(db_access, "connect", counting_connect)
+    return calls
+
+
+class TestPredictBatch:
+    """Tests pour LiveGoalProbabilityPredictor.predict_batch"""
+
+    @pytest.mark.parametrize("indexed", [False, True])
+    def test_same_results_as_single_predictions(self, db_path, indexed):
+        """Mêmes dicts que predict_goal_probability (index présent ou scan historique)"""
+        if indexed:
+            conn = sqlite3.connect(db_path)
+            recurrence_index.rebuild(conn)
+            conn.close()
+        expected = [LiveGoalProbabilityPredictor().predict_goal_probability(**state) for state in STATES]
+        results = LiveGoalProbabilityPredictor().predict_batch(STATES)
+        assert [_without_timestamp(r) for r in results] == [_without_timestamp(r) for r in expected]
+        assert all(type(v) is float for r in results for k, v in r['details'].items() if k.endswith('_factor'))
+
+    @pytest.mark.parametrize("indexed", [False, True])
+    def test_single_round_trip(self, db_path, indexed, monkeypatch):
+        """Un scan complet = une connexion, puis plus aucune une fois le cache rempli"""
+        if indexed:
+            conn = sqlite3.connect(db_path)
+            recurrence_index.rebuild(conn)
+            conn.close()
+        calls = _count_connections(monkeypatch)
+        predictor = LiveGoalProbabilityPredictor()
+        predictor.predict_batch(STATES * 7)
+        assert len(calls) == 1
+        predictor.predict_batch(STATES)
+        assert len(calls) == 1
+        assert predictor.predict_batch([]) == []
@@ -0,0 +1,88 @@
+"""
+Tests du moteur de récurrence vectorisé (cohérence avec les calculs Python historiques).
+
+Usage :
+    python3 -m pytest CLEAN_WORKFLOW/test_recurrence_engine.py -q
+"""
+import json
+import os
+import sqlite3
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+import init_soccerstats_db
+from recurrence_engine import RecurrenceEngine
+
+MATCHES = [
+    # league, team, is_home, date, buts marqués, buts encaissés
+    ("france", "Lyon", 1, "1 Aug", [33, 80], []),
+    ("france", "Lyon", 1, "8 Aug", [12], [90]),
+    ("france", "Lyon", 1, "15 Aug", [], []),
+    ("france", "Lyon", 1, "22 Aug", [50, 77], [31]),
+    ("france", "Lyon", 0, "5 Aug", [44], [45]),
+    ("england", "Lyon", 1, "3 Aug", [40], []),
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "predictions.db"))
+    conn.executescript(init_soccerstats_db.schema)
+    padded = lambda l: json.dumps((l + [0] * 10)[:10])
+    for league, team, is_home, date, goals, conceded in MATCHES:
+        conn.execute('''
+            INSERT INTO soccerstats_scraped_matches
+            (league, team, opponent, date, is_home, goal_times, goal_times_conceded)
+            VALUES (?, ?, 'X', ?, ?, ?, ?)
+        ''', (league, team, date, is_home, padded(goals), padded(conceded)))
+    conn.commit()
+    engine = RecurrenceEngine.load(conn)
+    conn.close()
+    return engine
+
+
+def _row(df, league, team, is_home, interval=None):
+    mask = (df['league'] == league) & (df['team'] == team) & (df['is_home'] == is_home)
+    if interval is not None:
+        mask &= df['interval'] == interval
+    return df[mask].iloc[0]
+
+
+class TestRecurrenceEngine:
+    """Tests pour RecurrenceEngine"""
+
+    def test_interval_stats(self, engine):
+        """Compteurs par intervalle, groupés par ligue (pas de mélange des homonymes)"""
+        stats = engine.interval_stats({"31-45": (31, 45), "75-90": (75, 90)})
+        lyon = _row(stats, "france", "Lyon", 1, "31-45")
+        assert lyon['matches'] == 4
+        assert lyon['matches_with_goal'] == 2
+        assert lyon['goals_for'] == 1 and lyon['goals_against'] == 1
+        assert lyon['recurrence'] == pytest.approx(50.0)
+        late = _row(stats, "france", "Lyon", 1, "75-90")
+        assert late['matches_with_goal'] == 3 and late['goals_for'] == 2 and late['goals_against'] == 1
+        assert _row(stats, "england", "Lyon", 1, "31-45")['matches'] == 1
+
+    def test_last_n(self, engine):
+        """last_n ne garde que les matchs les plus récents de chaque groupe"""
+        stats = engine.interval_stats({"31-45": (31, 45)}, last_n=2)
+        lyon = _row(stats, "france", "Lyon", 1)
+        # 22 Aug (but 31) et 15 Aug (aucun but)
+        assert lyon['matches'] == 2
+        assert lyon['matches_with_goal'] == 1
+
+    def test_minute_and_count_stats(self, engine):
+        """Moyenne / IQR des minutes et moyenne de buts par mi-temps == calcul NumPy direct"""
+        minutes = [33, 12]
+        ms = _row(engine.minute_stats(1, 45), "france", "Lyon", 1)
+        assert ms['avg_minute'] == pytest.approx(np.mean(minutes))
+        assert ms['std_minute'] == pytest.approx(np.std(minutes, ddof=1))
+        assert ms['q1'] == pytest.approx(np.percentile(minutes, 25))
+        assert ms['q3'] == pytest.approx(np.percentile(minutes, 75))
+        counts = _row(engine.count_stats(1, 45), "france", "Lyon", 1)
+        per_match = [1, 1, 0, 1]
+        assert counts['total_mean'] == pytest.approx(np.mean(per_match))
+        assert counts['total_std'] == pytest.approx(np.std(per_match, ddof=1))
@@ -0,0 +1,98 @@
+"""
+Tests de l'index matérialisé recurrence_index (cohérence avec le scan historique).
+
+Usage :
+    python3 -m pytest CLEAN_WORKFLOW/test_recurrence_index.py -q
+"""
+import json
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+import db_access
+import init_soccerstats_db
+import recurrence_index
+import scoring_utils
+
+
+def _insert(conn, league, team, is_home, goals, conceded, date="1 Aug", opponent="X"):
+    padded = lambda l: json.dumps((l + [0] * 10)[:10])
+    conn.execute('''
+        INSERT INTO soccerstats_scraped_matches
+        (league, team, opponent, date, is_home, goal_times, goal_times_conceded)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (league, team, opponent, date, 1 if is_home else 0, padded(goals), padded(conceded)))
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "predictions.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(init_soccerstats_db.schema)
+    _insert(conn, "france", "Lyon", True, [33, 80], [], opponent="A")
+    _insert(conn, "france", "Lyon", True, [12], [90], opponent="B")
+    _insert(conn, "france", "Lyon", True, [], [], opponent="C")
+    _insert(conn, "france", "Lyon", True, [50], [], opponent="D")
+    _insert(conn, "france", "Lyon", False, [44], [45], opponent="E")
+    _insert(conn, "france", "Nice", False, [76], [], opponent="F")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(db_access, "_db_path", path)
+    yield path
+    db_access.close_all()
+
+
+class TestRecurrenceIndex:
+    """Tests pour recurrence_index"""
+
+    def test_rebuild_counts(self, db_path):
+        """Les compteurs agrégés correspondent aux matchs insérés"""
+        conn = sqlite3.connect(db_path)
+        recurrence_index.rebuild(conn)
+        data = recurrence_index.lookup(conn, "france", "Lyon", True, "76-90")
+        assert data['matches'] == 4
+        assert data['matches_with_goal'] == 2
+        assert data['goals_for'] == 1 and data['goals_against'] == 1
+        assert data['avg_minute'] == pytest.approx(85.0)
+        away = recurrence_index.lookup(conn, "france", "Lyon", False, "31-45")
+        assert away['matches'] == 1 and away['goals_for'] == 1 and away['goals_against'] == 1
+        assert recurrence_index.lookup(conn, "france", "Nice", True, "76-90") is None
+        conn.close()
+
+    def test_pattern_score_matches_scan(self, db_path):
+        """get_pattern_score via l'index == calcul historique par scan"""
+        conn = sqlite3.connect(db_path)
+        recurrence_index.rebuild(conn)
+        conn.close()
+        for team in ["Lyon", "Nice", "lyon"]:
+            for side in ["HOME", "AWAY"]:
+                for interval in [(31, 45), (75, 120)]:
+                    expected = scoring_utils._get_pattern_score_scan("france", team, side, interval)
+                    assert scoring_utils.get_pattern_score("france", team, side, interval) == pytest.approx(expected)
+
+    def test_pattern_score_team_missing_from_index(self, db_path):
+        """Équipe écrite après le rebuild : repli sur le scan plutôt que 0"""
+        conn = sqlite3.connect(db_path)
+        recurrence_index.rebuild(conn)
+        _insert(conn, "france", "Brest", True, [40], [], opponent="I")
+        conn.commit()
+        conn.close()
+        assert scoring_utils.get_pattern_score("france", "Brest", "HOME", (31, 45)) == pytest.approx(
+            scoring_utils._get_pattern_score_scan("france", "Brest", "HOME", (31, 45)))
+        assert scoring_utils.get_pattern_score("france", "Brest", "HOME", (31, 45)) > 0
+
+    def test_refresh_teams_is_incremental(self, db_path):
+        """refresh_teams ne recalcule que les équipes demandées"""
+        conn = sqlite3.connect(db_path)
+        recurrence_index.rebuild(conn)
+        _insert(conn, "france", "Nice", False, [], [88], opponent="G")
+        _insert(conn, "france", "Lyon", True, [88], [], opponent="H")
+        conn.commit()
+        recurrence_index.refresh_teams(conn, [("france", "Nice")])
+        assert recurrence_index.lookup(conn, "france", "Nice", False, "76-90")['matches'] == 2
+        # Lyon n'a pas été rafraîchi : l'index reflète l'état précédent
+        assert recurrence_index.lookup(conn, "france", "Lyon", True, "76-90")['matches'] == 4
+        conn.close()
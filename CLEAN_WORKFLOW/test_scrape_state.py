@@ -0,0 +1,139 @@
+"""
+Tests du scraping incrémental (repères par équipe, ligues terminées).
+
+Usage :
+    python3 -m pytest CLEAN_WORKFLOW/test_scrape_state.py -q
+"""
+import os
+import sqlite3
+import sys
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.dirname(__file__))
+import bulk_upsert
+import init_soccerstats_db
+import scrape_state
+from scrape_all_leagues_auto import BulgariaAutoScraper
+
+BASE = "https://www.soccerstats.com"
+FORMTABLE = "<a href='teamstats.asp?league=france&stats=u1-lyon'>Lyon</a>".encode()
+
+
+def _team_page(rows):
+    """rows : (date, adversaire, lyon_a_domicile, minute du but de Lyon)"""
+    html = "<table bgcolor='#cccccc' width='100%'><tr><td>header</td></tr>"
+    for date, opponent, home, minute in rows:
+        lyon = "<b>Lyon</b>"
+        home_cell, away_cell = (lyon, opponent) if home else (opponent, lyon)
+        html += (f"<tr><td>{date}</td><td>{home_cell}</td>"
+                 f"<td><a class='tooltip4'><font>1 - 0</font><span><div>"
+                 f"<font><br/><b>1-0</b> <font color='#000000'>X ({minute})</font></font>"
+                 f"</div></span></a></td><td>{away_cell}</td>"
+                 f"<td></td><td></td><td></td><td>0-0</td><td></td></tr>")
+    return (html + "</table>").encode()
+
+
+class FakeSession:
+    def __init__(self, pages):
+        self.pages = pages
+        self.urls = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.urls.append(url)
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = self.pages[url]
+        return response
+
+
+@pytest.fixture
+def scraper(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "predictions.db")
+    conn = sqlite3.connect(db_path)
+    conn.executescript(init_soccerstats_db.schema)
+    conn.close()
+    monkeypatch.setattr(BulgariaAutoScraper, "DB_PATH", db_path)
+    monkeypatch.setattr("time.sleep", lambda s: None)
+    scraper = BulgariaAutoScraper(use_cache=False)
+    return scraper
+
+
+class TestScrapeState:
+    """Tests pour scrape_state et le mode incrémental"""
+
+    def test_rows_after(self):
+        """Reprise après le repère ; repère absent => re-scrape complet"""
+        keys = [("1 Aug", "Nice"), ("8 Aug", "Lens"), None, ("15 Aug", "Brest")]
+        assert scrape_state.rows_after(keys, ("8 Aug", "Lens")) == 2
+        assert scrape_state.rows_after(keys, ("15 Aug", "Brest")) == 4
+        assert scrape_state.rows_after(keys, ("3 May", "Metz")) == 0
+        assert scrape_state.rows_after(keys, None) == 0
+
+    def test_finished_leagues(self, tmp_path):
+        """Ligues season_finished=1 ; base absente => aucune"""
+        path = str(tmp_path / "leagues_dates.db")
+        assert scrape_state.finished_leagues(path) == set()
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE leagues_dates (league TEXT PRIMARY KEY, season_finished INTEGER)")
+        conn.executemany("INSERT INTO leagues_dates VALUES (?, ?)", [("france", 0), ("iceland", 1)])
+        conn.commit()
+        conn.close()
+        assert scrape_state.finished_leagues(path) == {"iceland"}
+
+    def test_incremental_run(self, scraper):
+        """Second passage : seule la nouvelle ligne est parsée et insérée, rien n'est supprimé"""
+        team_url = f"{BASE}/teamstats.asp?league=france&stats=u1-lyon"
+        rows = [("1 Aug", "Nice", True, 10), ("8 Aug", "Lens", False, 20)]
+        scraper.session = FakeSession({
+            f"{BASE}/formtable.asp?league=france": FORMTABLE,
+            team_url: _team_page(rows),
+        })
+        scraper.run("france", "Ligue 1", parallel_workers=1, incremental=True)
+
+        conn = sqlite3.connect(scraper.DB_PATH)
+        assert scrape_state.load_watermarks(conn, "france") == {"Lyon": ("8 Aug", "Lens")}
+
+        scraper.session.pages[team_url] = _team_page(rows + [("15 Aug", "Brest", True, 30)])
+        parsed = []
+        original = scraper.scrape_team
+
+        def spy(*args, **kwargs):
+            result = original(*args, **kwargs)
+            parsed.append(result)
+            return result
+
+        scraper.scrape_team = spy
+        scraper.run("france", "Ligue 1", parallel_workers=1, incremental=True)
+
+        assert [[m['opponent'] for m in result] for result in parsed] == [["Brest"]]
+        stored = conn.execute(
+            "SELECT date, opponent FROM soccerstats_scraped_matches WHERE team = 'Lyon' ORDER BY id"
+        ).fetchall()
+        assert stored == [("1 Aug", "Nice"), ("8 Aug", "Lens"), ("15 Aug", "Brest")]
+        assert scrape_state.load_watermarks(conn, "france") == {"Lyon": ("15 Aug", "Brest")}
+        conn.close()
+
+    def test_failed_write_keeps_watermarks(self, scraper, monkeypatch):
+        """Transaction de la ligue en échec : aucun repère enregistré, le passage suivant reprend tout"""
+        team_url = f"{BASE}/teamstats.asp?league=france&stats=u1-lyon"
+        scraper.session = FakeSession({
+            f"{BASE}/formtable.asp?league=france": FORMTABLE,
+            team_url: _team_page([("1 Aug", "Nice", True, 10)]),
+        })
+
+        def fail(*args, **kwargs):
+            raise sqlite3.OperationalError("database is locked")
+        with monkeypatch.context() as m:
+            m.setattr(bulk_upsert, "upsert_rows", fail)
+            scraper.run("france", "Ligue 1", parallel_workers=1, incremental=True)
+        assert list(scraper.failed_leagues) == ["france"]
+
+        conn = sqlite3.connect(scraper.DB_PATH)
+        assert scrape_state.load_watermarks(conn, "france") == {}
+        scraper.run("france", "Ligue 1", parallel_workers=1, incremental=True)
+        assert scraper.failed_leagues == {}
+        assert scrape_state.load_watermarks(conn, "france") == {"Lyon": ("1 Aug", "Nice")}
+        conn.close()
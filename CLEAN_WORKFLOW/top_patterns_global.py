@@ -1,46 +1,49 @@
 import sqlite3
-import json
-from collections import defaultdict
+
+import recurrence_index
+from recurrence_engine import RecurrenceEngine
+
+# Label de la table recurrence_index pour chaque intervalle (bornes strictes)
+INDEX_LABELS = { (31, 45): "31-45", (75, 120): "75-90+" }
+
+
+def load_patterns_from_index(conn, intervals):
+    """Charge les compteurs pré-agrégés depuis recurrence_index (une requête par intervalle)"""
+    patterns = {}
+    cursor = conn.cursor()
+    for interval in intervals:
+        cursor.execute("""
+            SELECT league, team, is_home, goals_for, goals_against, matches, matches_with_goal
+            FROM recurrence_index WHERE interval_name = ?
+        """, (INDEX_LABELS[interval],))
+        for league, team, is_home, marques, encaisses, matchs, matchs_avec_but in cursor.fetchall():
+            side = "HOME" if is_home else "AWAY"
+            patterns[(league, team, side, interval)] = [league, team, side, interval, marques, encaisses, matchs, matchs_avec_but]
+    return patterns
+
+
+def load_patterns_from_engine(engine, intervals):
+    """Calcule les mêmes compteurs en une passe vectorisée (base sans recurrence_index)"""
+    patterns = {}
+    stats = engine.interval_stats({interval: interval for interval in intervals})
+    for row in stats.itertuples(index=False):
+        side = "HOME" if row.is_home else "AWAY"
+        patterns[(row.league, row.team, side, row.interval)] = [
+            row.league, row.team, side, row.interval, row.goals_for, row.goals_against, row.matches, row.matches_with_goal
+        ]
+    return patterns
+
 
 def top_patterns_global(n=20):
     import os
     DB_PATH = os.path.join(os.path.dirname(__file__), "data", "predictions.db")
     INTERVALS = [(31, 45), (75, 120)]
     INTERVAL_LABELS = { (31, 45): "31-45+", (75, 120): "75-90+" }
-    patterns = defaultdict(lambda: ["", "", 0, 0, 0, 0])  # league, team, side, buts_marques, encaisses, matchs, matchs_avec_but
     conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT league, team, is_home, goal_times, goal_times_conceded FROM soccerstats_scraped_matches")
-    for row in cursor.fetchall():
-        league, team, is_home, goal_times, goal_times_conceded = row
-        is_home = bool(is_home)
-        try:
-            goals = json.loads(goal_times) if goal_times else []
-            conceded = json.loads(goal_times_conceded) if goal_times_conceded else []
-        except Exception:
-            goals, conceded = [], []
-        # Toujours travailler avec des listes
-        if isinstance(goals, int):
-            goals = [goals]
-        if isinstance(conceded, int):
-            conceded = [conceded]
-        if not isinstance(goals, list):
-            goals = []
-        if not isinstance(conceded, list):
-            conceded = []
-        for interval in INTERVALS:
-            start, end = interval
-            buts_marques = sum(1 for m in goals if start <= m <= end)
-            buts_encaisses = sum(1 for m in conceded if start <= m <= end)
-            side = "HOME" if is_home else "AWAY"
-            key = (league, team, side, interval)
-            if key not in patterns:
-                patterns[key] = [league, team, side, interval, 0, 0, 0, 0]  # league, team, side, interval, buts_marques, encaisses, matchs, matchs_avec_but
-            patterns[key][4] += buts_marques
-            patterns[key][5] += buts_encaisses
-            patterns[key][6] += 1
-            if (buts_marques + buts_encaisses) > 0:
-                patterns[key][7] += 1
+    if recurrence_index.has_index(conn):
+        patterns = load_patterns_from_index(conn, INTERVALS)
+    else:
+        patterns = load_patterns_from_engine(RecurrenceEngine.load(conn), INTERVALS)
     conn.close()
     for interval in INTERVALS:
         label = INTERVAL_LABELS[interval]
@@ -0,0 +1,158 @@
+"""
+Abonnements aux alertes live : un calcul par match, autant d'abonnés que voulu
+Chaque abonné (chat Telegram) a ses ligues, ses intervalles, sa probabilité minimale et son delta de mise à jour.
+Le moniteur calcule chaque match une seule fois puis SubscriptionRegistry.evaluate() ne teste que les abonnés
+indexés sur (ligue, intervalle) du match : N abonnés = N filtres, pas N moniteurs qui scrapent les mêmes pages.
+
+Règles d'alerte (par abonné, pour un match et un intervalle) :
+    premier passage ≥ min_probability            PREMIER SIGNAL
+    passage au-dessus / en dessous du seuil       SIGNAL ACTIVÉ / SIGNAL DÉSACTIVÉ
+    variation ≥ change_delta en restant au-dessus MAJ SIGNIFICATIVE
+
+Configuration (subscriptions.json) :
+    {"subscribers": [{"name": "vip", "chat_id": "-100123", "leagues": ["france", "germany"],
+                      "intervals": ["76-90"], "min_probability": 70, "change_delta": 3}]}
+    bot_token facultatif (celui de telegram_config.json par défaut) ; leagues / intervals vides = tout.
+Sans subscriptions.json, telegram_config.json donne un abonné unique (toutes ligues, 65%, ±5%).
+Utilisé par auto_live_continuous_monitor.py
+"""
+
+import json
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+ANY = '*'
+
+# Fichiers de configuration résolus depuis le dossier du module, pas depuis le répertoire courant
+SUBSCRIPTIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'subscriptions.json')
+TELEGRAM_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'telegram_config.json')
+
+DEFAULT_MIN_PROBABILITY = 65.0
+DEFAULT_CHANGE_DELTA = 5.0
+
+FIRST_SIGNAL = 'first'
+SIGNAL_UP = 'up'
+SIGNAL_DOWN = 'down'
+SIGNAL_UPDATE = 'update'
+
+
+@dataclass(frozen=True)
+class Subscription:
+    """Un abonné et ses filtres"""
+    name: str
+    chat_id: str
+    bot_token: str
+    leagues: FrozenSet[str] = field(default_factory=frozenset)  # vide = toutes
+    intervals: FrozenSet[str] = field(default_factory=frozenset)  # vide = tous
+    min_probability: float = DEFAULT_MIN_PROBABILITY
+    change_delta: float = DEFAULT_CHANGE_DELTA
+
+
+@dataclass
+class Notification:
+    """Alerte à envoyer à un abonné"""
+    subscription: Subscription
+    reason: str  # FIRST_SIGNAL, SIGNAL_UP, SIGNAL_DOWN, SIGNAL_UPDATE
+    probability: float
+    previous: Optional[float] = None
+
+
+class SubscriptionRegistry:
+    """
+    Abonnés indexés par (ligue, intervalle), avec la dernière probabilité vue par chacun
+
+    Usage :
+        registry = SubscriptionRegistry.from_config(telegram_config)
+        for notification in registry.evaluate(match_period_id, league, period, probability):
+            ...envoi au chat de notification.subscription
+        registry.forget(match_period_ids)   # matchs sortis de l'intervalle
+    """
+
+    def __init__(self, subscriptions: Iterable[Subscription] = ()):
+        self.subscriptions: Dict[str, Subscription] = {}
+        self._index: Dict[Tuple[str, str], List[Subscription]] = defaultdict(list)
+        self._last: Dict[Tuple[str, str], float] = {}  # {(abonné, match_period_id): dernière probabilité}
+        for subscription in subscriptions:
+            self.add(subscription)
+
+    @classmethod
+    def from_config(cls, telegram_config: Optional[Dict], path: str = SUBSCRIPTIONS_PATH) -> 'SubscriptionRegistry':
+        """Abonnés de subscriptions.json (à côté de ce module), sinon l'abonné unique de telegram_config.json"""
+        default_token = (telegram_config or {}).get('bot_token')
+        try:
+            with open(path, 'r') as f:
+                entries = json.load(f).get('subscribers', [])
+        except (OSError, ValueError):
+            entries = None
+        registry = cls()
+        if entries is None:
+            if telegram_config:
+                registry.add(Subscription('default', str(telegram_config['chat_id']), default_token))
+            return registry
+        for i, entry in enumerate(entries):
+            registry.add(Subscription(
+                name=entry.get('name', f"subscriber{i + 1}"),
+                chat_id=str(entry['chat_id']),
+                bot_token=entry.get('bot_token', default_token),
+                leagues=frozenset(entry.get('leagues', ())),
+                intervals=frozenset(entry.get('intervals', ())),
+                min_probability=float(entry.get('min_probability', DEFAULT_MIN_PROBABILITY)),
+                change_delta=float(entry.get('change_delta', DEFAULT_CHANGE_DELTA)),
+            ))
+        return registry
+
+    def add(self, subscription: Subscription):
+        self.remove(subscription.name)
+        self.subscriptions[subscription.name] = subscription
+        for league in subscription.leagues or (ANY,):
+            for interval in subscription.intervals or (ANY,):
+                self._index[(league, interval)].append(subscription)
+
+    def remove(self, name: str):
+        subscription = self.subscriptions.pop(name, None)
+        if subscription is None:
+            return
+        for key in list(self._index):
+            self._index[key] = [s for s in self._index[key] if s.name != name]
+            if not self._index[key]:
+                del self._index[key]
+        self._last = {key: value for key, value in self._last.items() if key[0] != name}
+
+    def candidates(self, league: str, period: str) -> List[Subscription]:
+        """Abonnés concernés par une ligue et un intervalle (4 lectures d'index)"""
+        found = []
+        for key in ((league, period), (league, ANY), (ANY, period), (ANY, ANY)):
+            found.extend(self._index.get(key, ()))
+        return found
+
+    def evaluate(self, match_period_id: str, league: str, period: str, probability: float) -> List[Notification]:
+        """Alertes déclenchées par la nouvelle probabilité d'un match, pour chaque abonné concerné"""
+        notifications = []
+        for subscription in self.candidates(league, period):
+            state_key = (subscription.name, match_period_id)
+            previous = self._last.get(state_key)
+            self._last[state_key] = probability
+            threshold = subscription.min_probability
+            if previous is None:
+                reason = FIRST_SIGNAL if probability >= threshold else None
+            elif previous < threshold <= probability:
+                reason = SIGNAL_UP
+            elif probability < threshold <= previous:
+                reason = SIGNAL_DOWN
+            elif probability >= threshold and abs(probability - previous) >= subscription.change_delta:
+                reason = SIGNAL_UPDATE
+            else:
+                reason = None
+            if reason:
+                notifications.append(Notification(subscription, reason, probability, previous))
+        return notifications
+
+    def forget(self, match_period_ids: Iterable[str]):
+        """Oublie l'état des matchs qui ne sont plus suivis"""
+        match_period_ids = set(match_period_ids)
+        self._last = {key: value for key, value in self._last.items() if key[1] not in match_period_ids}
+
+    def __len__(self) -> int:
+        return len(self.subscriptions)
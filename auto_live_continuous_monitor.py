@@ -18,10 +18,15 @@ import re
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'football-live-prediction'))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'football-live-prediction/predictors'))
 from live_goal_probability_predictor import LiveGoalProbabilityPredictor
+from telegram_queue import get_queue
+from alert_subscriptions import (FIRST_SIGNAL, SIGNAL_DOWN, SIGNAL_UP, TELEGRAM_CONFIG_PATH, SubscriptionRegistry)
 
 # Importer le scraper live
 try:
     from scrape_live_soccerstats import SoccerStatsLiveScraper
+    from live_scan_engine import LiveScanEngine
+    from live_poll_scheduler import PollScheduler
+    from live_cycle_planner import CyclePlanner, load_whitelist_teams
     SCRAPER_AVAILABLE = True
 except ImportError:
     print("⚠️  scrape_live_soccerstats.py non trouvé, scraping basique activé")
@@ -93,109 +98,93 @@ INTERVALS = [
     {'start': 76, 'end': 90, 'period': '76-90'}
 ]
 
-# Fréquence de mise à jour (secondes)
+# Attente maximale entre deux scans (secondes) ; le rythme réel des pages de match
+# est fixé par PollScheduler selon la distance aux intervalles critiques
 UPDATE_INTERVAL = 60
 
 class ContinuousLiveMonitor:
     def __init__(self):
         self.predictor = LiveGoalProbabilityPredictor()
         self.telegram_config = self.load_telegram_config()
+        # Abonnés (chat, ligues, intervalles, seuil, delta) évalués sur chaque calcul de match
+        self.subscriptions = SubscriptionRegistry.from_config(self.telegram_config)
         self.tracked_matches = {}  # {match_id: {data, last_alert, interval}}
         self.alert_history = {}  # {match_id_period: [probabilities]}
         
         # Initialiser le scraper robuste si disponible
         if SCRAPER_AVAILABLE:
             self.live_scraper = SoccerStatsLiveScraper(throttle_seconds=3)
+            # Scan concurrent (pages ligues + matchs) sous budget global de requêtes
+            self.scan_engine = LiveScanEngine(scraper=self.live_scraper)
+            # Rapide dans/juste avant 31-45+ et 75-90+, lent ailleurs, rien à la mi-temps
+            self.scheduler = PollScheduler(idle_seconds=UPDATE_INTERVAL)
+            # Budget de temps par cycle : intervalle critique > whitelist > reste, délestage au-delà
+            self.planner = CyclePlanner(whitelist_teams=load_whitelist_teams(LEAGUES_CONFIG))
             print("✅ SoccerStatsLiveScraper initialisé")
         else:
             self.live_scraper = None
+            self.scan_engine = None
+            self.scheduler = None
+            self.planner = None
             print("⚠️  Mode scraping basique")
         
     def load_telegram_config(self):
-        """Charge la configuration Telegram"""
+        """Charge la configuration Telegram (à côté des modules, comme subscriptions.json)"""
         try:
-            with open('telegram_config.json', 'r') as f:
+            with open(TELEGRAM_CONFIG_PATH, 'r') as f:
                 return json.load(f)
         except:
             print("⚠️  telegram_config.json non trouvé")
             return None
     
-    def send_telegram(self, message):
-        """Envoie un message Telegram"""
+    def send_telegram(self, message, key=None, subscription=None):
+        """Met un message Telegram en file d'envoi (non bloquant) ; key=(match, intervalle) coalesce les MAJ"""
+        if subscription is not None:
+            if not subscription.bot_token:
+                return False
+            return get_queue().enqueue(subscription.bot_token, subscription.chat_id, message, key=key)
         if not self.telegram_config:
             return False
-        
-        try:
-            url = f"https://api.telegram.org/bot{self.telegram_config['bot_token']}/sendMessage"
-            data = {
-                'chat_id': self.telegram_config['chat_id'],
-                'text': message,
-                'parse_mode': 'HTML'
-            }
-            response = requests.post(url, data=data, timeout=10)
-            return response.status_code == 200
-        except:
-            return False
+        return get_queue().enqueue(self.telegram_config['bot_token'], self.telegram_config['chat_id'],
+                                   message, key=key)
     
     def scrape_live_matches(self):
-        """Scrape les pages de ligues pour détecter les matchs live"""
+        """Détecte les matchs live (page d'accueil, repli sur les pages de ligues) puis scrape leurs pages"""
         print("\n🔍 Scraping des matchs live...")
         
         all_live_matches = []
         
-        for league_key, league_info in LEAGUES_CONFIG.items():
-            try:
-                # Scraper la page "latest" de chaque ligue
-                url = league_info['soccerstats_url']
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                }
-                
-                response = requests.get(url, headers=headers, timeout=15)
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Chercher les matchs "In-play" (en cours)
-                # Structure SoccerStats: liens avec "pmatch.asp" et indicateur "In-play" ou minute
-                links = soup.find_all('a', href=re.compile(r'pmatch\.asp'))
-                
-                for link in links:
-                    # Vérifier si le match est live (chercher indicateur de minute dans les parents)
-                    parent_row = link.find_parent('tr')
-                    if not parent_row:
-                        continue
-                    
-                    row_text = parent_row.get_text()
-                    
-                    # Détecter si en cours: "'" ou "In-play" ou "Live"
-                    if "'" not in row_text and 'In-play' not in row_text and 'Live' not in row_text:
-                        continue
-                    
-                    # Extraire l'URL complète du match
-                    match_url = link.get('href')
-                    if not match_url.startswith('http'):
-                        match_url = f"https://www.soccerstats.com/{match_url}"
-                    
-                    # Scraper les détails du match avec le scraper robuste
-                    if SCRAPER_AVAILABLE and self.live_scraper:
-                        match_data = self.live_scraper.scrape_match(match_url)
-                        
-                        if match_data:
-                            # Convertir en format compatible
-                            live_match = {
-                                'league': league_key,
-                                'home_team': match_data.home_team,
-                                'away_team': match_data.away_team,
-                                'home_score': match_data.score_home,
-                                'away_score': match_data.score_away,
-                                'minute': match_data.minute or 0,
-                                'match_url': match_url
-                            }
-                            all_live_matches.append(live_match)
-                            print(f"   ✅ {league_info['name']}: {match_data.home_team} {match_data.score_home}-{match_data.score_away} {match_data.away_team} ({match_data.minute}')")
-                
-            except Exception as e:
-                print(f"   ⚠️  {league_key}: {e}")
-                continue
+        if not (SCRAPER_AVAILABLE and self.scan_engine):
+            return all_live_matches
+        
+        # Page d'accueil (+ pages "latest" des ligues non résolues) puis pages des matchs in-play, en parallèle
+        snapshot = self.scan_engine.scan({
+            league_key: league_info['soccerstats_url'] for league_key, league_info in LEAGUES_CONFIG.items()
+        }, scheduler=self.scheduler, planner=self.planner)
+        
+        for source, error in snapshot.errors.items():
+            print(f"   ⚠️  {source}: {error}")
+        if snapshot.fallback_leagues:
+            print(f"   ↩️  Pages de ligues consultées: {', '.join(snapshot.fallback_leagues)}")
+        
+        for result in snapshot.matches:
+            match_data = result.data
+            # Convertir en format compatible
+            live_match = {
+                'league': result.league,
+                'home_team': match_data.home_team,
+                'away_team': match_data.away_team,
+                'home_score': match_data.score_home,
+                'away_score': match_data.score_away,
+                'minute': match_data.minute or 0,
+                'match_url': result.match_url
+            }
+            all_live_matches.append(live_match)
+            print(f"   ✅ {LEAGUES_CONFIG[result.league]['name']}: {match_data.home_team} {match_data.score_home}-{match_data.score_away} {match_data.away_team} ({match_data.minute}')")
+        
+        print(f"   ⏱️  Scan: {snapshot.requests_count} requêtes en {snapshot.duration:.1f}s")
+        if snapshot.deferred:
+            print(f"   💤 {len(snapshot.deferred)} match(s) différé(s) (hors intervalle, mi-temps ou délestage)")
         
         return all_live_matches
     
@@ -206,6 +195,10 @@ class ContinuousLiveMonitor:
                 return interval['period']
         return None
     
+    def match_value(self, match):
+        """Valeur du match pour le budget du cycle (intervalle critique > whitelist > reste)"""
+        return self.planner.value(match['league'], match['minute'], f"{match['home_team']} {match['away_team']}")
+    
     def get_match_id(self, match):
         """Génère un ID unique pour un match"""
         return f"{match['league']}_{match['home_team']}_{match['away_team']}"
@@ -259,45 +252,30 @@ class ContinuousLiveMonitor:
         print(f"   Minute: {match['minute']}' | Score: {match['home_score']}-{match['away_score']}")
         print(f"   Probabilité: {result['probability']:.1f}% | Intervalle: {period}")
         
-        # Vérifier si changement significatif ou première alerte
-        should_send_alert = False
-        
-        if len(self.alert_history[match_period_id]) == 0:
-            # Première analyse de ce match dans cet intervalle
-            if result['probability'] >= 65.0:
-                should_send_alert = True
-                print(f"   ✅ PREMIER SIGNAL (≥65%)")
-        else:
-            # Vérifier si changement significatif (±5% ou changement de seuil 65%)
-            last_prob = self.alert_history[match_period_id][-1]
-            prob_change = abs(result['probability'] - last_prob)
-            
-            # Alerte si:
-            # 1. Passe au-dessus de 65% (était en dessous)
-            # 2. Passe en dessous de 65% (était au-dessus)
-            # 3. Changement ≥5% et toujours ≥65%
-            crossed_threshold_up = last_prob < 65.0 and result['probability'] >= 65.0
-            crossed_threshold_down = last_prob >= 65.0 and result['probability'] < 65.0
-            significant_change = prob_change >= 5.0 and result['probability'] >= 65.0
-            
-            if crossed_threshold_up:
-                should_send_alert = True
-                print(f"   📈 SIGNAL ACTIVÉ ({last_prob:.1f}% → {result['probability']:.1f}%)")
-            elif crossed_threshold_down:
-                should_send_alert = True
-                print(f"   📉 SIGNAL DÉSACTIVÉ ({last_prob:.1f}% → {result['probability']:.1f}%)")
-            elif significant_change:
-                should_send_alert = True
-                print(f"   🔄 MAJ SIGNIFICATIVE (+{prob_change:.1f}%)")
+        # Un seul calcul, évalué contre les filtres de chaque abonné concerné (seuil, delta, ligues, intervalles)
+        # Alerte si : premier passage ≥ seuil, seuil franchi (dans un sens ou l'autre), variation ≥ delta au-dessus
+        notifications = self.subscriptions.evaluate(match_period_id, match['league'], period, result['probability'])
+        for notification in notifications:
+            subscription = notification.subscription
+            if notification.reason == FIRST_SIGNAL:
+                print(f"   ✅ PREMIER SIGNAL (≥{subscription.min_probability:.0f}%) → {subscription.name}")
+            elif notification.reason == SIGNAL_UP:
+                print(f"   📈 SIGNAL ACTIVÉ ({notification.previous:.1f}% → {result['probability']:.1f}%) → {subscription.name}")
+            elif notification.reason == SIGNAL_DOWN:
+                print(f"   📉 SIGNAL DÉSACTIVÉ ({notification.previous:.1f}% → {result['probability']:.1f}%) → {subscription.name}")
             else:
-                print(f"   ⏸️  Stable ({prob_change:.1f}% de variation)")
+                change = abs(result['probability'] - notification.previous)
+                print(f"   🔄 MAJ SIGNIFICATIVE (+{change:.1f}%) → {subscription.name}")
+        if not notifications and self.alert_history[match_period_id]:
+            change = abs(result['probability'] - self.alert_history[match_period_id][-1])
+            print(f"   ⏸️  Stable ({change:.1f}% de variation)")
         
         # Ajouter à l'historique
         self.alert_history[match_period_id].append(result['probability'])
         
-        # Envoyer l'alerte si nécessaire
-        if should_send_alert:
-            self.send_detailed_alert(match, result, period)
+        # Envoyer les alertes déclenchées
+        for notification in notifications:
+            self.send_detailed_alert(match, result, period, notification.subscription)
         
         # Mettre à jour le tracking
         self.tracked_matches[match_id] = {
@@ -306,8 +284,9 @@ class ContinuousLiveMonitor:
             'last_update': datetime.now()
         }
     
-    def send_detailed_alert(self, match, result, period):
-        """Envoie une alerte Telegram détaillée"""
+    def send_detailed_alert(self, match, result, period, subscription=None):
+        """Envoie une alerte Telegram détaillée (au chat de l'abonné s'il est donné)"""
+        threshold = subscription.min_probability if subscription else 65.0
         
         # Récurrence totale
         rt_text = "N/A"
@@ -327,7 +306,7 @@ class ContinuousLiveMonitor:
             sat_text = f"\n⚠️ <b>Saturation:</b> {result['saturation_factor']:.2f}"
         
         # Statut du signal
-        if result['probability'] >= 65.0:
+        if result['probability'] >= threshold:
             status = "✅ SIGNAL VALIDÉ"
             emoji = "🚨"
         else:
@@ -362,10 +341,10 @@ class ContinuousLiveMonitor:
 🕐 {datetime.now().strftime('%H:%M:%S')}
 """
         
-        if self.send_telegram(message):
-            print(f"   📱 Alerte Telegram envoyée !")
+        if self.send_telegram(message, key=(self.get_match_id(match), period), subscription=subscription):
+            print(f"   📱 Alerte Telegram en file d'envoi")
         else:
-            print(f"   ⚠️  Échec envoi Telegram")
+            print(f"   ⚠️  Telegram non configuré")
     
     def cleanup_finished_matches(self):
         """Nettoie les matchs qui ont quitté les intervalles surveillés"""
@@ -381,6 +360,7 @@ class ContinuousLiveMonitor:
         
         for match_id in to_remove:
             del self.tracked_matches[match_id]
+        self.subscriptions.forget(f"{match_id}_{interval['period']}" for match_id in to_remove for interval in INTERVALS)
     
     def run_continuous(self, duration_minutes=None):
         """Lance le monitoring continu"""
@@ -390,8 +370,13 @@ class ContinuousLiveMonitor:
         print(f"🕐 Démarrage: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"🎯 Ligues: {len(LEAGUES_CONFIG)}")
         print(f"📊 Intervalles: 31-45' et 76-90'")
-        print(f"🔄 Fréquence MAJ: {UPDATE_INTERVAL}s")
-        print(f"✅ Seuil: ≥65%")
+        if self.scheduler:
+            print(f"🔄 Fréquence MAJ: adaptative ({self.scheduler.fast_seconds}s en intervalle, max {UPDATE_INTERVAL}s entre scans)")
+        else:
+            print(f"🔄 Fréquence MAJ: {UPDATE_INTERVAL}s")
+        print(f"✅ Abonnés: {len(self.subscriptions)} ("
+              + ", ".join(f"{s.name} ≥{s.min_probability:.0f}%" for s in self.subscriptions.subscriptions.values())
+              + ")")
         if duration_minutes:
             print(f"⏱️  Durée: {duration_minutes} minutes")
         else:
@@ -407,21 +392,33 @@ class ContinuousLiveMonitor:
                 print(f"\n🔍 SCAN #{scan_count} - {datetime.now().strftime('%H:%M:%S')}")
                 print("-" * 70)
                 
-                # Scraper les matchs live
+                # Scraper les matchs live (le cycle dispose d'un budget de temps)
+                if self.planner:
+                    self.planner.start_cycle()
                 live_matches = self.scrape_live_matches()
                 
                 if live_matches:
                     print(f"✅ {len(live_matches)} match(s) live détecté(s)")
                     
-                    # Analyser et suivre chaque match
+                    # Analyser et suivre chaque match, par valeur décroissante si un budget est actif
+                    if self.planner:
+                        live_matches = self.planner.order(live_matches, key=self.match_value)
                     for match in live_matches:
+                        if self.planner and not self.planner.admit_analysis(self.match_value(match)):
+                            continue
+                        started = time.monotonic()
                         try:
                             self.analyze_and_track_match(match)
                         except Exception as e:
                             print(f"❌ Erreur: {e}")
+                        if self.planner:
+                            self.planner.record_analysis(time.monotonic() - started)
                 else:
                     print("❌ Aucun match live pour nos ligues")
                 
+                if self.planner:
+                    print(f"⏱️  Cycle: {self.planner.finish_cycle().summary()}")
+                
                 # Nettoyer les matchs terminés
                 self.cleanup_finished_matches()
                 
@@ -436,9 +433,10 @@ class ContinuousLiveMonitor:
                         print(f"\n⏱️  Durée atteinte ({duration_minutes} min)")
                         break
                 
-                # Attendre avant le prochain scan
-                print(f"\n⏳ Prochain scan dans {UPDATE_INTERVAL}s...")
-                time.sleep(UPDATE_INTERVAL)
+                # Attendre le prochain match dû (au plus UPDATE_INTERVAL)
+                wait = self.scheduler.next_wake() if self.scheduler else UPDATE_INTERVAL
+                print(f"\n⏳ Prochain scan dans {wait:.0f}s...")
+                time.sleep(wait)
                 
         except KeyboardInterrupt:
             print("\n\n⚠️  Arrêt demandé (Ctrl+C)")
@@ -448,8 +446,17 @@ class ContinuousLiveMonitor:
         print("📊 RÉSUMÉ DE LA SESSION")
         print("="*70)
         print(f"🔍 Scans effectués: {scan_count}")
+        if self.planner:
+            totals = self.planner.totals
+            print(f"🪓 Délestage: {totals['shed_fetches']} page(s), {totals['shed_analyses']} analyse(s) "
+                  f"| {totals['overruns']} cycle(s) hors budget")
         print(f"⏱️  Durée totale: {(datetime.now() - start_time).total_seconds() / 60:.1f} min")
         print(f"⚽ Matchs suivis: {len(self.alert_history)}")
+        if self.telegram_config:
+            queue = get_queue()
+            queue.stop(timeout=30)
+            print(f"📱 Telegram: {queue.stats['sent']} envoyé(s), {queue.stats['coalesced']} MAJ fusionnée(s), "
+                  f"{queue.stats['failed']} échec(s)")
         
         if self.alert_history:
             print("\n📈 Historique des matchs:")
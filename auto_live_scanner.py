@@ -5,7 +5,6 @@ Scrape automatiquement les matchs live et applique nos conditions
 """
 
 import requests
-from bs4 import BeautifulSoup
 import json
 import time
 import sys
@@ -16,6 +15,8 @@ from datetime import datetime
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'football-live-prediction'))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'football-live-prediction/predictors'))
 from live_goal_probability_predictor import LiveGoalProbabilityPredictor
+from live_scan_engine import LiveScanEngine
+from telegram_queue import get_queue
 
 # Configuration des ligues suivies avec leurs IDs SoccerStats
 LEAGUES_CONFIG = {
@@ -72,6 +73,7 @@ class AutoLiveScanner:
         self.predictor = LiveGoalProbabilityPredictor()
         self.telegram_config = self.load_telegram_config()
         self.monitored_matches = set()  # Éviter les doublons
+        self.scan_engine = LiveScanEngine()
         
     def load_telegram_config(self):
         """Charge la configuration Telegram"""
@@ -82,124 +84,42 @@ class AutoLiveScanner:
             print("⚠️  telegram_config.json non trouvé")
             return None
     
-    def send_telegram(self, message):
-        """Envoie un message Telegram"""
+    def send_telegram(self, message, key=None):
+        """Met un message Telegram en file d'envoi (non bloquant) ; key=(match, intervalle) coalesce les MAJ"""
         if not self.telegram_config:
             return False
-        
-        try:
-            url = f"https://api.telegram.org/bot{self.telegram_config['bot_token']}/sendMessage"
-            data = {
-                'chat_id': self.telegram_config['chat_id'],
-                'text': message,
-                'parse_mode': 'HTML'
-            }
-            response = requests.post(url, data=data, timeout=10)
-            return response.status_code == 200
-        except:
-            return False
+        return get_queue().enqueue(self.telegram_config['bot_token'], self.telegram_config['chat_id'],
+                                   message, key=key)
     
     def scrape_live_matches(self):
-        """Scrape la page d'accueil SoccerStats pour détecter les matchs live"""
+        """Détecte les matchs live depuis la page d'accueil SoccerStats (une requête par scan)"""
         print("\n🔍 Scraping des matchs live sur SoccerStats...")
         
-        try:
-            url = "https://www.soccerstats.com/"
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=15)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            live_matches = []
-            
-            # Chercher les matchs avec classe "live" ou contenant la minute
-            # Structure type: <tr class="live"> ou texte contenant "45'" ou "87'"
-            rows = soup.find_all('tr', class_=['live', 'inplay'])
-            
-            if not rows:
-                # Alternative: chercher tous les rows et filtrer ceux avec une minute
-                all_rows = soup.find_all('tr')
-                for row in all_rows:
-                    text = row.get_text()
-                    # Détecter format minute: "87'" ou "45'" ou "HT" ou "2H 87'"
-                    if "'" in text or 'HT' in text or '2H' in text:
-                        rows.append(row)
-            
-            print(f"   Trouvé {len(rows)} lignes potentielles")
-            
-            for row in rows:
-                try:
-                    match_data = self.parse_live_match_row(row)
-                    if match_data:
-                        live_matches.append(match_data)
-                except Exception as e:
-                    continue
-            
-            return live_matches
-            
-        except Exception as e:
-            print(f"❌ Erreur scraping: {e}")
-            return []
-    
-    def parse_live_match_row(self, row):
-        """Parse une ligne de match live"""
-        cells = row.find_all('td')
-        if len(cells) < 4:
-            return None
-        
-        text = row.get_text()
-        
-        # Extraire la minute
-        minute = None
-        if "'" in text:
-            # Format: "87'" ou "2H 87'"
-            import re
-            minute_match = re.search(r'(\d+)\'', text)
-            if minute_match:
-                minute = int(minute_match.group(1))
-        
-        if not minute:
-            return None
-        
-        # Extraire équipes et score
-        # Structure typique: [Ligue] [Équipe Domicile] [Score] [Équipe Extérieure] [Minute]
-        home_team = None
-        away_team = None
-        home_score = 0
-        away_score = 0
-        league_name = None
-        
-        # Chercher les liens des équipes
-        team_links = row.find_all('a', href=True)
-        if len(team_links) >= 2:
-            home_team = team_links[0].get_text(strip=True)
-            away_team = team_links[1].get_text(strip=True)
-        
-        # Chercher le score (format: "2-1" ou "0-0")
-        score_match = re.search(r'(\d+)\s*-\s*(\d+)', text)
-        if score_match:
-            home_score = int(score_match.group(1))
-            away_score = int(score_match.group(2))
-        
-        # Identifier la ligue
-        for league_key, league_info in LEAGUES_CONFIG.items():
-            if league_info['name'].lower() in text.lower():
-                league_name = league_key
-                break
-        
-        if not home_team or not away_team or not league_name:
-            return None
-        
-        return {
-            'league': league_name,
-            'home_team': home_team,
-            'away_team': away_team,
-            'home_score': home_score,
-            'away_score': away_score,
-            'minute': minute
-        }
+        snapshot = self.scan_engine.scan({
+            league_key: f"https://www.soccerstats.com/latest.asp?league={league_key}"
+            for league_key in LEAGUES_CONFIG
+        })
+        
+        for source, error in snapshot.errors.items():
+            print(f"   ⚠️  {source}: {error}")
+        if snapshot.fallback_leagues:
+            print(f"   ↩️  Pages de ligues consultées: {', '.join(snapshot.fallback_leagues)}")
+        
+        live_matches = []
+        for result in snapshot.matches:
+            match_data = result.data
+            live_matches.append({
+                'league': result.league,
+                'home_team': match_data.home_team,
+                'away_team': match_data.away_team,
+                'home_score': match_data.score_home,
+                'away_score': match_data.score_away,
+                'minute': match_data.minute or 0
+            })
+        
+        print(f"   ⏱️  Scan: {snapshot.requests_count} requêtes en {snapshot.duration:.1f}s")
+        
+        return live_matches
     
     def check_interval(self, minute):
         """Vérifie si la minute est dans un intervalle à surveiller"""
@@ -324,10 +244,10 @@ class AutoLiveScanner:
 🕐 Détecté à {datetime.now().strftime('%H:%M:%S')}
 """
         
-        if self.send_telegram(message):
-            print("   📱 Alerte Telegram envoyée !")
+        if self.send_telegram(message, key=(match['home_team'], match['away_team'], result['period'])):
+            print("   📱 Alerte Telegram en file d'envoi")
         else:
-            print("   ⚠️  Échec envoi Telegram")
+            print("   ⚠️  Telegram non configuré")
     
     def run_scan(self):
         """Lance un scan complet"""
@@ -357,6 +277,10 @@ class AutoLiveScanner:
             except Exception as e:
                 print(f"❌ Erreur analyse {match['home_team']} vs {match['away_team']}: {e}")
         
+        # Laisser partir les alertes en file avant la fin du processus
+        if self.telegram_config and not get_queue().flush(timeout=60):
+            print("⚠️  Alertes Telegram encore en attente après 60s")
+        
         print("\n" + "="*70)
         print("✅ Scan terminé")
         print("="*70)
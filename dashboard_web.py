@@ -22,6 +22,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'football-live-predic
 try:
     from live_goal_probability_predictor import LiveGoalProbabilityPredictor
     from scrape_live_soccerstats import SoccerStatsLiveScraper
+    from live_scan_engine import LiveScanEngine
+    from live_poll_scheduler import PollScheduler
+    from live_cycle_planner import CyclePlanner, load_whitelist_teams
     PREDICTORS_AVAILABLE = True
 except ImportError:
     PREDICTORS_AVAILABLE = False
@@ -41,7 +44,8 @@ dashboard_state = {
         'total_scans': 0,
         'matches_detected': 0,
         'signals_sent': 0,
-        'avg_probability': 0
+        'avg_probability': 0,
+        'shed_last_cycle': 0
     }
 }
 state_lock = Lock()
@@ -68,9 +72,17 @@ class DashboardMonitor:
         if PREDICTORS_AVAILABLE:
             self.predictor = LiveGoalProbabilityPredictor()
             self.scraper = SoccerStatsLiveScraper(throttle_seconds=3)
+            self.scan_engine = LiveScanEngine(scraper=self.scraper)
+            # Pages de match re-scrapées selon la distance aux intervalles critiques
+            self.scheduler = PollScheduler()
+            self.planner = CyclePlanner(whitelist_teams=load_whitelist_teams(LEAGUES_CONFIG))
         else:
             self.predictor = None
             self.scraper = None
+            self.scan_engine = None
+            self.scheduler = None
+            self.planner = None
+        self.last_entries = {}  # {url pmatch.asp: entrée affichée}, reprise pour les matchs différés
     
     def start(self):
         """Démarre le monitoring"""
@@ -98,13 +110,20 @@ class DashboardMonitor:
                 with state_lock:
                     dashboard_state['stats']['total_scans'] += 1
                 
-                # Scraper les matchs live (simulation pour l'instant)
+                # Scraper les matchs live (budget de temps par cycle, délestage des moins utiles)
+                if self.planner:
+                    self.planner.start_cycle()
                 live_matches = self._scan_live_matches()
+                report = self.planner.finish_cycle() if self.planner else None
                 
                 with state_lock:
                     dashboard_state['live_matches'] = live_matches
                     dashboard_state['last_update'] = datetime.now().isoformat()
                     dashboard_state['stats']['matches_detected'] = len(live_matches)
+                    if report:
+                        dashboard_state['stats']['shed_last_cycle'] = report.shed
+                if report and report.shed:
+                    print(f"⏱️  Cycle: {report.summary()}")
                 
                 # Émettre mise à jour via WebSocket
                 socketio.emit('matches_update', {
@@ -113,106 +132,99 @@ class DashboardMonitor:
                     'stats': dashboard_state['stats']
                 })
                 
-                # Attendre 60 secondes
-                for _ in range(60):
-                    if not self.running:
-                        break
-                    time.sleep(1)
+                # Attendre le prochain match dû (60 secondes au plus)
+                wait = self.scheduler.next_wake() if self.scheduler else 60
+                deadline = time.monotonic() + wait
+                while self.running and time.monotonic() < deadline:
+                    time.sleep(min(1, max(0, deadline - time.monotonic())))
                     
             except Exception as e:
                 print(f"❌ Erreur monitoring: {e}")
                 time.sleep(5)
     
+    def _match_value(self, scanned):
+        """Valeur d'un match scanné pour le budget du cycle"""
+        data = scanned.data
+        return self.planner.value(scanned.league, data.minute, f"{data.home_team} {data.away_team}")
+    
     def _scan_live_matches(self):
         """Scanne les matchs live avec le vrai scraper SoccerStats"""
         matches = []
         
-        if not self.scraper or not self.predictor:
+        if not self.scan_engine or not self.predictor:
             return matches
         
-        # Scraper chaque ligue
-        for league_key, league_info in LEAGUES_CONFIG.items():
-            try:
-                # Scraper la page "latest" de la ligue
-                url = f"https://www.soccerstats.com/latest.asp?league={league_key}"
-                headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-                
-                response = requests.get(url, headers=headers, timeout=15)
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Chercher les matchs "In-play"
-                import re
-                links = soup.find_all('a', href=re.compile(r'pmatch\.asp'))
+        # Page d'accueil + scan concurrent des matchs live (snapshot cohérent de tous les matchs live)
+        snapshot = self.scan_engine.scan({
+            league_key: f"https://www.soccerstats.com/latest.asp?league={league_key}"
+            for league_key in LEAGUES_CONFIG
+        }, scheduler=self.scheduler, planner=self.planner)
+        for source, error in snapshot.errors.items():
+            print(f"⚠️ Erreur scraping {source}: {error}")
+        
+        # Matchs différés par le scheduler : dernière entrée affichée (sauf mi-temps)
+        entries = {match_url: self.last_entries[match_url] for _, match_url in snapshot.deferred
+                   if match_url in self.last_entries and match_url not in snapshot.half_time}
+        scanned_matches = snapshot.matches
+        if self.planner:
+            scanned_matches = self.planner.order(scanned_matches, key=self._match_value)
+        for scanned in scanned_matches:
+            league_key = scanned.league
+            league_info = LEAGUES_CONFIG[league_key]
+            match_data = scanned.data
+            if self.planner and not self.planner.admit_analysis(self._match_value(scanned)):
+                continue
+            
+            if match_data and match_data.minute:
+                # Vérifier l'intervalle
+                interval = None
+                if 31 <= match_data.minute <= 45:
+                    interval = '31-45'
+                elif 76 <= match_data.minute <= 90:
+                    interval = '76-90'
                 
-                for link in links:
-                    parent_row = link.find_parent('tr')
-                    if not parent_row:
-                        continue
-                    
-                    row_text = parent_row.get_text()
-                    
-                    # Détecter si en cours
-                    if "'" not in row_text and 'In-play' not in row_text and 'Live' not in row_text:
-                        continue
-                    
-                    # Extraire l'URL du match
-                    match_url = link.get('href')
-                    if not match_url.startswith('http'):
-                        match_url = f"https://www.soccerstats.com/{match_url}"
-                    
-                    # Scraper le match complet
-                    match_data = self.scraper.scrape_match(match_url)
-                    
-                    if match_data and match_data.minute:
-                        # Vérifier l'intervalle
-                        interval = None
-                        if 31 <= match_data.minute <= 45:
-                            interval = '31-45'
-                        elif 76 <= match_data.minute <= 90:
-                            interval = '76-90'
+                if interval:
+                    # Charger whitelist
+                    try:
+                        with open(league_info['whitelist'], 'r') as f:
+                            whitelist = json.load(f)
                         
-                        if interval:
-                            # Charger whitelist
-                            try:
-                                with open(league_info['whitelist'], 'r') as f:
-                                    whitelist = json.load(f)
-                                
-                                # Analyser avec le predictor
-                                result = self.predictor.predict_live_match(
-                                    league_name=league_key,
-                                    home_team=match_data.home_team,
-                                    away_team=match_data.away_team,
-                                    current_minute=match_data.minute,
-                                    current_home_goals=match_data.score_home,
-                                    current_away_goals=match_data.score_away,
-                                    whitelist_data=whitelist
-                                )
-                                
-                                if result:
-                                    match_id = f"{league_key}_{match_data.home_team}_{match_data.away_team}".replace(' ', '_')
-                                    matches.append({
-                                        'id': match_id,
-                                        'league': league_key,
-                                        'league_name': league_info['name'],
-                                        'home_team': match_data.home_team,
-                                        'away_team': match_data.away_team,
-                                        'home_score': match_data.score_home,
-                                        'away_score': match_data.score_away,
-                                        'minute': match_data.minute,
-                                        'probability': result['probability'],
-                                        'interval': interval,
-                                        'status': 'qualified' if result['probability'] >= 65 else 'monitoring',
-                                        'last_update': datetime.now().isoformat()
-                                    })
-                            except Exception as e:
-                                print(f"⚠️ Erreur analyse {match_data.home_team}: {e}")
-                                continue
-                            
-            except Exception as e:
-                print(f"⚠️ Erreur scraping {league_key}: {e}")
-                continue
+                        # Analyser avec le predictor
+                        started = time.monotonic()
+                        result = self.predictor.predict_live_match(
+                            league_name=league_key,
+                            home_team=match_data.home_team,
+                            away_team=match_data.away_team,
+                            current_minute=match_data.minute,
+                            current_home_goals=match_data.score_home,
+                            current_away_goals=match_data.score_away,
+                            whitelist_data=whitelist
+                        )
+                        if self.planner:
+                            self.planner.record_analysis(time.monotonic() - started)
+                        
+                        if result:
+                            match_id = f"{league_key}_{match_data.home_team}_{match_data.away_team}".replace(' ', '_')
+                            entries[scanned.match_url] = {
+                                'id': match_id,
+                                'league': league_key,
+                                'league_name': league_info['name'],
+                                'home_team': match_data.home_team,
+                                'away_team': match_data.away_team,
+                                'home_score': match_data.score_home,
+                                'away_score': match_data.score_away,
+                                'minute': match_data.minute,
+                                'probability': result['probability'],
+                                'interval': interval,
+                                'status': 'qualified' if result['probability'] >= 65 else 'monitoring',
+                                'last_update': datetime.now().isoformat()
+                            }
+                    except Exception as e:
+                        print(f"⚠️ Erreur analyse {match_data.home_team}: {e}")
+                        continue
         
+        self.last_entries = entries
+        matches = list(entries.values())
         return matches
 
 # Instance du moniteur
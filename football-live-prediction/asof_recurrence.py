@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Leak-free walk-forward recurrence snapshots for backtesting.
+
+LiveGoalProbabilityPredictor._get_team_recurrence counts, over the whole
+soccerstats_scraped_matches table, the share of a team's home (or away) matches
+with at least one goal (scored or conceded) in an interval. In a backtest that
+includes the match being predicted and every later one.
+
+AsOfRecurrence walks all matches once in date order and keeps running
+(matches, matches_with_goal) counters per (league, team, side, interval). Before
+each match day it records the counters of the teams playing that day, so the
+state "just before the match" is a dict lookup. Matches played on the same day
+do not see each other.
+
+Dates are stored without a year ("17 Aug"): each league's season start month is
+taken from the first stored row of its teams (rows are scraped in match order),
+and months are ordered from there.
+
+Usage:
+    asof = AsOfRecurrence.build('data/predictions.db')
+    asof.recurrence(('france', '17 Aug', 'Angers', 'Paris FC'), 'Angers', '31-45', is_home=True)
+    predictor._patterns_cache = asof.patterns_cache(fixture)   # what _get_team_recurrence would return
+"""
+
+import json
+import sqlite3
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+MONTHS = {name: i for i, name in enumerate(
+    ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), start=1)}
+
+# Same bounds as LiveGoalProbabilityPredictor.INTERVAL_BOUNDS for the key intervals
+DEFAULT_INTERVALS = {
+    "31-45": (31, 45),
+    "76-90": (76, 90),
+}
+DEFAULT_RECURRENCE = 5.0  # % returned by _get_team_recurrence without history or with zero recurrence
+
+Fixture = Tuple[str, str, str, str]  # (league, date, home_team, away_team)
+CounterKey = Tuple[str, bool, str]  # (team, is_home, interval_name)
+
+
+def parse_day_month(date: Optional[str]) -> Optional[Tuple[int, int]]:
+    """'17 Aug' -> (8, 17), None if unreadable"""
+    try:
+        day, month = (date or "").split()[:2]
+        return MONTHS[month[:3].title()], int(day)
+    except (KeyError, ValueError):
+        return None
+
+
+def _goal_minutes(value) -> List[int]:
+    if not value:
+        return []
+    try:
+        return [int(m) for m in json.loads(value) if int(m) > 0]
+    except (TypeError, ValueError):
+        return []
+
+
+class AsOfRecurrence:
+    """Recurrence counters of each fixture's teams as of the day before the fixture"""
+
+    def __init__(self, intervals: Optional[Dict[str, Tuple[int, int]]] = None):
+        self.intervals = dict(intervals or DEFAULT_INTERVALS)
+        # Plain dicts (no defaultdict factories) so the instance pickles for spawn-based pools
+        self.counters: Dict[str, Dict[CounterKey, List[int]]] = {}
+        self._before: Dict[Fixture, Dict[CounterKey, Tuple[int, int]]] = {}
+        self.season_start: Dict[str, int] = {}
+
+    @classmethod
+    def build(cls, db_path: str, leagues: Optional[Sequence[str]] = None,
+              intervals: Optional[Dict[str, Tuple[int, int]]] = None) -> 'AsOfRecurrence':
+        """Read soccerstats_scraped_matches once and walk every league forward"""
+        query = """
+            SELECT id, league, team, opponent, date, is_home, goal_times, goal_times_conceded
+            FROM soccerstats_scraped_matches
+        """
+        params: List[str] = []
+        if leagues:
+            query += f" WHERE league IN ({', '.join('?' * len(leagues))})"
+            params.extend(leagues)
+        query += " ORDER BY id"
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+        return cls(intervals).walk(rows)
+
+    def walk(self, rows: Iterable[tuple]) -> 'AsOfRecurrence':
+        """
+        Args:
+            rows: (id, league, team, opponent, date, is_home, goal_times, goal_times_conceded), in id order
+        """
+        by_league: Dict[str, List[tuple]] = defaultdict(list)
+        for row in rows:
+            by_league[row[1]].append(row)
+
+        for league, league_rows in by_league.items():
+            start = self._season_start(league_rows)
+            self.season_start[league] = start
+
+            def order(row):
+                parsed = parse_day_month(row[4])
+                if parsed is None:
+                    return (12, 32, row[0])  # unreadable dates last
+                month, day = parsed
+                return ((month - start) % 12, day, row[0])
+
+            league_rows.sort(key=order)
+            counters = self.counters.setdefault(league, {})
+            day_rows: List[tuple] = []
+            for row in league_rows + [None]:
+                if day_rows and (row is None or order(row)[:2] != order(day_rows[0])[:2]):
+                    self._close_day(league, counters, day_rows)
+                    day_rows = []
+                if row is not None:
+                    day_rows.append(row)
+        return self
+
+    @staticmethod
+    def _season_start(league_rows: List[tuple]) -> int:
+        """Most common month of each team's first stored row"""
+        first: Dict[str, tuple] = {}
+        for row in league_rows:
+            first.setdefault(row[2], row)
+        months = Counter(parsed[0] for parsed in (parse_day_month(row[4]) for row in first.values()) if parsed)
+        return months.most_common(1)[0][0] if months else 7
+
+    def _close_day(self, league: str, counters: Dict[CounterKey, List[int]], day_rows: List[tuple]):
+        """Snapshot the day's fixtures, then add the day's results to the counters"""
+        for _, _, team, opponent, date, is_home, _, _ in day_rows:
+            home, away = (team, opponent) if is_home else (opponent, team)
+            fixture = (league, date, home, away)
+            if fixture in self._before:
+                continue
+            self._before[fixture] = {
+                (side_team, side, name): tuple(counters.get((side_team, side, name), (0, 0)))
+                for side_team, side in ((home, True), (away, False))
+                for name in self.intervals
+            }
+        for _, _, team, _, _, is_home, goal_times, goal_times_conceded in day_rows:
+            minutes = _goal_minutes(goal_times) + _goal_minutes(goal_times_conceded)
+            for name, (start, end) in self.intervals.items():
+                counter = counters.setdefault((team, bool(is_home), name), [0, 0])
+                counter[0] += 1
+                counter[1] += any(start <= m <= end for m in minutes)
+
+    # ------------------------------------------------------------------ lookups
+
+    def before(self, fixture: Fixture) -> Dict[CounterKey, Tuple[int, int]]:
+        """{(team, is_home, interval): (matches, matches_with_goal)} just before the fixture"""
+        return self._before.get(tuple(fixture), {})
+
+    def recurrence(self, fixture: Fixture, team: str, interval_name: str, is_home: bool) -> float:
+        """Recurrence (%) as _get_team_recurrence would compute it with only earlier matches"""
+        matches, with_goal = self.before(fixture).get((team, is_home, interval_name), (0, 0))
+        recurrence = with_goal / matches * 100 if matches else 0
+        return recurrence or DEFAULT_RECURRENCE
+
+    def patterns_cache(self, fixture: Fixture) -> Dict[str, float]:
+        """Entries of LiveGoalProbabilityPredictor._patterns_cache for the fixture's two teams"""
+        league = fixture[0]
+        return {
+            f"{league}_{team}_{name}_{'HOME' if is_home else 'AWAY'}": self.recurrence(fixture, team, name, is_home)
+            for team, is_home, name in self.before(fixture)
+        }
+
+    def __len__(self) -> int:
+        return len(self._before)
@@ -6,6 +6,7 @@ This module provides advanced analysis of backtesting results including:
 - Statistical breakdowns by interval, league, team
 - Confidence vs accuracy analysis
 - Comparison with baseline strategies
+- Dense (confidence, danger) threshold sweep with Pareto frontier
 - ROI distribution analysis
 - Visualization data generation
 """
@@ -57,6 +58,47 @@ class StrategyComparison:
     f1_score: float
 
 
+@dataclass
+class ThresholdSweep:
+    """
+    Metrics of every (confidence, danger) threshold pair of a grid
+
+    Arrays are indexed [confidence index, danger index]; a decision is a bet
+    when confidence >= confidence threshold and danger_score >= danger threshold * 100.
+    """
+    confidence_thresholds: np.ndarray
+    danger_thresholds: np.ndarray
+    bets: np.ndarray
+    wins: np.ndarray
+    win_rate: np.ndarray  # %
+    roi_avg: np.ndarray  # % per bet (+1 win / -1 loss)
+    precision: np.ndarray
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per grid point"""
+        conf, danger = np.meshgrid(self.confidence_thresholds, self.danger_thresholds, indexing="ij")
+        return pd.DataFrame({
+            "confidence_threshold": conf.ravel(),
+            "danger_threshold": danger.ravel(),
+            "bets": self.bets.ravel(),
+            "wins": self.wins.ravel(),
+            "win_rate": self.win_rate.ravel(),
+            "roi_avg": self.roi_avg.ravel(),
+            "precision": self.precision.ravel(),
+        })
+
+    def pareto_frontier(self, min_bets: int = 1) -> pd.DataFrame:
+        """
+        Grid points not dominated on (bets, roi_avg): no other point has at least
+        as many bets and a strictly better ROI. Sorted by decreasing bet count.
+        """
+        df = self.to_frame()
+        df = df[df["bets"] >= min_bets]
+        df = df.sort_values(["bets", "roi_avg"], ascending=[False, False], kind="mergesort")
+        best_before = df["roi_avg"].cummax().shift(fill_value=-np.inf)
+        return df[df["roi_avg"] > best_before].reset_index(drop=True)
+
+
 class BacktestingAnalyzer:
     """Advanced analysis of backtesting results"""
 
@@ -114,31 +156,25 @@ class BacktestingAnalyzer:
         results = []
         
         # Create confidence brackets
-        min_conf = self.df["confidence"].min()
-        max_conf = self.df["confidence"].max()
+        confidence = self.df["confidence"].to_numpy()
+        min_conf = confidence.min()
+        max_conf = confidence.max()
         bracket_size = (max_conf - min_conf) / brackets
+        lower = min_conf + np.arange(brackets) * bracket_size
+        upper = lower + bracket_size
         
-        for i in range(brackets):
-            lower = min_conf + (i * bracket_size)
-            upper = lower + bracket_size
-            
-            bracket_df = self.df[
-                (self.df["confidence"] >= lower) & 
-                (self.df["confidence"] < upper)
-            ]
-            
-            if len(bracket_df) == 0:
-                continue
-            
-            correct = bracket_df["correct_prediction"].sum()
-            correct_rate = correct / len(bracket_df)
-            avg_roi = bracket_df["roi"].mean()
-            
+        # decisions x brackets membership, counted in one pass
+        inside = (confidence[:, None] >= lower) & (confidence[:, None] < upper)
+        counts = inside.sum(axis=0)
+        correct = (inside & self.df["correct_prediction"].to_numpy(dtype=bool)[:, None]).sum(axis=0)
+        roi_sums = self.df["roi"].to_numpy(dtype=float) @ inside
+        
+        for i in np.flatnonzero(counts):
             results.append(ConfidenceAnalysis(
-                confidence_bracket=f"{lower*100:.0f}%-{upper*100:.0f}%",
-                sample_count=len(bracket_df),
-                correct_rate=correct_rate,
-                avg_roi=avg_roi
+                confidence_bracket=f"{lower[i]*100:.0f}%-{upper[i]*100:.0f}%",
+                sample_count=int(counts[i]),
+                correct_rate=correct[i] / counts[i],
+                avg_roi=roi_sums[i] / counts[i]
             ))
         
         return results
@@ -192,6 +228,57 @@ class BacktestingAnalyzer:
         
         return results
 
+    def sweep_thresholds(
+        self,
+        confidence_thresholds: Optional[np.ndarray] = None,
+        danger_thresholds: Optional[np.ndarray] = None,
+    ) -> ThresholdSweep:
+        """
+        Evaluate every (confidence, danger) threshold pair in one pass
+
+        Each decision is placed in the grid cell of the highest thresholds it
+        passes; suffix cumulative sums of the win/loss counts along both axes
+        then give, for every grid point, the bets that pass both thresholds.
+        Same bet selection and ROI as analyze_strategy_variations, for a
+        100x100 grid by default.
+        """
+        conf_grid = np.sort(np.asarray(
+            np.arange(100) / 100 if confidence_thresholds is None else confidence_thresholds, dtype=float))
+        danger_grid = np.sort(np.asarray(
+            np.arange(100) / 100 if danger_thresholds is None else danger_thresholds, dtype=float))
+        
+        # Number of thresholds each decision passes on each axis
+        conf_passed = np.searchsorted(conf_grid, self.df["confidence"].to_numpy(dtype=float), side="right")
+        danger_passed = np.searchsorted(danger_grid * 100, self.df["danger_score"].to_numpy(dtype=float), side="right")
+        won = (self.df["actual_goals"].to_numpy() >= 1)
+        
+        shape = (len(conf_grid) + 1, len(danger_grid) + 1)
+        cells = conf_passed * shape[1] + danger_passed
+        
+        def passing(mask: np.ndarray) -> np.ndarray:
+            hist = np.bincount(cells[mask], minlength=shape[0] * shape[1]).reshape(shape)
+            # decisions passing thresholds (i, j) = cells (>= i+1, >= j+1)
+            suffix = hist[::-1, ::-1].cumsum(axis=0).cumsum(axis=1)[::-1, ::-1]
+            return suffix[1:, 1:]
+        
+        wins = passing(won)
+        losses = passing(~won)
+        bets = wins + losses
+        with np.errstate(divide="ignore", invalid="ignore"):
+            win_rate = np.where(bets > 0, wins / bets * 100, 0.0)
+            roi_avg = np.where(bets > 0, (wins - losses) / bets * 100, 0.0)
+            precision = np.where(bets > 0, wins / bets, 0.0)
+        
+        return ThresholdSweep(
+            confidence_thresholds=conf_grid,
+            danger_thresholds=danger_grid,
+            bets=bets,
+            wins=wins,
+            win_rate=win_rate,
+            roi_avg=roi_avg,
+            precision=precision,
+        )
+
     def get_roi_distribution(self, bins: int = 10) -> Dict[str, int]:
         """Get distribution of ROI values"""
         roi_values = self.df[self.df["should_bet"]]["roi"].values
@@ -269,6 +356,13 @@ class BacktestingAnalyzer:
         files["strategy_comparison"] = str(strategy_file)
         logger.info(f"✅ Strategy comparison saved")
         
+        # Export threshold sweep frontier
+        frontier = self.sweep_thresholds().pareto_frontier()
+        frontier_file = output_path / "analysis_threshold_frontier.json"
+        frontier.to_json(frontier_file, orient="records", indent=2)
+        files["threshold_frontier"] = str(frontier_file)
+        logger.info(f"✅ Threshold frontier saved ({len(frontier)} points)")
+        
         # Export ROI distribution
         roi_dist = self.get_roi_distribution()
         roi_file = output_path / "analysis_roi_distribution.json"
@@ -334,6 +428,20 @@ def main():
                 strat.precision
             ))
         
+        # Threshold sweep
+        print("\n\n🧭 Threshold Sweep (100x100) - Pareto frontier (bets vs ROI):")
+        frontier = analyzer.sweep_thresholds().pareto_frontier(min_bets=10)
+        print("\n{:10} {:10} {:10} {:10} {:10}".format("Conf", "Danger", "Bets", "Win%", "ROI%"))
+        print("-" * 55)
+        for row in frontier.itertuples():
+            print("{:10.0%} {:10.0%} {:10} {:10.1f}% {:10.1f}%".format(
+                row.confidence_threshold,
+                row.danger_threshold,
+                row.bets,
+                row.win_rate,
+                row.roi_avg
+            ))
+        
         # Export all analysis
         print("\n\n💾 Exporting analysis...")
         files = analyzer.export_analysis()
@@ -8,9 +8,10 @@ win rate, precision, recall, and AUC.
 
 Architecture:
     1. Load historical matches from CSV
-    2. For each match/interval, simulate live snapshots at intervals
-    3. Apply the prediction pipeline (danger score + TTL decay)
-    4. Record betting decisions
+    2. Build one feature matrix for the whole dataset (one row per match)
+    3. Score it with a single scaler/model call
+    4. Expand to every match/interval/snapshot and apply TTL decay,
+       thresholds and ROI as array operations
     5. Match decisions against actual outcomes
     6. Calculate performance metrics
 """
@@ -22,13 +23,26 @@ import pandas as pd
 from pathlib import Path
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Sequence
 import logging
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Snapshot minutes simulated for each interval (any other label uses 75-90)
+INTERVAL_SNAPSHOTS = {
+    "30-45": (30, 35, 40),
+    "75-90": (75, 80, 85),
+}
+DEFAULT_INTERVALS = ("30-45", "75-90")
+FRESHNESS_TTL_SECONDS = 300
+DECISION_COLUMNS = [
+    "match_id", "interval", "timestamp", "danger_score", "confidence",
+    "freshness_factor", "should_bet", "reason", "actual_goals",
+    "correct_prediction", "roi",
+]
+
 
 @dataclass
 class BacktestDecision:
@@ -86,7 +100,9 @@ class BacktestingEngine:
         self.model = None
         self.scaler = None
         self.data = None
-        self.decisions: List[BacktestDecision] = []
+        # Decisions live in decisions_frame; self.decisions is materialized from it on demand
+        self.decisions_frame: Optional[pd.DataFrame] = None
+        self._decision_records: Optional[Tuple[pd.DataFrame, Tuple[BacktestDecision, ...]]] = None
         
         self._load_models()
         self._load_data()
@@ -179,6 +195,162 @@ class BacktestingEngine:
         
         return features
 
+    def build_feature_matrix(self, data: Optional[pd.DataFrame] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Build one feature row per match (features do not depend on the snapshot)
+
+        Rows sharing match_id and score get the same seeded features, so they
+        are generated once.
+
+        Returns:
+            (features: n_valid x n_features, valid: boolean mask over data rows)
+        """
+        data = self.data if data is None else data
+        cache: Dict[tuple, Optional[np.ndarray]] = {}
+        rows = []
+        valid = np.zeros(len(data), dtype=bool)
+
+        for idx, match_data in enumerate(data.to_dict("records")):
+            key = (
+                str(match_data.get("match_id", "")),
+                match_data.get("home_goals", 0),
+                match_data.get("away_goals", 0),
+            )
+            if key not in cache:
+                try:
+                    cache[key] = self._generate_simulated_features(match_data)
+                except Exception as e:
+                    logger.warning(f"Error generating features for match {match_data.get('match_id', 'unknown')}: {e}")
+                    cache[key] = None
+            if cache[key] is not None:
+                rows.append(cache[key])
+                valid[idx] = True
+
+        if not rows:
+            return np.empty((0, 0)), valid
+        return np.vstack(rows), valid
+
+    def score_features(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score a whole feature matrix with one scaler/model call
+
+        Returns:
+            (danger_scores: 0-100%, probabilities: 0-1), one value per row
+        """
+        if len(features) == 0:
+            return np.zeros(0), np.zeros(0)
+        try:
+            probabilities = self.model.predict_proba(self.scaler.transform(features))[:, 1]
+        except Exception as e:
+            logger.error(f"Error calculating danger score: {e}")
+            probabilities = np.zeros(len(features))
+        return probabilities * 100, probabilities
+
+    def simulate_decisions_frame(
+        self,
+        data: Optional[pd.DataFrame] = None,
+        intervals: Tuple[str, ...] = DEFAULT_INTERVALS,
+    ) -> pd.DataFrame:
+        """
+        Simulate every match x interval x snapshot as array operations
+
+        Same decisions, in the same order, as calling simulate_interval_decisions()
+        for each row and interval, with a single model call for the dataset.
+        """
+        data = self.data if data is None else data
+        features, valid = self.build_feature_matrix(data)
+        data = data[valid]
+        danger, probability = self.score_features(features)
+
+        n_matches = len(data)
+        minutes = np.array([INTERVAL_SNAPSHOTS.get(i, INTERVAL_SNAPSHOTS["75-90"]) for i in intervals])
+        n_intervals, n_snapshots = minutes.shape
+        shape = (n_matches, n_intervals, n_snapshots)
+
+        # Freshness decay: age from the first snapshot of the interval
+        age_seconds = (minutes - minutes[:, :1]) * 60
+        decay = np.exp(-age_seconds / FRESHNESS_TTL_SECONDS)
+        prob = np.broadcast_to(probability[:, None, None], shape)
+        confidence_fresh = prob * decay
+        positive = prob > 0
+        ratio = np.divide(confidence_fresh, prob, out=np.zeros(shape), where=positive)
+        danger_fresh = danger[:, None, None] * np.where(positive, ratio, 1)
+
+        # Thresholds
+        low_confidence = confidence_fresh < self.confidence_threshold
+        low_danger = danger_fresh < self.danger_threshold * 100
+        should_bet = ~low_confidence & ~low_danger
+
+        # Outcome and ROI
+        if "label" in data:
+            labels = data["label"].fillna(0).astype(int).to_numpy()
+        else:
+            labels = np.zeros(n_matches, dtype=int)
+        actual = np.broadcast_to(labels[:, None, None], shape)
+        scored = actual >= 1
+        correct = np.where(should_bet, scored, actual == 0)
+        roi = np.where(should_bet, np.where(scored, 1.0, -1.0), 0.0)
+
+        if "match_id" in data:
+            match_ids = data["match_id"].astype(str).to_numpy()
+        else:
+            match_ids = np.full(n_matches, "unknown", dtype=object)
+
+        frame = pd.DataFrame({
+            "match_id": np.repeat(match_ids, n_intervals * n_snapshots),
+            "interval": np.tile(np.repeat(np.array(intervals, dtype=object), n_snapshots), n_matches),
+            "timestamp": datetime.now() - pd.to_timedelta(np.tile(minutes.ravel(), n_matches), unit="m"),
+            "danger_score": np.repeat(danger, n_intervals * n_snapshots),
+            "confidence": prob.ravel(),
+            "freshness_factor": ratio.ravel(),
+            "should_bet": should_bet.ravel(),
+            "reason": self._decision_reasons(
+                confidence_fresh.ravel(), danger_fresh.ravel(),
+                low_confidence.ravel(), low_danger.ravel(),
+            ),
+            "actual_goals": actual.ravel(),
+            "correct_prediction": correct.ravel(),
+            "roi": roi.ravel(),
+        }, columns=DECISION_COLUMNS)
+        return frame
+
+    def _decision_reasons(
+        self,
+        confidence_fresh: np.ndarray,
+        danger_fresh: np.ndarray,
+        low_confidence: np.ndarray,
+        low_danger: np.ndarray,
+    ) -> np.ndarray:
+        """Reason strings, formatted only for the rejected decisions"""
+        reasons = np.full(len(confidence_fresh), "THRESHOLD_PASS", dtype=object)
+        danger_limit = f"{self.danger_threshold*100:.1f}%"
+        confidence_limit = f"{self.confidence_threshold:.1%}"
+        for idx in np.flatnonzero(low_confidence):
+            reasons[idx] = f"LOW_CONFIDENCE ({confidence_fresh[idx]:.1%} < {confidence_limit})"
+        for idx in np.flatnonzero(low_danger & ~low_confidence):
+            reasons[idx] = f"LOW_DANGER ({danger_fresh[idx]:.1f}% < {danger_limit})"
+        return reasons
+
+    @staticmethod
+    def _frame_to_decisions(frame: pd.DataFrame) -> List[BacktestDecision]:
+        """Materialize decision records from a decisions frame"""
+        return [
+            BacktestDecision(
+                match_id=row.match_id,
+                interval=row.interval,
+                timestamp=row.timestamp.to_pydatetime(),
+                danger_score=float(row.danger_score),
+                confidence=float(row.confidence),
+                freshness_factor=float(row.freshness_factor),
+                should_bet=bool(row.should_bet),
+                reason=row.reason,
+                actual_goals=int(row.actual_goals),
+                correct_prediction=bool(row.correct_prediction),
+                roi=float(row.roi),
+            )
+            for row in frame.itertuples(index=False)
+        ]
+
     def simulate_interval_decisions(
         self,
         match_data: pd.Series,
@@ -191,116 +363,44 @@ class BacktestingEngine:
             - 30-45: snapshots at 30, 35, 40 minutes
             - 75-90: snapshots at 75, 80, 85 minutes
         """
-        interval_decisions = []
-        
-        # Extract interval boundaries
-        if interval == "30-45":
-            snapshot_minutes = [30, 35, 40]
-        else:  # 75-90
-            snapshot_minutes = [75, 80, 85]
-        
-        match_id = str(match_data.get("match_id", "unknown"))
-        
-        # Determine actual goals based on label
-        label = int(match_data.get("label", 0))
-        actual_goals = label  # 1 if goal, 0 if no goal
-        
-        # Generate simulated features
-        try:
-            features = self._generate_simulated_features(match_data)
-        except Exception as e:
-            logger.warning(f"Error generating features for match {match_id}: {e}")
-            return interval_decisions
-        
-        # Generate decisions for each snapshot
-        for idx, minute in enumerate(snapshot_minutes):
-            # Calculate age from start of interval
-            interval_start = snapshot_minutes[0]
-            age_seconds = (minute - interval_start) * 60
-            
-            # Calculate danger score
-            danger_score, probability = self.calculate_danger_score(features)
-            
-            # Apply freshness decay (simulate signal aging)
-            confidence_fresh = self.apply_freshness_decay(
-                probability,
-                age_seconds,
-                ttl_seconds=300
-            )
-            
-            # Apply decay to danger score as well
-            danger_score_fresh = danger_score * (confidence_fresh / probability if probability > 0 else 1)
-            
-            # Check thresholds
-            should_bet = (
-                confidence_fresh >= self.confidence_threshold and
-                danger_score_fresh >= self.danger_threshold * 100
-            )
-            
-            # Determine reason
-            if not should_bet:
-                if confidence_fresh < self.confidence_threshold:
-                    reason = f"LOW_CONFIDENCE ({confidence_fresh:.1%} < {self.confidence_threshold:.1%})"
-                elif danger_score_fresh < self.danger_threshold * 100:
-                    reason = f"LOW_DANGER ({danger_score_fresh:.1f}% < {self.danger_threshold*100:.1f}%)"
-                else:
-                    reason = "UNKNOWN"
-            else:
-                reason = "THRESHOLD_PASS"
-            
-            # Check if prediction is correct
-            correct_prediction = (should_bet and actual_goals >= 1) or (not should_bet and actual_goals == 0)
-            
-            # Calculate ROI (simplified: +2.0x if win, -1.0x if loss)
-            if should_bet:
-                roi = 1.0 if actual_goals >= 1 else -1.0
-            else:
-                roi = 0  # No bet, no ROI
-            
-            decision = BacktestDecision(
-                match_id=match_id,
-                interval=interval,
-                timestamp=datetime.now() - timedelta(minutes=minute),
-                danger_score=danger_score,
-                confidence=probability,
-                freshness_factor=confidence_fresh / probability if probability > 0 else 0,
-                should_bet=should_bet,
-                reason=reason,
-                actual_goals=actual_goals,
-                correct_prediction=correct_prediction,
-                roi=roi
-            )
-            
-            interval_decisions.append(decision)
-        
-        return interval_decisions
+        frame = self.simulate_decisions_frame(pd.DataFrame([match_data]), intervals=(interval,))
+        return self._frame_to_decisions(frame)
 
-    def backtest_all_matches(self) -> List[BacktestDecision]:
-        """Backtest all matches in historical data"""
+    def backtest_all_matches(self) -> pd.DataFrame:
+        """Backtest all matches in historical data (one row per decision, DECISION_COLUMNS)"""
         logger.info(f"Starting backtesting on {len(self.data)} matches...")
         
-        all_decisions = []
+        self.decisions_frame = self.simulate_decisions_frame()
+        logger.info(f"✅ Backtesting complete: {len(self.decisions_frame)} decisions")
         
-        for idx, (_, match_data) in enumerate(self.data.iterrows()):
-            if idx % 50 == 0:
-                logger.info(f"Processing match {idx}/{len(self.data)}")
-            
-            # Simulate both intervals for each match
-            for interval in ["30-45", "75-90"]:
-                interval_decisions = self.simulate_interval_decisions(match_data, interval)
-                all_decisions.extend(interval_decisions)
-        
-        self.decisions = all_decisions
-        logger.info(f"✅ Backtesting complete: {len(all_decisions)} decisions")
-        
-        return all_decisions
+        return self.decisions_frame
+
+    @property
+    def decisions(self) -> Tuple[BacktestDecision, ...]:
+        """Decision records of decisions_frame, built on first access (read-only: assign to replace)"""
+        frame = self.decisions_frame
+        if frame is None:
+            return ()
+        if self._decision_records is None or self._decision_records[0] is not frame:
+            self._decision_records = (frame, tuple(self._frame_to_decisions(frame)))
+        return self._decision_records[1]
+
+    @decisions.setter
+    def decisions(self, decisions: Sequence[BacktestDecision]):
+        """Replace the decisions: decisions_frame is rebuilt from the records"""
+        records = tuple(decisions)
+        self.decisions_frame = pd.DataFrame([asdict(d) for d in records], columns=DECISION_COLUMNS)
+        self._decision_records = (self.decisions_frame, records)
+
+    def _has_decisions(self) -> bool:
+        return self.decisions_frame is not None and not self.decisions_frame.empty
 
     def calculate_metrics(self) -> BacktestMetrics:
         """Calculate performance metrics from decisions"""
-        if not self.decisions:
+        if not self._has_decisions():
             raise ValueError("No decisions to analyze. Run backtest_all_matches() first.")
         
-        df = pd.DataFrame([asdict(d) for d in self.decisions])
+        df = self.decisions_frame
         
         # Basic metrics
         total_decisions = len(df)
@@ -351,11 +451,20 @@ class BacktestingEngine:
 
     def export_decisions_csv(self, output_path: str = "backtesting_decisions.csv"):
         """Export all decisions to CSV for analysis"""
-        if not self.decisions:
+        if not self._has_decisions():
+            raise ValueError("No decisions to export.")
+        
+        self.decisions_frame.to_csv(output_path, index=False)
+        logger.info(f"✅ Decisions exported to {output_path}")
+        
+        return output_path
+
+    def export_decisions_json(self, output_path: str = "backtesting_decisions.json"):
+        """Export all decisions to JSON (one record per decision)"""
+        if not self._has_decisions():
             raise ValueError("No decisions to export.")
         
-        df = pd.DataFrame([asdict(d) for d in self.decisions])
-        df.to_csv(output_path, index=False)
+        self.decisions_frame.to_json(output_path, orient="records", date_format="iso", indent=2)
         logger.info(f"✅ Decisions exported to {output_path}")
         
         return output_path
@@ -23,6 +23,7 @@ from live_predictor_v2 import LivePredictorV2, LiveMatchContext
 try:
     sys.path.insert(0, '/workspaces/paris-live')
     from telegram_notifier import TelegramNotifier
+    from telegram_queue import get_queue
     from telegram_config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, ALERTS_ENABLED, ALERT_THRESHOLD_COMBINED, ALERT_THRESHOLD_SINGLE
     TELEGRAM_AVAILABLE = True
 except ImportError:
@@ -50,12 +51,17 @@ class BoliviaLiveMonitor:
     # Intervalle de scan (secondes)
     SCAN_INTERVAL = 30
     
+    # Vérification de la version des patterns (secondes)
+    PATTERN_REFRESH_SECONDS = 300
+    
     # Intervalles critiques
     CRITICAL_INTERVALS = [(31, 45), (75, 90)]
     
     def __init__(self, db_path='data/predictions.db'):
         self.scraper = SoccerStatsLiveScraper(throttle_seconds=5)
-        self.predictor = LivePredictorV2(db_path=db_path)
+        # Patterns préchargés en mémoire, rechargés si team_critical_intervals est reconstruite
+        self.predictor = LivePredictorV2(db_path=db_path, preload=True)
+        self.predictor.patterns.watch(self.PATTERN_REFRESH_SECONDS)
         self.monitored_matches = {}  # match_url -> last_alert_minute
         
         # Initialiser Telegram si disponible
@@ -363,6 +369,9 @@ class BoliviaLiveMonitor:
             logger.info("\n\n⏹️ Monitoring arrêté par l'utilisateur")
         except Exception as e:
             logger.error(f"❌ Erreur monitoring: {e}", exc_info=True)
+        finally:
+            if self.telegram:
+                get_queue().stop(timeout=30)  # envoyer les alertes encore en file avant de quitter
 
 
 def main():
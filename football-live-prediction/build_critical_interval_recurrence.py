@@ -12,11 +12,16 @@ For each team + home/away context:
 - Average minute of goals
 """
 
+import os
 import sqlite3
+import sys
 import logging
 from collections import defaultdict
 import numpy as np
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'CLEAN_WORKFLOW'))
+import goal_storage
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
@@ -35,19 +40,24 @@ class CriticalIntervalRecurrence:
         self.league = league
         self.conn = sqlite3.connect(db_path)
         self.cursor = self.conn.cursor()
+        # Minutes packées (BLOB uint8) si la migration goal_storage a été appliquée, JSON sinon
+        self.goal_columns = goal_storage.select_goal_columns(self.conn)
         
     def close(self):
         """Close database connection."""
         self.conn.close()
     
     def _parse_goal_times(self, goal_times_str):
-        """Parse goal times from string format 'min1,min2,min3' or JSON '[min1,min2,min3]'
+        """Parse goal times from string format 'min1,min2,min3', JSON '[min1,min2,min3]' or packed uint8 BLOB
         
         IMPORTANT: Filtre les zéros (padding) pour obtenir seulement les buts réels.
         Exemple: '[12, 0, 0, 0, 0, 0, 0, 0, 0, 0]' → [12] (1 seul but)
         """
         if not goal_times_str:
             return []
+        # Format colonnaire : une minute par octet, sans padding
+        if isinstance(goal_times_str, (bytes, memoryview)):
+            return [t for t in bytes(goal_times_str) if t > 0]
         try:
             # Supporter format JSON "[13,24,50]"
             if goal_times_str.startswith('['):
@@ -89,8 +99,8 @@ class CriticalIntervalRecurrence:
             total_goals_full.append((goals_for or 0) + (goals_against or 0))
         
         # Pour calculer moyennes par mi-temps, on doit utiliser goal_times
-        query2 = '''
-            SELECT goal_times, goal_times_conceded
+        query2 = f'''
+            SELECT {self.goal_columns}
             FROM soccerstats_scraped_matches
             WHERE team = ? AND is_home = ?
         '''
@@ -189,7 +199,7 @@ class CriticalIntervalRecurrence:
         })
         
         # Récupérer tous les matchs (filtrer par country/league si spécifié)
-        query = '''
+        query = f'''
             SELECT 
                 id,
                 country,
@@ -197,8 +207,7 @@ class CriticalIntervalRecurrence:
                 team,
                 opponent,
                 is_home,
-                goal_times,
-                goal_times_conceded,
+                {self.goal_columns},
                 goals_for,
                 goals_against,
                 match_id,
@@ -19,10 +19,12 @@ from dataclasses import dataclass
 
 sys.path.insert(0, 'scrapers')
 sys.path.insert(0, 'predictors')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # telegram_queue
 
 from soccerstats_live import SoccerStatsLiveScraper
 from recurrence_predictor import RecurrencePredictor
 from loguru import logger
+from telegram_queue import get_queue
 
 
 @dataclass
@@ -280,16 +282,16 @@ class ContinuousLiveMonitor:
         except Exception as e:
             logger.error(f"Error in monitoring loop: {e}")
         finally:
+            if self.telegram_token and self.telegram_chat_id:
+                get_queue().stop(timeout=30)  # deliver queued alerts before exiting
             self._print_summary()
 
     def _send_telegram_alert(self, signal: BettingSignal):
-        """Send Telegram alert for high danger signal"""
+        """Queue a Telegram alert for a high danger signal (sent by the background delivery queue)"""
         if not self.telegram_token or not self.telegram_chat_id:
             return
 
         try:
-            import requests
-
             message = f"""
 🎯 BETTING SIGNAL ALERT
 
@@ -302,18 +304,11 @@ Action: PARIER (High Confidence)
 Time: {signal.timestamp.strftime('%H:%M:%S')}
             """.strip()
 
-            url = f"https://api.telegram.org/bot{self.telegram_token}/sendMessage"
-            params = {
-                'chat_id': self.telegram_chat_id,
-                'text': message,
-                'parse_mode': 'HTML'
-            }
-
-            response = requests.post(url, params=params, timeout=10)
-            if response.status_code == 200:
-                logger.success(f"✅ Telegram alert sent for {signal.match_id}")
-            else:
-                logger.warning(f"Failed to send Telegram alert: {response.status_code}")
+            # Only the newest update per match and interval is sent
+            interval = "31-45" if signal.minute <= 45 else "76-90"
+            get_queue().enqueue(self.telegram_token, self.telegram_chat_id, message,
+                                key=(signal.match_id, interval))
+            logger.info(f"📱 Telegram alert queued for {signal.match_id}")
         except Exception as e:
             logger.error(f"Error sending Telegram alert: {e}")
 
@@ -17,9 +17,11 @@ Features:
 
 import numpy as np
 from dataclasses import dataclass
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Union
 import logging
 
+from snapshot_store import MatchSeries, series_deltas, series_saturation
+
 logger = logging.getLogger(__name__)
 
 
@@ -120,7 +122,7 @@ class FeatureExtractor:
     
     def extract_deltas(
         self,
-        snapshots: List,  # from SnapshotCache.snapshots
+        snapshots: Union[List, MatchSeries],  # SnapshotCache.series (O(1)) or a snapshot list
         window_sec: float = 300  # 5 minutes
     ) -> Dict:
         """
@@ -129,6 +131,8 @@ class FeatureExtractor:
         Returns dict with keys like:
           shots_delta_home, sot_delta_home, corners_delta_home, etc.
         """
+        if isinstance(snapshots, MatchSeries):
+            return series_deltas(snapshots, window_sec)
         if len(snapshots) < 2:
             return {
                 'shots_delta_home': 0, 'shots_delta_away': 0,
@@ -163,7 +167,7 @@ class FeatureExtractor:
     
     def extract_saturation_score(
         self,
-        snapshots: List,
+        snapshots: Union[List, MatchSeries],
         window_sec: float = 600  # 10 minutes
     ) -> float:
         """
@@ -172,6 +176,8 @@ class FeatureExtractor:
         
         Returns: float 0-100 (rough score)
         """
+        if isinstance(snapshots, MatchSeries):
+            return series_saturation(snapshots, window_sec)
         if len(snapshots) < 2:
             return 0.0
         
@@ -198,7 +204,7 @@ class FeatureExtractor:
     def extract_features(
         self,
         current_stats,  # MatchStats object
-        snapshots: List,  # from SnapshotCache
+        snapshots: Union[List, MatchSeries],  # SnapshotCache.series or snapshot list
         home_team: str,
         away_team: str,
     ) -> FeatureVector:
@@ -207,7 +213,7 @@ class FeatureExtractor:
         
         Args:
             current_stats: MatchStats object (current snapshot)
-            snapshots: List of historical MatchStats snapshots
+            snapshots: Match series from the snapshot store (O(1) windows) or list of MatchStats snapshots
             home_team: Home team name (for Elo lookup)
             away_team: Away team name (for Elo lookup)
         
@@ -12,6 +12,8 @@ from dataclasses import dataclass, asdict
 from typing import Dict, Optional, List
 from datetime import datetime
 
+from snapshot_store import SnapshotStore, get_store
+
 try:
     from playwright.async_api import async_playwright, Page, Browser
 except ImportError:
@@ -56,41 +58,39 @@ class MatchStats:
 
 
 class SnapshotCache:
-    """Rolling window cache for delta calculations."""
+    """
+    Rolling window of one match's snapshots, backed by the shared SnapshotStore
+    (ring buffer + array columns: windowed deltas are O(1), history survives restarts if persisted).
+    """
     
-    def __init__(self, match_id: str, max_snapshots: int = 20):
+    def __init__(self, match_id: str, max_snapshots: int = 20, store: Optional[SnapshotStore] = None):
         self.match_id = match_id
         self.max_snapshots = max_snapshots
-        self.snapshots: List[MatchStats] = []
+        self.store = store or get_store()
+        self.store.get(match_id, capacity=max_snapshots)
+
+    @property
+    def series(self):
+        """Current series of the match (recreated, or reloaded if persisted, after an eviction)."""
+        return self.store.get(self.match_id, capacity=self.max_snapshots)
+    
+    @property
+    def snapshots(self) -> List[MatchStats]:
+        """Snapshots currently kept, oldest first (rebuilt from the columns)."""
+        return self.series.snapshots()
     
     def append(self, stats: MatchStats):
         """Add snapshot to cache, keep only most recent N."""
-        self.snapshots.append(stats)
-        if len(self.snapshots) > self.max_snapshots:
-            self.snapshots.pop(0)
-        logger.debug(f"[{self.match_id}] Snapshot cache: {len(self.snapshots)} entries")
+        self.store.append(self.match_id, stats)
+        logger.debug(f"[{self.match_id}] Snapshot cache: {len(self.series)} entries")
     
     def get_momentum(self, window_sec: float = 300) -> Optional[Dict]:
         """Calculate deltas over last window_sec seconds."""
-        if len(self.snapshots) < 2:
-            return None
-        
-        now = time.time()
-        recent = [s for s in self.snapshots if now - s.timestamp <= window_sec]
-        
-        if len(recent) < 2:
-            return None
-        
-        first, last = recent[0], recent[-1]
-        
-        deltas = {}
-        for key in ['shots_home', 'shots_away', 'sot_home', 'sot_away', 'corners_home', 'corners_away']:
-            val_first = getattr(first, key, None)
-            val_last = getattr(last, key, None)
-            if val_first is not None and val_last is not None:
-                deltas[f'{key}_delta'] = val_last - val_first
-        
-        return deltas if deltas else None
+        return self.store.momentum(self.match_id, window_sec)
+
+    def release(self):
+        """Free the match's in-memory series (persisted snapshots are kept)."""
+        self.store.drop(self.match_id)
 
 
 class HeadlessMatchParser:
@@ -199,13 +199,14 @@ class HeadlessMatchParser:
     })();
     """
     
-    def __init__(self, match_id: str, match_url: str, interval_sec: float = 45):
+    def __init__(self, match_id: str, match_url: str, interval_sec: float = 45,
+                 store: Optional[SnapshotStore] = None):
         self.match_id = match_id
         self.match_url = match_url
         self.interval_sec = interval_sec
         self.browser: Optional[Browser] = None
         self.page: Optional[Page] = None
-        self.cache = SnapshotCache(match_id)
+        self.cache = SnapshotCache(match_id, store=store)
         self.last_valid_stats: Optional[MatchStats] = None
         self.health_check_interval = 300  # 5 minutes
     
@@ -392,6 +393,7 @@ class HeadlessMatchParser:
             logger.error(f"[{self.match_id}] Fatal error: {e}", exc_info=True)
         
         finally:
+            self.cache.release()
             if self.browser:
                 await self.browser.close()
                 logger.info(f"[{self.match_id}] Browser closed")
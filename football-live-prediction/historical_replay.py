@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+Minute-by-minute historical replay backtester.
+
+Streams soccerstats_scraped_matches once, rebuilds the score of every match at
+each minute of a configurable grid from the goal-time lists, and evaluates a
+live predictor on those states:
+
+    goal_probability  LiveGoalProbabilityPredictor.predict_batch (intervals 31-45 / 76-90)
+    v2                LivePredictorV2.predict, combined_active (intervals 31-45+ / 75-90+)
+
+The pattern index is built once in the parent process (team recurrences for
+goal_probability, a PatternMap for v2) and shared read-only with a process pool;
+each worker replays a chunk of matches with no database access and returns
+aggregated counters. The report gives per-interval hit rates, Brier score,
+log-loss, calibration bins and flat-odds ROI.
+
+With --as-of (goal_probability only), team recurrences come from
+asof_recurrence.AsOfRecurrence: each match only sees the matches played before
+it, instead of the whole table including its own result.
+
+Historical rows carry no live stats (possession, shots...). goal_probability
+states are fed NEUTRAL_LIVE_STATS, which give a live factor of 1.0 for
+possession, dangerous attacks and shots on target (passing None would turn the
+dangerous-attacks factor into 0 and pin every prediction to 0.8 x base rate):
+only the score driven factors (saturation, score differential) vary during the
+replay.
+
+Usage:
+    python3 historical_replay.py --model goal_probability --workers 8
+    python3 historical_replay.py --model goal_probability --as-of
+    python3 historical_replay.py --model v2 --leagues france germany --minutes 31-45 75-90 --step 5
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from asof_recurrence import AsOfRecurrence
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MODELS = ("goal_probability", "v2")
+DEFAULT_MINUTES = tuple(range(31, 46)) + tuple(range(76, 91))
+DEFAULT_THRESHOLD = 0.65  # alert threshold of the live monitors
+DEFAULT_ODDS = 2.0  # flat decimal odds (even money), as in backtesting_engine
+CALIBRATION_BINS = 10
+CHUNK_SIZE = 500
+
+# Missing possession / shots give a factor of 1.0, but missing dangerous attacks give
+# min(1.5, 2 * 0) = 0: a dangerous / total ratio of 0.5 is the neutral value (factor 1.0)
+NEUTRAL_LIVE_STATS = {
+    "home_possession": None, "away_possession": None,
+    "home_attacks": 2, "away_attacks": 2,
+    "home_dangerous_attacks": 1, "away_dangerous_attacks": 1,
+    "home_shots_on_target": None, "away_shots_on_target": None,
+}
+
+# Last minute of each predicted interval (stoppage goals are recorded as 45 / 90)
+INTERVAL_END = {
+    "31-45": 45,
+    "76-90": 90,
+    "31-45+": 45,
+    "75-90+": 90,
+}
+
+
+@dataclass(frozen=True)
+class ReplayMatch:
+    """One historical match, seen from the home side"""
+    league: str
+    country: str
+    date: str
+    home_team: str
+    away_team: str
+    home_goals: Tuple[int, ...]  # sorted goal minutes
+    away_goals: Tuple[int, ...]
+
+    @property
+    def fixture(self) -> Tuple[str, str, str, str]:
+        return (self.league, self.date, self.home_team, self.away_team)
+
+
+def _parse_goal_times(value: Optional[str]) -> Tuple[int, ...]:
+    """'[9, 51, 0, 0]' -> (9, 51) (zeros are padding)"""
+    if not value:
+        return ()
+    try:
+        minutes = json.loads(value)
+    except ValueError:
+        minutes = [x.strip() for x in value.strip("[]").split(",")]
+    try:
+        return tuple(sorted(int(m) for m in minutes if m and int(m) > 0))
+    except (TypeError, ValueError):
+        return ()
+
+
+def load_matches(db_path: str, leagues: Optional[Sequence[str]] = None) -> List[ReplayMatch]:
+    """
+    Stream soccerstats_scraped_matches once and return one ReplayMatch per fixture
+
+    Each fixture is stored twice (once per team); the first row seen wins, both
+    carry the same goal minutes.
+    """
+    query = """
+        SELECT league, country, date, team, opponent, is_home, goal_times, goal_times_conceded
+        FROM soccerstats_scraped_matches
+    """
+    params: List[str] = []
+    if leagues:
+        query += f" WHERE league IN ({', '.join('?' * len(leagues))})"
+        params.extend(leagues)
+    query += " ORDER BY id"
+
+    matches, seen = [], set()
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        for league, country, date, team, opponent, is_home, goals_for, goals_against in conn.execute(query, params):
+            if is_home:
+                home, away, home_goals, away_goals = team, opponent, goals_for, goals_against
+            else:
+                home, away, home_goals, away_goals = opponent, team, goals_against, goals_for
+            key = (league, date, home, away)
+            if key in seen:
+                continue
+            seen.add(key)
+            matches.append(ReplayMatch(
+                league=league, country=country or "", date=date or "",
+                home_team=home, away_team=away,
+                home_goals=_parse_goal_times(home_goals),
+                away_goals=_parse_goal_times(away_goals),
+            ))
+    finally:
+        conn.close()
+    return matches
+
+
+def score_states(match: ReplayMatch, minutes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Score (home, away) at the start of each minute: goals strictly before it"""
+    home = np.searchsorted(np.asarray(match.home_goals, dtype=int), minutes, side="left")
+    away = np.searchsorted(np.asarray(match.away_goals, dtype=int), minutes, side="left")
+    return home, away
+
+
+def goal_in_window(match: ReplayMatch, minutes: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """True where at least one goal falls in [minute, end]"""
+    goals = np.sort(np.asarray(match.home_goals + match.away_goals, dtype=int))
+    before_end = np.searchsorted(goals, ends, side="right")
+    before_start = np.searchsorted(goals, minutes, side="left")
+    return before_end > before_start
+
+
+# ---------------------------------------------------------------------- report
+
+
+@dataclass
+class IntervalStats:
+    """Counters of one predicted interval (mergeable across workers)"""
+    predictions: int = 0
+    goals: int = 0
+    bets: int = 0
+    bet_hits: int = 0
+    probability_sum: float = 0.0
+    brier_sum: float = 0.0
+    log_loss_sum: float = 0.0
+    bin_count: np.ndarray = field(default_factory=lambda: np.zeros(CALIBRATION_BINS, dtype=int))
+    bin_probability: np.ndarray = field(default_factory=lambda: np.zeros(CALIBRATION_BINS))
+    bin_goals: np.ndarray = field(default_factory=lambda: np.zeros(CALIBRATION_BINS, dtype=int))
+
+    def add(self, probabilities: np.ndarray, outcomes: np.ndarray, threshold: float):
+        p = np.clip(probabilities, 1e-6, 1 - 1e-6)
+        y = outcomes.astype(float)
+        bets = probabilities >= threshold
+        self.predictions += len(probabilities)
+        self.goals += int(outcomes.sum())
+        self.bets += int(bets.sum())
+        self.bet_hits += int((bets & outcomes).sum())
+        self.probability_sum += float(probabilities.sum())
+        self.brier_sum += float(((probabilities - y) ** 2).sum())
+        self.log_loss_sum += float(-(y * np.log(p) + (1 - y) * np.log(1 - p)).sum())
+        bins = np.minimum((probabilities * CALIBRATION_BINS).astype(int), CALIBRATION_BINS - 1)
+        self.bin_count += np.bincount(bins, minlength=CALIBRATION_BINS)
+        self.bin_probability += np.bincount(bins, weights=probabilities, minlength=CALIBRATION_BINS)
+        self.bin_goals += np.bincount(bins, weights=outcomes, minlength=CALIBRATION_BINS).astype(int)
+
+    def merge(self, other: "IntervalStats"):
+        self.predictions += other.predictions
+        self.goals += other.goals
+        self.bets += other.bets
+        self.bet_hits += other.bet_hits
+        self.probability_sum += other.probability_sum
+        self.brier_sum += other.brier_sum
+        self.log_loss_sum += other.log_loss_sum
+        self.bin_count += other.bin_count
+        self.bin_probability += other.bin_probability
+        self.bin_goals += other.bin_goals
+
+    def summary(self, odds: float) -> Dict:
+        n = self.predictions
+        profit = self.bet_hits * (odds - 1) - (self.bets - self.bet_hits)
+        calibration = [
+            {
+                "bin": f"{i / CALIBRATION_BINS:.1f}-{(i + 1) / CALIBRATION_BINS:.1f}",
+                "count": int(self.bin_count[i]),
+                "mean_probability": float(self.bin_probability[i] / self.bin_count[i]),
+                "goal_rate": float(self.bin_goals[i] / self.bin_count[i]),
+            }
+            for i in range(CALIBRATION_BINS) if self.bin_count[i]
+        ]
+        return {
+            "predictions": n,
+            "goal_rate": self.goals / n if n else 0.0,
+            "mean_probability": self.probability_sum / n if n else 0.0,
+            "bets": self.bets,
+            "hits": self.bet_hits,
+            "hit_rate": self.bet_hits / self.bets if self.bets else 0.0,
+            "roi": profit / self.bets if self.bets else 0.0,
+            "brier": self.brier_sum / n if n else 0.0,
+            "log_loss": self.log_loss_sum / n if n else 0.0,
+            "calibration": calibration,
+        }
+
+
+@dataclass
+class ReplayReport:
+    """Per-interval results of a replay"""
+    model: str
+    threshold: float
+    odds: float
+    as_of: bool = False
+    matches: int = 0
+    seconds: float = 0.0
+    by_interval: Dict[str, IntervalStats] = field(default_factory=dict)
+
+    def merge(self, by_interval: Dict[str, IntervalStats]):
+        for name, stats in by_interval.items():
+            self.by_interval.setdefault(name, IntervalStats()).merge(stats)
+
+    def to_dict(self) -> Dict:
+        return {
+            "model": self.model,
+            "threshold": self.threshold,
+            "odds": self.odds,
+            "as_of": self.as_of,
+            "matches": self.matches,
+            "seconds": round(self.seconds, 2),
+            "by_interval": {name: stats.summary(self.odds) for name, stats in sorted(self.by_interval.items())},
+        }
+
+
+# ---------------------------------------------------------------------- models
+
+# Read-only state of the worker processes (inherited by fork, or set by _init_worker)
+_shared: Dict = {}
+
+
+def build_pattern_index(model: str, db_path: str, matches: Sequence[ReplayMatch], as_of: bool = False,
+                        leagues: Optional[Sequence[str]] = None):
+    """
+    Pattern index shared with the workers: recurrence cache (goal_probability),
+    AsOfRecurrence (goal_probability, as_of) or PatternMap (v2)
+    """
+    if as_of:
+        return AsOfRecurrence.build(db_path, leagues)
+    if model == "v2":
+        from pattern_map import PatternMap
+        return PatternMap(db_path).load()
+    from predictors.live_goal_probability_predictor import LiveGoalProbabilityPredictor
+    predictor = LiveGoalProbabilityPredictor(db_path=db_path, cache_size=0)
+    keys = []
+    for match in matches:
+        for interval_name in ("31-45", "76-90"):
+            keys.append((match.league, match.home_team, interval_name, True))
+            keys.append((match.league, match.away_team, interval_name, False))
+    predictor._resolve_recurrences(keys)
+    return predictor._patterns_cache
+
+
+def make_predictor(model: str, db_path: str, pattern_index):
+    """Predictor reading only the shared pattern index (no per-prediction SQL)"""
+    if model == "v2":
+        from live_predictor_v2 import LivePredictorV2
+        return LivePredictorV2(db_path, pattern_map=pattern_index, cache_size=0)
+    from predictors.live_goal_probability_predictor import LiveGoalProbabilityPredictor
+    predictor = LiveGoalProbabilityPredictor(db_path=db_path, cache_size=0)
+    if not isinstance(pattern_index, AsOfRecurrence):
+        predictor._patterns_cache = pattern_index
+    return predictor
+
+
+def replay_states(match: ReplayMatch, minutes: np.ndarray, home: np.ndarray, away: np.ndarray) -> List[Dict]:
+    """Inputs of LiveGoalProbabilityPredictor.predict_batch for each minute (neutral live stats)"""
+    return [
+        {
+            "home_team": match.home_team, "away_team": match.away_team, "current_minute": int(minute),
+            **NEUTRAL_LIVE_STATS,
+            "score_home": int(home[i]), "score_away": int(away[i]), "league": match.league,
+        }
+        for i, minute in enumerate(minutes)
+    ]
+
+
+def predict_states(model: str, predictor, match: ReplayMatch, minutes: np.ndarray,
+                   home: np.ndarray, away: np.ndarray) -> Tuple[List[Optional[str]], np.ndarray]:
+    """(interval name or None outside the predicted intervals, probability 0-1) for each minute"""
+    if model == "v2":
+        from live_predictor_v2 import LiveMatchContext
+        intervals, probabilities = [], np.zeros(len(minutes))
+        for i, minute in enumerate(minutes):
+            predictions = predictor.predict(LiveMatchContext(
+                home_team=match.home_team, away_team=match.away_team, current_minute=int(minute),
+                home_score=int(home[i]), away_score=int(away[i]),
+                country=match.country or "Bulgaria", league=match.league,
+            ))
+            combined = predictions.get("combined_active")
+            intervals.append(combined["interval"] if combined else None)
+            probabilities[i] = combined["probability"] if combined else 0.0
+        return intervals, probabilities
+
+    results = predictor.predict_batch(replay_states(match, minutes, home, away))
+    intervals = [r["details"]["interval"] if r["details"]["interval"] in INTERVAL_END else None for r in results]
+    return intervals, np.array([r["details"]["final_probability"] for r in results])
+
+
+def replay_chunk(matches: Sequence[ReplayMatch], model: str, db_path: str, pattern_index,
+                 minutes: Sequence[int], threshold: float) -> Dict[str, IntervalStats]:
+    """Replay a chunk of matches and return the per-interval counters"""
+    predictor = make_predictor(model, db_path, pattern_index)
+    grid = np.asarray(minutes, dtype=int)
+    by_interval: Dict[str, IntervalStats] = {}
+    try:
+        for match in matches:
+            home, away = score_states(match, grid)
+            if isinstance(pattern_index, AsOfRecurrence):
+                predictor._patterns_cache = pattern_index.patterns_cache(match.fixture)
+            intervals, probabilities = predict_states(model, predictor, match, grid, home, away)
+            names = np.array([name or "" for name in intervals], dtype=object)
+            for name in set(intervals) - {None}:
+                # stoppage goals are recorded at the interval end: later minutes cannot be scored
+                mask = (names == name) & (grid <= INTERVAL_END[name])
+                if not mask.any():
+                    continue
+                ends = np.full(mask.sum(), INTERVAL_END[name])
+                outcomes = goal_in_window(match, grid[mask], ends)
+                by_interval.setdefault(name, IntervalStats()).add(probabilities[mask], outcomes, threshold)
+    finally:
+        if model == "v2":
+            predictor.close()
+    return by_interval
+
+
+def _init_worker(model: str, db_path: str, pattern_index):
+    _shared.update(model=model, db_path=db_path, pattern_index=pattern_index)
+
+
+def _replay_worker(matches: Sequence[ReplayMatch], minutes: Sequence[int], threshold: float) -> Dict[str, IntervalStats]:
+    return replay_chunk(matches, _shared["model"], _shared["db_path"], _shared["pattern_index"], minutes, threshold)
+
+
+def run_replay(
+    db_path: str = "data/predictions.db",
+    model: str = "goal_probability",
+    minutes: Iterable[int] = DEFAULT_MINUTES,
+    leagues: Optional[Sequence[str]] = None,
+    threshold: float = DEFAULT_THRESHOLD,
+    odds: float = DEFAULT_ODDS,
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    as_of: bool = False,
+) -> ReplayReport:
+    """
+    Replay every historical match on the minute grid
+
+    Args:
+        db_path: Database with soccerstats_scraped_matches
+        model: "goal_probability" or "v2"
+        minutes: Minutes at which the predictor is evaluated
+        leagues: Leagues to replay (all when None)
+        threshold: Probability (0-1) from which a bet is placed
+        odds: Flat decimal odds used for ROI
+        workers: Worker processes (None = CPU count, 0 or 1 = in-process)
+        chunk_size: Matches per worker task
+        as_of: Team recurrences from earlier matches only (goal_probability)
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unknown model {model!r} (expected one of {MODELS})")
+    if as_of and model != "goal_probability":
+        raise ValueError("as_of is only available for the goal_probability model")
+    started = time.perf_counter()
+    minutes = sorted(set(int(m) for m in minutes))
+    report = ReplayReport(model=model, threshold=threshold, odds=odds, as_of=as_of)
+
+    matches = load_matches(db_path, leagues)
+    report.matches = len(matches)
+    pattern_index = build_pattern_index(model, db_path, matches, as_of, leagues)
+    logger.info(f"Replaying {len(matches)} matches x {len(minutes)} minutes ({model})")
+
+    chunks = [matches[i:i + chunk_size] for i in range(0, len(matches), chunk_size)]
+    workers = os.cpu_count() if workers is None else workers
+    if workers <= 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            report.merge(replay_chunk(chunk, model, db_path, pattern_index, minutes, threshold))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_init_worker,
+                                 initargs=(model, db_path, pattern_index)) as pool:
+            for by_interval in pool.map(_replay_worker, chunks, [minutes] * len(chunks),
+                                        [threshold] * len(chunks)):
+                report.merge(by_interval)
+
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def _parse_minutes(specs: Sequence[str], step: int) -> List[int]:
+    """['31-45', '80'] -> [31, 31+step, ..., 45, 80]"""
+    minutes = []
+    for spec in specs:
+        if "-" in spec:
+            start, end = (int(x) for x in spec.split("-", 1))
+            minutes.extend(range(start, end + 1, step))
+        else:
+            minutes.append(int(spec))
+    return minutes
+
+
+def print_report(report: ReplayReport):
+    data = report.to_dict()
+    print("\n" + "=" * 80)
+    print(f"📊 HISTORICAL REPLAY - {data['model']} ({data['matches']} matches, {data['seconds']:.1f}s)")
+    print("=" * 80)
+    print(f"Bet threshold: {data['threshold']:.0%} | Odds: {data['odds']:.2f} | "
+          f"Recurrences: {'as of each match' if data['as_of'] else 'full table'}")
+    for name, stats in data["by_interval"].items():
+        print(f"\n{name}: {stats['predictions']} predictions, goal rate {stats['goal_rate']:.1%}, "
+              f"mean probability {stats['mean_probability']:.1%}")
+        print(f"  Bets: {stats['bets']} | Hit rate: {stats['hit_rate']:.1%} | ROI: {stats['roi']:+.1%}")
+        print(f"  Brier: {stats['brier']:.4f} | Log-loss: {stats['log_loss']:.4f}")
+        for row in stats["calibration"]:
+            print(f"    {row['bin']}: {row['count']:6d}  predicted {row['mean_probability']:.1%}"
+                  f"  observed {row['goal_rate']:.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minute-by-minute historical replay backtest")
+    parser.add_argument("--db", default="data/predictions.db")
+    parser.add_argument("--model", choices=MODELS, default="goal_probability")
+    parser.add_argument("--leagues", nargs="*", help="Leagues to replay (default: all)")
+    parser.add_argument("--minutes", nargs="*", default=["31-45", "76-90"],
+                        help="Minute ranges or single minutes (default: 31-45 76-90)")
+    parser.add_argument("--step", type=int, default=1, help="Step inside minute ranges")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--odds", type=float, default=DEFAULT_ODDS)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--as-of", action="store_true",
+                        help="Leak-free team recurrences (earlier matches only, goal_probability)")
+    parser.add_argument("--output", default="historical_replay_results.json")
+    args = parser.parse_args()
+
+    report = run_replay(
+        db_path=args.db, model=args.model, minutes=_parse_minutes(args.minutes, args.step),
+        leagues=args.leagues, threshold=args.threshold, odds=args.odds, workers=args.workers,
+        as_of=args.as_of,
+    )
+    print_report(report)
+    with open(args.output, "w") as f:
+        json.dump(report.to_dict(), f, indent=2)
+    print(f"\n✅ Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
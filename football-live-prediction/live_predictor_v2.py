@@ -4,11 +4,15 @@ Prédicteur live v2 - Optimisé avec métriques any_goal, récurrence_last_5 et
 Prédit la probabilité qu'AU MOINS 1 BUT soit marqué dans l'intervalle critique.
 """
 
+import copy
 import sqlite3
+import time
 from dataclasses import dataclass
 from typing import Optional, Dict, Tuple
 import logging
 
+from prediction_cache import PredictionCache, memoize_prediction
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -79,8 +83,16 @@ class LivePredictorV2:
     
     INTERVAL_1 = (31, 45, "31-45+")
     INTERVAL_2 = (75, 90, "75-90+")
+    PATTERN_VERSION_TTL = 30.0  # secondes : en mode SQL, version de la table relue au plus une fois par TTL
     
-    def __init__(self, db_path=None):
+    def __init__(self, db_path=None, preload: bool = False, pattern_map=None, cache_size: int = 512):
+        """
+        Args:
+            db_path: Base contenant team_critical_intervals (défaut: data/predictions.db)
+            preload: Précharger tous les patterns en mémoire (aucune requête SQL par prédiction)
+            pattern_map: PatternMap déjà chargée à partager (implique preload)
+            cache_size: Prédictions mémorisées quand le contexte live est inchangé (0 = désactivé)
+        """
         import os
         if db_path is None:
             # Toujours chercher la base relativement au dossier du script
@@ -89,11 +101,32 @@ class LivePredictorV2:
         self.db_path = db_path
         self.conn = sqlite3.connect(db_path)
         self.cursor = self.conn.cursor()
+        self.patterns = pattern_map
+        if self.patterns is None and preload:
+            from pattern_map import get_pattern_map
+            self.patterns = get_pattern_map(db_path)
+        self.prediction_cache = PredictionCache(cache_size)
+        self._table_version: Optional[tuple] = None
+        self._table_version_expires = 0.0
     
     def close(self):
         """Fermer connexion DB."""
         self.conn.close()
     
+    def _patterns_version(self) -> Optional[tuple]:
+        """
+        Version des patterns pour le cache de prédictions : carte chargée, sinon table interrogée
+        (au plus une fois par PATTERN_VERSION_TTL, un hit du cache ne parcourt pas la table)
+        """
+        if self.patterns is not None:
+            return self.patterns.version
+        now = time.monotonic()
+        if now >= self._table_version_expires:
+            from pattern_map import read_table_version
+            self._table_version = read_table_version(self.conn)
+            self._table_version_expires = now + self.PATTERN_VERSION_TTL
+        return self._table_version
+
     def _get_active_interval(self, minute: int) -> Optional[Tuple[int, int, str]]:
         """Déterminer l'intervalle actif."""
         if self.INTERVAL_1[0] <= minute <= self.INTERVAL_1[1]:
@@ -111,10 +144,11 @@ class LivePredictorV2:
         return None
     
     def _load_pattern(self, team: str, is_home: bool, interval_name: str, 
-                     country: str = "Bulgaria") -> Optional[Dict]:
-        """Charger pattern pour équipe + contexte."""
-        self.cursor.execute('''
-            SELECT 
+                     country: str = "Bulgaria", league: Optional[str] = None) -> Optional[Dict]:
+        """Charger pattern pour équipe + contexte (carte en mémoire si preload, sinon requête SQL)."""
+        if self.patterns is not None:
+            return self.patterns.get(team, is_home, interval_name, country, league)
+        columns = '''
                 team_name, is_home, interval_name,
                 goals_scored, matches_with_goals_scored, freq_goals_scored,
                 avg_minute_scored, std_minute_scored,
@@ -124,11 +158,23 @@ class LivePredictorV2:
                 recurrence_last_5, confidence_level,
                 avg_goals_full_match, avg_goals_first_half, avg_goals_second_half,
                 total_matches
+        '''
+        self.cursor.execute(f'''
+            SELECT {columns}
             FROM team_critical_intervals
             WHERE country = ? AND team_name = ? AND is_home = ? AND interval_name = ?
+            ORDER BY league
         ''', (country, team, is_home, interval_name))
-        
         row = self.cursor.fetchone()
+        if not row and league:
+            # Même repli que PatternMap.get : pays du contexte par défaut mais ligue renseignée
+            self.cursor.execute(f'''
+                SELECT {columns}
+                FROM team_critical_intervals
+                WHERE league = ? AND team_name = ? AND is_home = ? AND interval_name = ?
+                ORDER BY country
+            ''', (league, team, is_home, interval_name))
+            row = self.cursor.fetchone()
         if not row:
             return None
         
@@ -526,6 +572,7 @@ class LivePredictorV2:
         
         return reason
     
+    @memoize_prediction(version=lambda self: self._patterns_version(), copy_result=copy.deepcopy)
     def predict(self, match: LiveMatchContext) -> Dict[str, IntervalPrediction]:
         """
         Prédire probabilités pour le match en cours.
@@ -546,8 +593,8 @@ class LivePredictorV2:
         
         # INTERVALLE ACTIF
         if active_interval:
-            home_pattern = self._load_pattern(match.home_team, True, active_interval[2], match.country)
-            away_pattern = self._load_pattern(match.away_team, False, active_interval[2], match.country)
+            home_pattern = self._load_pattern(match.home_team, True, active_interval[2], match.country, match.league)
+            away_pattern = self._load_pattern(match.away_team, False, active_interval[2], match.country, match.league)
             
             predictions['home_active'] = self._build_prediction(
                 home_pattern, active_interval, match.home_team, True, is_active=True, 
@@ -573,8 +620,8 @@ class LivePredictorV2:
         
         # PROCHAIN INTERVALLE
         if next_interval:
-            home_pattern = self._load_pattern(match.home_team, True, next_interval[2], match.country)
-            away_pattern = self._load_pattern(match.away_team, False, next_interval[2], match.country)
+            home_pattern = self._load_pattern(match.home_team, True, next_interval[2], match.country, match.league)
+            away_pattern = self._load_pattern(match.away_team, False, next_interval[2], match.country, match.league)
             
             predictions['home_next'] = self._build_prediction(
                 home_pattern, next_interval, match.home_team, True, is_active=False, 
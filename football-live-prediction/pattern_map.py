@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Carte en mémoire des patterns team_critical_intervals pour LivePredictorV2 (mode preload).
+
+Toutes les lignes de la table (tous pays) sont lues une fois au démarrage et rangées dans un dict
+{(country, team_name, is_home, interval_name): tuple de valeurs} ; les prédictions ne font plus aucune
+requête SQL. Un second index par ligue permet de retrouver l'équipe quand le pays du contexte est
+celui par défaut ("Bulgaria") mais que la ligue est renseignée.
+
+La version de la table (MAX(created_at), COUNT(*), MAX(id)) change à chaque reconstruction par
+build_critical_interval_recurrence.py (INSERT OR REPLACE) : refresh_if_changed() recharge alors la carte
+complète puis la remplace d'un bloc (les lectures en cours voient l'ancienne ou la nouvelle, jamais un mélange).
+
+Usage:
+    patterns = get_pattern_map('data/predictions.db')   # partagée par le processus
+    patterns.watch(60)                                   # thread de rafraîchissement (optionnel)
+    predictor = LivePredictorV2(db_path, pattern_map=patterns)   # ou LivePredictorV2(db_path, preload=True)
+"""
+
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Colonnes lues, dans l'ordre des clés du dict renvoyé par LivePredictorV2._load_pattern
+COLUMNS = (
+    'team_name', 'is_home', 'interval_name',
+    'goals_scored', 'matches_with_goals_scored', 'freq_goals_scored',
+    'avg_minute_scored', 'std_minute_scored',
+    'goals_conceded', 'matches_with_goals_conceded', 'freq_goals_conceded',
+    'avg_minute_conceded', 'std_minute_conceded',
+    'any_goal_total', 'matches_with_any_goal', 'freq_any_goal',
+    'recurrence_last_5', 'confidence_level',
+    'avg_goals_full_match', 'avg_goals_first_half', 'avg_goals_second_half',
+    'total_matches',
+)
+FIELDS = (
+    'team_name', 'is_home', 'interval_name',
+    'goals_scored', 'matches_scored', 'freq_scored',
+    'avg_minute_scored', 'std_minute_scored',
+    'goals_conceded', 'matches_conceded', 'freq_conceded',
+    'avg_minute_conceded', 'std_minute_conceded',
+    'any_goal_total', 'matches_any_goal', 'freq_any_goal',
+    'recurrence_last_5', 'confidence_level',
+    'avg_goals_full_match', 'avg_goals_first_half', 'avg_goals_second_half',
+    'total_matches',
+)
+
+Key = Tuple[str, str, int, str]
+
+
+def read_table_version(conn: sqlite3.Connection) -> Optional[tuple]:
+    """Version de team_critical_intervals (None si la table est absente), change à chaque reconstruction"""
+    try:
+        return conn.execute(
+            "SELECT MAX(created_at), COUNT(*), MAX(id) FROM team_critical_intervals"
+        ).fetchone()
+    except sqlite3.Error:
+        return None  # table absente (base pas encore construite)
+
+
+class PatternMap:
+    """Patterns team_critical_intervals de tous les pays, rechargés quand la table est reconstruite."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.by_country: Dict[Key, tuple] = {}
+        self.by_league: Dict[Key, tuple] = {}
+        self.version: Optional[tuple] = None
+        self.stats = {'rows': 0, 'load_seconds': 0.0, 'memory_bytes': 0, 'loads': 0}
+        self.lock = threading.Lock()  # un seul rechargement à la fois
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    def load(self) -> 'PatternMap':
+        """Charge toute la table puis remplace la carte courante d'un bloc"""
+        with self.lock:
+            started = time.perf_counter()
+            conn = self._connect()
+            try:
+                version = read_table_version(conn)
+                rows = []
+                if version is not None:
+                    # Même ligne que le fetchone() de _load_pattern quand une équipe existe dans plusieurs ligues
+                    rows = conn.execute(f'''
+                        SELECT country, league, {', '.join(COLUMNS)}
+                        FROM team_critical_intervals
+                        ORDER BY country, league, team_name, is_home, interval_name
+                    ''').fetchall()
+            finally:
+                conn.close()
+
+            by_country: Dict[Key, tuple] = {}
+            by_league: Dict[Key, tuple] = {}
+            for country, league, *values in rows:
+                values = tuple(values)
+                team, is_home, interval_name = values[0], int(values[1]), values[2]
+                by_country.setdefault((country, team, is_home, interval_name), values)
+                by_league.setdefault((league, team, is_home, interval_name), values)
+
+            # Remplacement atomique : une seule affectation par attribut, lue sans verrou
+            self.by_country, self.by_league, self.version = by_country, by_league, version
+            self.stats = {
+                'rows': len(rows),
+                'load_seconds': time.perf_counter() - started,
+                'memory_bytes': self._footprint(by_country, by_league),
+                'loads': self.stats['loads'] + 1,
+            }
+        logger.info(
+            f"📦 Patterns préchargés : {self.stats['rows']} lignes en {self.stats['load_seconds'] * 1000:.1f} ms "
+            f"(~{self.stats['memory_bytes'] / 1024:.0f} Ko)"
+        )
+        return self
+
+    @staticmethod
+    def _footprint(by_country: Dict, by_league: Dict) -> int:
+        """Taille approximative des deux index (dicts, clés, tuples et valeurs distinctes)"""
+        seen = set()
+        total = sys.getsizeof(by_country) + sys.getsizeof(by_league)
+        for index in (by_country, by_league):
+            for key, values in index.items():
+                for obj in (key, *key, values, *values):
+                    if id(obj) not in seen:
+                        seen.add(id(obj))
+                        total += sys.getsizeof(obj)
+        return total
+
+    def refresh_if_changed(self) -> bool:
+        """Recharge la carte si la table a été reconstruite depuis le dernier chargement"""
+        conn = self._connect()
+        try:
+            version = read_table_version(conn)
+        finally:
+            conn.close()
+        if version == self.version and self.stats['loads']:
+            return False
+        self.load()
+        return True
+
+    def watch(self, interval_seconds: float = 60.0):
+        """Vérifie la version de la table toutes les interval_seconds dans un thread daemon"""
+        if self._watcher is not None:
+            return
+
+        def run():
+            while not self._stop.wait(interval_seconds):
+                try:
+                    self.refresh_if_changed()
+                except sqlite3.Error as e:
+                    logger.warning(f"⚠️ Rafraîchissement des patterns impossible: {e}")
+
+        self._watcher = threading.Thread(target=run, name='pattern-map-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def get(self, team: str, is_home: bool, interval_name: str, country: str = "Bulgaria",
+            league: Optional[str] = None) -> Optional[Dict]:
+        """Même dict que LivePredictorV2._load_pattern, sans requête SQL (None si inconnu)"""
+        key = (team, int(is_home), interval_name)
+        values = self.by_country.get((country, *key))
+        if values is None and league:
+            values = self.by_league.get((league, *key))
+        if values is None:
+            return None
+        return dict(zip(FIELDS, values))
+
+    def __len__(self) -> int:
+        return len(self.by_country)
+
+    def __getstate__(self) -> Dict:
+        """Copie sans verrou ni thread de surveillance (envoi aux workers d'un pool spawn)"""
+        state = self.__dict__.copy()
+        for name in ('lock', '_watcher', '_stop'):
+            del state[name]
+        return state
+
+    def __setstate__(self, state: Dict):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+
+
+_maps: Dict[str, PatternMap] = {}
+_maps_lock = threading.Lock()
+
+
+def get_pattern_map(db_path: str) -> PatternMap:
+    """Carte partagée par le processus (une par base), chargée au premier appel"""
+    with _maps_lock:
+        patterns = _maps.get(db_path)
+        if patterns is None:
+            patterns = _maps[db_path] = PatternMap(db_path).load()
+        return patterns
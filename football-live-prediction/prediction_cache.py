@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Mémoïsation des prédictions live quand les entrées n'ont pas changé entre deux polls.
+
+Entre deux scrapes d'un même match, minute, score et stats sont souvent identiques : la prédiction
+(et ses textes de reasoning) est alors servie depuis un cache LRU borné, indexé par la forme canonique
+des arguments (ligue, équipes, minute, score, tuple de stats...). Le taux de succès est exposé par stats().
+
+Usage:
+    class Predictor:
+        def __init__(self):
+            self.prediction_cache = PredictionCache(maxsize=512)
+
+        @memoize_prediction()
+        def predict(self, match): ...
+
+    predictor.prediction_cache.stats()   # {'size', 'maxsize', 'hits', 'misses', 'hit_rate'}
+"""
+
+import dataclasses
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+def canonical_key(value: Any) -> Hashable:
+    """Forme hashable et stable d'un argument (dicts triés, dataclasses et listes en tuples)"""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return (type(value).__name__,) + tuple(canonical_key(getattr(value, f.name))
+                                               for f in dataclasses.fields(value))
+    if isinstance(value, dict):
+        return tuple(sorted((key, canonical_key(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(canonical_key(item) for item in value)
+    return value
+
+
+class PredictionCache:
+    """Cache LRU thread-safe de résultats de prédiction"""
+
+    def __init__(self, maxsize: int = 512):
+        """
+        Args:
+            maxsize: Nombre maximal de prédictions gardées (0 = cache désactivé)
+        """
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self.lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        if self.maxsize <= 0:
+            return
+        with self.lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {'size': len(self._entries), 'maxsize': self.maxsize,
+                'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def memoize_prediction(version: Optional[Callable[[Any], Hashable]] = None,
+                       copy_result: Optional[Callable[[Any], Any]] = None):
+    """
+    Décorateur de méthode : résultat servi depuis self.prediction_cache quand les arguments sont identiques
+
+    Args:
+        version: version(self) ajoutée à la clé (ex: version des patterns chargés)
+        copy_result: copy_result(résultat) -> copie renvoyée à l'appelant, le résultat mémorisé n'est
+                     jamais exposé (ex: horodatage rafraîchi)
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = getattr(self, 'prediction_cache', None)
+            if cache is None or cache.maxsize <= 0:
+                return method(self, *args, **kwargs)
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            key = (method.__name__, version(self) if version else None,
+                   canonical_key(tuple(bound.arguments.values())[1:]))
+            result = cache.get(key, _MISSING)
+            if result is not _MISSING:
+                return copy_result(result) if copy_result else result
+            result = method(self, *args, **kwargs)
+            cache.put(key, result)
+            return copy_result(result) if copy_result else result
+
+        return wrapper
+    return decorator
@@ -4,27 +4,75 @@ Préditeur de probabilité de but EN DIRECT
 Prédit si "il y aura un but" (peu importe qui marque) basé sur les données historiques + live
 """
 
+import os
 import statistics
 import sqlite3
+import sys
 import json
-from typing import Dict, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from datetime import datetime
 from collections import defaultdict
 
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'CLEAN_WORKFLOW'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import db_access
+from prediction_cache import PredictionCache, memoize_prediction
+
+
+def _fresh_prediction(result: Dict) -> Dict:
+    """Copie d'une prédiction mémorisée, horodatée maintenant"""
+    return {**result, "details": {**result["details"], "timestamp": datetime.now().isoformat()}}
+
 
 class LiveGoalProbabilityPredictor:
     """Prédit la probabilité qu'un but soit marqué dans les prochaines minutes"""
 
-    def __init__(self, db_manager=None, db_path='/workspaces/paris-live/football-live-prediction/data/predictions.db'):
+    # Base rates des intervalles clés quand la récurrence des équipes est inconnue
+    FALLBACK_BASE_RATES = {
+        "31-45": 0.35,  # 35% (fin 1ère mi-temps, plus de buts)
+        "76-90": 0.38,  # 38% (fin de match, urgence accrue)
+    }
+
+    # Bornes des intervalles pour le scan historique (hors recurrence_index)
+    INTERVAL_BOUNDS = {
+        "1-15": (1, 15),
+        "16-30": (16, 30),
+        "31-45": (31, 45),
+        "46-60": (46, 60),
+        "61-75": (61, 75),
+        "76-90": (76, 90),
+    }
+
+    # Expected goals par intervalle (facteur saturation)
+    EXPECTED_GOALS_BY_INTERVAL = {
+        "1-15": 0.3,
+        "16-30": 0.5,
+        "31-45": 1.0,
+        "46-60": 0.5,
+        "61-75": 0.6,
+        "76-90": 1.2,
+        "91-120": 0.8,
+    }
+
+    # Nombre de clés par requête groupée (limite de variables SQLite)
+    BATCH_KEYS = 200
+
+    def __init__(self, db_manager=None, db_path: Optional[str] = None, cache_size: int = 512):
         """
         Args:
             db_manager: Instance de DatabaseManager avec goal_stats (legacy)
             db_path: Chemin vers la base de données soccerstats_scraped_matches
+                     (défaut : db_access.get_db_path(), connexions lecture seule partagées)
+            cache_size: Prédictions mémorisées quand les entrées live sont inchangées (0 = désactivé)
         """
         self.db = db_manager
-        self.db_path = db_path
+        self.db_path = db_path or db_access.get_db_path()
         self._patterns_cache = {}  # Cache pour les patterns historiques
+        self.prediction_cache = PredictionCache(cache_size)
 
+    @memoize_prediction(copy_result=_fresh_prediction)
     def predict_goal_probability(
         self,
         home_team: str,
@@ -156,6 +204,123 @@ class LiveGoalProbabilityPredictor:
             },
         }
 
+    def predict_batch(self, states: Sequence[Dict]) -> List[Dict]:
+        """
+        Prédit la probabilité de but de plusieurs matchs live en une passe (un scan complet)
+
+        Les récurrences (league, team, side, interval) absentes du cache sont résolues ensemble
+        (une connexion, une requête sur recurrence_index + une requête de scan pour les équipes hors index),
+        puis les facteurs live sont calculés en opérations numpy sur tous les matchs à la fois.
+
+        Args:
+            states: Liste de dicts avec les arguments nommés de predict_goal_probability
+                    (home_team, away_team, current_minute, home_possession, ..., league)
+
+        Returns:
+            Liste de dicts identiques à ceux de predict_goal_probability, dans l'ordre de states
+        """
+        if not states:
+            return []
+
+        def column(name: str) -> np.ndarray:
+            # None (ou absent) -> NaN
+            return np.array([np.nan if state.get(name) is None else state[name] for state in states], dtype=float)
+
+        # 1. BASE RATE (récurrences résolues en un aller-retour)
+        intervals = [self._get_interval_name(state["current_minute"]) for state in states]
+        wanted = []
+        for state, interval_name in zip(states, intervals):
+            if interval_name != "outside_key_intervals" and state.get("home_team") and state.get("away_team") and state.get("league"):
+                wanted.append((state["league"], state["home_team"], interval_name, True))
+                wanted.append((state["league"], state["away_team"], interval_name, False))
+        recurrences = self._resolve_recurrences(wanted)
+        base_rates = np.empty(len(states))
+        for i, (state, interval_name) in enumerate(zip(states, intervals)):
+            base_rates[i] = self.FALLBACK_BASE_RATES.get(interval_name, 0.05)
+            if interval_name == "outside_key_intervals":
+                base_rates[i] = 0.05
+            elif state.get("home_team") and state.get("away_team") and state.get("league"):
+                home_rate = recurrences.get((state["league"], state["home_team"], interval_name, True))
+                away_rate = recurrences.get((state["league"], state["away_team"], interval_name, False))
+                if home_rate is not None and away_rate is not None:
+                    base_rates[i] = max(home_rate, away_rate) / 100
+
+        # 2. FACTEUR POSSESSION
+        home_possession, away_possession = column("home_possession"), column("away_possession")
+        possession = np.where(np.isnan(home_possession) | np.isnan(away_possession), 1.0,
+                              np.where((home_possession > 60) | (home_possession < 40), 1.2, 1.0))
+
+        # 3. FACTEUR ATTAQUES DANGEREUSES (ratio nul si une valeur manque ou 0 attaque)
+        def safe_ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+            valid = ~np.isnan(numerator) & ~np.isnan(denominator) & (denominator != 0)
+            return np.divide(numerator, denominator, out=np.zeros(len(states)), where=valid)
+
+        dangerous_attacks = np.minimum(1.5, np.maximum(
+            safe_ratio(column("home_dangerous_attacks"), column("home_attacks")),
+            safe_ratio(column("away_dangerous_attacks"), column("away_attacks")),
+        ) * 2)
+
+        # 4. FACTEUR TIRS CADRÉS
+        home_sot, away_sot = column("home_shots_on_target"), column("away_shots_on_target")
+        total_sot = home_sot + away_sot
+        shots_on_target = np.where(np.isnan(total_sot), 1.0,
+                                   np.where(total_sot >= 4, 1.3, np.where(total_sot >= 2, 1.1, 1.0)))
+
+        # 5. FACTEUR MOMENTUM (dernières 5 minutes)
+        events = np.array([
+            np.nan if state.get("last_5_min_events") is None
+            else state["last_5_min_events"].get("buts", 0) + state["last_5_min_events"].get("tirs", 0) // 2
+            for state in states
+        ], dtype=float)
+        momentum = np.where(np.isnan(events), 1.0, np.where(events >= 3, 1.5, np.where(events >= 1, 1.2, 1.0)))
+
+        # 6. FACTEUR CARTE ROUGE
+        total_reds = np.nan_to_num(column("home_red_cards")) + np.nan_to_num(column("away_red_cards"))
+        red_card = np.where(total_reds >= 2, 0.4, np.where(total_reds == 1, 0.7, 1.0))
+
+        # 7. FACTEUR SATURATION
+        score_home, score_away = np.nan_to_num(column("score_home")), np.nan_to_num(column("score_away"))
+        total_goals = score_home + score_away
+        expected = np.array([self.EXPECTED_GOALS_BY_INTERVAL.get(name, 0.7) for name in intervals])
+        saturation = np.where(total_goals > expected * 1.5, 0.5, np.where(total_goals > expected, 0.75, 1.0))
+
+        # 8. FACTEUR SCORE DIFFERENTIAL
+        diff = np.abs(score_home - score_away)
+        score_diff = np.where(diff == 0, 1.0, np.where(diff == 1, 1.1, 1.15))
+
+        # FORMULE FINALE - 80% HISTORIQUE + 20% LIVE (même ordre d'opérations que predict_goal_probability)
+        live_multiplier = possession * dangerous_attacks * shots_on_target * momentum * red_card * saturation * score_diff
+        live_adjustment = (live_multiplier - 1.0) * 0.20
+        probabilities = np.minimum(0.95, np.maximum(0.05, base_rates * (1.0 + live_adjustment)))
+
+        timestamp = datetime.now().isoformat()
+        results = []
+        for i, state in enumerate(states):
+            probability = float(probabilities[i])
+            results.append({
+                "goal_probability": probability * 100,  # en %
+                "danger_level": self._get_danger_level(probability),
+                "details": {
+                    "base_rate": float(base_rates[i]),
+                    "historical_component": float(base_rates[i]),
+                    "live_multiplier": float(live_multiplier[i]),
+                    "live_adjustment": float(live_adjustment[i]),
+                    "final_probability": probability,
+                    "possession_factor": float(possession[i]),
+                    "dangerous_attacks_factor": float(dangerous_attacks[i]),
+                    "shots_on_target_factor": float(shots_on_target[i]),
+                    "momentum_factor": float(momentum[i]),
+                    "red_card_factor": float(red_card[i]),
+                    "saturation_factor": float(saturation[i]),
+                    "score_differential_factor": float(score_diff[i]),
+                    "interval": intervals[i],
+                    "current_minute": state["current_minute"],
+                    "timestamp": timestamp,
+                    "weighting": "80% historique + 20% live",
+                },
+            })
+        return results
+
     def _get_interval_name(self, minute: int) -> str:
         """Retourne l'intervalle du match - UNIQUEMENT intervalles clés 31-45+ et 76-90+"""
         # INTERVALLES CLÉS : Fin de mi-temps avec temps additionnel
@@ -197,11 +362,7 @@ class LiveGoalProbabilityPredictor:
                     return combined_rate
             
             # Fallback: base rates pour intervalles clés uniquement
-            base_rates = {
-                "31-45": 0.35,  # 35% (fin 1ère mi-temps, plus de buts)
-                "76-90": 0.38,  # 38% (fin de match, urgence accrue)
-            }
-            return base_rates.get(interval_name, 0.05)  # Défaut très bas
+            return self.FALLBACK_BASE_RATES.get(interval_name, 0.05)  # Défaut très bas
         except Exception as e:
             print(f"⚠️ Erreur calcul base_rate: {e}")
             return 0.05
@@ -223,8 +384,12 @@ class LiveGoalProbabilityPredictor:
         # Vérifier le cache
         if cache_key in self._patterns_cache:
             return self._patterns_cache[cache_key]
+        # Lecture ponctuelle dans l'index matérialisé (CLEAN_WORKFLOW/recurrence_index.py)
+        indexed = self._read_recurrence_index(team, league, interval_name, is_home)
+        if indexed is not None:
+            return self._recurrence_from_counts(team, league, interval_name, is_home, *indexed)
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = db_access.connect(self.db_path)
             cursor = conn.cursor()
             # Récupérer tous les matchs de cette équipe
             cursor.execute("""
@@ -234,57 +399,175 @@ class LiveGoalProbabilityPredictor:
             """, (league, team, 1 if is_home else 0))
             matches = cursor.fetchall()
             conn.close()
-            if not matches or len(matches) == 0:
-                # Pas de données historiques, retourner une valeur faible et logguer
-                print(f"⚠️ Aucun match historique pour {team} ({'HOME' if is_home else 'AWAY'}) dans {league} intervalle {interval_name}")
-                self._patterns_cache[cache_key] = 5.0  # 5% par défaut
-                return 5.0
-            # Déterminer l'intervalle en minutes
-            if interval_name == "1-15":
-                min_start, min_end = 1, 15
-            elif interval_name == "16-30":
-                min_start, min_end = 16, 30
-            elif interval_name == "31-45":
-                min_start, min_end = 31, 45
-            elif interval_name == "46-60":
-                min_start, min_end = 46, 60
-            elif interval_name == "61-75":
-                min_start, min_end = 61, 75
-            elif interval_name == "76-90":
-                min_start, min_end = 76, 90
-            else:
-                return None
-            # Compter matchs avec but dans l'intervalle
-            matches_with_goal = set()
-            for row in matches:
-                goals_scored = json.loads(row[0])
-                goals_conceded = json.loads(row[1])
-                match_id = f"{row[2]}_{row[3]}"
-                # Vérifier si au moins 1 but (marqué OU encaissé) dans l'intervalle
-                for minute in goals_scored + goals_conceded:
-                    if min_start <= minute <= min_end:
-                        matches_with_goal.add(match_id)
-                        break
-            # Calculer récurrence en toute sécurité
-            total_matches = len(matches)
-            if total_matches == 0:
-                print(f"⚠️ Aucun match historique pour {team} ({'HOME' if is_home else 'AWAY'}) dans {league} intervalle {interval_name}")
-                self._patterns_cache[cache_key] = 5.0
-                return 5.0
-            recurrence = (len(matches_with_goal) / total_matches) * 100
-            # Si la récurrence est nulle, retourner une valeur faible
-            if recurrence == 0:
-                print(f"⚠️ Récurrence nulle pour {team} ({'HOME' if is_home else 'AWAY'}) dans {league} intervalle {interval_name}")
-                self._patterns_cache[cache_key] = 5.0
-                return 5.0
-            # Mettre en cache
-            self._patterns_cache[cache_key] = recurrence
-            return recurrence
+            return self._recurrence_from_matches(team, league, interval_name, is_home, matches)
         except Exception as e:
             print(f"⚠️ Erreur récupération patterns {team}: {e}")
             self._patterns_cache[cache_key] = 5.0
             return 5.0
 
+    def _recurrence_from_counts(self, team: str, league: str, interval_name: str, is_home: bool,
+                                matches_count: int, matches_with_goal: int) -> float:
+        """Récurrence (%) depuis les compteurs de recurrence_index, mise en cache"""
+        cache_key = f"{league}_{team}_{interval_name}_{'HOME' if is_home else 'AWAY'}"
+        recurrence = (matches_with_goal / matches_count) * 100 if matches_count else 0
+        if recurrence == 0:
+            print(f"⚠️ Récurrence nulle pour {team} ({'HOME' if is_home else 'AWAY'}) dans {league} intervalle {interval_name}")
+            recurrence = 5.0
+        self._patterns_cache[cache_key] = recurrence
+        return recurrence
+
+    def _recurrence_from_matches(self, team: str, league: str, interval_name: str, is_home: bool,
+                                 matches: Sequence[tuple]) -> Optional[float]:
+        """
+        Récurrence (%) depuis les lignes (goal_times, goal_times_conceded, date, opponent) de l'équipe, mise en cache
+        """
+        cache_key = f"{league}_{team}_{interval_name}_{'HOME' if is_home else 'AWAY'}"
+        if not matches or len(matches) == 0:
+            # Pas de données historiques, retourner une valeur faible et logguer
+            print(f"⚠️ Aucun match historique pour {team} ({'HOME' if is_home else 'AWAY'}) dans {league} intervalle {interval_name}")
+            self._patterns_cache[cache_key] = 5.0  # 5% par défaut
+            return 5.0
+        # Déterminer l'intervalle en minutes
+        if interval_name not in self.INTERVAL_BOUNDS:
+            return None
+        min_start, min_end = self.INTERVAL_BOUNDS[interval_name]
+        # Compter matchs avec but dans l'intervalle
+        matches_with_goal = set()
+        for row in matches:
+            goals_scored = json.loads(row[0])
+            goals_conceded = json.loads(row[1])
+            match_id = f"{row[2]}_{row[3]}"
+            # Vérifier si au moins 1 but (marqué OU encaissé) dans l'intervalle
+            for minute in goals_scored + goals_conceded:
+                if min_start <= minute <= min_end:
+                    matches_with_goal.add(match_id)
+                    break
+        recurrence = (len(matches_with_goal) / len(matches)) * 100
+        # Si la récurrence est nulle, retourner une valeur faible
+        if recurrence == 0:
+            print(f"⚠️ Récurrence nulle pour {team} ({'HOME' if is_home else 'AWAY'}) dans {league} intervalle {interval_name}")
+            self._patterns_cache[cache_key] = 5.0
+            return 5.0
+        # Mettre en cache
+        self._patterns_cache[cache_key] = recurrence
+        return recurrence
+
+    def _read_recurrence_index(self, team: str, league: str, interval_name: str, is_home: bool) -> Optional[Tuple[int, int]]:
+        """
+        Lit (matches, matches_with_goal) dans la table recurrence_index
+
+        Returns:
+            Tuple ou None si la table ou la ligne n'existe pas (fallback sur le scan complet)
+        """
+        try:
+            conn = db_access.connect(self.db_path)
+            try:
+                row = conn.execute("""
+                    SELECT matches, matches_with_goal FROM recurrence_index
+                    WHERE league = ? AND team = ? AND is_home = ? AND interval_name = ?
+                """, (league, team, 1 if is_home else 0, interval_name)).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return None
+        if not row or not row[0]:
+            return None
+        return row[0], row[1]
+
+    def _resolve_recurrences(self, keys: Iterable[Tuple[str, str, str, bool]]) -> Dict[Tuple[str, str, str, bool], Optional[float]]:
+        """
+        Récurrences de plusieurs (league, team, interval_name, is_home) en un aller-retour base
+
+        Cache d'abord ; les clés manquantes sont lues ensemble dans recurrence_index, celles absentes de
+        l'index recalculées depuis un seul scan de soccerstats_scraped_matches (mêmes défauts que
+        _get_team_recurrence, résultats mis en cache).
+
+        Returns:
+            {clé: récurrence en % ou None}
+        """
+        resolved, missing = {}, []
+        for key in dict.fromkeys(keys):
+            league, team, interval_name, is_home = key
+            cache_key = f"{league}_{team}_{interval_name}_{'HOME' if is_home else 'AWAY'}"
+            if cache_key in self._patterns_cache:
+                resolved[key] = self._patterns_cache[cache_key]
+            else:
+                missing.append(key)
+        if not missing:
+            return resolved
+
+        try:
+            conn = db_access.connect(self.db_path)
+            try:
+                indexed = self._read_recurrence_index_many(conn, missing)
+                unindexed = [key for key in missing if key not in indexed]
+                history = self._read_team_matches_many(conn, unindexed) if unindexed else {}
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"⚠️ Erreur récupération patterns ({len(missing)} équipes): {e}")
+            for league, team, interval_name, is_home in missing:
+                self._patterns_cache[f"{league}_{team}_{interval_name}_{'HOME' if is_home else 'AWAY'}"] = 5.0
+                resolved[(league, team, interval_name, is_home)] = 5.0
+            return resolved
+
+        for key in missing:
+            league, team, interval_name, is_home = key
+            if key in indexed:
+                resolved[key] = self._recurrence_from_counts(team, league, interval_name, is_home, *indexed[key])
+            else:
+                try:
+                    matches = history.get((league, team, is_home), [])
+                    resolved[key] = self._recurrence_from_matches(team, league, interval_name, is_home, matches)
+                except Exception as e:
+                    print(f"⚠️ Erreur récupération patterns {team}: {e}")
+                    self._patterns_cache[f"{league}_{team}_{interval_name}_{'HOME' if is_home else 'AWAY'}"] = 5.0
+                    resolved[key] = 5.0
+        return resolved
+
+    def _read_recurrence_index_many(self, conn, keys: List[Tuple[str, str, str, bool]]) -> Dict[Tuple, Tuple[int, int]]:
+        """{(league, team, interval_name, is_home): (matches, matches_with_goal)} (vide si la table n'existe pas)"""
+        indexed = {}
+        try:
+            for start in range(0, len(keys), self.BATCH_KEYS):
+                chunk = keys[start:start + self.BATCH_KEYS]
+                rows = conn.execute(f"""
+                    WITH wanted(league, team, is_home, interval_name) AS (
+                        VALUES {', '.join(['(?, ?, ?, ?)'] * len(chunk))}
+                    )
+                    SELECT r.league, r.team, r.is_home, r.interval_name, r.matches, r.matches_with_goal
+                    FROM wanted w
+                    JOIN recurrence_index r
+                      ON r.league = w.league AND r.team = w.team
+                     AND r.is_home = w.is_home AND r.interval_name = w.interval_name
+                """, [value for league, team, interval_name, is_home in chunk
+                      for value in (league, team, 1 if is_home else 0, interval_name)]).fetchall()
+                for league, team, is_home, interval_name, matches, matches_with_goal in rows:
+                    if matches:
+                        indexed[(league, team, interval_name, bool(is_home))] = (matches, matches_with_goal)
+        except sqlite3.Error:
+            return {}
+        return indexed
+
+    def _read_team_matches_many(self, conn, keys: List[Tuple[str, str, str, bool]]) -> Dict[Tuple[str, str, bool], List[tuple]]:
+        """{(league, team, is_home): [(goal_times, goal_times_conceded, date, opponent)]} en une requête par paquet"""
+        teams = list(dict.fromkeys((league, team, is_home) for league, team, _, is_home in keys))
+        history = defaultdict(list)
+        for start in range(0, len(teams), self.BATCH_KEYS):
+            chunk = teams[start:start + self.BATCH_KEYS]
+            rows = conn.execute(f"""
+                WITH wanted(league, team, is_home) AS (
+                    VALUES {', '.join(['(?, ?, ?)'] * len(chunk))}
+                )
+                SELECT m.league, m.team, m.is_home, m.goal_times, m.goal_times_conceded, m.date, m.opponent
+                FROM wanted w
+                JOIN soccerstats_scraped_matches m
+                  ON m.league = w.league AND m.team = w.team AND m.is_home = w.is_home
+            """, [value for league, team, is_home in chunk for value in (league, team, 1 if is_home else 0)]).fetchall()
+            for league, team, is_home, *match in rows:
+                history[(league, team, bool(is_home))].append(tuple(match))
+        return history
+
     def _calculate_possession_factor(
         self, home_possession: Optional[float], away_possession: Optional[float]
     ) -> float:
@@ -361,16 +644,7 @@ class LiveGoalProbabilityPredictor:
         total_goals = (score_home or 0) + (score_away or 0)
 
         # Expected goals par intervalle
-        expected_goals_by_interval = {
-            "1-15": 0.3,
-            "16-30": 0.5,
-            "31-45": 1.0,
-            "46-60": 0.5,
-            "61-75": 0.6,
-            "76-90": 1.2,
-            "91-120": 0.8,
-        }
-        expected = expected_goals_by_interval.get(interval_name, 0.7)
+        expected = self.EXPECTED_GOALS_BY_INTERVAL.get(interval_name, 0.7)
 
         if total_goals > expected * 1.5:
             return 0.5  # Saturation: réduction 50%
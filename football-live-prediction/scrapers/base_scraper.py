@@ -1,6 +1,6 @@
 """
 Base Scraper - Classe de base pour tous les scrapers
-Inclut: gestion d'erreurs, retry, rate limiting, logging
+Inclut: gestion d'erreurs, retry, rate limiting, cache HTTP, logging
 """
 import time
 import requests
@@ -12,9 +12,11 @@ from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_excep
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent.parent.parent / "CLEAN_WORKFLOW"))
 
 from utils.config_loader import get_config
 from utils.logger import get_logger
+from http_cache import DEFAULT_CACHE_PATH, HttpCache
 
 
 class BaseScraper(ABC):
@@ -50,6 +52,14 @@ class BaseScraper(ABC):
         self.session = requests.Session()
         self.session.headers.update(self.headers)
         
+        # Cache HTTP disque (revalidation conditionnelle + empreinte du contenu)
+        self.http_cache = None
+        if self.config.get("soccerstats.scraping.http_cache.enabled", True):
+            self.http_cache = HttpCache(
+                self.config.get("soccerstats.scraping.http_cache.path", DEFAULT_CACHE_PATH),
+                ttl=self.config.get("soccerstats.scraping.http_cache.ttl", {})
+            )
+        
         # Compteur de requêtes (pour rate limiting)
         self.request_count = 0
         self.last_request_time = 0
@@ -79,6 +89,9 @@ class BaseScraper(ABC):
         """
         Récupère une page avec retry automatique
         
+        Avec le cache HTTP actif, la réponse porte `from_cache` et `changed` :
+        si `changed` est faux le contenu est identique au dernier passage.
+        
         Args:
             url: URL à récupérer
             params: Paramètres GET optionnels
@@ -89,19 +102,30 @@ class BaseScraper(ABC):
         Raises:
             requests.RequestException: Si la requête échoue après tous les retries
         """
-        self._rate_limit()
-        
         self.logger.debug(f"Fetching: {url}")
         
         try:
-            response = self.session.get(
-                url,
-                params=params,
-                timeout=self.timeout
-            )
-            response.raise_for_status()
+            if self.http_cache is not None:
+                # Le rate limiting ne s'applique qu'aux accès réseau
+                response = self.http_cache.get(
+                    self.session,
+                    url,
+                    params=params,
+                    timeout=self.timeout,
+                    on_request=self._rate_limit
+                )
+            else:
+                self._rate_limit()
+                response = self.session.get(
+                    url,
+                    params=params,
+                    timeout=self.timeout
+                )
+                response.raise_for_status()
+                response.from_cache = False
+                response.changed = True
             
-            self.logger.debug(f"Success: {url} (Status: {response.status_code})")
+            self.logger.debug(f"Success: {url} (Status: {response.status_code}, cache: {response.from_cache})")
             
             # Sauvegarder HTML si debug mode
             if self.config.get("development.save_html_responses", False):
@@ -217,6 +241,10 @@ class BaseScraper(ABC):
         if hasattr(self, 'session'):
             self.session.close()
             self.logger.debug("Session closed")
+        if getattr(self, 'http_cache', None) is not None:
+            self.logger.info(self.http_cache.summary())
+            self.http_cache.close()
+            self.http_cache = None
     
     def __del__(self):
         """Destructeur - nettoie les ressources"""
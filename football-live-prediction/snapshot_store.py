@@ -0,0 +1,289 @@
+"""
+Shared time-series store for live match snapshots.
+
+One ring buffer per match, one array-backed column per numeric stat. Stats are cumulative counters
+(shots, corners, score...), so each column already is a running prefix aggregate: the change over a
+window is last - first. A per-window cursor on the oldest in-window snapshot only moves forward as time
+passes, which makes 5 / 10-minute deltas, momentum and saturation amortised O(1) per query.
+
+Optional SQLite persistence (table live_snapshots): a restarted monitor reloads the last snapshots of
+each match on first access and resumes with its momentum history.
+
+Finished matches leave memory through drop(), or after idle_ttl seconds without a new snapshot
+(persisted rows are kept and reloaded if the match shows up again).
+
+Usage:
+    store = get_store()                       # in-memory, shared by every parser of the process
+    store = get_store("data/live_snapshots.db")
+    store.append(match_id, stats)
+    store.deltas(match_id, window_sec=300); store.saturation(match_id, window_sec=600)
+"""
+
+import json
+import math
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+# Numeric MatchStats fields kept as columns (None is stored as NaN)
+COLUMNS = (
+    'minute', 'score_home', 'score_away', 'possession_home', 'possession_away',
+    'shots_home', 'shots_away', 'sot_home', 'sot_away', 'corners_home', 'corners_away',
+    'yellow_cards_home', 'yellow_cards_away', 'red_cards_home', 'red_cards_away',
+)
+INT_COLUMNS = frozenset(c for c in COLUMNS if not c.startswith('possession'))
+
+# Deltas reported by SnapshotCache.get_momentum / FeatureExtractor.extract_deltas
+MOMENTUM_COLUMNS = ('shots_home', 'shots_away', 'sot_home', 'sot_away', 'corners_home', 'corners_away')
+
+SCHEMA = f'''
+CREATE TABLE IF NOT EXISTS live_snapshots (
+    match_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    {', '.join(f'{c} REAL' for c in COLUMNS)},
+    last_events TEXT,
+    PRIMARY KEY (match_id, timestamp)
+);
+'''
+
+NAN = float('nan')
+IDLE_TTL = 3 * 3600  # seconds without a snapshot before a match's series is evicted from memory
+SWEEP_INTERVAL = 60  # seconds between two idle sweeps
+
+
+def _stats_class():
+    from headless_parser_prototype import MatchStats
+    return MatchStats
+
+
+class MatchSeries:
+    """Ring buffer of one match's snapshots (timestamps must be appended in increasing order)."""
+
+    def __init__(self, capacity: int = 20):
+        self.capacity = capacity
+        self.timestamps = array('d', [0.0] * capacity)
+        self.columns: Dict[str, array] = {c: array('d', [NAN] * capacity) for c in COLUMNS}
+        self.events: List[Optional[List[Dict]]] = [None] * capacity
+        self.total = 0  # snapshots ever appended; sequence numbers run from 0 to total - 1
+        self._cursors: Dict[float, Tuple[float, int]] = {}  # {window_sec: (cutoff, first seq)}
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    @property
+    def oldest(self) -> int:
+        return self.total - len(self)
+
+    def append(self, stats):
+        slot = self.total % self.capacity
+        self.timestamps[slot] = stats.timestamp
+        for name, column in self.columns.items():
+            value = getattr(stats, name, None)
+            column[slot] = NAN if value is None else float(value)
+        self.events[slot] = stats.last_events
+        self.total += 1
+
+    def value(self, name: str, seq: int) -> Optional[float]:
+        value = self.columns[name][seq % self.capacity]
+        if math.isnan(value):
+            return None
+        return int(value) if name in INT_COLUMNS else value
+
+    def window(self, window_sec: float, now: Optional[float] = None) -> Optional[Tuple[int, int]]:
+        """
+        (first, last) sequence numbers of the snapshots with now - timestamp <= window_sec.
+
+        The cursor of each window size only moves forward while `now` increases (amortised O(1));
+        it restarts from the oldest snapshot when `now` goes back.
+        """
+        if self.total == 0:
+            return None
+        now = time.time() if now is None else now
+        cutoff = now - window_sec
+        previous_cutoff, seq = self._cursors.get(window_sec, (cutoff, self.oldest))
+        if cutoff < previous_cutoff or seq < self.oldest:
+            seq = self.oldest
+        while seq < self.total and self.timestamps[seq % self.capacity] < cutoff:
+            seq += 1
+        self._cursors[window_sec] = (cutoff, seq)
+        if seq >= self.total:
+            return None
+        return seq, self.total - 1
+
+    def delta(self, name: str, first: int, last: int) -> Optional[float]:
+        start, end = self.value(name, first), self.value(name, last)
+        if start is None or end is None:
+            return None
+        return end - start
+
+    def snapshot(self, seq: int):
+        slot = seq % self.capacity
+        values = {name: self.value(name, seq) for name in COLUMNS}
+        return _stats_class()(timestamp=self.timestamps[slot], last_events=self.events[slot], **values)
+
+    def snapshots(self) -> List:
+        return [self.snapshot(seq) for seq in range(self.oldest, self.total)]
+
+
+class SnapshotStore:
+    """Snapshots of every live match, thread-safe, optionally persisted to SQLite."""
+
+    def __init__(self, capacity: int = 20, db_path: Optional[str] = None, idle_ttl: Optional[float] = IDLE_TTL):
+        """
+        Args:
+            capacity: Snapshots kept per match
+            db_path: SQLite file for persistence (None = memory only)
+            idle_ttl: Seconds without a snapshot before a series is evicted (None = never)
+        """
+        self.capacity = capacity
+        self.db_path = db_path
+        self.idle_ttl = idle_ttl
+        self.series: Dict[str, MatchSeries] = {}
+        self.last_active: Dict[str, float] = {}  # {match_id: time.monotonic() of creation or last snapshot}
+        self._last_sweep = time.monotonic()
+        self.lock = threading.RLock()
+        self.conn = None
+        if db_path:
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            self.conn.executescript(SCHEMA)
+
+    def get(self, match_id: str, capacity: Optional[int] = None) -> MatchSeries:
+        """Series of a match, reloaded from SQLite on first access"""
+        with self.lock:
+            series = self.series.get(match_id)
+            if series is None:
+                series = self.series[match_id] = MatchSeries(capacity or self.capacity)
+                self.last_active[match_id] = time.monotonic()
+                if self.conn is not None:
+                    self._load(match_id, series)
+            return series
+
+    def _load(self, match_id: str, series: MatchSeries):
+        rows = self.conn.execute(f'''
+            SELECT timestamp, {', '.join(COLUMNS)}, last_events FROM live_snapshots
+            WHERE match_id = ? ORDER BY timestamp DESC LIMIT ?
+        ''', (match_id, series.capacity)).fetchall()
+        stats_class = _stats_class()
+        for row in reversed(rows):
+            values = {name: (int(v) if v is not None and name in INT_COLUMNS else v)
+                      for name, v in zip(COLUMNS, row[1:-1])}
+            events = json.loads(row[-1]) if row[-1] else None
+            series.append(stats_class(timestamp=row[0], last_events=events, **values))
+
+    def append(self, match_id: str, stats):
+        """Add a snapshot (and write it through to SQLite when persistence is on)"""
+        with self.lock:
+            self.get(match_id).append(stats)
+            now = time.monotonic()
+            self.last_active[match_id] = now
+            if self.idle_ttl is not None and now - self._last_sweep >= SWEEP_INTERVAL:
+                self.evict_idle(now)
+            if self.conn is not None:
+                self.conn.execute(f'''
+                    INSERT OR REPLACE INTO live_snapshots
+                    (match_id, timestamp, {', '.join(COLUMNS)}, last_events)
+                    VALUES ({', '.join('?' * (len(COLUMNS) + 3))})
+                ''', (match_id, stats.timestamp, *[getattr(stats, c, None) for c in COLUMNS],
+                      json.dumps(stats.last_events) if stats.last_events is not None else None))
+                self.conn.commit()
+
+    def drop(self, match_id: str, persisted: bool = False):
+        """Forget a finished match (and its stored rows if persisted=True)"""
+        with self.lock:
+            self.series.pop(match_id, None)
+            self.last_active.pop(match_id, None)
+            if persisted and self.conn is not None:
+                self.conn.execute("DELETE FROM live_snapshots WHERE match_id = ?", (match_id,))
+                self.conn.commit()
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Drop the in-memory series of matches idle for more than idle_ttl seconds; returns how many"""
+        with self.lock:
+            now = time.monotonic() if now is None else now
+            self._last_sweep = now
+            if self.idle_ttl is None:
+                return 0
+            idle = [match_id for match_id, last in self.last_active.items() if now - last > self.idle_ttl]
+            for match_id in idle:
+                self.drop(match_id)
+            return len(idle)
+
+    def momentum(self, match_id: str, window_sec: float = 300, now: Optional[float] = None) -> Optional[Dict]:
+        """{stat_delta: last - first} over the window, only for stats present at both ends (None if < 2 snapshots)"""
+        with self.lock:
+            series = self.get(match_id)
+            bounds = series.window(window_sec, now)
+            if bounds is None or bounds[0] == bounds[1]:
+                return None
+            deltas = {}
+            for name in MOMENTUM_COLUMNS:
+                delta = series.delta(name, *bounds)
+                if delta is not None:
+                    deltas[f'{name}_delta'] = int(delta)
+            return deltas or None
+
+    def deltas(self, match_id: str, window_sec: float = 300, now: Optional[float] = None) -> Dict:
+        """Same keys as FeatureExtractor.extract_deltas (missing values count as 0)"""
+        with self.lock:
+            return series_deltas(self.get(match_id), window_sec, now)
+
+    def saturation(self, match_id: str, window_sec: float = 600, now: Optional[float] = None) -> float:
+        """(goals * 10) + (shots on target / 2) over the window, capped at 100"""
+        with self.lock:
+            return series_saturation(self.get(match_id), window_sec, now)
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def _value_or_zero(series: MatchSeries, name: str, seq: int) -> float:
+    return series.value(name, seq) or 0
+
+
+def series_deltas(series: MatchSeries, window_sec: float = 300, now: Optional[float] = None) -> Dict:
+    bounds = series.window(window_sec, now) if len(series) >= 2 else None
+    if bounds is None or bounds[0] == bounds[1]:
+        return {
+            'shots_delta_home': 0, 'shots_delta_away': 0,
+            'sot_delta_home': 0, 'sot_delta_away': 0,
+            'corners_delta_home': 0, 'corners_delta_away': 0,
+            'goal_count': 0,
+        }
+    first, last = bounds
+    result = {}
+    for name in MOMENTUM_COLUMNS:
+        stat, side = name.rsplit('_', 1)
+        result[f'{stat}_delta_{side}'] = _value_or_zero(series, name, last) - _value_or_zero(series, name, first)
+    result['goal_count'] = sum(_value_or_zero(series, name, last) - _value_or_zero(series, name, first)
+                               for name in ('score_home', 'score_away'))
+    return result
+
+
+def series_saturation(series: MatchSeries, window_sec: float = 600, now: Optional[float] = None) -> float:
+    bounds = series.window(window_sec, now) if len(series) >= 2 else None
+    if bounds is None:
+        return 0.0
+    first, last = bounds
+    goals = sum(_value_or_zero(series, name, last) - _value_or_zero(series, name, first)
+                for name in ('score_home', 'score_away'))
+    sot = sum(_value_or_zero(series, name, last) - _value_or_zero(series, name, first)
+              for name in ('sot_home', 'sot_away'))
+    return min(100, (goals * 10) + (sot / 2))
+
+
+_stores: Dict[Optional[str], SnapshotStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(db_path: Optional[str] = None, capacity: int = 20) -> SnapshotStore:
+    """Process-wide store (one per db_path)"""
+    with _stores_lock:
+        store = _stores.get(db_path)
+        if store is None:
+            store = _stores[db_path] = SnapshotStore(capacity=capacity, db_path=db_path)
+        return store
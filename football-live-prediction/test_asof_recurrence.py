@@ -0,0 +1,78 @@
+import pickle
+
+import numpy as np
+
+from asof_recurrence import AsOfRecurrence, parse_day_month
+from historical_replay import run_replay
+from test_historical_replay import make_db
+
+MONTHS = ['Aug', 'Sep', 'Oct', 'Nov', 'Dec', 'Jan', 'Feb']
+
+
+def season_fixtures(n=80, seed=3):
+    # August-start season spanning the new year, several matches per day
+    rng = np.random.RandomState(seed)
+    teams = [f"T{i}" for i in range(6)]
+    fixtures = []
+    goals = lambda: sorted(int(m) for m in rng.randint(1, 91, rng.poisson(1.4)))
+    for i in range(n):
+        if i % 3 == 0:
+            order = rng.permutation(teams)  # each team plays once per day
+        home, away = order[2 * (i % 3)], order[2 * (i % 3) + 1]
+        date = f"{(i // 3) % 4 * 7 + 1} {MONTHS[i // 12]}"
+        fixtures.append(('france', date, home, away, goals(), goals()))
+    return fixtures
+
+
+def test_counters_only_see_earlier_days(tmp_path):
+    path = str(tmp_path / 'asof.db')
+    fixtures = season_fixtures()
+    make_db(path, fixtures)
+    asof = AsOfRecurrence.build(path)
+    assert asof.season_start['france'] == 8 and len(asof) == len(fixtures)
+
+    def day(date):
+        month, d = parse_day_month(date)
+        return ((month - 8) % 12, d)
+
+    for league, date, home, away, _, _ in fixtures:
+        fixture = (league, date, home, away)
+        for team, is_home in ((home, True), (away, False)):
+            for name, (start, end) in asof.intervals.items():
+                earlier = [(h, a) for _, d, h2, a2, h, a in fixtures
+                           if day(d) < day(date) and (h2 if is_home else a2) == team]
+                with_goal = sum(any(start <= m <= end for m in h + a) for h, a in earlier)
+                assert asof.before(fixture)[(team, is_home, name)] == (len(earlier), with_goal)
+                expected = with_goal / len(earlier) * 100 if earlier and with_goal else 5.0
+                assert asof.recurrence(fixture, team, name, is_home) == expected
+
+
+def test_first_fixture_has_no_history_and_replay_uses_it(tmp_path):
+    path = str(tmp_path / 'asof.db')
+    fixtures = season_fixtures()
+    make_db(path, fixtures)
+    asof = AsOfRecurrence.build(path)
+    first = fixtures[0][:4]
+    assert set(asof.before(first).values()) == {(0, 0)}
+    assert set(asof.patterns_cache(first).values()) == {5.0}
+
+    leaky = run_replay(path, minutes=[35, 80], workers=0).to_dict()
+    honest = run_replay(path, minutes=[35, 80], workers=0, as_of=True).to_dict()
+    pooled = run_replay(path, minutes=[35, 80], workers=2, chunk_size=9, as_of=True).to_dict()
+    assert honest['as_of'] and not leaky['as_of']
+    assert honest['by_interval']['31-45']['predictions'] == leaky['by_interval']['31-45']['predictions']
+    assert honest['by_interval']['31-45']['mean_probability'] != leaky['by_interval']['31-45']['mean_probability']
+    for name, summary in honest['by_interval'].items():
+        assert np.isclose(pooled['by_interval'][name]['brier'], summary['brier'])
+        assert pooled['by_interval'][name]['bets'] == summary['bets']
+
+
+def test_pickles_for_spawned_workers(tmp_path):
+    path = str(tmp_path / 'asof.db')
+    fixtures = season_fixtures(n=24)
+    make_db(path, fixtures)
+    asof = AsOfRecurrence.build(path)
+    copy = pickle.loads(pickle.dumps(asof))
+    fixture = fixtures[-1][:4]
+    assert copy.before(fixture) == asof.before(fixture)
+    assert copy.counters == asof.counters
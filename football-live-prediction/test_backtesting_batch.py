@@ -0,0 +1,118 @@
+import pickle
+from dataclasses import asdict
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+from backtesting_engine import BacktestingEngine
+
+
+def make_engine(tmp_path, n_matches=12, **thresholds):
+    rng = np.random.RandomState(3)
+    X = rng.randn(200, 20) * 5 + 10
+    y = (X[:, 0] + X[:, 16] / 10 + rng.randn(200) > 15).astype(int)
+    scaler = StandardScaler().fit(X)
+    model = LogisticRegression().fit(scaler.transform(X), y)
+    with open(tmp_path / 'model.pkl', 'wb') as f:
+        pickle.dump(model, f)
+    with open(tmp_path / 'scaler.pkl', 'wb') as f:
+        pickle.dump(scaler, f)
+    pd.DataFrame({
+        'match_id': [f"M{i // 2:03d}" for i in range(n_matches)],
+        'home_goals': rng.randint(0, 3, n_matches),
+        'away_goals': rng.randint(0, 3, n_matches),
+        'label': rng.randint(0, 2, n_matches),
+    }).to_csv(tmp_path / 'matches.csv', index=False)
+    return BacktestingEngine(str(tmp_path / 'model.pkl'), str(tmp_path / 'scaler.pkl'),
+                             str(tmp_path / 'matches.csv'), **thresholds)
+
+
+def reference_decisions(engine):
+    # per-snapshot scoring, as the engine did before batching
+    decisions = []
+    for _, match_data in engine.data.iterrows():
+        features = engine._generate_simulated_features(match_data)
+        for interval in ["30-45", "75-90"]:
+            minutes = [30, 35, 40] if interval == "30-45" else [75, 80, 85]
+            for minute in minutes:
+                danger, probability = engine.calculate_danger_score(features)
+                fresh = engine.apply_freshness_decay(probability, (minute - minutes[0]) * 60, ttl_seconds=300)
+                danger_fresh = danger * (fresh / probability if probability > 0 else 1)
+                bet = fresh >= engine.confidence_threshold and danger_fresh >= engine.danger_threshold * 100
+                if bet:
+                    reason = "THRESHOLD_PASS"
+                elif fresh < engine.confidence_threshold:
+                    reason = f"LOW_CONFIDENCE ({fresh:.1%} < {engine.confidence_threshold:.1%})"
+                else:
+                    reason = f"LOW_DANGER ({danger_fresh:.1f}% < {engine.danger_threshold*100:.1f}%)"
+                label = int(match_data["label"])
+                decisions.append((str(match_data["match_id"]), interval, danger, probability,
+                                  fresh / probability if probability > 0 else 0, bet, reason, label,
+                                  (bet and label >= 1) or (not bet and label == 0),
+                                  (1.0 if label >= 1 else -1.0) if bet else 0))
+    return decisions
+
+
+def as_tuples(decisions):
+    return [(d.match_id, d.interval, d.danger_score, d.confidence, d.freshness_factor, d.should_bet,
+             d.reason, d.actual_goals, d.correct_prediction, d.roi) for d in decisions]
+
+
+def test_batch_matches_per_snapshot_scoring(tmp_path):
+    for thresholds in ({}, {'confidence_threshold': 0.2, 'danger_threshold': 0.6}):
+        engine = make_engine(tmp_path, **thresholds)
+        expected = reference_decisions(engine)
+        assert len(engine.backtest_all_matches()) == 12 * 2 * 3
+        decisions = engine.decisions
+        for got, want in zip(as_tuples(decisions), expected):
+            assert got[:2] == want[:2] and got[5:] == want[5:]
+            assert np.allclose(got[2:5], want[2:5], rtol=1e-12, atol=0)
+        single = engine.simulate_interval_decisions(engine.data.iloc[3], "75-90")
+        assert as_tuples(single) == as_tuples(decisions[21:24])
+
+
+def test_dataset_scored_in_one_model_call(tmp_path):
+    engine = make_engine(tmp_path, n_matches=40)
+    calls = []
+    predict_proba = engine.model.predict_proba
+    engine.model.predict_proba = lambda X: calls.append(len(X)) or predict_proba(X)
+    engine.backtest_all_matches()
+    assert calls == [40]
+
+
+def test_exports_use_decisions_frame(tmp_path):
+    engine = make_engine(tmp_path)
+    engine.backtest_all_matches()
+    metrics = engine.calculate_metrics()
+    exported = pd.read_csv(engine.export_decisions_csv(str(tmp_path / 'decisions.csv')))
+    assert metrics.total_decisions == len(exported) == len(engine.decisions)
+    assert exported['roi'].sum() == metrics.roi_total
+    records = pd.read_json(engine.export_decisions_json(str(tmp_path / 'decisions.json')))
+    assert list(records['reason']) == list(exported['reason'])
+    # decisions assigned by hand still drive the metrics
+    engine.decisions = engine.decisions[:6]
+    assert engine.calculate_metrics().total_decisions == 6
+    assert pd.DataFrame([asdict(d) for d in engine.decisions])['roi'].sum() == engine.calculate_metrics().roi_total
+
+
+def test_decisions_built_lazily_from_frame(tmp_path, monkeypatch):
+    engine = make_engine(tmp_path)
+    built = []
+    frame_to_decisions = BacktestingEngine._frame_to_decisions
+    monkeypatch.setattr(BacktestingEngine, '_frame_to_decisions',
+                        staticmethod(lambda frame: built.append(len(frame)) or frame_to_decisions(frame)))
+    frame = engine.backtest_all_matches()
+    assert frame is engine.decisions_frame
+    engine.calculate_metrics()
+    engine.export_decisions_csv(str(tmp_path / 'decisions.csv'))
+    assert built == []
+    assert len(engine.decisions) == len(frame) and engine.decisions is engine.decisions
+    assert built == [len(frame)]
+    # a new frame invalidates the records; the tuple cannot be changed in place
+    engine.backtest_all_matches()
+    assert engine.decisions[0].match_id == frame.iloc[0]['match_id'] and built == [len(frame)] * 2
+    with pytest.raises(AttributeError):
+        engine.decisions.append(engine.decisions[0])
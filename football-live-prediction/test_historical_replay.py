@@ -0,0 +1,122 @@
+import json
+import pickle
+import sqlite3
+
+import numpy as np
+
+import historical_replay
+from historical_replay import build_pattern_index, goal_in_window, load_matches, run_replay, score_states
+from predictors.live_goal_probability_predictor import LiveGoalProbabilityPredictor
+
+
+def make_db(path, fixtures):
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE soccerstats_scraped_matches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, country TEXT, league TEXT, team TEXT, opponent TEXT,
+            date TEXT, is_home BOOLEAN, goals_for INTEGER, goals_against INTEGER,
+            goal_times TEXT, goal_times_conceded TEXT
+        )
+    ''')
+    for league, date, home, away, home_goals, away_goals in fixtures:
+        pad = lambda goals: json.dumps(list(goals) + [0] * (10 - len(goals)))
+        for team, opponent, is_home, scored, conceded in ((home, away, 1, home_goals, away_goals),
+                                                          (away, home, 0, away_goals, home_goals)):
+            conn.execute('''
+                INSERT INTO soccerstats_scraped_matches
+                (country, league, team, opponent, date, is_home, goals_for, goals_against, goal_times, goal_times_conceded)
+                VALUES ('Bulgaria', ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (league, team, opponent, date, is_home, len(scored), len(conceded), pad(scored), pad(conceded)))
+    conn.commit()
+    conn.close()
+
+
+def random_fixtures(n=60, seed=5):
+    rng = np.random.RandomState(seed)
+    teams = [f"T{i}" for i in range(8)]
+    fixtures = []
+    for i in range(n):
+        home, away = rng.choice(teams, 2, replace=False)
+        goals = lambda: sorted(int(m) for m in rng.randint(1, 91, rng.poisson(1.3)))
+        fixtures.append(('france' if i % 2 else 'germany', f"{i % 28 + 1} Sep {i // 28}", home, away, goals(), goals()))
+    return fixtures
+
+
+def test_score_state_and_outcomes_from_goal_times(tmp_path):
+    path = str(tmp_path / 'replay.db')
+    make_db(path, [('france', '17 Aug', 'Angers', 'Paris FC', [9, 44], [45, 80])])
+    [match] = load_matches(path)
+    assert (match.home_team, match.home_goals, match.away_goals) == ('Angers', (9, 44), (45, 80))
+    minutes = np.array([31, 44, 45, 76, 81])
+    home, away = score_states(match, minutes)
+    assert list(home) == [1, 1, 2, 2, 2] and list(away) == [0, 0, 0, 1, 2]
+    ends = np.array([45, 45, 45, 90, 90])
+    assert list(goal_in_window(match, minutes, ends)) == [True, True, True, True, False]
+
+
+def test_replay_matches_per_state_predictions(tmp_path):
+    path = str(tmp_path / 'replay.db')
+    fixtures = random_fixtures()
+    make_db(path, fixtures)
+    minutes = [31, 38, 45, 76, 83, 90]
+    report = run_replay(path, minutes=minutes, threshold=0.4, workers=0)
+
+    predictor = LiveGoalProbabilityPredictor(db_path=path, cache_size=0)
+    expected = {}
+    multipliers = set()
+    for match in load_matches(path):
+        home, away = score_states(match, np.array(minutes))
+        for i, minute in enumerate(minutes):
+            result = predictor.predict_goal_probability(
+                match.home_team, match.away_team, minute, None, None, 2, 2, 1, 1, None, None,
+                score_home=int(home[i]), score_away=int(away[i]), league=match.league)
+            assert result['details']['dangerous_attacks_factor'] == 1.0  # neutral live stats
+            multipliers.add(round(result['details']['live_multiplier'], 6))
+            probability = result['details']['final_probability']
+            goal = bool(goal_in_window(match, np.array([minute]), np.array([45 if minute <= 45 else 90]))[0])
+            stats = expected.setdefault(result['details']['interval'], [0, 0, 0, 0.0])
+            stats[0] += 1
+            stats[1] += probability >= 0.4
+            stats[2] += probability >= 0.4 and goal
+            stats[3] += (probability - goal) ** 2
+
+    assert report.matches == len(fixtures)
+    assert len(multipliers) > 1  # the score state moves the live component
+    for name, (n, bets, hits, brier) in expected.items():
+        summary = report.to_dict()['by_interval'][name]
+        assert (summary['predictions'], summary['bets'], summary['hits']) == (n, bets, hits)
+        assert np.isclose(summary['brier'], brier / n)
+        assert np.isclose(summary['roi'], (hits - (bets - hits)) / bets if bets else 0.0)
+        assert sum(row['count'] for row in summary['calibration']) == n
+
+
+def test_process_pool_gives_same_report(tmp_path):
+    path = str(tmp_path / 'replay.db')
+    make_db(path, random_fixtures(40, seed=11))
+    inline = run_replay(path, workers=0).to_dict()
+    pooled = run_replay(path, workers=2, chunk_size=7).to_dict()
+    assert pooled['by_interval'].keys() == inline['by_interval'].keys()
+    for name, summary in inline['by_interval'].items():
+        for key, value in summary.items():
+            if key == 'calibration':
+                assert [row['count'] for row in pooled['by_interval'][name][key]] == [row['count'] for row in value]
+            else:
+                assert np.isclose(pooled['by_interval'][name][key], value)
+    v2 = run_replay(path, model='v2', minutes=[35, 80], leagues=['france'], workers=0).to_dict()
+    assert set(v2['by_interval']) == {'31-45+', '75-90+'}
+    assert v2['matches'] == 20
+    assert historical_replay._shared == {}
+
+
+def test_pattern_indexes_pickle_for_spawned_workers(tmp_path):
+    path = str(tmp_path / 'replay.db')
+    make_db(path, random_fixtures(20, seed=5))
+    matches = load_matches(path)
+    for model, as_of in (('goal_probability', False), ('goal_probability', True), ('v2', False)):
+        index = build_pattern_index(model, path, matches, as_of)
+        copy = pickle.loads(pickle.dumps(index))
+        assert type(copy) is type(index)
+    patterns = build_pattern_index('v2', path, matches)
+    copy = pickle.loads(pickle.dumps(patterns))
+    assert copy.by_country == patterns.by_country and copy.version == patterns.version
+    assert copy.refresh_if_changed() is False
@@ -0,0 +1,90 @@
+import sqlite3
+
+from build_critical_interval_recurrence import CriticalIntervalRecurrence
+from live_predictor_v2 import LiveMatchContext, LivePredictorV2
+from pattern_map import PatternMap
+
+
+def insert_pattern(conn, country, league, team, is_home, interval_name, freq, confidence='BON', rec5=0.6):
+    conn.execute('''
+        INSERT OR REPLACE INTO team_critical_intervals
+        (country, league, team_name, is_home, interval_name,
+         goals_scored, matches_with_goals_scored, freq_goals_scored, avg_minute_scored, std_minute_scored,
+         goals_conceded, matches_with_goals_conceded, freq_goals_conceded, avg_minute_conceded, std_minute_conceded,
+         any_goal_total, matches_with_any_goal, freq_any_goal, recurrence_last_5, confidence_level,
+         avg_goals_full_match, avg_goals_first_half, avg_goals_second_half, total_matches)
+        VALUES (?, ?, ?, ?, ?, 4, 3, 0.3, 38.5, 4.1, 2, 2, 0.2, 80.0, NULL, 6, 5, ?, ?, ?, 2.6, 1.1, 1.5, 10)
+    ''', (country, league, team, int(is_home), interval_name, freq, rec5, confidence))
+
+
+def make_db(tmp_path):
+    path = str(tmp_path / 'predictions.db')
+    builder = CriticalIntervalRecurrence(db_path=path)
+    builder._create_table()
+    builder.close()
+    conn = sqlite3.connect(path)
+    for interval_name in ('31-45+', '75-90+'):
+        insert_pattern(conn, 'Germany', 'germany2', 'Paderborn', True, interval_name, 0.5, 'EXCELLENT', 0.8)
+        insert_pattern(conn, 'Germany', 'germany2', 'Elversberg', False, interval_name, 0.4)
+        insert_pattern(conn, 'Bulgaria', 'bulgaria', 'Levski Sofia', True, interval_name, 0.7, 'TRES_BON')
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_preloaded_predictions_match_sql(tmp_path):
+    path = make_db(tmp_path)
+    sql = LivePredictorV2(db_path=path)
+    preloaded = LivePredictorV2(db_path=path, pattern_map=PatternMap(path).load())
+    for minute in (20, 40, 60, 85):
+        for home, away, country in (('Paderborn', 'Elversberg', 'Germany'), ('Levski Sofia', 'Arda', 'Bulgaria')):
+            context = LiveMatchContext(home, away, minute, 1, 0, country=country, possession_home=55.0,
+                                       possession_away=45.0, shots_home=5, shots_away=3)
+            assert preloaded.predict(context) == sql.predict(context)
+    assert preloaded.patterns.stats['rows'] == 6
+    assert preloaded.patterns.stats['memory_bytes'] > 0
+    sql.close()
+    preloaded.close()
+
+
+def test_no_query_per_prediction_and_league_fallback(tmp_path):
+    path = make_db(tmp_path)
+    predictor = LivePredictorV2(db_path=path, pattern_map=PatternMap(path).load())
+    predictor.cursor = None  # any SQL access would fail
+    # default country "Bulgaria": the league resolves the German teams
+    context = LiveMatchContext('Paderborn', 'Elversberg', 40, 0, 0, league='germany2')
+    predictions = predictor.predict(context)
+    assert predictions['home_active'].confidence_level == 'EXCELLENT'
+    assert predictions['away_active'].total_matches == 10
+    predictor.conn.close()
+
+
+def test_refresh_when_table_rebuilt(tmp_path):
+    path = make_db(tmp_path)
+    patterns = PatternMap(path).load()
+    assert patterns.refresh_if_changed() is False
+    before = patterns.by_country
+    conn = sqlite3.connect(path)
+    insert_pattern(conn, 'Germany', 'germany2', 'Paderborn', True, '31-45+', 0.9)
+    conn.commit()
+    conn.close()
+    assert patterns.refresh_if_changed() is True
+    assert patterns.by_country is not before
+    assert patterns.get('Paderborn', True, '31-45+', 'Germany')['freq_any_goal'] == 0.9
+    assert patterns.stats['loads'] == 2
+
+
+def test_league_fallback_same_in_sql_and_preload(tmp_path):
+    path = make_db(tmp_path)
+    sql = LivePredictorV2(db_path=path)
+    preloaded = LivePredictorV2(db_path=path, pattern_map=PatternMap(path).load())
+    for minute in (20, 40, 85):
+        for league in ('germany2', 'bulgaria', 'unknown'):
+            # default country "Bulgaria": only the league can resolve the German teams
+            context = LiveMatchContext('Paderborn', 'Elversberg', minute, 0, 0, league=league)
+            assert preloaded.predict(context) == sql.predict(context)
+    resolved = sql.predict(LiveMatchContext('Paderborn', 'Elversberg', 40, 0, 0, league='germany2'))
+    assert resolved['home_active'].confidence_level == 'EXCELLENT'
+    assert sql._load_pattern('Paderborn', True, '31-45+', league='bulgaria') is None
+    sql.close()
+    preloaded.close()
@@ -0,0 +1,82 @@
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'predictors'))
+
+from live_goal_probability_predictor import LiveGoalProbabilityPredictor
+from live_predictor_v2 import LiveMatchContext, LivePredictorV2
+from pattern_map import PatternMap
+from prediction_cache import PredictionCache
+from test_pattern_map import insert_pattern, make_db
+
+
+def test_lru_eviction_and_hit_rate():
+    cache = PredictionCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'a' devient le plus récent
+    cache.put('c', 3)
+    assert cache.get('b') is None and cache.get('c') == 3
+    assert cache.stats() == {'size': 2, 'maxsize': 2, 'hits': 2, 'misses': 1, 'hit_rate': 2 / 3}
+
+
+def test_goal_probability_memoised_until_inputs_change():
+    predictor = LiveGoalProbabilityPredictor(db_path='unused.db')
+    stats = dict(home_team='Lyon', away_team='Nice', current_minute=20, home_possession=55.0, away_possession=45.0,
+                 home_attacks=30, away_attacks=20, home_dangerous_attacks=10, away_dangerous_attacks=5,
+                 home_shots_on_target=2, away_shots_on_target=1, league='france')
+    first = predictor.predict_goal_probability(**stats)
+    first['details']['interval'] = 'modifié par l\'appelant'
+    second = predictor.predict_goal_probability(**stats)
+    assert second['details']['interval'] == 'outside_key_intervals'
+    assert second['goal_probability'] == first['goal_probability']
+    predictor.predict_goal_probability(**{**stats, 'home_shots_on_target': 3})
+    assert predictor.prediction_cache.stats()['hits'] == 1
+    assert predictor.prediction_cache.stats()['misses'] == 2
+    assert LiveGoalProbabilityPredictor(db_path='unused.db', cache_size=0).prediction_cache.maxsize == 0
+
+
+def test_live_predictor_v2_cache_follows_pattern_version(tmp_path):
+    path = make_db(tmp_path)
+    patterns = PatternMap(path).load()
+    predictor = LivePredictorV2(db_path=path, pattern_map=patterns)
+    context = LiveMatchContext('Paderborn', 'Elversberg', 40, 0, 0, country='Germany', shots_home=3, shots_away=1)
+    first = predictor.predict(context)
+    assert predictor.predict(LiveMatchContext('Paderborn', 'Elversberg', 40, 0, 0, country='Germany',
+                                              shots_home=3, shots_away=1)) == first
+    assert predictor.prediction_cache.hits == 1
+
+    conn = sqlite3.connect(path)
+    insert_pattern(conn, 'Germany', 'germany2', 'Paderborn', True, '31-45+', 0.9)
+    conn.commit()
+    conn.close()
+    patterns.refresh_if_changed()
+    assert predictor.predict(context)['home_active'].freq_any_goal == 0.9
+    predictor.close()
+
+
+def test_live_predictor_v2_sql_cache_follows_table_and_copies_deeply(tmp_path):
+    path = make_db(tmp_path)
+    predictor = LivePredictorV2(db_path=path)
+    context = LiveMatchContext('Paderborn', 'Elversberg', 40, 0, 0, country='Germany')
+    first = predictor.predict(context)
+    first['home_active'].probability = -1.0
+    first['combined_active']['probability'] = -1.0
+    second = predictor.predict(context)
+    assert second['home_active'].probability > 0 and second['combined_active']['probability'] > 0
+    assert predictor.prediction_cache.hits == 1
+
+    # Hit du cache : la version de la table n'est pas relue avant l'expiration du TTL
+    statements = []
+    predictor.conn.set_trace_callback(statements.append)
+    predictor.predict(context)
+    assert statements == []
+
+    conn = sqlite3.connect(path)
+    insert_pattern(conn, 'Germany', 'germany2', 'Paderborn', True, '31-45+', 0.9)
+    conn.commit()
+    conn.close()
+    predictor._table_version_expires = 0.0
+    assert predictor.predict(context)['home_active'].freq_any_goal == 0.9
+    predictor.close()
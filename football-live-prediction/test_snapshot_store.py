@@ -0,0 +1,91 @@
+import math
+import random
+import time
+
+from feature_extractor import FeatureExtractor
+from headless_parser_prototype import MatchStats, SnapshotCache
+from snapshot_store import SnapshotStore
+
+
+def make_stats(t, minute, **counters):
+    values = dict(score_home=0, score_away=0, shots_home=0, shots_away=0, sot_home=0, sot_away=0,
+                  corners_home=0, corners_away=0)
+    values.update(counters)
+    return MatchStats(timestamp=t, minute=minute, **values)
+
+
+def random_match(n=40, seed=7):
+    rng = random.Random(seed)
+    totals = dict(score_home=0, score_away=0, shots_home=0, shots_away=0, sot_home=0, sot_away=0,
+                  corners_home=0, corners_away=0)
+    snapshots = []
+    for i in range(n):
+        for key in totals:
+            totals[key] += rng.random() < (0.1 if key.startswith('score') else 0.4)
+        snapshots.append(make_stats(1000 + 45 * i, i, **totals))
+    return snapshots
+
+
+def test_windowed_deltas_match_list_scan():
+    # same results as FeatureExtractor's list filtering, after every append
+    store = SnapshotStore(capacity=20)
+    snapshots = random_match()
+    extractor = FeatureExtractor()
+    for i, stats in enumerate(snapshots):
+        store.append('m1', stats)
+        kept = snapshots[max(0, i - 19):i + 1]
+        now = stats.timestamp + 10
+        # the list path filters on time.time(): shift the kept snapshots so that "now" is the present
+        shift = time.time() - now
+        shifted = [MatchStats(**{**s.to_dict(), 'timestamp': s.timestamp + shift}) for s in kept]
+        for window in (300, 600):
+            assert store.deltas('m1', window, now=now) == extractor.extract_deltas(shifted, window)
+        assert math.isclose(store.saturation('m1', 600, now=now), extractor.extract_saturation_score(shifted, 600))
+    assert [s.timestamp for s in store.get('m1').snapshots()] == [s.timestamp for s in snapshots[-20:]]
+
+
+def test_snapshot_cache_keeps_momentum_semantics():
+    store = SnapshotStore()
+    cache = SnapshotCache('m2', max_snapshots=3, store=store)
+    cache.append(make_stats(100, 1, shots_home=1))
+    assert store.momentum('m2', 300, now=150) is None
+    cache.append(make_stats(200, 3, shots_home=3, corners_away=1))
+    cache.append(make_stats(300, 5, shots_home=4, corners_away=2, sot_home=None))
+    cache.append(make_stats(400, 7, shots_home=6, corners_away=2))
+    assert [s.minute for s in cache.snapshots] == [3, 5, 7]
+    momentum = store.momentum('m2', 300, now=410)
+    assert momentum['shots_home_delta'] == 3 and momentum['corners_away_delta'] == 1
+    # time going back resets the window cursor
+    assert store.momentum('m2', 150, now=410)['shots_home_delta'] == 2
+    assert store.momentum('m2', 150, now=340)['shots_home_delta'] == 3
+
+
+def test_persistence_restores_history(tmp_path):
+    path = str(tmp_path / 'live_snapshots.db')
+    store = SnapshotStore(capacity=5, db_path=path)
+    for stats in random_match(8):
+        store.append('m3', stats)
+    expected = store.deltas('m3', 300, now=1000 + 45 * 7)
+    store.close()
+
+    restarted = SnapshotStore(capacity=5, db_path=path)
+    assert len(restarted.get('m3')) == 5
+    assert restarted.deltas('m3', 300, now=1000 + 45 * 7) == expected
+    restarted.drop('m3', persisted=True)
+    assert len(restarted.get('m3')) == 0
+    restarted.close()
+
+
+def test_idle_series_evicted_and_released():
+    store = SnapshotStore(idle_ttl=600)
+    cache = SnapshotCache('m4', store=store)
+    cache.append(make_stats(100, 1, shots_home=1))
+    store.append('m5', make_stats(100, 1))
+    store.last_active['m4'] -= 601
+    assert store.evict_idle() == 1
+    assert set(store.series) == {'m5'}
+    # the cache follows the store's current series
+    cache.append(make_stats(200, 2, shots_home=2))
+    assert [s.minute for s in cache.snapshots] == [2]
+    cache.release()
+    assert set(store.series) == set(store.last_active) == {'m5'}
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from backtesting_analyzer import BacktestingAnalyzer
+
+
+def make_analyzer(tmp_path, n=500, seed=9):
+    rng = np.random.RandomState(seed)
+    confidence = np.round(rng.uniform(0, 1, n), 2)  # ties on grid values
+    goals = (rng.uniform(0, 1, n) < confidence * 0.8).astype(int)
+    should_bet = confidence >= 0.3
+    pd.DataFrame({
+        'match_id': [f"M{i}" for i in range(n)],
+        'interval': np.where(np.arange(n) % 2, '30-45', '75-90'),
+        'confidence': confidence,
+        'danger_score': np.round(rng.uniform(0, 100, n), 1),
+        'should_bet': should_bet,
+        'actual_goals': goals,
+        'correct_prediction': np.where(should_bet, goals >= 1, goals == 0),
+        'roi': np.where(should_bet, np.where(goals >= 1, 1.0, -1.0), 0.0),
+    }).to_csv(tmp_path / 'decisions.csv', index=False)
+    return BacktestingAnalyzer(str(tmp_path / 'decisions.csv'))
+
+
+def test_sweep_matches_filtering_each_pair(tmp_path):
+    analyzer = make_analyzer(tmp_path)
+    df = analyzer.df
+    sweep = analyzer.sweep_thresholds(np.arange(0, 100, 7) / 100, np.arange(0, 100, 9) / 100)
+    for i, conf in enumerate(sweep.confidence_thresholds):
+        for j, danger in enumerate(sweep.danger_thresholds):
+            passed = df[(df['confidence'] >= conf) & (df['danger_score'] >= danger * 100)]
+            wins = (passed['actual_goals'] >= 1).sum()
+            assert sweep.bets[i, j] == len(passed) and sweep.wins[i, j] == wins
+            if len(passed):
+                assert np.isclose(sweep.roi_avg[i, j], (2 * wins - len(passed)) / len(passed) * 100)
+
+    strategies = {s.strategy_name: s for s in analyzer.analyze_strategy_variations()}
+    moderate = analyzer.sweep_thresholds([0.30], [0.35])
+    assert moderate.bets[0, 0] == strategies['Moderate'].total_bets
+    assert np.isclose(moderate.roi_avg[0, 0], strategies['Moderate'].roi_avg)
+
+
+def test_pareto_frontier_is_not_dominated(tmp_path):
+    sweep = make_analyzer(tmp_path).sweep_thresholds()
+    assert sweep.bets.shape == (100, 100)
+    grid = sweep.to_frame()
+    frontier = sweep.pareto_frontier(min_bets=5)
+    assert list(frontier['bets']) == sorted(frontier['bets'], reverse=True)
+    assert frontier['roi_avg'].is_monotonic_increasing
+    candidates = grid[grid['bets'] >= 5]
+    for point in frontier.itertuples():
+        dominating = candidates[(candidates['bets'] >= point.bets) & (candidates['roi_avg'] > point.roi_avg)]
+        assert dominating.empty
+    best = candidates['roi_avg'].max()
+    assert np.isclose(frontier['roi_avg'].iloc[-1], best)
+
+
+def test_confidence_distribution_brackets(tmp_path):
+    analyzer = make_analyzer(tmp_path)
+    df = analyzer.df
+    result = analyzer.analyze_confidence_distribution(brackets=5)
+    lower, size = df['confidence'].min(), (df['confidence'].max() - df['confidence'].min()) / 5
+    for i, bracket in enumerate(result):
+        low = lower + i * size
+        inside = df[(df['confidence'] >= low) & (df['confidence'] < low + size)]
+        assert bracket.sample_count == len(inside)
+        assert np.isclose(bracket.correct_rate, inside['correct_prediction'].mean())
+        assert np.isclose(bracket.avg_roi, inside['roi'].mean())
+    # the maximum confidence falls outside the last bracket, as before
+    assert sum(b.sample_count for b in result) == (df['confidence'] < df['confidence'].max()).sum()
@@ -0,0 +1,95 @@
+import numpy as np
+
+from historical_replay import run_replay
+from predictors.live_goal_probability_predictor import LiveGoalProbabilityPredictor
+from test_historical_replay import make_db, random_fixtures
+from weight_search import (CURRENT, SnapshotFactors, WeightConfig, build_snapshots, config_grid,
+                           config_matrix, distinct_caps, factors_from_predictions, probabilities, score_configs,
+                           search)
+
+
+def live_states(n=200, seed=4):
+    rng = np.random.RandomState(seed)
+    states = []
+    for i in range(n):
+        attacks = rng.randint(0, 40, 2)
+        states.append({
+            'home_team': 'A', 'away_team': 'B', 'current_minute': int(rng.choice([35, 40, 80, 88])),
+            'home_possession': float(rng.uniform(30, 70)), 'away_possession': None if i % 7 == 0 else 50.0,
+            'home_attacks': int(attacks[0]), 'away_attacks': int(attacks[1]),
+            'home_dangerous_attacks': int(rng.randint(0, attacks[0] + 1)),
+            'away_dangerous_attacks': None if i % 5 == 0 else int(rng.randint(0, attacks[1] + 1)),
+            'home_shots_on_target': int(rng.randint(0, 4)), 'away_shots_on_target': int(rng.randint(0, 4)),
+            'home_red_cards': int(i % 11 == 0), 'score_home': int(rng.randint(0, 3)), 'score_away': int(rng.randint(0, 2)),
+            'last_5_min_events': {'buts': 0, 'tirs': int(rng.randint(0, 6))},
+        })
+    return states
+
+
+def test_current_config_reproduces_predictor(tmp_path):
+    predictor = LiveGoalProbabilityPredictor(db_path=str(tmp_path / 'empty.db'), cache_size=0)
+    states = live_states()
+    results = [predictor.predict_goal_probability(**state) for state in states]
+    factors = factors_from_predictions(states, results)
+    snapshots = SnapshotFactors(outcome=np.zeros(len(states), dtype=bool),
+                                interval=np.array([r['details']['interval'] for r in results]), **factors)
+    assert (snapshots.attack_ratio * 2 > 1.5).any()  # the cap is exercised
+    expected = [r['details']['final_probability'] for r in results]
+    assert np.allclose(probabilities(snapshots, config_matrix([CURRENT]))[0], expected, rtol=1e-12)
+
+    # a different cap / weight changes the probabilities as the formula says
+    other = WeightConfig(live_weight=0.5, dangerous_attacks_cap=1.0, min_probability=0.0, max_probability=1.0)
+    p = probabilities(snapshots, config_matrix([other]))[0]
+    multiplier = snapshots.other_multiplier * np.minimum(1.0, snapshots.attack_ratio * 2)
+    assert np.allclose(p, np.clip(snapshots.base_rate * (1 + (multiplier - 1) * 0.5), 0, 1))
+
+
+def test_snapshots_match_replay_and_scores(tmp_path):
+    path = str(tmp_path / 'replay.db')
+    make_db(path, random_fixtures())
+    minutes = [31, 40, 45, 76, 85, 90]
+    snapshots = build_snapshots(path, minutes=minutes)
+    report = run_replay(path, minutes=minutes, threshold=0.4, workers=0).to_dict()
+    assert len(snapshots) == sum(s['predictions'] for s in report['by_interval'].values())
+
+    scores = score_configs(snapshots, config_matrix([CURRENT]), threshold=0.4)
+    brier = sum(s['brier'] * s['predictions'] for s in report['by_interval'].values()) / len(snapshots)
+    assert np.isclose(scores['brier'][0], brier)
+    assert scores['bets'][0] == sum(s['bets'] for s in report['by_interval'].values())
+
+    path_npz = str(tmp_path / 'snapshots.npz')
+    snapshots.save(path_npz)
+    restored = SnapshotFactors.load(path_npz)
+    assert np.array_equal(restored.base_rate, snapshots.base_rate)
+    assert np.array_equal(restored.outcome, snapshots.outcome)
+
+
+def test_search_ranks_configs_in_process_pool(tmp_path):
+    path = str(tmp_path / 'replay.db')
+    make_db(path, random_fixtures(30, seed=2))
+    snapshots = build_snapshots(path, minutes=[35, 80])
+    configs = config_grid(live_weights=(0.0, 0.2, 0.4), dangerous_attacks_caps=(1.5,),
+                          min_probabilities=(0.05, 0.2), max_probabilities=(0.5, 0.95))
+    inline = search(snapshots, configs, threshold=0.3, workers=0)
+    pooled = search(snapshots, configs, threshold=0.3, workers=2, chunk_size=3)
+    assert len(inline) == len(configs) == 12
+    assert np.allclose(inline[['log_loss', 'brier', 'roi']], pooled[['log_loss', 'brier', 'roi']])
+    y = snapshots.outcome.astype(float)
+    for row, config in zip(inline.itertuples(), configs):
+        p = probabilities(snapshots, config_matrix([config]))[0]
+        assert np.isclose(row.brier, np.mean((p - y) ** 2))
+        assert row.bets == (p >= 0.3).sum()
+
+
+def test_replay_snapshots_are_neutral_and_cap_axis_collapses(tmp_path):
+    path = str(tmp_path / 'replay.db')
+    make_db(path, random_fixtures(30, seed=6))
+    snapshots = build_snapshots(path, minutes=[35, 40, 80, 88])
+    assert np.all(snapshots.attack_ratio == 0.5)
+    assert len(np.unique(snapshots.other_multiplier)) > 1  # score driven factors
+    assert distinct_caps(snapshots, [1.0, 1.25, 1.5, 2.0]) == [1.5]
+    assert distinct_caps(snapshots, [0.8, 1.25, 2.0]) == [0.8, 1.25]
+
+    low, high = probabilities(snapshots, config_matrix([WeightConfig(live_weight=0.0), WeightConfig(live_weight=0.5)]))
+    assert np.allclose(low, np.clip(snapshots.base_rate, 0.05, 0.95))
+    assert not np.allclose(low, high)
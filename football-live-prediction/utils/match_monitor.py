@@ -14,9 +14,11 @@ from loguru import logger
 import sys
 sys.path.insert(0, 'scrapers')
 sys.path.insert(0, 'predictors')
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
 from soccerstats_live import SoccerStatsLiveScraper
 from interval_predictor import IntervalPredictor
+from live_poll_scheduler import PollScheduler
 
 
 class MatchMonitor:
@@ -27,7 +29,8 @@ class MatchMonitor:
         match_url: str,
         scraper: Optional[SoccerStatsLiveScraper] = None,
         predictor: Optional[IntervalPredictor] = None,
-        interval: int = 30  # Scrape toutes les 30 secondes
+        interval: int = 30,  # Scrape toutes les 30 secondes dans les intervalles critiques
+        scheduler: Optional[PollScheduler] = None
     ):
         """
         Initialise le moniteur
@@ -36,12 +39,14 @@ class MatchMonitor:
             match_url: URL du match live
             scraper: Scraper live (créé si None)
             predictor: Prédicteur (créé si None)
-            interval: Intervalle de scraping en secondes
+            interval: Intervalle de scraping en secondes dans 31-45+ / 75-90+ (et juste avant)
+            scheduler: Rythme hors intervalles (créé si None : lent loin des intervalles et à la mi-temps)
         """
         self.match_url = match_url
         self.scraper = scraper or SoccerStatsLiveScraper()
         self.predictor = predictor or IntervalPredictor()
         self.interval = interval
+        self.scheduler = scheduler or PollScheduler(fast_seconds=interval)
         
         # État du match
         self.previous_state = {}
@@ -165,6 +170,11 @@ class MatchMonitor:
         normalized['raw'] = stats
         return normalized
     
+    def _next_delay(self, match_data: Dict) -> float:
+        """Pause avant le prochain scrape : self.interval près des intervalles critiques, plus long ailleurs"""
+        return self.scheduler.delay(match_data.get('current_minute'),
+                                    half_time=match_data.get('status') == 'HT')
+    
     def monitor(self, max_duration: int = 5400):
         """
         Surveille le match en continu
@@ -212,7 +222,7 @@ class MatchMonitor:
                     if self.on_match_start:
                         self.on_match_start(match_data)
                     self.previous_state = match_data.copy()
-                    time.sleep(self.interval)
+                    time.sleep(self._next_delay(match_data))
                     continue
                 
                 # Vérifier nouveau but
@@ -262,8 +272,8 @@ class MatchMonitor:
                 # Mise à jour
                 self.previous_state = match_data.copy()
                 
-                # Pause avant la prochaine vérification
-                time.sleep(self.interval)
+                # Pause avant la prochaine vérification (selon la distance aux intervalles critiques)
+                time.sleep(self._next_delay(match_data))
         
         except KeyboardInterrupt:
             logger.info("⏹️  Monitoring stopped by user")
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Hyper-parameter search for the hand-set constants of
+LiveGoalProbabilityPredictor.predict_goal_probability:
+
+    goal_probability = clip(base_rate * (1 + (live_multiplier - 1) * live_weight), min_probability, max_probability)
+    live_multiplier  = other_factors * min(dangerous_attacks_cap, 2 * dangerous_attacks_ratio)
+
+with live_weight = 0.20 (80% historical / 20% live), dangerous_attacks_cap = 1.5
+and the 0.05-0.95 clamp today.
+
+Every historical snapshot (match x minute of the replay grid) is run through the
+predictor once and reduced to its factor vector (base rate, dangerous-attacks
+ratio, product of the other live factors, outcome). Weight configurations are
+then scored as matrix operations on those vectors, in blocks spread over a
+process pool, and ranked by log-loss, Brier score and flat-odds ROI.
+
+Historical rows carry no live stats: replay snapshots use
+historical_replay.NEUTRAL_LIVE_STATS, so live_weight only scales the score
+driven factors (saturation, score differential), and the dangerous-attacks
+ratio is 0.5 everywhere, i.e. min(cap, 1.0) = 1 for every cap >= 1. Caps that
+cannot change any snapshot are collapsed to one value (distinct_caps) before
+the grid is built: the cap axis is only searched on snapshots saved from live
+matches (SnapshotFactors.save / load).
+
+Usage:
+    python3 weight_search.py --as-of --workers 8
+    python3 weight_search.py --snapshots snapshots.npz --live-weights 0 0.1 0.2 0.3 --top 5
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from asof_recurrence import AsOfRecurrence
+from historical_replay import (DEFAULT_MINUTES, DEFAULT_ODDS, DEFAULT_THRESHOLD, INTERVAL_END,
+                               build_pattern_index, goal_in_window, load_matches, make_predictor,
+                               replay_states, score_states)
+
+CONFIG_BLOCK = 16  # configurations scored together (block x snapshots matrix)
+MIN_BETS = 30  # configurations with fewer bets are not ranked by ROI
+
+
+@dataclass(frozen=True)
+class WeightConfig:
+    """Constants of predict_goal_probability (defaults = current values)"""
+    live_weight: float = 0.20
+    dangerous_attacks_cap: float = 1.5
+    min_probability: float = 0.05
+    max_probability: float = 0.95
+
+
+CURRENT = WeightConfig()
+
+
+@dataclass
+class SnapshotFactors:
+    """Factor vectors of the historical snapshots, one entry per snapshot"""
+    base_rate: np.ndarray
+    attack_ratio: np.ndarray  # max(dangerous attacks / attacks) of the two teams
+    other_multiplier: np.ndarray  # product of the live factors other than dangerous attacks
+    outcome: np.ndarray  # goal in [minute, end of interval]
+    interval: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.base_rate)
+
+    def save(self, path: str):
+        np.savez_compressed(path, **asdict(self))
+
+    @classmethod
+    def load(cls, path: str) -> "SnapshotFactors":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(**{name: data[name] for name in data.files})
+
+
+def state_attack_ratio(state: Dict) -> float:
+    """Same ratio as predict_goal_probability before the x2 and the cap"""
+    def ratio(numerator, denominator):
+        if numerator is None or denominator is None or denominator == 0:
+            return 0.0
+        return numerator / denominator
+    return max(ratio(state.get("home_dangerous_attacks"), state.get("home_attacks")),
+               ratio(state.get("away_dangerous_attacks"), state.get("away_attacks")))
+
+
+def factors_from_predictions(states: Sequence[Dict], results: Sequence[Dict]) -> Dict[str, np.ndarray]:
+    """Factor vectors of predictions returned by predict_goal_probability / predict_batch"""
+    other = np.array([
+        r["details"]["possession_factor"] * r["details"]["shots_on_target_factor"]
+        * r["details"]["momentum_factor"] * r["details"]["red_card_factor"]
+        * r["details"]["saturation_factor"] * r["details"]["score_differential_factor"]
+        for r in results
+    ])
+    return {
+        "base_rate": np.array([r["details"]["base_rate"] for r in results]),
+        "attack_ratio": np.array([state_attack_ratio(state) for state in states]),
+        "other_multiplier": other,
+    }
+
+
+def build_snapshots(db_path: str = "data/predictions.db", minutes: Iterable[int] = DEFAULT_MINUTES,
+                    leagues: Optional[Sequence[str]] = None, as_of: bool = False) -> SnapshotFactors:
+    """
+    Replay every match on the minute grid once (see historical_replay) and keep the factor vectors
+
+    Args:
+        as_of: Team recurrences from earlier matches only (asof_recurrence)
+    """
+    grid = np.array(sorted(set(int(m) for m in minutes)), dtype=int)
+    matches = load_matches(db_path, leagues)
+    pattern_index = build_pattern_index("goal_probability", db_path, matches, as_of, leagues)
+    predictor = make_predictor("goal_probability", db_path, pattern_index)
+
+    parts: Dict[str, List] = {name: [] for name in ("base_rate", "attack_ratio", "other_multiplier",
+                                                    "outcome", "interval")}
+    for match in matches:
+        home, away = score_states(match, grid)
+        if isinstance(pattern_index, AsOfRecurrence):
+            predictor._patterns_cache = pattern_index.patterns_cache(match.fixture)
+        states = replay_states(match, grid, home, away)
+        results = predictor.predict_batch(states)
+        intervals = np.array([r["details"]["interval"] for r in results])
+        ends = np.array([INTERVAL_END.get(name, 0) for name in intervals])
+        keep = (ends > 0) & (grid <= ends)  # key intervals only, minutes that can still be scored
+        if not keep.any():
+            continue
+        for name, values in factors_from_predictions(states, results).items():
+            parts[name].append(values[keep])
+        parts["outcome"].append(goal_in_window(match, grid[keep], ends[keep]))
+        parts["interval"].append(intervals[keep])
+
+    if not parts["base_rate"]:
+        return SnapshotFactors(np.zeros(0), np.zeros(0), np.zeros(0), np.zeros(0, dtype=bool), np.zeros(0, dtype=str))
+    return SnapshotFactors(**{name: np.concatenate(values) for name, values in parts.items()})
+
+
+def config_matrix(configs: Sequence[WeightConfig]) -> np.ndarray:
+    """K x 4 array (live_weight, dangerous_attacks_cap, min_probability, max_probability)"""
+    return np.array([[c.live_weight, c.dangerous_attacks_cap, c.min_probability, c.max_probability]
+                     for c in configs], dtype=float).reshape(-1, 4)
+
+
+def probabilities(snapshots: SnapshotFactors, configs: np.ndarray) -> np.ndarray:
+    """K x N goal probabilities (0-1), same formula as predict_goal_probability"""
+    live_weight, cap, low, high = (configs[:, i:i + 1] for i in range(4))
+    dangerous_attacks = np.minimum(cap, snapshots.attack_ratio * 2)
+    live_multiplier = snapshots.other_multiplier * dangerous_attacks
+    live_adjustment = (live_multiplier - 1.0) * live_weight
+    return np.minimum(high, np.maximum(low, snapshots.base_rate * (1.0 + live_adjustment)))
+
+
+def score_configs(snapshots: SnapshotFactors, configs: np.ndarray, threshold: float = DEFAULT_THRESHOLD,
+                  odds: float = DEFAULT_ODDS) -> Dict[str, np.ndarray]:
+    """Log-loss, Brier score, bets, hit rate and ROI of each configuration (row of configs)"""
+    y = snapshots.outcome.astype(float)
+    n = max(len(y), 1)
+    scores = {name: np.zeros(len(configs)) for name in ("log_loss", "brier", "bets", "hits")}
+    for start in range(0, len(configs), CONFIG_BLOCK):
+        block = slice(start, start + CONFIG_BLOCK)
+        p = probabilities(snapshots, configs[block])
+        clipped = np.clip(p, 1e-6, 1 - 1e-6)
+        scores["log_loss"][block] = -(np.log(clipped) @ y + np.log(1 - clipped) @ (1 - y)) / n
+        scores["brier"][block] = ((p - y) ** 2).sum(axis=1) / n
+        bets = p >= threshold
+        scores["bets"][block] = bets.sum(axis=1)
+        scores["hits"][block] = bets @ y
+    bets, hits = scores["bets"], scores["hits"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores["hit_rate"] = np.where(bets > 0, hits / bets, 0.0)
+        scores["roi"] = np.where(bets > 0, (hits * (odds - 1) - (bets - hits)) / bets, 0.0)
+    return scores
+
+
+def distinct_caps(snapshots: SnapshotFactors, caps: Iterable[float]) -> List[float]:
+    """
+    Candidate caps that give different probabilities on these snapshots: every cap
+    above 2 x the largest dangerous-attacks ratio leaves all of them uncapped, only
+    one of those is kept (the current cap when it is among them)
+    """
+    ceiling = 2 * float(snapshots.attack_ratio.max()) if len(snapshots) else 0.0
+    caps = sorted(set(caps))
+    binding = [cap for cap in caps if cap < ceiling]
+    inert = [cap for cap in caps if cap >= ceiling]
+    if CURRENT.dangerous_attacks_cap in inert:
+        inert = [CURRENT.dangerous_attacks_cap]
+    return binding + inert[:1]
+
+
+def config_grid(live_weights: Iterable[float] = (0.0, 0.1, 0.2, 0.3, 0.4, 0.5),
+                dangerous_attacks_caps: Iterable[float] = (1.0, 1.25, 1.5, 2.0),
+                min_probabilities: Iterable[float] = (0.01, 0.05, 0.10),
+                max_probabilities: Iterable[float] = (0.85, 0.90, 0.95, 0.99)) -> List[WeightConfig]:
+    """Cartesian product of candidate values (the current configuration included by default)"""
+    return [WeightConfig(*values) for values in itertools.product(
+        live_weights, dangerous_attacks_caps, min_probabilities, max_probabilities) if values[2] < values[3]]
+
+
+# Snapshots of the worker processes (inherited by fork, or set by _init_worker)
+_shared: Dict = {}
+
+
+def _init_worker(snapshots: SnapshotFactors, threshold: float, odds: float):
+    _shared.update(snapshots=snapshots, threshold=threshold, odds=odds)
+
+
+def _score_worker(configs: np.ndarray) -> Dict[str, np.ndarray]:
+    return score_configs(_shared["snapshots"], configs, _shared["threshold"], _shared["odds"])
+
+
+def search(snapshots: SnapshotFactors, configs: Sequence[WeightConfig], threshold: float = DEFAULT_THRESHOLD,
+           odds: float = DEFAULT_ODDS, workers: Optional[int] = None, chunk_size: int = 4 * CONFIG_BLOCK) -> pd.DataFrame:
+    """
+    Score every configuration on the snapshots
+
+    Returns:
+        One row per configuration: its constants, log_loss, brier, bets, hits, hit_rate, roi
+    """
+    matrix = config_matrix(configs)
+    chunks = [matrix[i:i + chunk_size] for i in range(0, len(matrix), chunk_size)]
+    workers = os.cpu_count() if workers is None else workers
+    if workers <= 1 or len(chunks) <= 1:
+        parts = [score_configs(snapshots, chunk, threshold, odds) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_init_worker,
+                                 initargs=(snapshots, threshold, odds)) as pool:
+            parts = list(pool.map(_score_worker, chunks))
+
+    results = pd.DataFrame(matrix, columns=["live_weight", "dangerous_attacks_cap",
+                                            "min_probability", "max_probability"])
+    for name in ("log_loss", "brier", "bets", "hits", "hit_rate", "roi"):
+        results[name] = np.concatenate([part[name] for part in parts]) if parts else []
+    results["bets"] = results["bets"].astype(int)
+    results["hits"] = results["hits"].astype(int)
+    return results
+
+
+def best_configs(results: pd.DataFrame, top: int = 10, min_bets: int = MIN_BETS) -> Dict[str, pd.DataFrame]:
+    """Best configurations by log-loss, Brier score and ROI (ROI among configurations with min_bets bets)"""
+    return {
+        "log_loss": results.nsmallest(top, "log_loss"),
+        "brier": results.nsmallest(top, "brier"),
+        "roi": results[results["bets"] >= min_bets].nlargest(top, "roi"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Weight search for LiveGoalProbabilityPredictor")
+    parser.add_argument("--db", default="data/predictions.db")
+    parser.add_argument("--snapshots", help="Factor vectors (.npz): loaded if present, otherwise built and saved")
+    parser.add_argument("--leagues", nargs="*")
+    parser.add_argument("--as-of", action="store_true", help="Leak-free team recurrences")
+    parser.add_argument("--live-weights", nargs="*", type=float, default=[0.0, 0.1, 0.2, 0.3, 0.4, 0.5])
+    parser.add_argument("--caps", nargs="*", type=float, default=[1.0, 1.25, 1.5, 2.0])
+    parser.add_argument("--min-probabilities", nargs="*", type=float, default=[0.01, 0.05, 0.10])
+    parser.add_argument("--max-probabilities", nargs="*", type=float, default=[0.85, 0.90, 0.95, 0.99])
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--odds", type=float, default=DEFAULT_ODDS)
+    parser.add_argument("--min-bets", type=int, default=MIN_BETS)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--output", default="weight_search_results.json")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.snapshots and os.path.exists(args.snapshots):
+        snapshots = SnapshotFactors.load(args.snapshots)
+    else:
+        snapshots = build_snapshots(args.db, leagues=args.leagues, as_of=args.as_of)
+        if args.snapshots:
+            snapshots.save(args.snapshots)
+    print(f"📦 {len(snapshots)} snapshots ({time.perf_counter() - started:.1f}s)")
+
+    caps = distinct_caps(snapshots, args.caps)
+    if len(caps) < len(set(args.caps)):
+        print(f"ℹ️ Caps {sorted(set(args.caps) - set(caps))} bind no snapshot (no live stats): searching {caps} only")
+    configs = config_grid(args.live_weights, caps, args.min_probabilities, args.max_probabilities)
+    started = time.perf_counter()
+    results = search(snapshots, configs, args.threshold, args.odds, args.workers)
+    print(f"⚙️ {len(configs)} configurations scored ({time.perf_counter() - started:.1f}s)")
+
+    current = score_configs(snapshots, config_matrix([CURRENT]), args.threshold, args.odds)
+    print(f"\nCurrent {CURRENT}: log-loss {current['log_loss'][0]:.4f} | Brier {current['brier'][0]:.4f} | "
+          f"bets {int(current['bets'][0])} | ROI {current['roi'][0]:+.1%}")
+    ranked = best_configs(results, args.top, args.min_bets)
+    for metric, frame in ranked.items():
+        print(f"\n🏆 Best by {metric}:")
+        print(frame.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+
+    with open(args.output, "w") as f:
+        json.dump({metric: frame.to_dict(orient="records") for metric, frame in ranked.items()}, f, indent=2)
+    print(f"\n✅ Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
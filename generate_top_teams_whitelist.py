@@ -11,53 +11,66 @@ Usage:
 import sqlite3
 import json
 import argparse
+import os
+import sys
 from datetime import datetime
 from collections import defaultdict
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'CLEAN_WORKFLOW'))
+import pandas as pd
 
-def get_interval_stats(cursor, team_name, is_home, interval_min, interval_max, min_matches=3):
-    """Calcule stats d'une équipe sur un intervalle spécifique"""
-    cursor.execute('''
-        SELECT goal_times, goal_times_conceded, date
-        FROM soccerstats_scraped_matches
-        WHERE team = ? AND is_home = ?
-        ORDER BY date DESC
-    ''', (team_name, 1 if is_home else 0))
-    
-    matches = cursor.fetchall()
-    total_matches = len(matches)
-    
-    # Minimum de matchs requis pour pattern fiable
-    if total_matches < min_matches:
-        return None
-    
-    matches_with_goal = 0
-    total_goals = 0
-    
-    for goal_times_json, goal_conceded_json, match_date in matches:
-        goals = json.loads(goal_times_json) if goal_times_json else []
-        goals_conceded = json.loads(goal_conceded_json) if goal_conceded_json else []
-        all_goals = goals + goals_conceded
-        
-        # Compter buts dans intervalle
-        goals_in_interval = [g for g in all_goals if interval_min <= g <= interval_max]
-        if goals_in_interval:
-            matches_with_goal += 1
-            total_goals += len(goals_in_interval)
-    
-    probability = (matches_with_goal / total_matches * 100) if total_matches > 0 else 0
-    recurrence = (total_goals / total_matches * 100) if total_matches > 0 else 0
-    
-    return {
-        'probability': probability,
-        'recurrence': recurrence,
-        'matches': total_matches,
-        'matches_with_goal': matches_with_goal,
-        'total_goals': total_goals
-    }
+import recurrence_index
+from recurrence_engine import RecurrenceEngine
+
+# Intervalles analysés (mêmes libellés et bornes que recurrence_index)
+INTERVALS = [
+    ('31-45', 31, 45),
+    ('76-90', 76, 90)
+]
+STATS_COLUMNS = ['league', 'team', 'is_home', 'interval', 'matches', 'matches_with_goal',
+                 'goals_for', 'goals_against', 'recurrence']
+
+
+def load_interval_stats(conn, leagues=None):
+    """
+    Compteurs (league, team, is_home, interval) de toutes les ligues demandées, calculés une seule fois
+
+    Lecture directe dans recurrence_index s'il existe ; les équipes absentes de l'index (écrites depuis
+    le dernier rebuild) et les bases sans index passent par RecurrenceEngine.
+    """
+    intervals = {name: (int_min, int_max) for name, int_min, int_max in INTERVALS}
+    where = f" AND league IN ({','.join('?' * len(leagues))})" if leagues else ''
+    params = list(leagues or [])
+    if not recurrence_index.has_index(conn):
+        return _engine_stats(conn, intervals, leagues)
+
+    indexed = pd.read_sql_query(f'''
+        SELECT league, team, is_home, interval_name AS interval, matches, matches_with_goal,
+               goals_for, goals_against
+        FROM recurrence_index
+        WHERE interval_name IN ({','.join('?' * len(intervals))}) AND matches > 0{where}
+    ''', conn, params=list(intervals) + params)
+    indexed['is_home'] = indexed['is_home'].astype(bool)
+    indexed['recurrence'] = 100.0 * indexed['matches_with_goal'] / indexed['matches']
+    scraped = conn.execute(
+        f"SELECT DISTINCT league, team FROM soccerstats_scraped_matches WHERE 1 = 1{where}", params
+    ).fetchall()
+    missing = set(scraped) - set(zip(indexed['league'], indexed['team']))
+    if not missing:
+        return indexed[STATS_COLUMNS]
+    computed = _engine_stats(conn, intervals, sorted({league for league, _ in missing}))
+    in_missing = [key in missing for key in zip(computed['league'], computed['team'])]
+    return pd.concat([indexed[STATS_COLUMNS], computed[in_missing]], ignore_index=True)
+
+
+def _engine_stats(conn, intervals, leagues=None):
+    """Mêmes compteurs calculés par RecurrenceEngine (une lecture de la table)"""
+    stats = RecurrenceEngine.load(conn, leagues=leagues).interval_stats(intervals)
+    stats['is_home'] = stats['is_home'].astype(bool)
+    return stats[STATS_COLUMNS].reset_index(drop=True)
 
 
-def analyze_league_teams(db_path, league_code, threshold=65, min_matches=4):
+def analyze_league_teams(db_path, league_code, threshold=65, min_matches=4, league_stats=None):
     """
     Analyse toutes les équipes d'une ligue et identifie les meilleures
     
@@ -66,22 +79,22 @@ def analyze_league_teams(db_path, league_code, threshold=65, min_matches=4):
         league_code: Code de la ligue (ex: 'germany', 'france')
         threshold: Seuil minimal de probabilité (défaut 65%)
         min_matches: Nombre minimal de matchs requis (défaut 4)
+        league_stats: Stats de la ligue déjà calculées (--all : load_interval_stats une fois, découpé par ligue)
     
     Returns:
         Dict avec équipes qualifiées et statistiques
     """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # Récupérer toutes les équipes de la ligue
-    cursor.execute('''
-        SELECT DISTINCT team, league
-        FROM soccerstats_scraped_matches
-        WHERE league = ?
-        ORDER BY team
-    ''', (league_code,))
+    if league_stats is None:
+        # Stats de toutes les équipes / côtés / intervalles de la ligue en une passe
+        conn = sqlite3.connect(db_path)
+        league_stats = load_interval_stats(conn, leagues=[league_code])
+        conn.close()
     
-    teams = cursor.fetchall()
+    stats_by_key = {
+        (row.team, bool(row.is_home), row.interval): row
+        for row in league_stats.itertuples(index=False)
+    }
+    teams = sorted(league_stats['team'].unique())
     
     print(f'\n🔍 ANALYSE DE {len(teams)} ÉQUIPES - {league_code.upper()}')
     print('=' * 70)
@@ -89,15 +102,20 @@ def analyze_league_teams(db_path, league_code, threshold=65, min_matches=4):
     qualified_teams = []
     team_stats = []
     
-    intervals = [
-        ('31-45', 31, 45),
-        ('76-90', 76, 90)
-    ]
-    
-    for team_name, league in teams:
+    for team_name in teams:
         for location_name, is_home in [('HOME', True), ('AWAY', False)]:
-            for interval_name, int_min, int_max in intervals:
-                stats = get_interval_stats(cursor, team_name, is_home, int_min, int_max, min_matches)
+            for interval_name, int_min, int_max in INTERVALS:
+                row = stats_by_key.get((team_name, is_home, interval_name))
+                stats = None
+                if row is not None and row.matches >= min_matches:
+                    total_goals = row.goals_for + row.goals_against
+                    stats = {
+                        'probability': float(row.recurrence),
+                        'recurrence': float(total_goals / row.matches * 100),
+                        'matches': int(row.matches),
+                        'matches_with_goal': int(row.matches_with_goal),
+                        'total_goals': int(total_goals)
+                    }
                 
                 if stats and stats['probability'] >= threshold:
                     qualified_teams.append({
@@ -121,8 +139,6 @@ def analyze_league_teams(db_path, league_code, threshold=65, min_matches=4):
                         'matches': stats['matches']
                     })
     
-    conn.close()
-    
     # Trier par probabilité décroissante
     qualified_teams.sort(key=lambda x: x['probability'], reverse=True)
     
@@ -186,7 +202,6 @@ def main():
     db_path = '/workspaces/paris-live/football-live-prediction/data/predictions.db'
     
     # Créer dossier de sortie
-    import os
     os.makedirs(args.output_dir, exist_ok=True)
     
     if args.all:
@@ -195,13 +210,17 @@ def main():
         cursor = conn.cursor()
         cursor.execute('SELECT DISTINCT league FROM soccerstats_scraped_matches ORDER BY league')
         leagues = [row[0] for row in cursor.fetchall()]
+        # Stats calculées une seule fois pour toutes les ligues, puis découpées par ligue
+        all_stats = load_interval_stats(conn)
         conn.close()
+        stats_by_league = dict(tuple(all_stats.groupby('league')))
         
         print(f'\n🚀 GÉNÉRATION WHITELISTS POUR {len(leagues)} LIGUES')
         print('=' * 70)
         
         for league in leagues:
-            data = analyze_league_teams(db_path, league, args.threshold, args.min_matches)
+            data = analyze_league_teams(db_path, league, args.threshold, args.min_matches,
+                                        league_stats=stats_by_league.get(league, all_stats.iloc[:0]))
             output_file = f'{args.output_dir}/{league}_whitelist.json'
             save_whitelist(data, output_file)
             print_report(data)
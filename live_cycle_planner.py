@@ -0,0 +1,190 @@
+"""
+Planification d'un cycle de scan live sous budget de temps (délestage)
+Chaque cycle (pages de match + analyses) doit tenir dans `budget_seconds`. Le travail est ordonné par valeur :
+    2  match dans un intervalle critique (31-45+, 75-90+)
+    1  match d'une équipe de la whitelist de sa ligue
+    0  le reste
+Quand le temps projeté dépasse le budget, les pages et analyses de moindre valeur sont délestées
+(reportées au cycle suivant) ; celles des matchs en intervalle critique ne le sont jamais.
+Les coûts (page de match, analyse) sont estimés par moyenne mobile exponentielle des cycles précédents.
+Utilisé par LiveScanEngine.scan(planner=...), auto_live_continuous_monitor.py et dashboard_web.py
+"""
+
+import json
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from live_poll_scheduler import PollScheduler, minutes_to_window
+
+VALUE_CRITICAL = 2
+VALUE_WHITELIST = 1
+VALUE_OTHER = 0
+
+
+def load_whitelist_teams(leagues_config: Dict[str, Dict]) -> Dict[str, Set[str]]:
+    """{league_key: noms d'équipes qualifiées en minuscules} depuis les fichiers whitelist de la config"""
+    teams = {}
+    for league_key, league_info in leagues_config.items():
+        try:
+            with open(league_info['whitelist'], 'r') as f:
+                whitelist = json.load(f)
+        except (OSError, ValueError, KeyError):
+            continue
+        names = set()
+        for entry in whitelist.get('qualified_teams', []):
+            name = entry.get('team') if isinstance(entry, dict) else entry
+            if name:
+                names.add(str(name).lower())
+        teams[league_key] = names
+    return teams
+
+
+@dataclass
+class CycleReport:
+    """Bilan d'un cycle : travail effectué et délesté"""
+    budget: float
+    elapsed: float = 0.0
+    fetched: int = 0
+    analysed: int = 0
+    shed_fetches: List[Tuple[str, str]] = field(default_factory=list)  # (league, url pmatch.asp)
+    shed_analyses: int = 0
+
+    @property
+    def shed(self) -> int:
+        return len(self.shed_fetches) + self.shed_analyses
+
+    def summary(self) -> str:
+        status = "⚠️ dépassé" if self.elapsed > self.budget else "✅"
+        text = (f"{self.fetched} page(s), {self.analysed} analyse(s) en {self.elapsed:.1f}s "
+                f"(budget {self.budget:.0f}s {status})")
+        if self.shed:
+            text += f" | délestage: {len(self.shed_fetches)} page(s), {self.shed_analyses} analyse(s)"
+        return text
+
+
+class CyclePlanner:
+    """
+    Budget de temps par cycle de scan
+
+    Usage :
+        planner.start_cycle()
+        snapshot = engine.scan(leagues, scheduler=scheduler, planner=planner)   # pages triées + délestage
+        for match in planner.order(matches): if planner.admit_analysis(value): ... planner.record_analysis(s)
+        report = planner.finish_cycle()
+    """
+
+    DEFAULT_BUDGET = PollScheduler.FAST_SECONDS  # les matchs en intervalle redeviennent dus après ce délai
+    SAFETY = 0.9  # part du budget réellement planifiée
+    SMOOTHING = 0.3  # poids de la dernière mesure dans les moyennes mobiles
+    FETCH_SECONDS = 1.0  # estimations initiales
+    ANALYSIS_SECONDS = 0.5
+
+    def __init__(self, budget_seconds: float = DEFAULT_BUDGET,
+                 whitelist_teams: Optional[Dict[str, Set[str]]] = None):
+        """
+        Args:
+            budget_seconds: Durée maximale d'un cycle (pages de match + analyses)
+            whitelist_teams: {league_key: noms d'équipes en minuscules} (voir load_whitelist_teams)
+        """
+        self.budget_seconds = budget_seconds
+        self.whitelist_teams = whitelist_teams or {}
+        self.fetch_seconds = self.FETCH_SECONDS
+        self.analysis_seconds = self.ANALYSIS_SECONDS
+        self.started_at = time.monotonic()
+        self.report = CycleReport(budget=budget_seconds)
+        self.totals = {'cycles': 0, 'overruns': 0, 'shed_fetches': 0, 'shed_analyses': 0}
+        self.lock = threading.Lock()
+
+    # ------------------------------------------------------------------ valeur
+
+    def value(self, league_key: str, minute: Optional[int], label: str = '') -> int:
+        """Valeur d'un match : intervalle critique > équipe whitelistée > reste"""
+        if minute is not None and minutes_to_window(minute) == 0:
+            return VALUE_CRITICAL
+        label = label.lower()
+        if label and any(team in label for team in self.whitelist_teams.get(league_key, ())):
+            return VALUE_WHITELIST
+        return VALUE_OTHER
+
+    def order(self, items: Iterable, key) -> List:
+        """Éléments triés par valeur décroissante (ordre d'origine conservé à valeur égale) ; key(item) -> valeur"""
+        return sorted(items, key=lambda item: -key(item))
+
+    # ------------------------------------------------------------------ cycle
+
+    def start_cycle(self, now: Optional[float] = None):
+        """Ouvre un cycle : l'échéance est maintenant + budget"""
+        self.started_at = time.monotonic() if now is None else now
+        self.report = CycleReport(budget=self.budget_seconds)
+
+    def remaining(self, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        return self.started_at + self.budget_seconds * self.SAFETY - now
+
+    def fetch_duration(self, count: int, rate: float, workers: int) -> float:
+        """Durée projetée de `count` pages : limitée par le seau à jetons ou par les workers"""
+        if count <= 0:
+            return 0.0
+        return max(count / rate, math.ceil(count / workers) * self.fetch_seconds)
+
+    def plan_fetches(self, match_urls: List[Tuple[str, str]], minutes: Dict[str, int],
+                     labels: Dict[str, str], rate: float, workers: int,
+                     now: Optional[float] = None) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+        """
+        Pages de match à télécharger dans le temps restant
+
+        Args:
+            match_urls: [(league_key, url)] dus ce cycle (ordre du scheduler)
+            minutes: {url: minute} connues (page d'accueil ou estimation)
+            labels: {url: texte de la ligne de la page d'accueil} (noms d'équipes)
+            rate: Débit du seau à jetons (requêtes/s)
+            workers: Téléchargements simultanés
+
+        Returns:
+            (à télécharger par valeur décroissante, délestées)
+        """
+        ranked = self.order(match_urls, key=lambda item: self.value(item[0], minutes.get(item[1]),
+                                                                    labels.get(item[1], '')))
+        remaining = self.remaining(now)
+        admitted, shed = [], []
+        for league_key, match_url in ranked:
+            critical = self.value(league_key, minutes.get(match_url), labels.get(match_url, '')) == VALUE_CRITICAL
+            count = len(admitted) + 1
+            projected = self.fetch_duration(count, rate, workers) + count * self.analysis_seconds
+            if critical or projected <= remaining:
+                admitted.append((league_key, match_url))
+            else:
+                shed.append((league_key, match_url))
+        self.report.shed_fetches.extend(shed)
+        return admitted, shed
+
+    def record_fetch(self, seconds: float):
+        """Durée mesurée d'une page de match (téléchargement + parsing), thread-safe"""
+        with self.lock:
+            self.fetch_seconds += self.SMOOTHING * (seconds - self.fetch_seconds)
+            self.report.fetched += 1
+
+    def admit_analysis(self, value: int, now: Optional[float] = None) -> bool:
+        """True si l'analyse tient dans le temps restant (toujours True pour un match en intervalle)"""
+        if value >= VALUE_CRITICAL or self.remaining(now) >= self.analysis_seconds:
+            return True
+        self.report.shed_analyses += 1
+        return False
+
+    def record_analysis(self, seconds: float):
+        self.analysis_seconds += self.SMOOTHING * (seconds - self.analysis_seconds)
+        self.report.analysed += 1
+
+    def finish_cycle(self, now: Optional[float] = None) -> CycleReport:
+        """Clôt le cycle et renvoie son bilan (cumulé dans self.totals)"""
+        now = time.monotonic() if now is None else now
+        report = self.report
+        report.elapsed = now - self.started_at
+        self.totals['cycles'] += 1
+        self.totals['overruns'] += report.elapsed > report.budget
+        self.totals['shed_fetches'] += len(report.shed_fetches)
+        self.totals['shed_analyses'] += report.shed_analyses
+        return report
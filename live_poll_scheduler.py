@@ -0,0 +1,183 @@
+"""
+Planification adaptative des requêtes de matchs live
+Chaque match est re-scrapé selon sa distance aux intervalles critiques de LivePredictorV2 (31-45+, 75-90+) :
+rapide dans un intervalle et juste avant, de plus en plus lent à mesure qu'on s'en éloigne (début de match,
+entre les deux intervalles), jamais à la mi-temps quand la page d'accueil la signale.
+Utilisé par LiveScanEngine.scan(scheduler=...), auto_live_continuous_monitor.py, dashboard_web.py
+et football-live-prediction/utils/match_monitor.py
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# (début, fin) des intervalles critiques ; le dernier reste ouvert (temps additionnel 90+)
+# Copie de LivePredictorV2.INTERVAL_1 / INTERVAL_2 (football-live-prediction/live_predictor_v2.py),
+# sans importer le prédicteur (sqlite3, logging) pour deux constantes
+CRITICAL_WINDOWS = ((31, 45), (75, 90))
+
+# Reprise de la 2e mi-temps : une mi-temps est planifiée comme la minute 46
+SECOND_HALF_START = 46
+
+
+def minutes_to_window(minute: int) -> int:
+    """Minutes avant le prochain intervalle critique (0 dans un intervalle ou après 90)"""
+    for start, end in CRITICAL_WINDOWS:
+        if minute < start:
+            return start - minute
+        if minute <= end:
+            return 0
+    return 0
+
+
+class PollScheduler:
+    """
+    Échéancier thread-safe des pages de match
+
+    Pour chaque match : date du dernier scrape et dernière minute connue. Le délai avant le
+    scrape suivant dépend de la minute la plus fraîche (page d'accueil, sinon estimation) :
+        intervalle critique ou moins de `lead_minutes` avant          fast_seconds
+        plus loin                                                      temps restant avant l'approche,
+                                                                       plafonné à slow_seconds
+        mi-temps signalée par la page d'accueil                        différé
+        minute inconnue                                                unknown_seconds
+    Les matchs dus sont renvoyés par distance croissante à l'intervalle (budget éventuel par cycle).
+    """
+
+    FAST_SECONDS = 20
+    LEAD_MINUTES = 3
+    SLOW_SECONDS = 300
+    UNKNOWN_SECONDS = 60
+    IDLE_SECONDS = 60
+
+    def __init__(self, fast_seconds: float = FAST_SECONDS, lead_minutes: int = LEAD_MINUTES,
+                 slow_seconds: float = SLOW_SECONDS, unknown_seconds: float = UNKNOWN_SECONDS,
+                 idle_seconds: float = IDLE_SECONDS, max_polls_per_cycle: Optional[int] = None):
+        """
+        Args:
+            fast_seconds: Période de scrape dans un intervalle critique et juste avant
+            lead_minutes: Minutes avant l'intervalle à partir desquelles on passe en rythme rapide
+            slow_seconds: Période maximale hors intervalle
+            unknown_seconds: Période quand la minute est inconnue
+            idle_seconds: Attente maximale entre deux lectures de la page d'accueil
+            max_polls_per_cycle: Nombre maximal de pages de match par cycle (None = illimité)
+        """
+        self.fast_seconds = fast_seconds
+        self.lead_minutes = lead_minutes
+        self.slow_seconds = slow_seconds
+        self.unknown_seconds = unknown_seconds
+        self.idle_seconds = idle_seconds
+        self.max_polls_per_cycle = max_polls_per_cycle
+        self._polled_at: Dict[str, float] = {}
+        self._minutes: Dict[str, Tuple[Optional[int], float]] = {}  # {url: (minute, observée à)}
+        self._half_time: set = set()
+        self._previous_poll: Dict[str, Optional[float]] = {}  # pour release()
+        self.stats = {'polled': 0, 'deferred': 0}
+        self.lock = threading.Lock()
+
+    def delay(self, minute: Optional[int], half_time: bool = False) -> float:
+        """Secondes entre deux scrapes d'un match à cette minute"""
+        if half_time:
+            minute = SECOND_HALF_START
+        elif minute is None:
+            return self.unknown_seconds
+        remaining = minutes_to_window(minute) - self.lead_minutes
+        if remaining <= 0:
+            return self.fast_seconds
+        return max(self.fast_seconds, min(self.slow_seconds, remaining * 60))
+
+    def estimate_minute(self, match_url: str, now: Optional[float] = None) -> Optional[int]:
+        """Dernière minute observée + temps écoulé (sans dépasser la 45e tant que la 1re mi-temps n'est pas finie)"""
+        minute, observed_at = self._minutes.get(match_url, (None, 0.0))
+        if minute is None:
+            return None
+        now = time.monotonic() if now is None else now
+        estimate = minute + int((now - observed_at) // 60)
+        return min(estimate, 45) if minute <= 45 else estimate
+
+    def _due_at(self, match_url: str, minute: Optional[int], half_time: bool) -> float:
+        polled_at = self._polled_at.get(match_url)
+        if polled_at is None:
+            return 0.0
+        return polled_at + self.delay(minute, half_time)
+
+    def select(self, match_urls: List[Tuple[str, str]], minutes: Optional[Dict[str, int]] = None,
+               half_time: Iterable[str] = (), now: Optional[float] = None
+               ) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+        """
+        Répartit les matchs découverts en matchs à scraper maintenant et matchs différés
+
+        Args:
+            match_urls: [(league_key, url pmatch.asp)] découverts ce cycle
+            minutes: {url: minute} lues sur la page d'accueil (sinon minute estimée)
+            half_time: URLs signalées "HT" sur la page d'accueil (jamais scrapées)
+            now: Horloge monotone (tests)
+
+        Returns:
+            (à scraper par distance croissante à l'intervalle, différés)
+        """
+        now = time.monotonic() if now is None else now
+        minutes = minutes or {}
+        half_time = set(half_time)
+        due, deferred = [], []
+        with self.lock:
+            live = {url for _, url in match_urls}
+            for stale in [url for url in self._polled_at if url not in live]:
+                del self._polled_at[stale]
+                self._minutes.pop(stale, None)
+            self._half_time = half_time & live
+
+            for position, (league_key, match_url) in enumerate(match_urls):
+                minute = minutes.get(match_url, self.estimate_minute(match_url, now))
+                if match_url in self._half_time:
+                    deferred.append((league_key, match_url))
+                    continue
+                if match_url in minutes:
+                    self._minutes[match_url] = (minute, now)
+                if now >= self._due_at(match_url, minute, False):
+                    distance = minutes_to_window(minute) if minute is not None else self.lead_minutes
+                    due.append((distance, position, (league_key, match_url)))
+                else:
+                    deferred.append((league_key, match_url))
+
+            due.sort()
+            selected = [item for _, _, item in due]
+            if self.max_polls_per_cycle is not None:
+                deferred.extend(selected[self.max_polls_per_cycle:])
+                selected = selected[:self.max_polls_per_cycle]
+            self._previous_poll = {url: self._polled_at.get(url) for _, url in selected}
+            for _, match_url in selected:
+                self._polled_at[match_url] = now
+            self.stats['polled'] += len(selected)
+            self.stats['deferred'] += len(deferred)
+        return selected, deferred
+
+    def release(self, match_urls: Iterable[Tuple[str, str]]):
+        """Matchs sélectionnés puis finalement non scrapés (délestage) : redeviennent dus tout de suite"""
+        with self.lock:
+            for _, match_url in match_urls:
+                previous = self._previous_poll.pop(match_url, None)
+                if previous is None:
+                    self._polled_at.pop(match_url, None)
+                else:
+                    self._polled_at[match_url] = previous
+                self.stats['polled'] -= 1
+                self.stats['deferred'] += 1
+
+    def observe(self, match_url: str, minute: Optional[int], now: Optional[float] = None):
+        """Minute lue sur la page du match (None = scrape en échec, seule la date compte)"""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            self._polled_at[match_url] = now
+            if minute is not None:
+                self._minutes[match_url] = (minute, now)
+
+    def next_wake(self, now: Optional[float] = None) -> float:
+        """Secondes avant le prochain match dû (au plus idle_seconds, pour relire la page d'accueil)"""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            due_times = [self._due_at(url, self.estimate_minute(url, now), False)
+                         for url in self._polled_at if url not in self._half_time]
+        if not due_times:
+            return self.idle_seconds
+        return max(1.0, min(self.idle_seconds, min(due_times) - now))
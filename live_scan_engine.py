@@ -0,0 +1,343 @@
+"""
+Moteur de scan live concurrent pour SoccerStats
+Détecte les matchs en cours depuis la page d'accueil (une seule requête par cycle), avec repli sur les
+pages latest.asp des ligues non résolues, puis télécharge en parallèle les pages pmatch.asp des matchs,
+sous un budget de requêtes global (seau à jetons) partagé par tous les threads.
+Avec un PollScheduler, seules les pages des matchs dus sont téléchargées (rythme selon la distance
+aux intervalles critiques, voir live_poll_scheduler.py).
+Utilisé par auto_live_continuous_monitor.py, auto_live_scanner.py et dashboard_web.py
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urljoin, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from live_cycle_planner import CyclePlanner
+from live_poll_scheduler import PollScheduler
+from scrape_live_soccerstats import LiveMatchData, SoccerStatsLiveScraper
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'CLEAN_WORKFLOW'))
+import html_parsing
+
+BASE_URL = "https://www.soccerstats.com"
+INDEX_URL = f"{BASE_URL}/"
+
+# Minute affichée en couleur en tête de ligne sur la page d'accueil : "57'", "45+2'", "HT"
+LIVE_MINUTE_RE = re.compile(r"^(\d{1,3})(?:\+\d{1,2})?'$")
+
+
+class TokenBucket:
+    """
+    Seau à jetons thread-safe
+    `rate` requêtes par seconde en régime établi, rafales jusqu'à `capacity`
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Bloque jusqu'à obtenir un jeton"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+@dataclass
+class LiveScanResult:
+    """Un match live détecté pendant un scan"""
+    league: str
+    match_url: str
+    data: LiveMatchData
+
+
+@dataclass
+class LiveIndex:
+    """Matchs en cours lus sur la page d'accueil"""
+    matches: Dict[str, List[str]] = field(default_factory=dict)  # {league_key: [url pmatch.asp]}
+    minutes: Dict[str, int] = field(default_factory=dict)  # {url pmatch.asp: minute}
+    half_time: List[str] = field(default_factory=list)  # urls pmatch.asp affichées "HT"
+    labels: Dict[str, str] = field(default_factory=dict)  # {url pmatch.asp: texte de la ligne (équipes)}
+    match_rows: int = 0  # lignes de match reconnues (live ou non)
+    unresolved: int = 0  # lignes live sans code de ligue
+
+
+@dataclass
+class LiveScanSnapshot:
+    """Résultat complet d'un cycle de scan (tous les matchs sont collectés avant publication)"""
+    scanned_at: datetime
+    duration: float
+    matches: List[LiveScanResult] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+    requests_count: int = 0
+    fallback_leagues: List[str] = field(default_factory=list)
+    index_minutes: Dict[str, int] = field(default_factory=dict)  # minutes lues sur la page d'accueil
+    half_time: List[str] = field(default_factory=list)
+    deferred: List[Tuple[str, str]] = field(default_factory=list)  # (league, url) non scrapés ce cycle
+    labels: Dict[str, str] = field(default_factory=dict)
+    shed: List[Tuple[str, str]] = field(default_factory=list)  # délestés faute de temps (inclus dans deferred)
+
+
+class LiveScanEngine:
+    """
+    Scan concurrent des matchs live
+
+    Phase 1 : page d'accueil (1 requête) ; pages latest.asp en parallèle uniquement pour les ligues
+              que la page d'accueil ne permet pas de résoudre
+    Phase 2 : pages pmatch.asp de tous les matchs in-play en parallèle
+    Chaque requête consomme un jeton du seau global (respect du serveur)
+    """
+
+    DEFAULT_TIMEOUT = 15
+    DEFAULT_RATE = 2.0  # requêtes / seconde, tous threads confondus
+    DEFAULT_BURST = 4
+    DEFAULT_WORKERS = 8
+
+    def __init__(self, scraper: Optional[SoccerStatsLiveScraper] = None,
+                 rate_per_second: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+                 max_workers: int = DEFAULT_WORKERS, timeout: int = DEFAULT_TIMEOUT):
+        """
+        Args:
+            scraper: Parser des pages de match (seul parse_match est utilisé)
+            rate_per_second: Budget global de requêtes par seconde
+            burst: Nombre de requêtes autorisées en rafale
+            max_workers: Nombre de téléchargements simultanés
+            timeout: Timeout HTTP (secondes)
+        """
+        self.scraper = scraper or SoccerStatsLiveScraper()
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        })
+        self._requests_count = 0
+        self._count_lock = threading.Lock()
+
+    def fetch(self, url: str) -> bytes:
+        """Télécharge une page en respectant le budget global"""
+        self.bucket.acquire()
+        with self._count_lock:
+            self._requests_count += 1
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.content
+
+    @staticmethod
+    def find_live_links(html: bytes) -> List[str]:
+        """
+        Liens pmatch.asp des matchs en cours d'une page latest.asp
+        (même détection que les monitors : minute "'" ou "In-play" / "Live" dans la ligne)
+        """
+        soup = html_parsing.make_soup(html)
+        urls = []
+        for link in soup.find_all('a', href=re.compile(r'pmatch\.asp')):
+            parent_row = link.find_parent('tr')
+            if not parent_row:
+                continue
+            row_text = parent_row.get_text()
+            if "'" not in row_text and 'In-play' not in row_text and 'Live' not in row_text:
+                continue
+            match_url = link.get('href')
+            if not match_url.startswith('http'):
+                match_url = f"{BASE_URL}/{match_url}"
+            if match_url not in urls:
+                urls.append(match_url)
+        return urls
+
+    @staticmethod
+    def parse_index(html: bytes, index_url: str = INDEX_URL) -> LiveIndex:
+        """
+        Matchs en cours de la page d'accueil, regroupés par code de ligue
+
+        Une ligne de match est la plus petite <tr> contenant un lien pmatch.asp ; elle est live si sa
+        première balise <font color=...> porte une minute ("57'") ou "HT", ou si elle mentionne
+        "live" / "in-play". Le code de ligue vient du paramètre league= du lien (ou d'un autre lien de la ligne).
+        """
+        soup = html_parsing.make_soup(html)
+        index = LiveIndex()
+        seen_rows = set()
+        for link in soup.find_all('a', href=re.compile(r'pmatch\.asp')):
+            row = link.find_parent('tr')
+            if row is None or id(row) in seen_rows:
+                continue
+            seen_rows.add(id(row))
+            index.match_rows += 1
+
+            minute = None
+            font = row.find('font', attrs={'color': True})
+            label = font.get_text(strip=True) if font else ''
+            minute_match = LIVE_MINUTE_RE.match(label)
+            if minute_match:
+                minute = int(minute_match.group(1))
+            elif label == 'HT':
+                minute = 45
+            elif not re.search(r"\b(live|in-play)\b", row.get_text(" ", strip=True), re.I):
+                continue
+
+            league = None
+            for a in [link] + row.find_all('a', href=True):
+                values = parse_qs(urlparse(a.get('href', '')).query).get('league')
+                if values:
+                    league = values[0].lower()
+                    break
+            if not league:
+                index.unresolved += 1
+                continue
+
+            match_url = urljoin(index_url, link['href'])
+            urls = index.matches.setdefault(league, [])
+            if match_url not in urls:
+                urls.append(match_url)
+                if minute is not None:
+                    index.minutes[match_url] = minute
+                if label == 'HT':
+                    index.half_time.append(match_url)
+                index.labels[match_url] = row.get_text(" ", strip=True)
+        return index
+
+    def _scan_league(self, url: str) -> List[str]:
+        return self.find_live_links(self.fetch(url))
+
+    def discover(self, leagues: Dict[str, str], pool: ThreadPoolExecutor,
+                 snapshot: LiveScanSnapshot, index_url: Optional[str] = INDEX_URL) -> List[Tuple[str, str]]:
+        """
+        Phase 1 : matchs live des ligues suivies
+
+        La page d'accueil est lue une fois ; les pages latest.asp ne sont téléchargées que si elle est
+        indisponible, sans ligne de match reconnue, ou contient des lignes live sans code de ligue
+        (dans ce dernier cas seules les ligues sans match résolu sont re-scannées).
+
+        Returns:
+            [(league_key, url pmatch.asp)] dans l'ordre des ligues, sans doublon
+        """
+        found: Dict[str, List[str]] = {}
+        fallback = list(leagues)
+        if index_url:
+            try:
+                index = self.parse_index(self.fetch(index_url), index_url)
+                found = {key: index.matches[key] for key in leagues if key in index.matches}
+                snapshot.index_minutes = index.minutes
+                snapshot.half_time = index.half_time
+                snapshot.labels = index.labels
+                if index.match_rows and not index.unresolved:
+                    fallback = []
+                else:
+                    fallback = [key for key in leagues if key not in found]
+            except Exception as e:
+                snapshot.errors[index_url] = str(e)
+        snapshot.fallback_leagues = fallback
+
+        league_futures = {key: pool.submit(self._scan_league, leagues[key]) for key in fallback}
+        match_urls = []  # (league, url), un match n'est scrapé qu'une fois
+        seen = set()
+        for league_key in leagues:
+            try:
+                urls = league_futures[league_key].result() if league_key in league_futures else found.get(league_key, [])
+            except Exception as e:
+                snapshot.errors[league_key] = str(e)
+                continue
+            for match_url in urls:
+                if match_url not in seen:
+                    seen.add(match_url)
+                    match_urls.append((league_key, match_url))
+        return match_urls
+
+    def _scan_match(self, match_url: str) -> Optional[LiveMatchData]:
+        scraper = self.scraper
+        soup = html_parsing.parse(self.fetch(match_url), html_parsing.MATCH_PAGE,
+                                  check=lambda s: scraper.extract_teams(s) != (None, None))
+        return self.scraper.parse_match(soup, match_url)
+
+    def _timed_scan(self, planner: CyclePlanner):
+        def scan_match(match_url: str) -> Optional[LiveMatchData]:
+            start = time.monotonic()
+            try:
+                return self._scan_match(match_url)
+            finally:
+                planner.record_fetch(time.monotonic() - start)
+        return scan_match
+
+    def scan(self, leagues: Dict[str, str], index_url: Optional[str] = INDEX_URL,
+             scheduler: Optional[PollScheduler] = None,
+             planner: Optional[CyclePlanner] = None) -> LiveScanSnapshot:
+        """
+        Scan complet des ligues
+
+        Args:
+            leagues: {league_key: url latest.asp}
+            index_url: Page d'accueil listant les matchs du jour (None = pages latest.asp uniquement)
+            scheduler: PollScheduler ; seuls les matchs dus sont scrapés, les autres vont dans snapshot.deferred
+            planner: CyclePlanner (cycle ouvert par l'appelant) ; pages triées par valeur, délestées
+                     dans snapshot.shed si le budget du cycle ne suffit pas
+
+        Returns:
+            LiveScanSnapshot (ordre des ligues puis ordre d'apparition des matchs)
+        """
+        start = time.time()
+        with self._count_lock:
+            self._requests_count = 0
+        snapshot = LiveScanSnapshot(scanned_at=datetime.now(), duration=0.0)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            # Phase 1 : page d'accueil (+ pages de ligues non résolues)
+            match_urls = self.discover(leagues, pool, snapshot, index_url)
+            if scheduler is not None:
+                match_urls, snapshot.deferred = scheduler.select(
+                    match_urls, snapshot.index_minutes, snapshot.half_time)
+            if planner is not None:
+                minutes = dict(snapshot.index_minutes)
+                if scheduler is not None:
+                    for _, match_url in match_urls:
+                        if match_url not in minutes:
+                            minutes[match_url] = scheduler.estimate_minute(match_url)
+                match_urls, snapshot.shed = planner.plan_fetches(
+                    match_urls, minutes, snapshot.labels, self.bucket.rate, self.max_workers)
+                snapshot.deferred.extend(snapshot.shed)
+                if scheduler is not None:
+                    scheduler.release(snapshot.shed)
+
+            # Phase 2 : pages de matchs
+            scan_match = self._scan_match if planner is None else self._timed_scan(planner)
+            match_futures = [(league_key, match_url, pool.submit(scan_match, match_url))
+                             for league_key, match_url in match_urls]
+            for league_key, match_url, future in match_futures:
+                try:
+                    data = future.result()
+                except Exception as e:
+                    snapshot.errors[match_url] = str(e)
+                    if scheduler is not None:
+                        scheduler.observe(match_url, None)
+                    continue
+                if scheduler is not None:
+                    scheduler.observe(match_url, data.minute if data else None)
+                if data:
+                    snapshot.matches.append(LiveScanResult(league_key, match_url, data))
+
+        snapshot.duration = time.time() - start
+        snapshot.requests_count = self._requests_count
+        return snapshot
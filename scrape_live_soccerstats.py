@@ -4,6 +4,8 @@ Extrait les données en direct d'un match SoccerStats
 Compatible avec live_prediction_pipeline.py
 """
 
+import os
+import sys
 import requests
 import re
 import time
@@ -12,6 +14,9 @@ from typing import Dict, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'CLEAN_WORKFLOW'))
+import html_parsing
+
 
 @dataclass
 class LiveMatchData:
@@ -106,7 +111,9 @@ class SoccerStatsLiveScraper:
             self._respect_throttle()
             response = self.session.get(url, timeout=self.DEFAULT_TIMEOUT)
             response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
+            # Tables utiles seulement (sans le bloc d'analyse) ; page complète si les équipes manquent
+            return html_parsing.parse(response.content, html_parsing.MATCH_PAGE,
+                                      check=lambda s: self.extract_teams(s) != (None, None))
         except requests.RequestException as e:
             print(f"❌ Erreur téléchargement {url}: {e}")
             return None
@@ -290,7 +297,20 @@ class SoccerStatsLiveScraper:
         soup = self.fetch_match_page(url)
         if not soup:
             return None
+        return self.parse_match(soup, url)
+    
+    def parse_match(self, soup: BeautifulSoup, url: str = "") -> Optional[LiveMatchData]:
+        """
+        Extrait un match depuis une page déjà téléchargée
+        (utilisé par LiveScanEngine, qui gère lui-même téléchargement et rate limit)
         
+        Args:
+            soup: Page du match parsée
+            url: URL d'origine (pour les messages d'erreur)
+        
+        Returns:
+            LiveMatchData object ou None si données incomplètes
+        """
         # Extraire tous les éléments
         home_team, away_team = self.extract_teams(soup)
         score_home, score_away = self.extract_score(soup)
@@ -2,11 +2,12 @@
 Module d'envoi de notifications Telegram
 """
 
-import requests
 import logging
-from typing import Dict, Optional
+from typing import Dict, Hashable, Optional
 from datetime import datetime
 
+from telegram_queue import get_queue
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,38 +20,30 @@ class TelegramNotifier:
         self.base_url = f"https://api.telegram.org/bot{bot_token}"
         self.last_alerts = {}  # match_url -> timestamp
     
-    def send_message(self, message: str, parse_mode: str = "HTML") -> bool:
+    def send_message(self, message: str, parse_mode: str = "HTML", key: Optional[Hashable] = None,
+                     blocking: bool = False) -> bool:
         """
-        Envoyer un message Telegram.
+        Envoyer un message Telegram (mis en file d'envoi, non bloquant par défaut).
         
         Args:
             message: Texte du message
             parse_mode: Format (HTML ou Markdown)
+            key: (match, intervalle) - une MAJ en attente pour la même clé est remplacée
+            blocking: Envoi synchrone hors file (tests de configuration)
             
         Returns:
-            True si envoi réussi, False sinon
+            True si message accepté (ou envoyé si blocking), False sinon
         """
-        try:
-            url = f"{self.base_url}/sendMessage"
-            data = {
-                "chat_id": self.chat_id,
-                "text": message,
-                "parse_mode": parse_mode,
-                "disable_web_page_preview": True
-            }
-            
-            response = requests.post(url, data=data, timeout=10)
-            
-            if response.status_code == 200:
-                logger.info("✅ Message Telegram envoyé avec succès")
-                return True
-            else:
-                logger.error(f"❌ Erreur Telegram: {response.status_code} - {response.text}")
+        if blocking:
+            try:
+                sent = get_queue().deliver_now(self.bot_token, self.chat_id, message, parse_mode)
+            except Exception as e:
+                logger.error(f"❌ Exception lors de l'envoi Telegram: {e}")
                 return False
-                
-        except Exception as e:
-            logger.error(f"❌ Exception lors de l'envoi Telegram: {e}")
-            return False
+            if sent:
+                logger.info("✅ Message Telegram envoyé avec succès")
+            return sent
+        return get_queue().enqueue(self.bot_token, self.chat_id, message, parse_mode, key=key)
     
     def format_alert_message(self, analysis: Dict, championship: str = "Bulgarie") -> str:
         """
@@ -177,8 +170,9 @@ class TelegramNotifier:
             logger.warning("⚠️ Impossible de formater le message")
             return False
         
-        # Envoyer
-        return self.send_message(message)
+        # Mettre en file (une seule alerte en attente par match et intervalle)
+        home_pred = analysis['predictions'].get('home_active')
+        return self.send_message(message, key=(match_url, home_pred.interval_name if home_pred else None))
     
     def send_test_message(self) -> bool:
         """Envoyer un message de test."""
@@ -194,7 +188,7 @@ Vous recevrez désormais des alertes quand :
 
 🚀 Système prêt !
 """
-        return self.send_message(test_message)
+        return self.send_message(test_message, blocking=True)
 
 
 def test_telegram_connection():
@@ -0,0 +1,270 @@
+"""
+File d'envoi Telegram asynchrone
+Les boucles de scan ne font qu'empiler les messages (enqueue, non bloquant) ; un thread de fond les envoie :
+    - file bornée (le plus ancien message en attente est abandonné quand elle est pleine)
+    - limites Telegram : 1 message/s par chat, 20 messages/min par groupe (chat_id négatif), 30 messages/s au total
+    - nouvelle tentative avec backoff exponentiel (erreurs réseau, 5xx) ou après le retry_after d'un 429
+    - coalescence : un message en attente pour le même (chat, match, intervalle) est remplacé par le plus récent,
+      seule la dernière probabilité part
+Utilisé par telegram_notifier.TelegramNotifier, auto_live_continuous_monitor.py, auto_live_scanner.py
+et football-live-prediction/continuous_live_monitor.py
+"""
+
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Hashable, Optional, Tuple
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+API_URL = "https://api.telegram.org/bot{token}/sendMessage"
+
+
+@dataclass
+class TelegramMessage:
+    """Message en attente d'envoi"""
+    bot_token: str
+    chat_id: str
+    text: str
+    parse_mode: Optional[str] = "HTML"
+    key: Optional[Hashable] = None  # (match, intervalle) : coalescence des mises à jour
+    attempts: int = 0
+    not_before: float = 0.0  # backoff
+
+    def payload(self) -> Dict:
+        data = {'chat_id': self.chat_id, 'text': self.text, 'disable_web_page_preview': True}
+        if self.parse_mode:
+            data['parse_mode'] = self.parse_mode
+        return data
+
+
+def post_message(message: TelegramMessage, timeout: float = 10) -> Tuple[int, Dict]:
+    """Envoi HTTP d'un message : (status_code, réponse JSON)"""
+    response = requests.post(API_URL.format(token=message.bot_token), data=message.payload(), timeout=timeout)
+    try:
+        body = response.json()
+    except ValueError:
+        body = {'description': response.text}
+    return response.status_code, body
+
+
+class TelegramDeliveryQueue:
+    """
+    File d'envoi Telegram thread-safe avec un thread de fond
+
+    Usage :
+        queue = get_queue()
+        queue.enqueue(bot_token, chat_id, message, key=(match_id, '76-90'))   # retourne immédiatement
+        queue.flush(timeout=30)                                               # à l'arrêt du moniteur
+    """
+
+    MAXSIZE = 200
+    CHAT_INTERVAL = 1.0  # secondes entre deux messages d'un même chat
+    GROUP_PER_MINUTE = 20  # messages par minute vers un groupe
+    GLOBAL_PER_SECOND = 30  # messages par seconde tous chats confondus
+    MAX_ATTEMPTS = 5
+    BACKOFF_SECONDS = 2.0  # 2, 4, 8, 16 s entre les tentatives
+
+    def __init__(self, send: Callable[[TelegramMessage], Tuple[int, Dict]] = post_message,
+                 maxsize: int = MAXSIZE, chat_interval: float = CHAT_INTERVAL,
+                 group_per_minute: int = GROUP_PER_MINUTE, global_per_second: int = GLOBAL_PER_SECOND,
+                 max_attempts: int = MAX_ATTEMPTS, backoff_seconds: float = BACKOFF_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            send: Fonction d'envoi (message) -> (status_code, réponse JSON)
+            maxsize: Messages en attente au maximum
+            chat_interval: Délai minimal entre deux messages d'un même chat
+            group_per_minute: Messages par minute au plus vers un groupe
+            global_per_second: Messages par seconde au plus au total
+            max_attempts: Tentatives avant abandon d'un message
+            backoff_seconds: Premier délai de nouvelle tentative (doublé à chaque échec)
+        """
+        self.send = send
+        self.maxsize = maxsize
+        self.chat_interval = chat_interval
+        self.group_per_minute = group_per_minute
+        self.global_per_second = global_per_second
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.clock = clock
+        self._pending: "OrderedDict[int, TelegramMessage]" = OrderedDict()
+        self._by_key: Dict[Tuple[str, Hashable], int] = {}
+        self._ids = itertools.count()
+        self._chat_free_at: Dict[str, float] = {}  # prochain envoi autorisé par chat
+        self._group_sent: Dict[str, Deque[float]] = {}
+        self._global_sent: Deque[float] = deque()
+        self._in_flight = 0
+        self.stats = {'enqueued': 0, 'sent': 0, 'failed': 0, 'retried': 0, 'coalesced': 0, 'dropped': 0}
+        self.cond = threading.Condition()
+        self._stopping = False
+        self._worker: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------ producteurs
+
+    def enqueue(self, bot_token: str, chat_id, text: str, parse_mode: Optional[str] = "HTML",
+                key: Optional[Hashable] = None) -> bool:
+        """Ajoute un message (non bloquant) ; remplace le message en attente de même (chat, key)"""
+        chat_id = str(chat_id)
+        with self.cond:
+            if key is not None and (chat_id, key) in self._by_key:
+                pending = self._pending[self._by_key[(chat_id, key)]]
+                pending.text, pending.parse_mode, pending.bot_token = text, parse_mode, bot_token
+                self.stats['coalesced'] += 1
+                return True
+            if len(self._pending) >= self.maxsize:
+                _, oldest = self._pending.popitem(last=False)
+                self._forget_key(oldest)
+                self.stats['dropped'] += 1
+                logger.warning(f"⚠️ File Telegram pleine : message le plus ancien abandonné ({oldest.chat_id})")
+            message_id = next(self._ids)
+            self._pending[message_id] = TelegramMessage(bot_token, chat_id, text, parse_mode, key)
+            if key is not None:
+                self._by_key[(chat_id, key)] = message_id
+            self.stats['enqueued'] += 1
+            self._ensure_worker()
+            self.cond.notify()
+        return True
+
+    def deliver_now(self, bot_token: str, chat_id, text: str, parse_mode: Optional[str] = "HTML") -> bool:
+        """Envoi synchrone hors file (messages de test de configuration)"""
+        status, body = self.send(TelegramMessage(bot_token, str(chat_id), text, parse_mode))
+        if status != 200:
+            logger.error(f"❌ Erreur Telegram: {status} - {body.get('description', '')}")
+        return status == 200
+
+    def pending(self) -> int:
+        with self.cond:
+            return len(self._pending) + self._in_flight
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Attend que la file soit vide (True) ou l'expiration du délai (False)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.cond:
+            while self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.cond.wait(remaining if remaining is not None else 1.0)
+        return True
+
+    def stop(self, timeout: Optional[float] = 10.0):
+        """Vide la file (au plus timeout secondes) puis arrête le thread"""
+        self.flush(timeout)
+        with self.cond:
+            self._stopping = True
+            self.cond.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+        self._stopping = False
+
+    # ------------------------------------------------------------------ thread d'envoi
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name='telegram-delivery', daemon=True)
+            self._worker.start()
+
+    def _forget_key(self, message: TelegramMessage):
+        if message.key is not None:
+            self._by_key.pop((message.chat_id, message.key), None)
+
+    def _ready_at(self, message: TelegramMessage, now: float) -> float:
+        """Date à partir de laquelle le message respecte backoff et limites de débit"""
+        ready = max(message.not_before, self._chat_free_at.get(message.chat_id, 0.0))
+        if message.chat_id.startswith('-'):
+            sent = self._group_sent.get(message.chat_id, ())
+            if len(sent) >= self.group_per_minute:
+                ready = max(ready, sent[-self.group_per_minute] + 60.0)
+        if len(self._global_sent) >= self.global_per_second:
+            ready = max(ready, self._global_sent[-self.global_per_second] + 1.0)
+        return ready
+
+    def _next_message(self) -> Tuple[Optional[int], float]:
+        """(id du premier message envoyable, sinon None ; attente avant le prochain)"""
+        now = self.clock()
+        wait = None
+        for message_id, message in self._pending.items():
+            ready = self._ready_at(message, now)
+            if ready <= now:
+                return message_id, 0.0
+            wait = ready - now if wait is None else min(wait, ready - now)
+        return None, wait if wait is not None else 1.0
+
+    def _record_sent(self, chat_id: str, now: float):
+        self._chat_free_at[chat_id] = now + self.chat_interval
+        self._global_sent.append(now)
+        while self._global_sent and self._global_sent[0] <= now - 1.0:
+            self._global_sent.popleft()
+        if chat_id.startswith('-'):
+            sent = self._group_sent.setdefault(chat_id, deque())
+            sent.append(now)
+            while sent and sent[0] <= now - 60.0:
+                sent.popleft()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                message_id, wait = self._next_message()
+                while message_id is None:
+                    if self._stopping:
+                        return
+                    self.cond.wait(wait)
+                    message_id, wait = self._next_message()
+                message = self._pending.pop(message_id)
+                self._forget_key(message)
+                self._in_flight += 1
+            try:
+                status, body = self.send(message)
+            except Exception as e:  # réseau, timeout
+                status, body = None, {'description': str(e)}
+            with self.cond:
+                self._in_flight -= 1
+                self._record_sent(message.chat_id, self.clock())  # compté à la réponse (conservateur)
+                self._handle_result(message, status, body)
+                self.cond.notify_all()
+
+    def _handle_result(self, message: TelegramMessage, status: Optional[int], body: Dict):
+        if status == 200:
+            self.stats['sent'] += 1
+            return
+        message.attempts += 1
+        retryable = status is None or status == 429 or status >= 500
+        if not retryable or message.attempts >= self.max_attempts:
+            self.stats['failed'] += 1
+            logger.error(f"❌ Erreur Telegram: {status} - {body.get('description', '')}")
+            return
+        now = self.clock()
+        if status == 429:
+            retry_after = float((body.get('parameters') or {}).get('retry_after', self.backoff_seconds))
+            self._chat_free_at[message.chat_id] = now + retry_after
+            message.not_before = now + retry_after
+        else:
+            message.not_before = now + self.backoff_seconds * 2 ** (message.attempts - 1)
+        if message.key is not None and (message.chat_id, message.key) in self._by_key:
+            return  # une mise à jour plus récente attend déjà : la version en échec est abandonnée
+        self.stats['retried'] += 1
+        message_id = next(self._ids)
+        self._pending[message_id] = message
+        self._pending.move_to_end(message_id, last=False)  # garde sa place en tête de file
+        if message.key is not None:
+            self._by_key[(message.chat_id, message.key)] = message_id
+
+
+_queue: Optional[TelegramDeliveryQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_queue() -> TelegramDeliveryQueue:
+    """File d'envoi partagée par le processus"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = TelegramDeliveryQueue()
+        return _queue
@@ -0,0 +1,92 @@
+"""
+Tests des abonnements aux alertes live (un calcul par match, filtres par abonné).
+
+Usage :
+    python3 -m pytest test_alert_subscriptions.py -q
+"""
+import json
+import os
+
+import alert_subscriptions
+from alert_subscriptions import (FIRST_SIGNAL, SIGNAL_DOWN, SIGNAL_UP, SIGNAL_UPDATE, SUBSCRIPTIONS_PATH,
+                                 TELEGRAM_CONFIG_PATH, Subscription, SubscriptionRegistry)
+
+
+def _reasons(notifications):
+    return {n.subscription.name: n.reason for n in notifications}
+
+
+class TestSubscriptionRegistry:
+    """Tests pour SubscriptionRegistry"""
+
+    def test_index_by_league_and_interval(self):
+        """Seuls les abonnés de la ligue / de l'intervalle (ou sans filtre) sont candidats"""
+        registry = SubscriptionRegistry([
+            Subscription('tous', '1', 't'),
+            Subscription('france', '2', 't', leagues=frozenset({'france'})),
+            Subscription('fin', '3', 't', intervals=frozenset({'76-90'})),
+            Subscription('france_fin', '4', 't', leagues=frozenset({'france'}), intervals=frozenset({'76-90'})),
+        ])
+        assert {s.name for s in registry.candidates('france', '76-90')} == {'tous', 'france', 'fin', 'france_fin'}
+        assert {s.name for s in registry.candidates('france', '31-45')} == {'tous', 'france'}
+        assert {s.name for s in registry.candidates('bolivia', '31-45')} == {'tous'}
+        registry.remove('tous')
+        assert registry.candidates('bolivia', '31-45') == []
+
+    def test_thresholds_and_deltas_per_subscriber(self):
+        """Même suite de probabilités, alertes différentes selon seuil et delta de chaque abonné"""
+        registry = SubscriptionRegistry([
+            Subscription('defaut', '1', 't'),
+            Subscription('strict', '2', 't', min_probability=75, change_delta=2),
+        ])
+        evaluate = lambda p: _reasons(registry.evaluate('m_76-90', 'france', '76-90', p))
+        assert evaluate(60) == {}
+        assert evaluate(66) == {'defaut': SIGNAL_UP}
+        assert evaluate(70) == {}
+        assert evaluate(76) == {'defaut': SIGNAL_UPDATE, 'strict': SIGNAL_UP}
+        assert evaluate(78) == {'strict': SIGNAL_UPDATE}
+        assert evaluate(64) == {'defaut': SIGNAL_DOWN, 'strict': SIGNAL_DOWN}
+        assert _reasons(registry.evaluate('m2_76-90', 'france', '76-90', 80)) == {'defaut': FIRST_SIGNAL,
+                                                                                  'strict': FIRST_SIGNAL}
+        registry.forget(['m2_76-90'])
+        assert _reasons(registry.evaluate('m2_76-90', 'france', '76-90', 80)) == {'defaut': FIRST_SIGNAL,
+                                                                                  'strict': FIRST_SIGNAL}
+
+    def test_from_config(self, tmp_path):
+        """subscriptions.json (token par défaut de telegram_config), sinon abonné unique"""
+        path = tmp_path / 'subscriptions.json'
+        path.write_text(json.dumps({'subscribers': [
+            {'name': 'vip', 'chat_id': -100, 'leagues': ['france'], 'min_probability': 70},
+            {'chat_id': 5, 'bot_token': 'autre'},
+        ]}))
+        registry = SubscriptionRegistry.from_config({'bot_token': 'tok', 'chat_id': 1}, str(path))
+        vip, other = registry.subscriptions['vip'], registry.subscriptions['subscriber2']
+        assert (vip.chat_id, vip.bot_token, vip.leagues, vip.min_probability) == ('-100', 'tok', frozenset({'france'}), 70.0)
+        assert (other.bot_token, other.change_delta) == ('autre', 5.0)
+
+        fallback = SubscriptionRegistry.from_config({'bot_token': 'tok', 'chat_id': 1}, str(tmp_path / 'absent'))
+        assert list(fallback.subscriptions) == ['default']
+        assert len(SubscriptionRegistry.from_config(None, str(tmp_path / 'absent'))) == 0
+
+    def test_default_path_ignores_cwd(self, tmp_path, monkeypatch):
+        """subscriptions.json est cherché à côté du module, quel que soit le répertoire courant"""
+        assert SUBSCRIPTIONS_PATH == os.path.join(os.path.dirname(os.path.abspath(alert_subscriptions.__file__)),
+                                                  'subscriptions.json')
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / 'subscriptions.json').write_text(json.dumps({'subscribers': [{'chat_id': 9}]}))
+        registry = SubscriptionRegistry.from_config({'bot_token': 'tok', 'chat_id': 1})
+        assert 'subscriber1' not in registry.subscriptions
+
+    def test_monitor_telegram_config_ignores_cwd(self, tmp_path, monkeypatch):
+        """telegram_config.json est résolu comme subscriptions.json : depuis le dossier du module"""
+        import auto_live_continuous_monitor
+        assert os.path.dirname(TELEGRAM_CONFIG_PATH) == os.path.dirname(SUBSCRIPTIONS_PATH)
+        config = tmp_path / 'module' / 'telegram_config.json'
+        config.parent.mkdir()
+        config.write_text(json.dumps({'bot_token': 'tok', 'chat_id': 1}))
+        monkeypatch.setattr(auto_live_continuous_monitor, 'TELEGRAM_CONFIG_PATH', str(config))
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / 'telegram_config.json').write_text(json.dumps({'bot_token': 'cwd', 'chat_id': 2}))
+        monitor = auto_live_continuous_monitor.ContinuousLiveMonitor.__new__(
+            auto_live_continuous_monitor.ContinuousLiveMonitor)
+        assert monitor.load_telegram_config() == {'bot_token': 'tok', 'chat_id': 1}
@@ -0,0 +1,91 @@
+"""
+Tests du budget de temps par cycle de scan (ordre par valeur, délestage).
+
+Usage :
+    python3 -m pytest test_live_cycle_planner.py -q
+"""
+import json
+import os
+
+from live_cycle_planner import (VALUE_CRITICAL, VALUE_OTHER, VALUE_WHITELIST, CyclePlanner,
+                                load_whitelist_teams)
+from live_poll_scheduler import PollScheduler
+from live_scan_engine import LiveScanEngine
+
+SAMPLE_MATCH = os.path.join(os.path.dirname(__file__), 'football-live-prediction', 'live_match_sample.html')
+
+
+def _index_row(minute, stats, teams):
+    return (f"<tr><td><font color='#C70039'>{minute}'</font></td><td>{teams}</td>"
+            f"<td><a href='pmatch.asp?league=a&stats={stats}'>stats</a></td></tr>")
+
+
+class TestCyclePlanner:
+    """Tests pour CyclePlanner"""
+
+    def test_value_and_whitelist(self, tmp_path):
+        """Intervalle critique > équipe whitelistée > reste"""
+        path = tmp_path / "a_whitelist.json"
+        path.write_text(json.dumps({'qualified_teams': [{'team': 'Lyon', 'interval': '76-90'}]}))
+        teams = load_whitelist_teams({'a': {'whitelist': str(path)}, 'b': {'whitelist': str(tmp_path / 'absent')}})
+        assert teams == {'a': {'lyon'}}
+        planner = CyclePlanner(whitelist_teams=teams)
+        assert planner.value('a', 80, 'Nice 0:0 Metz') == VALUE_CRITICAL
+        assert planner.value('a', 10, 'Lyon 1:0 Metz') == VALUE_WHITELIST
+        assert planner.value('b', 10, 'Lyon 1:0 Metz') == VALUE_OTHER
+        assert planner.value('a', None) == VALUE_OTHER
+
+    def test_plan_fetches_sheds_low_value_only(self):
+        """Budget serré : les pages critiques passent toujours, le reste est délesté par valeur"""
+        planner = CyclePlanner(budget_seconds=10, whitelist_teams={'a': {'lyon'}})
+        planner.fetch_seconds = 2.0
+        planner.analysis_seconds = 0.5
+        planner.start_cycle(now=0)
+        urls = [('a', 'other1'), ('a', 'white'), ('a', 'crit1'), ('a', 'other2'), ('a', 'crit2')]
+        minutes = {'other1': 10, 'white': 12, 'crit1': 35, 'other2': 60, 'crit2': 80}
+        labels = {'white': 'Lyon 0:0 Nice'}
+        # 9s disponibles (SAFETY) ; 1 worker : 2.5s par page analysée
+        admitted, shed = planner.plan_fetches(urls, minutes, labels, rate=10, workers=1, now=0)
+        assert admitted == [('a', 'crit1'), ('a', 'crit2'), ('a', 'white')]
+        assert shed == [('a', 'other1'), ('a', 'other2')]
+
+        # trop tard pour une analyse non critique, jamais pour une critique
+        assert planner.admit_analysis(VALUE_OTHER, now=8.9) is False
+        assert planner.admit_analysis(VALUE_CRITICAL, now=30) is True
+        report = planner.finish_cycle(now=12)
+        assert report.shed == 3 and report.elapsed > report.budget
+        assert planner.totals == {'cycles': 1, 'overruns': 1, 'shed_fetches': 2, 'shed_analyses': 1}
+        assert 'délestage: 2 page(s), 1 analyse(s)' in report.summary()
+
+    def test_engine_sheds_and_releases(self, monkeypatch):
+        """LiveScanEngine.scan : pages délestées non téléchargées, redevenues dues au cycle suivant"""
+        with open(SAMPLE_MATCH, 'rb') as f:
+            match_html = f.read()
+        index_html = ("<table>" + _index_row(10, 'early', 'C - D') + _index_row(81, 'late', 'A - B')
+                      + "</table>").encode()
+        engine = LiveScanEngine(rate_per_second=1000, burst=100, max_workers=1)
+        fetched = []
+
+        def fake_fetch(url):
+            fetched.append(url)
+            return index_html if url == 'https://index/' else match_html
+
+        monkeypatch.setattr(engine, 'fetch', fake_fetch)
+        scheduler = PollScheduler()
+        planner = CyclePlanner(budget_seconds=1)
+        planner.start_cycle()
+        snapshot = engine.scan({'a': 'https://league/a'}, index_url='https://index/',
+                               scheduler=scheduler, planner=planner)
+        late = 'https://index/pmatch.asp?league=a&stats=late'
+        early = 'https://index/pmatch.asp?league=a&stats=early'
+        assert [r.match_url for r in snapshot.matches] == [late]
+        assert snapshot.shed == [('a', early)] and ('a', early) in snapshot.deferred
+        assert snapshot.labels[early] == "10' C - D stats"
+        assert planner.report.fetched == 1
+
+        planner.budget_seconds = 60
+        planner.start_cycle()
+        fetched.clear()
+        snapshot = engine.scan({'a': 'https://league/a'}, index_url='https://index/',
+                               scheduler=scheduler, planner=planner)
+        assert fetched == ['https://index/', early]
@@ -0,0 +1,88 @@
+"""
+Tests de la planification adaptative des pages de match (distance aux intervalles critiques).
+
+Usage :
+    python3 -m pytest test_live_poll_scheduler.py -q
+"""
+import os
+import sys
+
+from live_poll_scheduler import CRITICAL_WINDOWS, PollScheduler, minutes_to_window
+from live_scan_engine import LiveScanEngine
+
+SAMPLE_MATCH = os.path.join(os.path.dirname(__file__), 'football-live-prediction', 'live_match_sample.html')
+
+
+class TestPollScheduler:
+    """Tests pour PollScheduler"""
+
+    def test_delay_by_phase(self):
+        """Rapide dans l'intervalle et juste avant, lent loin, mi-temps planifiée comme la 46e"""
+        scheduler = PollScheduler(fast_seconds=20, lead_minutes=3, slow_seconds=300)
+        assert minutes_to_window(10) == 21 and minutes_to_window(40) == 0 and minutes_to_window(93) == 0
+        assert scheduler.delay(5) == 300
+        assert scheduler.delay(26) == 120  # réveil au début de l'approche (28')
+        assert scheduler.delay(29) == 20
+        assert scheduler.delay(45) == 20
+        assert scheduler.delay(60) == 300
+        assert scheduler.delay(72) == 20
+        assert scheduler.delay(90) == 20
+        assert scheduler.delay(None, half_time=True) == 300
+        assert scheduler.delay(None) == scheduler.unknown_seconds
+
+    def test_windows_match_live_predictor_v2(self):
+        """Les fenêtres recopiées suivent les intervalles de LivePredictorV2"""
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'football-live-prediction'))
+        from live_predictor_v2 import LivePredictorV2
+        assert CRITICAL_WINDOWS == tuple(interval[:2] for interval in (LivePredictorV2.INTERVAL_1,
+                                                                      LivePredictorV2.INTERVAL_2))
+
+    def test_select_prioritises_windows_and_defers(self):
+        """Intervalle d'abord ; mi-temps et matchs non dus différés ; budget par cycle"""
+        scheduler = PollScheduler(fast_seconds=20, slow_seconds=300, max_polls_per_cycle=2)
+        urls = [('a', 'early'), ('a', 'window'), ('b', 'approach'), ('b', 'ht')]
+        minutes = {'early': 10, 'window': 80, 'approach': 29, 'ht': 45}
+
+        due, deferred = scheduler.select(urls, minutes, half_time=['ht'], now=0)
+        assert due == [('a', 'window'), ('b', 'approach')]
+        assert set(deferred) == {('a', 'early'), ('b', 'ht')}
+
+        due, _ = scheduler.select(urls, minutes, half_time=['ht'], now=10)
+        assert due == [('a', 'early')]  # jamais scrapé, les deux autres ne sont pas encore dus
+
+        due, _ = scheduler.select(urls, minutes, half_time=['ht'], now=25)
+        assert due == [('a', 'window'), ('b', 'approach')]
+        # early (10') scrapé à t=10 : prochain passage au début de l'approche, plafonné à 300s
+        assert scheduler.next_wake(now=25) == 20
+        scheduler.select(urls[1:3], minutes, now=50)
+        assert scheduler.next_wake(now=50) == 20
+        assert 'early' not in scheduler._polled_at  # match disparu de la page d'accueil
+
+    def test_engine_skips_deferred_matches(self, monkeypatch):
+        """LiveScanEngine.scan : pages de match téléchargées seulement quand elles sont dues"""
+        with open(SAMPLE_MATCH, 'rb') as f:
+            match_html = f.read()
+        index_html = (
+            "<table>"
+            "<tr><td><font color='#C70039'>81'</font></td><td><a href='pmatch.asp?league=a&stats=m1'>s</a></td></tr>"
+            "<tr><td><font color='#C70039'>HT</font></td><td><a href='pmatch.asp?league=a&stats=m2'>s</a></td></tr>"
+            "</table>"
+        ).encode()
+        engine = LiveScanEngine(rate_per_second=1000, burst=100, max_workers=2)
+        fetched = []
+
+        def fake_fetch(url):
+            fetched.append(url)
+            return index_html if url == 'https://index/' else match_html
+
+        monkeypatch.setattr(engine, 'fetch', fake_fetch)
+        scheduler = PollScheduler()
+        snapshot = engine.scan({'a': 'https://league/a'}, index_url='https://index/', scheduler=scheduler)
+        assert [r.match_url for r in snapshot.matches] == ['https://index/pmatch.asp?league=a&stats=m1']
+        assert snapshot.deferred == [('a', 'https://index/pmatch.asp?league=a&stats=m2')]
+        assert snapshot.half_time == ['https://index/pmatch.asp?league=a&stats=m2']
+
+        fetched.clear()
+        snapshot = engine.scan({'a': 'https://league/a'}, index_url='https://index/', scheduler=scheduler)
+        assert fetched == ['https://index/'] and snapshot.matches == []
+        assert len(snapshot.deferred) == 2
@@ -0,0 +1,124 @@
+"""
+Tests du moteur de scan live concurrent (sans réseau : fetch remplacé par des pages locales).
+
+Usage :
+    python3 -m pytest test_live_scan_engine.py -q
+"""
+import os
+import threading
+import time
+
+import pytest
+
+from live_scan_engine import LiveScanEngine, TokenBucket
+
+SAMPLE_MATCH = os.path.join(os.path.dirname(__file__), 'football-live-prediction', 'live_match_sample.html')
+SAMPLE_HOME = os.path.join(os.path.dirname(__file__), 'soccerstats_home.html')
+
+
+def _league_page(match_ids):
+    rows = ''.join(
+        f"<tr><td>67'</td><td><a href='pmatch.asp?league=x&stats={mid}'>stats</a></td></tr>"
+        for mid in match_ids
+    )
+    rows += "<tr><td>20:00</td><td><a href='pmatch.asp?league=x&stats=later'>stats</a></td></tr>"
+    return f"<table>{rows}</table>".encode()
+
+
+class TestTokenBucket:
+    """Tests pour TokenBucket"""
+
+    def test_rate_is_enforced_across_threads(self):
+        """Au-delà de la rafale, le débit global est limité à `rate` requêtes/s"""
+        bucket = TokenBucket(rate=20, capacity=2)
+        start = time.monotonic()
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        # 2 jetons immédiats + 6 jetons à 20/s => au moins 0.3s
+        assert time.monotonic() - start >= 0.28
+
+
+class TestLiveScanEngine:
+    """Tests pour LiveScanEngine"""
+
+    def test_scan_snapshot(self, monkeypatch):
+        """Toutes les ligues et tous les matchs live sont collectés, erreurs isolées"""
+        with open(SAMPLE_MATCH, 'rb') as f:
+            match_html = f.read()
+        pages = {
+            'https://league/a': _league_page(['m1', 'm2']),
+            'https://league/b': _league_page(['m2', 'm3']),
+        }
+        engine = LiveScanEngine(rate_per_second=1000, burst=100, max_workers=4)
+
+        def fake_fetch(url):
+            engine.bucket.acquire()
+            if url in pages:
+                return pages[url]
+            if url.endswith('m3'):
+                raise RuntimeError('timeout')
+            return match_html
+
+        monkeypatch.setattr(engine, 'fetch', fake_fetch)
+        snapshot = engine.scan({'a': 'https://league/a', 'b': 'https://league/b', 'c': 'https://league/c'},
+                               index_url=None)
+
+        urls = [r.match_url for r in snapshot.matches]
+        assert [r.league for r in snapshot.matches] == ['a', 'a']
+        assert urls[0].endswith('m1') and urls[1].endswith('m2')
+        assert snapshot.matches[0].data.home_team == 'IBERIA B'
+        assert snapshot.matches[0].data.minute == 81
+        # m2 n'est scrapé qu'une fois ; m3 en erreur ; la ligue c renvoie une page de match (aucun lien)
+        assert any(key.endswith('m3') for key in snapshot.errors)
+        assert 'later' not in ''.join(urls)
+
+    def test_parse_index(self):
+        """Page d'accueil : seules les lignes avec minute sont live, rangées par code de ligue"""
+        with open(SAMPLE_HOME, 'rb') as f:
+            index = LiveScanEngine.parse_index(f.read())
+        assert index.unresolved == 0
+        assert sum(len(urls) for urls in index.matches.values()) == 18
+        bulgaria = index.matches['bulgaria']
+        assert bulgaria == ['https://www.soccerstats.com/pmatch.asp?league=bulgaria&stats=152-3-5-2026']
+        assert index.minutes[bulgaria[0]] == 57
+        # matchs à venir (15:00), terminés (FT) et articles "Playing today" exclus
+        assert 'england' not in index.matches and 'georgia2' not in index.matches
+
+    def test_index_discovery_with_fallback(self, monkeypatch):
+        """Une requête d'index ; pages de ligues seulement si une ligne live n'a pas de ligue"""
+        index_html = (
+            "<table>"
+            "<tr><td><font color='#C70039'>67'</font></td><td>A 1:0 B</td>"
+            "<td><a href='pmatch.asp?league=a&stats=m1'>stats</a></td></tr>"
+            "<tr><td><font color='green'>20:00</font></td><td>C - D</td>"
+            "<td><a href='pmatch.asp?league=b&stats=later'>stats</a></td></tr>"
+            "</table>"
+        ).encode()
+        leagues = {'a': 'https://league/a', 'b': 'https://league/b'}
+        engine = LiveScanEngine(rate_per_second=1000, burst=100, max_workers=4)
+        fetched = []
+
+        def fake_fetch(url):
+            fetched.append(url)
+            if url == 'https://index/':
+                return index_html
+            if url in leagues.values():
+                return _league_page(['m2'])
+            raise RuntimeError('offline')
+
+        monkeypatch.setattr(engine, 'fetch', fake_fetch)
+        snapshot = engine.scan(leagues, index_url='https://index/')
+        assert fetched[0] == 'https://index/'
+        assert not any(url.startswith('https://league/') for url in fetched)
+        assert snapshot.fallback_leagues == []
+        assert list(snapshot.errors) == ['https://index/pmatch.asp?league=a&stats=m1']
+
+        # ligne live sans league= : seules les ligues sans match résolu sont re-scannées
+        index_html += b"<table><tr><td><font color='#C70039'>12'</font></td><td><a href='pmatch.asp?stats=x'>E - F</a></td></tr></table>"
+        fetched.clear()
+        snapshot = engine.scan(leagues, index_url='https://index/')
+        assert snapshot.fallback_leagues == ['b']
+        assert 'https://league/b' in fetched and 'https://league/a' not in fetched
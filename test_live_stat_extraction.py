@@ -0,0 +1,59 @@
+"""
+Tests de l'extraction des stats live en un seul parcours (StatBlock + mémo par disposition).
+
+Usage :
+    python3 -m pytest test_live_stat_extraction.py -q
+"""
+import os
+
+from bs4 import BeautifulSoup
+
+from soccerstats_live_scraper import STAT_NAMES, SoccerStatsLiveScraper, StatBlock
+
+SAMPLE_MATCH = os.path.join(os.path.dirname(__file__), 'football-live-prediction', 'live_match_sample.html')
+
+
+def _sample_soup():
+    with open(SAMPLE_MATCH, 'rb') as f:
+        return BeautifulSoup(f.read(), 'html.parser')
+
+
+class TestStatExtraction:
+    """Tests pour SoccerStatsLiveScraper.extract_stats"""
+
+    def test_single_pass_matches_per_stat_extraction(self):
+        """Même résultat que extract_stat stat par stat"""
+        scraper = SoccerStatsLiveScraper()
+        soup = _sample_soup()
+        expected = {name: scraper.extract_stat(soup, name) for name in STAT_NAMES}
+        stats = scraper.extract_stats(soup)
+        assert stats == expected
+        assert stats['Possession'] == ('49%', '51%')
+        assert stats['Dangerous attacks'] == ('44', '52')
+        assert stats['Shots inside box'] == (None, None)
+
+    def test_layout_memo_skips_fallbacks(self, monkeypatch):
+        """Deuxième page de même disposition : méthode mémorisée, stats absentes non recherchées"""
+        scraper = SoccerStatsLiveScraper()
+        first = scraper.extract_stats(_sample_soup())
+        (methods,) = scraper.layout_methods.values()
+        assert methods['Possession'] == 1 and methods['Shots inside box'] is None
+
+        def fail(*args, **kwargs):
+            raise AssertionError("fallback appelé")
+
+        monkeypatch.setattr(StatBlock, '_b_values', fail)
+        monkeypatch.setattr(StatBlock, '_table_values', fail)
+        assert scraper.extract_stats(_sample_soup()) == first
+        assert scraper.layout_memo_hits == len(STAT_NAMES)
+
+    def test_scrape_match_uses_stat_block(self, monkeypatch):
+        """scrape_match convertit les valeurs extraites"""
+        scraper = SoccerStatsLiveScraper()
+        monkeypatch.setattr(scraper, 'fetch_match_page', lambda url: _sample_soup())
+        data = scraper.scrape_match('https://www.soccerstats.com/pmatch.asp?league=georgia2&stats=x')
+        assert data is not None
+        assert (data.possession_home, data.possession_away) == (49.0, 51.0)
+        assert (data.shots_home, data.shots_away) == (7, 13)
+        assert (data.attacks_home, data.dangerous_attacks_away) == (100, 52)
+        assert data.shots_inside_box_home is None
@@ -0,0 +1,92 @@
+"""
+Tests de la file d'envoi Telegram (non bloquante, débit limité, nouvelles tentatives, coalescence).
+
+Usage :
+    python3 -m pytest test_telegram_queue.py -q
+"""
+import threading
+import time
+
+from telegram_queue import TelegramDeliveryQueue
+
+
+class FakeTelegram:
+    """API Telegram simulée : réponses programmées, envois horodatés, blocage possible"""
+
+    def __init__(self, responses=(), delay=0.0):
+        self.responses = list(responses)
+        self.delay = delay
+        self.sent = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, message):
+        self.gate.wait(5)
+        time.sleep(self.delay)
+        self.sent.append((time.monotonic(), message.chat_id, message.text))
+        if self.responses:
+            return self.responses.pop(0)
+        return 200, {'ok': True}
+
+
+class TestTelegramDeliveryQueue:
+    """Tests pour TelegramDeliveryQueue"""
+
+    def test_enqueue_never_blocks(self):
+        """Un API lente ne ralentit pas la boucle de scan"""
+        api = FakeTelegram(delay=0.2)
+        queue = TelegramDeliveryQueue(send=api, chat_interval=0)
+        started = time.monotonic()
+        for i in range(5):
+            assert queue.enqueue('token', 42, f'msg {i}')
+        assert time.monotonic() - started < 0.1
+        assert queue.flush(timeout=5)
+        assert [text for _, _, text in api.sent] == [f'msg {i}' for i in range(5)]
+        queue.stop()
+
+    def test_coalesces_updates_for_same_match_and_interval(self):
+        """Seule la dernière probabilité d'un match/intervalle en attente est envoyée"""
+        api = FakeTelegram()
+        api.gate.clear()
+        queue = TelegramDeliveryQueue(send=api, chat_interval=0)
+        queue.enqueue('token', 42, 'autre match', key=('m0', '76-90'))
+        time.sleep(0.05)  # le premier message est en cours d'envoi (bloqué)
+        for probability in (66, 70, 74):
+            queue.enqueue('token', 42, f'm1 {probability}%', key=('m1', '76-90'))
+        queue.enqueue('token', 7, 'm1 autre chat', key=('m1', '76-90'))
+        api.gate.set()
+        assert queue.flush(timeout=5)
+        assert [text for _, _, text in api.sent] == ['autre match', 'm1 74%', 'm1 autre chat']
+        assert queue.stats['coalesced'] == 2
+        queue.stop()
+
+    def test_retries_with_backoff_and_gives_up_on_client_errors(self):
+        """5xx et 429 : nouvelle tentative (retry_after respecté) ; 400 : abandon"""
+        api = FakeTelegram(responses=[(500, {}), (429, {'parameters': {'retry_after': 0.2}}), (200, {}),
+                                      (400, {'description': 'chat not found'})])
+        queue = TelegramDeliveryQueue(send=api, chat_interval=0, backoff_seconds=0.05)
+        queue.enqueue('token', 42, 'alerte')
+        assert queue.flush(timeout=5)
+        (first, _, _), (second, _, _), (third, _, _) = api.sent
+        assert second - first >= 0.05 and third - second >= 0.2
+        queue.enqueue('token', 43, 'perdu')
+        assert queue.flush(timeout=5)
+        assert queue.stats['sent'] == 1 and queue.stats['retried'] == 2 and queue.stats['failed'] == 1
+        queue.stop()
+
+    def test_rate_limits_and_bounded_size(self):
+        """Délai minimal par chat, file bornée (le plus ancien message est abandonné)"""
+        api = FakeTelegram()
+        queue = TelegramDeliveryQueue(send=api, chat_interval=0.1, maxsize=3)
+        api.gate.clear()
+        queue.enqueue('token', 42, 'bloquant')
+        time.sleep(0.05)
+        for i in range(4):
+            queue.enqueue('token', 42, f'msg {i}')
+        assert queue.stats['dropped'] == 1
+        api.gate.set()
+        assert queue.flush(timeout=5)
+        assert [text for _, _, text in api.sent] == ['bloquant', 'msg 1', 'msg 2', 'msg 3']
+        times = [t for t, _, _ in api.sent]
+        assert all(b - a >= 0.09 for a, b in zip(times, times[1:]))
+        queue.stop()